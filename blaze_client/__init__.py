@@ -1,2 +1,46 @@
-from .blaze_client import BlazeClient
-from .NonExistentResourceException import NonExistentResourceException
\ No newline at end of file
+"""Client for the Samply.blaze FHIR server. The classes are imported lazily, on first access, so importing
+the package does not load the MIABIS on FHIR model, requests or aiohttp until they are needed."""
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .blaze_client import BlazeClient
+    from .NonExistentResourceException import NonExistentResourceException
+    from .collection_statistics_store import CollectionStatisticsStore
+    from .group_membership_index import GroupMembershipIndex
+    from .identifier_cache import IdentifierCache
+    from .purge import PurgeProgress
+    from .resource_cache import ResourceCache
+    from .search_util import SearchPolicy
+    from .async_blaze_client import AsyncBlazeClient
+
+# name of the attribute -> module it is defined in
+_LAZY_ATTRIBUTES = {
+    "BlazeClient": ".blaze_client",
+    "NonExistentResourceException": ".NonExistentResourceException",
+    "CollectionStatisticsStore": ".collection_statistics_store",
+    "GroupMembershipIndex": ".group_membership_index",
+    "IdentifierCache": ".identifier_cache",
+    "PurgeProgress": ".purge",
+    "ResourceCache": ".resource_cache",
+    "SearchPolicy": ".search_util",
+    # aiohttp is an optional dependency, installed with the "async" extra. Without it, accessing
+    # AsyncBlazeClient raises ImportError
+    "AsyncBlazeClient": ".async_blaze_client",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # later accesses do not go through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
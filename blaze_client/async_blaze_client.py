@@ -0,0 +1,211 @@
+import asyncio
+import base64
+import functools
+from typing import AsyncGenerator, Callable, TypeVar
+
+import aiohttp
+
+from blaze_client.batch_loader import AsyncBatchLoader
+from blaze_client.client_core import BatchLoad, BlazeClientCore, BlazeResponse, Concurrently, HttpRequest, \
+    Operation, SearchAll, expose_operations, parse_json_body
+from blaze_client.collection_statistics_store import CollectionStatisticsStore
+from blaze_client.group_membership_index import GroupMembershipIndex
+from blaze_client.identifier_cache import IdentifierCache
+from blaze_client.resource_cache import ResourceCache
+from blaze_client.search_util import SearchPolicy
+
+RETRY_STATUSES = frozenset([500, 502, 503, 504])
+
+T = TypeVar("T")
+
+
+def _create_coroutine_method(steps: Callable[..., Operation]) -> Callable:
+    @functools.wraps(steps)
+    async def run_operation(self: "AsyncBlazeClient", *args, **kwargs):
+        return await self._run(steps(self._core, *args, **kwargs))
+
+    return run_operation
+
+
+@expose_operations(_create_coroutine_method)
+class AsyncBlazeClient:
+    """asyncio counterpart of the BlazeClient. Offers the same upload/update/build/delete operations as coroutines,
+    sharing one pooled aiohttp session, so that many independent requests can be in flight at once.
+    Failed requests raise aiohttp.ClientResponseError where the BlazeClient raises requests.HTTPError.
+    Use it as an async context manager, or call close() when done."""
+
+    def __init__(self, blaze_url: str, blaze_username: str, blaze_password: str, max_concurrency: int = 64,
+                 connection_limit: int = 100, retries: int = 5, backoff_factor: float = 0.1,
+                 search_chunk_size: int = 100, upload_bundle_size: int = 100,
+                 conditional_upload: bool = False,
+                 collection_statistics_store: CollectionStatisticsStore = None, delete_bundle_size: int = 1000,
+                 group_membership_index: GroupMembershipIndex = None, identifier_cache: IdentifierCache = None,
+                 resource_cache: ResourceCache = None, lookup_batch_window_seconds: float = None,
+                 search_policy: SearchPolicy = None, trusted_hydration: bool = False):
+        """
+        :param blaze_url: url of the blaze server
+        :param blaze_username: blaze username
+        :param blaze_password: blaze password
+        :param max_concurrency: maximum number of requests that are in flight at the same time
+        :param connection_limit: maximum number of open connections in the connection pool
+        :param retries: how many times a request is retried on connection errors and 5xx responses
+        :param backoff_factor: backoff factor used for exponential sleep between retries
+        The other parameters are the same as the parameters of the BlazeClient.
+        """
+        self._core = BlazeClientCore(blaze_url, self.__create_request_error, search_chunk_size=search_chunk_size,
+                                     upload_bundle_size=upload_bundle_size, conditional_upload=conditional_upload,
+                                     collection_statistics_store=collection_statistics_store,
+                                     delete_bundle_size=delete_bundle_size,
+                                     group_membership_index=group_membership_index,
+                                     identifier_cache=identifier_cache, resource_cache=resource_cache,
+                                     lookup_batch_window_seconds=lookup_batch_window_seconds,
+                                     search_policy=search_policy, trusted_hydration=trusted_hydration)
+        self._lookup_batch_window_seconds = lookup_batch_window_seconds
+        self._lookup_loaders = {}
+        self._authorization = "Basic " + base64.b64encode(
+            f"{blaze_username}:{blaze_password}".encode("utf-8")).decode("ascii")
+        self._connection_limit = connection_limit
+        self._retries = retries
+        self._backoff_factor = backoff_factor
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self):
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """Close the underlying connection pool."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._connection_limit)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  headers={"Prefer": "handling=strict",
+                                                           "Authorization": self._authorization})
+        return self._session
+
+    async def _request(self, method: str, url: str, params: dict = None, json_body: dict = None,
+                       headers: dict = None) -> BlazeResponse:
+        """Send a request to blaze. Connection errors and 5xx responses are retried with exponential backoff.
+        :param method: HTTP method
+        :param url: absolute url of the request
+        :param params: query parameters
+        :param json_body: json body of the request
+        :param headers: additional headers of the request
+        :return: finished response
+        :raises ClientError: if blaze cannot be reached"""
+        session = await self._get_session()
+        attempt = 0
+        while True:
+            try:
+                # the concurrency slot is held only by the attempt, not during the backoff
+                async with self._semaphore:
+                    async with session.request(method, url, params=params, json=json_body, headers=headers) as response:
+                        if response.status in RETRY_STATUSES and attempt < self._retries:
+                            raise _RetryableStatus()
+                        body = await response.read()
+                        return BlazeResponse(response.status, parse_json_body(body), response)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError, _RetryableStatus):
+                if attempt >= self._retries:
+                    raise
+                await asyncio.sleep(self._backoff_factor * (2 ** attempt))
+                attempt += 1
+
+    async def iter_search(self, resource_type: str, params: dict = None, page_size: int = None,
+                          prefetch: bool = True) -> AsyncGenerator[dict, None]:
+        """Search for resources in blaze, lazily yielding the entries of the search bundles page by page.
+        While the entries of one page are being processed, the next page is already fetched in the background.
+        :param resource_type: the type of the resources
+        :param params: search parameters
+        :param page_size: number of entries per page (_count). If None, the page size of the search policy is used
+        :param prefetch: fetch the next page in the background. Should be disabled when only the first entries
+        are going to be consumed
+        :return: async generator of bundle entries (containing the resource as well as its search mode)
+        :raises ClientResponseError: if the request to blaze fails
+        """
+        response_json = await self._run(self._core.get_first_search_page(resource_type, params, page_size))
+        while True:
+            next_link = self._core.get_next_link(response_json)
+            next_page = None
+            if next_link is not None and prefetch:
+                next_page = asyncio.ensure_future(self._run(self._core.get_search_page(next_link)))
+            try:
+                for entry in response_json.get("entry", []):
+                    yield entry
+            except GeneratorExit:
+                if next_page is not None:
+                    next_page.cancel()
+                raise
+            if next_link is None:
+                return
+            response_json = await next_page if next_page is not None \
+                else await self._run(self._core.get_search_page(next_link))
+
+    def record_bundle_writes(self, bundle_json: dict, response_json: dict):
+        """Record resources written by a bundle which was sent by the caller (e.g. a bundle containing the entries
+        returned by the deletes with part_of_bundle=True) into the caches, the group membership index
+        and the collection statistics store of this client.
+        :param bundle_json: json representation of the sent bundle
+        :param response_json: response of blaze to the bundle"""
+        self._core.record_bundle_writes(bundle_json, response_json)
+
+    async def _run(self, operation: Operation[T]) -> T:
+        """Run the operation of the BlazeClientCore, executing every step it yields.
+        :param operation: the operation
+        :return: result of the operation"""
+        result = None
+        error = None
+        while True:
+            try:
+                step = operation.send(result) if error is None else operation.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            try:
+                result, error = await self.__execute(step), None
+            except Exception as step_error:
+                result, error = None, step_error
+
+    async def __execute(self, step: HttpRequest | Concurrently | SearchAll | BatchLoad):
+        if isinstance(step, HttpRequest):
+            # list values (e.g. multiple _revinclude) are sent as repeated parameters
+            params = None if step.params is None else [
+                (name, value) for name, values in step.params.items()
+                for value in (values if isinstance(values, list) else [values])]
+            return await self._request(step.method, step.url, params=params, json_body=step.json,
+                                       headers=step.headers)
+        if isinstance(step, Concurrently):
+            return list(await asyncio.gather(*(self._run(operation) for operation in step.operations)))
+        if isinstance(step, SearchAll):
+            return [entry async for entry in self.iter_search(step.resource_type, step.params, step.page_size)]
+        if isinstance(step, BatchLoad):
+            return await self.__get_lookup_loader(getattr(self, step.bulk_lookup), step.resource_type).load(step.key)
+        raise TypeError(f"Unknown step of an operation: {step!r}")
+
+    def __get_lookup_loader(self, bulk_lookup: Callable, resource_type: str) -> AsyncBatchLoader:
+        """Get loader gathering concurrent lookups of resources of a single type into calls of the bulk lookup.
+        :param bulk_lookup: bulk variant of the lookup (get_fhir_ids or get_identifiers_by_fhir_ids)
+        :param resource_type: type of the resources
+        :return: the loader"""
+        key = (bulk_lookup.__name__, resource_type.capitalize())
+        loader = self._lookup_loaders.get(key)
+        if loader is None:
+            loader = AsyncBatchLoader(lambda keys: bulk_lookup(resource_type, keys), self._lookup_batch_window_seconds)
+            self._lookup_loaders[key] = loader
+        return loader
+
+    @staticmethod
+    def __create_request_error(response: BlazeResponse, status: int, message: str) -> aiohttp.ClientResponseError:
+        return aiohttp.ClientResponseError(response.origin.request_info, response.origin.history, status=status,
+                                           message=message, headers=response.origin.headers)
+
+
+class _RetryableStatus(Exception):
+    """Raised internally when blaze responds with a status that should be retried"""
+    pass
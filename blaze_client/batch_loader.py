@@ -0,0 +1,149 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Hashable
+
+
+class BatchLoader:
+    """Loads values by keys for many threads at once. Keys requested within a short window are gathered
+    and loaded by a single call of the batch function, and a key which is already being loaded is not loaded again,
+    its callers wait for the same result instead.
+    The first thread requesting a key of a new batch waits for the window to pass and loads the whole batch,
+    the other threads wait for it."""
+
+    def __init__(self, load_batch: Callable[[list], dict], window_seconds: float = 0.002):
+        """
+        :param load_batch: function loading values of multiple keys, returning dictionary mapping key to the value.
+        Keys missing from the dictionary are loaded as None
+        :param window_seconds: how long keys are gathered before the batch is loaded
+        """
+        self._load_batch = load_batch
+        self._window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._pending: dict[Hashable, Future] = {}
+        self._in_flight: dict[Hashable, Future] = {}
+        self._batches = 0
+        self._coalesced = 0
+
+    @property
+    def batches(self) -> int:
+        """Number of calls of the batch function"""
+        return self._batches
+
+    @property
+    def coalesced(self) -> int:
+        """Number of requested keys which were already waiting for or being loaded"""
+        return self._coalesced
+
+    def load(self, key: Hashable):
+        """Load value of the key.
+        :param key: the key
+        :return: the value, None if the batch function did not return a value for the key
+        :raises Exception: any exception raised by the batch function"""
+        with self._lock:
+            future = self._in_flight.get(key) or self._pending.get(key)
+            is_leader = False
+            if future is not None:
+                self._coalesced += 1
+            else:
+                future = Future()
+                self._pending[key] = future
+                is_leader = len(self._pending) == 1
+        if is_leader:
+            self.__dispatch()
+        return future.result()
+
+    def __dispatch(self):
+        if self._window_seconds > 0:
+            time.sleep(self._window_seconds)
+        with self._lock:
+            batch = self._pending
+            self._pending = {}
+            self._in_flight.update(batch)
+            self._batches += 1
+        try:
+            values = self._load_batch(list(batch))
+        except BaseException as e:
+            for future in batch.values():
+                future.set_exception(e)
+        else:
+            for key, future in batch.items():
+                future.set_result(values.get(key))
+        finally:
+            with self._lock:
+                for key in batch:
+                    self._in_flight.pop(key, None)
+
+
+class AsyncBatchLoader:
+    """Loads values by keys for many tasks at once. Keys requested within a short window are gathered
+    and loaded by a single call of the batch coroutine, and a key which is already being loaded is not loaded again,
+    its callers await the same result instead."""
+
+    def __init__(self, load_batch: Callable[[list], Awaitable[dict]], window_seconds: float = 0.002):
+        """
+        :param load_batch: coroutine function loading values of multiple keys, returning dictionary mapping
+        key to the value. Keys missing from the dictionary are loaded as None
+        :param window_seconds: how long keys are gathered before the batch is loaded. With 0, the keys requested
+        until the event loop runs the batch are gathered
+        """
+        self._load_batch = load_batch
+        self._window_seconds = window_seconds
+        self._pending: dict[Hashable, asyncio.Future] = {}
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self._dispatch_tasks: set[asyncio.Task] = set()
+        self._batches = 0
+        self._coalesced = 0
+
+    @property
+    def batches(self) -> int:
+        """Number of calls of the batch coroutine"""
+        return self._batches
+
+    @property
+    def coalesced(self) -> int:
+        """Number of requested keys which were already waiting for or being loaded"""
+        return self._coalesced
+
+    async def load(self, key: Hashable):
+        """Load value of the key.
+        :param key: the key
+        :return: the value, None if the batch coroutine did not return a value for the key
+        :raises Exception: any exception raised by the batch coroutine"""
+        future = self._in_flight.get(key) or self._pending.get(key)
+        if future is not None:
+            self._coalesced += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            if len(self._pending) == 1:
+                dispatch_task = asyncio.create_task(self.__dispatch())
+                self._dispatch_tasks.add(dispatch_task)
+                dispatch_task.add_done_callback(self._dispatch_tasks.discard)
+        # cancelling one of the callers must not cancel loading of the key for the others
+        return await asyncio.shield(future)
+
+    async def __dispatch(self):
+        await asyncio.sleep(self._window_seconds)
+        batch = self._pending
+        self._pending = {}
+        self._in_flight.update(batch)
+        self._batches += 1
+        try:
+            values = await self._load_batch(list(batch))
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(values.get(key))
+        finally:
+            for key in batch:
+                self._in_flight.pop(key, None)
@@ -0,0 +1,64 @@
+from typing import Generator
+
+from miabis_model.util.parsing_util import get_nested_value
+
+
+def is_successful_entry_response(response_entry: dict) -> bool:
+    """Check whether an entry of a batch response finished with a 2xx status (status is e.g. "204 No Content")."""
+    status = (response_entry.get("response") or {}).get("status", "")
+    return status[:1] == "2"
+
+
+def get_entry_status_code(response_entry: dict) -> int | None:
+    """Get status code of an entry of a batch response (status is e.g. "404 Not Found").
+    :return: the status code, None if the entry does not have a valid status"""
+    status = (response_entry.get("response") or {}).get("status", "")
+    status_code = status.split(" ")[0]
+    return int(status_code) if status_code.isdigit() else None
+
+
+def get_entry_diagnostics(response_entry: dict) -> str | None:
+    """Get diagnostics of the OperationOutcome of a failed entry of a batch response."""
+    return get_nested_value(response_entry, ["response", "outcome", "issue", 0, "diagnostics"])
+
+
+def parse_resource_url(url: str) -> tuple[str, str | None] | None:
+    """Get type and FHIR ID of the resource from url of a bundle entry request (e.g. Patient/1, Patient or
+    Patient?identifier=...) or location of a bundle entry response (e.g. http://.../fhir/Patient/1/_history/1).
+    :return: tuple of resource type and FHIR ID (None if the url does not contain it), None if the url
+    does not refer to a resource"""
+    split_url = url.split("?")[0].rstrip("/").split("/")
+    if "_history" in split_url:
+        split_url = split_url[:split_url.index("_history")]
+    if len(split_url) >= 2 and split_url[-2][:1].isupper():
+        return split_url[-2], split_url[-1]
+    if len(split_url) == 1 and split_url[0][:1].isupper():
+        return split_url[0], None
+    return None
+
+
+def iter_bundle_writes(bundle_json: dict, response_json: dict = None) \
+        -> Generator[tuple[str, str, str, dict | None], None, None]:
+    """Iterate over the successful creates, updates and deletes of a transaction or batch bundle.
+    FHIR IDs of created resources (and of conditional requests) are taken from the locations of the response entries.
+    :param bundle_json: json representation of the sent bundle
+    :param response_json: response of blaze to the bundle. If None, all the entries are considered successful
+    :return: generator of (request method, resource type, FHIR ID, written resource or None for deletes)"""
+    response_entries = (response_json or {}).get("entry", [])
+    for index, entry in enumerate(bundle_json.get("entry") or []):
+        response_entry = response_entries[index] if index < len(response_entries) else None
+        if response_json is not None and (response_entry is None or not is_successful_entry_response(response_entry)):
+            continue
+        method = get_nested_value(entry, ["request", "method"])
+        if method not in ("POST", "PUT", "DELETE"):
+            continue
+        parsed_url = parse_resource_url(get_nested_value(entry, ["request", "url"]) or "")
+        if parsed_url is None:
+            continue
+        resource_type, resource_fhir_id = parsed_url
+        if resource_fhir_id is None:
+            parsed_location = parse_resource_url(get_nested_value(response_entry, ["response", "location"]) or "")
+            if parsed_location is None or parsed_location[1] is None:
+                continue
+            resource_fhir_id = parsed_location[1]
+        yield method, resource_type, resource_fhir_id, entry.get("resource") if method != "DELETE" else None
@@ -0,0 +1,2349 @@
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Generator, Hashable, Iterable, TypeVar
+from urllib.parse import urlencode
+
+from fhirclient.models.bundle import BundleEntry, BundleEntryRequest
+
+from miabis_model.biobank import Biobank
+from miabis_model.collection import Collection
+from miabis_model.collection_characteristics import CollectionCharacteristics
+from miabis_model.collection_organization import _CollectionOrganization
+from miabis_model.condition import Condition
+from miabis_model.juristic_person import _JuristicPerson
+from miabis_model.network import Network
+from miabis_model.network_organization import _NetworkOrganization
+from miabis_model.observation import _Observation
+from miabis_model.sample import Sample, get_sample_collection_id
+from miabis_model.sample_donor import SampleDonor
+from miabis_model.util.parsing_util import get_nested_value, parse_reference_id
+from miabis_model.util.util import create_identifier_search_query, create_bundle_dict
+from blaze_client.NonExistentResourceException import NonExistentResourceException
+from blaze_client.bundle_util import get_entry_diagnostics, get_entry_status_code, is_successful_entry_response, \
+    iter_bundle_writes
+from blaze_client.collection_statistics_store import CollectionStatisticsStore
+from blaze_client.delete_plan import DeletePlan
+from blaze_client.group_membership_index import GroupMembershipIndex, get_group_member_fhir_ids
+from blaze_client.identifier_cache import IdentifierCache
+from blaze_client.purge import PURGE_ORDER, PurgeProgress, create_keyset_search_params, create_purge_search_params
+from blaze_client.resource_cache import ResourceCache
+from blaze_client.search_util import SearchPolicy, chunk_list, join_search_values
+
+T = TypeVar("T")
+
+
+@dataclass
+class HttpRequest:
+    """Request which an operation asks its client to send to blaze. The response is sent back to the operation
+    as BlazeResponse."""
+    method: str
+    url: str
+    params: dict | None = None
+    json: dict | None = None
+    headers: dict | None = None
+
+
+@dataclass
+class BlazeResponse:
+    """Status and parsed body of a finished request."""
+    status: int
+    json: Any
+    # response of the http library of the client, used for creating the exceptions of failed requests
+    origin: Any = None
+
+
+@dataclass
+class Concurrently:
+    """Operations which the client runs concurrently. List of their results, in the same order,
+    is sent back to the operation."""
+    operations: list[Generator]
+
+
+@dataclass
+class SearchAll:
+    """Search which the client runs by its iter_search. List of entries of all the pages is sent back
+    to the operation."""
+    resource_type: str
+    params: dict
+    page_size: int | None = None
+
+
+@dataclass
+class BatchLoad:
+    """Lookup which the client gathers with other concurrent lookups into a single call of the bulk lookup
+    (see lookup_batch_window_seconds). The loaded value is sent back to the operation."""
+    bulk_lookup: str
+    resource_type: str
+    key: Hashable
+
+
+# generator yielding the steps above, the value it returns is the result of the operation
+Operation = Generator[HttpRequest | Concurrently | SearchAll | BatchLoad, Any, T]
+
+
+def operation(function: Callable) -> Callable:
+    """Mark a method of the BlazeClientCore as an operation, which the clients offer as their own method."""
+    function.is_operation = True
+    return function
+
+
+def expose_operations(create_method: Callable[[Callable], Callable]) -> Callable[[type], type]:
+    """Class decorator adding all the operations of the BlazeClientCore to the client class.
+    :param create_method: creates the method of the client from the operation. The method is expected to run
+    the operation on the BlazeClientCore of the client
+    :return: the class decorator"""
+
+    def decorate(client_class: type) -> type:
+        for name, function in vars(BlazeClientCore).items():
+            if getattr(function, "is_operation", False):
+                setattr(client_class, name, create_method(function))
+        return client_class
+
+    return decorate
+
+
+def parse_json_body(body: str | bytes) -> Any:
+    """Parse the body of a response. Bodies which are not json, e.g. error pages of a proxy, are parsed as None,
+    so that the status of the response is reported instead of a decoding error."""
+    if not body:
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+class BlazeClientCore:
+    """Operations of the BlazeClient and the AsyncBlazeClient, i.e. everything apart from sending the requests.
+    Every operation is a generator, which yields the requests (and the other steps) it needs to be sent and receives
+    their results, so that the same operation can be run by the blocking BlazeClient as well as by the asyncio
+    AsyncBlazeClient."""
+
+    def __init__(self, blaze_url: str, create_request_error: Callable[[BlazeResponse, int, str], Exception],
+                 search_chunk_size: int = 100, upload_bundle_size: int = 100, conditional_upload: bool = False,
+                 collection_statistics_store: CollectionStatisticsStore = None, delete_bundle_size: int = 1000,
+                 group_membership_index: GroupMembershipIndex = None, identifier_cache: IdentifierCache = None,
+                 resource_cache: ResourceCache = None, lookup_batch_window_seconds: float = None,
+                 search_policy: SearchPolicy = None, trusted_hydration: bool = False):
+        """
+        :param blaze_url: url of the blaze server
+        :param create_request_error: creates the exception raised for a failed request from its response,
+        the status of the failure and the message
+        The other parameters are described by the BlazeClient.
+        """
+        self._blaze_url = blaze_url
+        self._create_request_error = create_request_error
+        self._search_chunk_size = search_chunk_size
+        self._upload_bundle_size = upload_bundle_size
+        self._conditional_upload = conditional_upload
+        self._collection_statistics_store = collection_statistics_store or CollectionStatisticsStore()
+        self._delete_bundle_size = delete_bundle_size
+        self._group_membership_index = group_membership_index
+        self._identifier_cache = identifier_cache
+        self._resource_cache = resource_cache
+        self._lookup_batch_window_seconds = lookup_batch_window_seconds
+        self._search_policy = search_policy or SearchPolicy()
+        self._trusted_hydration = trusted_hydration
+
+    @operation
+    def is_resource_present_in_blaze(self, resource_type: str, search_value: str,
+                                     search_param: str = None) -> Operation[bool]:
+        """Check if a resource is present in the blaze.
+        The search parameter needs to confront to the searchable parameters defined by FHIR for each resource.
+        if search_param is None, this method checks the existence of resource by FHIR id.
+        :param resource_type: type of the resource
+        :param search_param: parameter by which the resource is searched
+        :param search_value: actual value by which the search is done
+        :return True if the resource is present, false otherwise
+        :raises HTTPError: if the request to blaze fails"""
+        if search_param is None:
+            response = yield HttpRequest("GET", f"{self._blaze_url}/{resource_type.capitalize()}/{search_value}")
+            return response.status == 200
+        return (yield from self.__search_exists(resource_type, {search_param: search_value}))
+
+    @operation
+    def get_fhir_resource_as_json(self, resource_type: str, resource_fhir_id: str) -> Operation[dict | None]:
+        """Get a FHIR resource from blaze as a json.
+        :param resource_type: the type of the resource
+        :param resource_fhir_id: the fhir id of the resource
+        :return: json representation of the resource, or None if such resource is not present.
+        :raises HTTPError: if the request to blaze fails
+        """
+        url = f"{self._blaze_url}/{resource_type.capitalize()}/{resource_fhir_id}"
+        response = yield HttpRequest("GET", url,
+                                     headers=self.__create_if_none_match_header(resource_type, resource_fhir_id))
+        if response.status == 304:
+            cached_resource = self._resource_cache.get(resource_type, resource_fhir_id)
+            if cached_resource is not None:
+                return cached_resource
+            # the resource was evicted from the cache in the meantime
+            response = yield HttpRequest("GET", url)
+        if response.status == 404:
+            if self._resource_cache is not None:
+                self._resource_cache.invalidate(resource_type, resource_fhir_id)
+            return None
+        self.__raise_for_status_extract_diagnostics_message(response)
+        self.__cache_resource(response.json)
+        if self._resource_cache is not None:
+            self._resource_cache.put(response.json)
+        return response.json
+
+    def __create_if_none_match_header(self, resource_type: str, resource_fhir_id: str) -> dict | None:
+        """Create header of a conditional read of the resource, if its version is cached."""
+        if self._resource_cache is None:
+            return None
+        version_id = self._resource_cache.get_version_id(resource_type, resource_fhir_id)
+        return {"If-None-Match": f'W/"{version_id}"'} if version_id is not None else None
+
+    @operation
+    def get_resource_by_search_parameter(self, resource_type: str, search_parameter: str,
+                                         search_value: str) -> Operation[dict | None]:
+        """Get a FHIR resource(s) by searching through defined search parameter.
+        :param resource_type: the type of the resource
+        :param search_parameter: the name of the search parameter to use
+        :param search_value: value to search by
+        :return: List of json representation of the resource(s), or None if such resource(s) are not present.
+        :raises HTTPError: if the request to blaze fails"""
+        response = yield HttpRequest("GET", f"{self._blaze_url}/{resource_type.capitalize()}",
+                                     params={search_parameter: search_value})
+        if response.status == 404:
+            return None
+        self.__raise_for_status_extract_diagnostics_message(response)
+        return response.json
+
+    @operation
+    def get_fhir_id(self, resource_type: str, resource_identifier: str) -> Operation[str | None]:
+        """get the fhir id of a resource in blaze.
+            :param resource_type: the type of the resource
+            :param resource_identifier: the identifier of the resource (usually given by the organization)
+            :return: the fhir id of the resource in blaze, or None if the resource was not found
+            :raises HTTPError: if the request to blaze fails
+            """
+        if self._identifier_cache is not None:
+            fhir_id = self._identifier_cache.get_fhir_id(resource_type, resource_identifier)
+            if fhir_id is not None:
+                return fhir_id
+        if self._lookup_batch_window_seconds is not None:
+            return (yield BatchLoad("get_fhir_ids", resource_type, resource_identifier))
+        resource = yield from self.__get_first_resource_by_search(
+            resource_type, self._search_policy.id_resolution_params({"identifier": resource_identifier}))
+        fhir_id = get_nested_value(resource, ["id"])
+        if self._identifier_cache is not None:
+            self._identifier_cache.put(resource_type, resource_identifier, fhir_id)
+        return fhir_id
+
+    @operation
+    def get_fhir_ids(self, resource_type: str, identifiers: Iterable[str]) -> Operation[dict[str, str]]:
+        """get the fhir ids of multiple resources in blaze.
+        Identifiers are split into chunks, each chunk is resolved by a single OR search (identifier=a,b,c)
+        and the chunks are searched concurrently.
+            :param resource_type: the type of the resources
+            :param identifiers: the identifiers of the resources (usually given by the organization)
+            :return: dictionary mapping identifier to the fhir id of the resource. Identifiers of resources
+            which were not found are not present in the dictionary.
+            :raises HTTPError: if the request to blaze fails
+            """
+        unique_identifiers = list(dict.fromkeys(identifiers))
+        fhir_ids = {}
+        if self._identifier_cache is not None:
+            for identifier in unique_identifiers:
+                fhir_id = self._identifier_cache.get_fhir_id(resource_type, identifier)
+                if fhir_id is not None:
+                    fhir_ids[identifier] = fhir_id
+            unique_identifiers = [identifier for identifier in unique_identifiers if identifier not in fhir_ids]
+        for chunk_fhir_ids in (yield Concurrently([
+                self.__get_fhir_ids_for_chunk(resource_type, identifiers_chunk)
+                for identifiers_chunk in chunk_list(unique_identifiers, self._search_chunk_size)])):
+            fhir_ids.update(chunk_fhir_ids)
+        return fhir_ids
+
+    def __get_fhir_ids_for_chunk(self, resource_type: str, identifiers: list[str]) -> Operation[dict[str, str]]:
+        """Resolve a single chunk of identifiers, following the next links of the search bundle.
+        :param resource_type: the type of the resources
+        :param identifiers: the identifiers of the resources
+        :return: dictionary mapping identifier to the fhir id of the resource"""
+        requested_identifiers = set(identifiers)
+        fhir_ids = {}
+        resources = yield from self.__get_all_resources_by_search(
+            resource_type, self._search_policy.id_resolution_params({
+                "identifier": join_search_values(identifiers),
+                "_count": len(identifiers)
+            }))
+        for resource in resources:
+            for identifier in resource.get("identifier", []):
+                value = identifier.get("value")
+                if value in requested_identifiers and value not in fhir_ids:
+                    fhir_ids[value] = resource.get("id")
+        return fhir_ids
+
+    @operation
+    def get_fhir_resources_as_json(self, resource_type: str, resource_fhir_ids: Iterable[str],
+                                   elements: list[str] = None) -> Operation[dict[str, dict]]:
+        """Get multiple FHIR resources from blaze as jsons.
+        FHIR ids are split into chunks, each chunk is read by a single search (_id=a,b,c)
+        and the chunks are searched concurrently.
+        :param resource_type: the type of the resources
+        :param resource_fhir_ids: the fhir ids of the resources
+        :param elements: if provided, only these elements of the resources are returned (_elements projection).
+        Such resources are incomplete and should not be used for updates.
+        :return: dictionary mapping fhir id to json representation of the resource. Resources which are not present
+        in blaze are not present in the dictionary.
+        :raises HTTPError: if the request to blaze fails
+        """
+        unique_fhir_ids = list(dict.fromkeys(resource_fhir_ids))
+        resources = {}
+        for chunk_resources in (yield Concurrently([
+                self.__get_resources_for_chunk(resource_type, fhir_ids_chunk, elements)
+                for fhir_ids_chunk in chunk_list(unique_fhir_ids, self._search_chunk_size)])):
+            for resource in chunk_resources:
+                resources[resource["id"]] = resource
+        return resources
+
+    @operation
+    def batch_get(self, request_urls: Iterable[str]) -> Operation[list[dict | None]]:
+        """Send independent GET requests (reads or searches, possibly of different resource types) packed
+        into batch bundles, instead of one by one. Requests which do not fit into a single bundle
+        are split into multiple bundles, which are sent concurrently.
+        :param request_urls: urls of the requests, relative to the blaze url (e.g. Patient/123 or
+        Specimen?identifier=sampleId)
+        :return: json body of the response to every request (the resource, or the search bundle),
+        in the same order as request_urls. None for resources which are not present in blaze
+        :raises HTTPError: if the request to blaze fails, or any of the requests fails with other status than 404
+        """
+        responses = []
+        for chunk_responses in (yield Concurrently([
+                self.__batch_get_chunk(request_urls_chunk)
+                for request_urls_chunk in chunk_list(list(request_urls), self._search_chunk_size)])):
+            responses.extend(chunk_responses)
+        return responses
+
+    def __batch_get_chunk(self, request_urls: list[str]) -> Operation[list[dict | None]]:
+        """Send GET requests packed into a single batch bundle.
+        :param request_urls: urls of the requests, relative to the blaze url
+        :return: json body of the response to every request, None for resources which are not present in blaze"""
+        bundle_json = self.__create_bundle([self.__create_get_bundle_entry(request_url)
+                                            for request_url in request_urls], "batch")
+        response = yield HttpRequest("POST", self._blaze_url, json=bundle_json)
+        self.__raise_for_status_extract_diagnostics_message(response)
+        responses = []
+        for request_url, response_entry in zip(request_urls, response.json.get("entry", [])):
+            status_code = get_entry_status_code(response_entry)
+            if status_code == 404:
+                responses.append(None)
+                continue
+            if not is_successful_entry_response(response_entry):
+                raise self._create_request_error(
+                    response, status_code or response.status,
+                    f"HTTP {status_code} for batch request GET {request_url} - Diagnostics: "
+                    f"{get_entry_diagnostics(response_entry)}")
+            self.__cache_resource(response_entry.get("resource"))
+            responses.append(response_entry.get("resource"))
+        return responses
+
+    def __get_resources_for_chunk(self, resource_type: str, resource_fhir_ids: list[str],
+                                  elements: list[str] | None) -> Operation[list[dict]]:
+        """Read a single chunk of resources by their fhir ids.
+        :param resource_type: the type of the resources
+        :param resource_fhir_ids: the fhir ids of the resources
+        :param elements: elements of the resources which should be returned, None for whole resources
+        :return: list of json representations of the resources"""
+        params = {
+            "_id": ",".join(resource_fhir_ids),
+            "_count": len(resource_fhir_ids)
+        }
+        if elements is not None:
+            params["_elements"] = ",".join(elements)
+        return (yield from self.__get_all_resources_by_search(resource_type, params))
+
+    @operation
+    def get_identifiers_by_fhir_ids(self, resource_type: str,
+                                    resource_fhir_ids: Iterable[str]) -> Operation[dict[str, str]]:
+        """get the identifiers of multiple resources in blaze. Only the identifier element of the resources
+        is transferred.
+        :param resource_type: the type of the resources
+        :param resource_fhir_ids: the fhir ids of the resources
+        :return: dictionary mapping fhir id to the identifier of the resource. Resources which are not present
+        in blaze are not present in the dictionary.
+        :raises HTTPError: if the request to blaze fails
+        """
+        identifiers = {}
+        if self._identifier_cache is not None:
+            resource_fhir_ids = list(dict.fromkeys(resource_fhir_ids))
+            for resource_fhir_id in resource_fhir_ids:
+                identifier = self._identifier_cache.get_identifier(resource_type, resource_fhir_id)
+                if identifier is not None:
+                    identifiers[resource_fhir_id] = identifier
+            resource_fhir_ids = [resource_fhir_id for resource_fhir_id in resource_fhir_ids
+                                 if resource_fhir_id not in identifiers]
+        resources = yield from self.get_fhir_resources_as_json(resource_type, resource_fhir_ids, ["identifier"])
+        identifiers.update({fhir_id: get_nested_value(resource, ["identifier", 0, "value"])
+                            for fhir_id, resource in resources.items()})
+        return identifiers
+
+    def get_first_search_page(self, resource_type: str, params: dict = None,
+                              page_size: int = None) -> Operation[dict]:
+        """Get the first page of a search, with the result parameters of the list searches of the search policy.
+        Used by iter_search of the clients.
+        :param resource_type: the type of the resources
+        :param params: search parameters
+        :param page_size: number of entries per page (_count). If None, the page size of the search policy is used
+        :return: the search bundle
+        :raises HTTPError: if the request to blaze fails"""
+        params = self._search_policy.list_params(params or {}, page_size)
+        return (yield from self.get_search_page(f"{self._blaze_url}/{resource_type.capitalize()}", params))
+
+    def get_search_page(self, url: str, params: dict = None) -> Operation[dict]:
+        """Get a page of a search bundle, caching the identifiers of the found resources.
+        :param url: url of the search, or the next link of the previous page
+        :param params: search parameters
+        :return: the search bundle
+        :raises HTTPError: if the request to blaze fails"""
+        response = yield HttpRequest("GET", url, params=params)
+        self.__raise_for_status_extract_diagnostics_message(response)
+        if self._identifier_cache is not None:
+            for entry in response.json.get("entry", []):
+                self.__cache_resource(entry.get("resource"))
+        return response.json
+
+    def get_next_link(self, response_json: dict) -> str | None:
+        """Get the url of the next page of a search bundle, rewritten to the blaze url of this client.
+        :param response_json: search bundle
+        :return: url of the next page, or None if this is the last page"""
+        for link in response_json.get("link", []):
+            if link.get("relation") == "next":
+                url = link.get("url")
+                url_after_fhir = url.find("/fhir")
+                if url_after_fhir == -1:
+                    return None
+                return self._blaze_url + url[url_after_fhir + len("/fhir"):]
+        return None
+
+    def __get_all_resources_by_search(self, resource_type: str, params: dict) -> Operation[list[dict]]:
+        """Get all resources matching the search, following the next links of the search bundles.
+        :param resource_type: the type of the resources
+        :param params: search parameters
+        :return: list of json representations of the resources
+        :raises HTTPError: if the request to blaze fails"""
+        entries = yield SearchAll(resource_type, params)
+        return [entry["resource"] for entry in entries if "resource" in entry]
+
+    def __get_all_fhir_ids_by_search(self, resource_type: str, params: dict) -> Operation[list[str]]:
+        """Get FHIR ids of all resources matching the search.
+        :raises HTTPError: if the request to blaze fails"""
+        entries = yield SearchAll(resource_type, self._search_policy.id_resolution_params(params))
+        return [get_nested_value(entry, ["resource", "id"]) for entry in entries
+                if get_nested_value(entry, ["resource", "id"]) is not None]
+
+    def __search_exists(self, resource_type: str, params: dict) -> Operation[bool]:
+        """Check whether any resource matches the search, asking blaze for as little as the search policy allows.
+        :raises HTTPError: if the request to blaze fails"""
+        params = self._search_policy.existence_params(params)
+        if self._search_policy.existence_by_count:
+            search_bundle = yield from self.get_search_page(f"{self._blaze_url}/{resource_type.capitalize()}",
+                                                            params)
+            return search_bundle.get("total", 0) > 0
+        return (yield from self.__get_first_resource_by_search(resource_type, params)) is not None
+
+    def __get_first_resource_by_search(self, resource_type: str, params: dict) -> Operation[dict | None]:
+        """Get the first resource matching the search, without fetching any further pages.
+        :raises HTTPError: if the request to blaze fails"""
+        search_bundle = yield from self.get_first_search_page(resource_type, params, page_size=1)
+        return get_nested_value(search_bundle, ["entry", 0, "resource"])
+
+    def __get_fhir_ids_by_batch(self, lookups: list[tuple[str, str]]) -> Operation[list[str | None]]:
+        """Get fhir ids of resources of different types by their identifiers, searching for all of them
+        in a single batch bundle.
+        :param lookups: pairs of resource type and identifier of the resource
+        :return: fhir ids of the resources, in the same order as lookups. None for resources which were not found"""
+        fhir_ids = [self._identifier_cache.get_fhir_id(resource_type, identifier)
+                    if self._identifier_cache is not None else None for resource_type, identifier in lookups]
+        missing_indices = [index for index, fhir_id in enumerate(fhir_ids) if fhir_id is None]
+        search_bundles = yield from self.batch_get(
+            [f"{lookups[index][0].capitalize()}?{create_identifier_search_query(lookups[index][1])}&"
+             f"{urlencode(self._search_policy.id_resolution_params({'_count': 1}))}" for index in missing_indices])
+        for index, search_bundle in zip(missing_indices, search_bundles):
+            fhir_ids[index] = get_nested_value(search_bundle, ["entry", 0, "resource", "id"])
+            if self._identifier_cache is not None:
+                self._identifier_cache.put(lookups[index][0], lookups[index][1], fhir_ids[index])
+        return fhir_ids
+
+    def __get_identifiers_by_batch(self, references: list[tuple[str, str]]) -> Operation[list[str | None]]:
+        """Get identifiers of resources of different types by their fhir ids, reading all of them
+        in a single batch bundle.
+        :param references: pairs of resource type and fhir id of the resource
+        :return: identifiers of the resources, in the same order as references. None for resources
+        which are not present in blaze"""
+        identifiers = [self._identifier_cache.get_identifier(resource_type, resource_fhir_id)
+                       if self._identifier_cache is not None else None
+                       for resource_type, resource_fhir_id in references]
+        missing_indices = [index for index, identifier in enumerate(identifiers) if identifier is None]
+        resources = yield from self.batch_get([f"{references[index][0].capitalize()}/{references[index][1]}"
+                                               for index in missing_indices])
+        for index, resource in zip(missing_indices, resources):
+            identifiers[index] = get_nested_value(resource, ["identifier", 0, "value"])
+        return identifiers
+
+    @operation
+    def get_identifier_by_fhir_id(self, resource_type: str, resource_fhir_id: str) -> Operation[str | None]:
+        """get the identifier of a resource in blaze.
+            :param resource_type: the type of the resource
+            :param resource_fhir_id: the fhir id of the resource
+            :return: the identifier of the resource in blaze, None if resource with resource_fhir_id does not exists
+            :raises HTTPError: if the request to blaze fails
+            """
+        if self._identifier_cache is not None:
+            identifier = self._identifier_cache.get_identifier(resource_type, resource_fhir_id)
+            if identifier is not None:
+                return identifier
+        if self._lookup_batch_window_seconds is not None:
+            return (yield BatchLoad("get_identifiers_by_fhir_ids", resource_type, resource_fhir_id))
+        response_json = yield from self.get_fhir_resource_as_json(resource_type, resource_fhir_id)
+        return get_nested_value(response_json, ["identifier", 0, "value"])
+
+    @operation
+    def _get_observation_fhir_ids_belonging_to_sample(self, sample_fhir_id: str) -> Operation[list[str]]:
+        """get all observations linked to a specific sample
+        :param sample_fhir_id: fhir id of a sample for which the observations should be retrieved
+        :return list of fhir ids linked to a specific sample
+        :raises HTTPError: if the request to blaze fails"""
+        return (yield from self.__get_all_fhir_ids_by_search("Observation", {"specimen": sample_fhir_id}))
+
+    @operation
+    def get_condition_by_patient_fhir_id(self, patient_fhir_id: str) -> Operation[str | None]:
+        resource = yield from self.__get_first_resource_by_search(
+            "Condition", self._search_policy.id_resolution_params({"subject": patient_fhir_id}))
+        return get_nested_value(resource, ["id"])
+
+    @operation
+    def _update_fhir_resource(self, resource_type: str, resource_fhir_id: str,
+                              resource_json: dict) -> Operation[bool]:
+        """Update a FHIR resource in blaze.
+        :param resource_type: the type of the resource
+        :param resource_fhir_id: the fhir id of the resource
+        :param resource_json: the json representation of the resource
+        :return: True if the resource was updated successfully
+        :raises NonExistentResourceException: if the resource cannot be found
+        :raises HTTPError: if the request to blaze fails
+        """
+        response = yield HttpRequest("PUT", f"{self._blaze_url}/{resource_type.capitalize()}/{resource_fhir_id}",
+                                     json=resource_json)
+        self.__raise_for_status_extract_diagnostics_message(response)
+        if resource_type.capitalize() == "Group" and self._group_membership_index is not None:
+            self._group_membership_index.set_members(resource_fhir_id, get_group_member_fhir_ids(resource_json))
+        if self._identifier_cache is not None:
+            self._identifier_cache.put(resource_type, get_nested_value(resource_json, ["identifier", 0, "value"]),
+                                       resource_fhir_id)
+        if self._resource_cache is not None:
+            self._resource_cache.invalidate(resource_type, resource_fhir_id)
+        return response.status == 200 or response.status == 201
+
+    def __post(self, url: str, resource_json: dict, headers: dict = None) -> Operation[dict]:
+        """Post a resource, or a bundle if the url is the blaze url, and record the written resources
+        into the caches.
+        :return: json body of the response
+        :raises HTTPError: if the request to blaze fails"""
+        response = yield HttpRequest("POST", url, json=resource_json, headers=headers)
+        self.__raise_for_status_extract_diagnostics_message(response)
+        if url == self._blaze_url:
+            self.__record_bundle_writes(resource_json, response.json)
+        else:
+            self.__cache_resource(response.json)
+        return response.json
+
+    @operation
+    def upload_donor(self, donor: SampleDonor) -> Operation[str]:
+        """Upload a donor to blaze.
+            :param donor: the donor to upload
+            :raises HTTPError: if the request to blaze fails
+            :return: the fhir id of the uploaded donor
+            :raises HTTPError: if the request to blaze fails
+            """
+        headers = {"If-None-Exist": create_identifier_search_query(donor.identifier)} \
+            if self._conditional_upload else None
+        response_json = yield from self.__post(f"{self._blaze_url}/Patient", donor.to_fhir_dict(), headers)
+        return response_json["id"]
+
+    @operation
+    def upload_donors(self, donors: Iterable[SampleDonor], bundle_size: int = None,
+                      bundle_type: str = "transaction") -> Operation[dict[str, str]]:
+        """Upload multiple donors to blaze. Donors are packed into bundles of at most bundle_size donors,
+        and the bundles are sent concurrently.
+        :param donors: the donors to upload
+        :param bundle_size: maximum number of donors in a single bundle. Defaults to upload_bundle_size of the client
+        :param bundle_type: "transaction" - all donors of a bundle are created or none of them,
+        "batch" - every donor is created independently, donors which could not be created are left out of the result
+        :return: dictionary mapping identifier of the donor to the fhir id of the uploaded donor
+        :raises HTTPError: if the request to blaze fails
+        """
+        upload_items = [(donor.identifier, [donor.build_bundle_entry_dict_for_upload(self._conditional_upload)])
+                        for donor in donors]
+        return (yield from self.__upload_in_bundles("Patient", upload_items, bundle_size, bundle_type))
+
+    @operation
+    def update_donor(self, donor: SampleDonor) -> Operation[str]:
+        """
+        Update donor resource present in the blaze store.
+        Uses PUT method
+        :param donor: donor to be updated
+        :return: fhir id of the updated donor
+        """
+        existing_donor_fhir_id = yield from self.get_fhir_id("Patient", donor.identifier)
+        if existing_donor_fhir_id is None:
+            raise NonExistentResourceException(f"cannot update donor. Donor with identifier {donor.identifier} "
+                                               f"is not present in the blaze store")
+        existing_donor = yield from self.build_donor_from_json(existing_donor_fhir_id)
+        if existing_donor == donor:
+            return existing_donor.donor_fhir_id
+        donor._donor_fhir_id = existing_donor.donor_fhir_id
+        donor_fhir = self.__with_fhir_id(donor.to_fhir_dict(), donor.donor_fhir_id)
+        yield from self._update_fhir_resource("Patient", existing_donor_fhir_id, donor_fhir)
+        return existing_donor.donor_fhir_id
+
+    @operation
+    def upload_sample(self, sample: Sample) -> Operation[str]:
+        """Upload a sample along with its observations to blaze, in a single transaction.
+        :param sample: the sample to upload
+        :return: the fhir id of the uploaded sample
+        :raises NonExistentResourceException: if the donor of the sample is not present in the blaze store
+        :raises HTTPError: if the request to blaze fails
+        """
+        if self._conditional_upload:
+            sample_bundle = create_bundle_dict(sample.build_bundle_entry_dicts_for_upload(conditional=True))
+        else:
+            donor_fhir_id = sample.subject_fhir_id or (yield from self.get_fhir_id("Patient", sample.donor_identifier))
+            if donor_fhir_id is None:
+                raise NonExistentResourceException(
+                    f"Cannot upload sample. Donor with (organizational) "
+                    f"identifier: {sample.donor_identifier} is not present in the blaze store.")
+            sample_bundle = create_bundle_dict(sample.build_bundle_entry_dicts_for_upload(donor_fhir_id))
+        response_json = yield from self.__post(self._blaze_url, sample_bundle)
+        return self.__get_id_from_bundle_response(response_json, "Specimen")
+
+    @operation
+    def upload_samples(self, samples: Iterable[Sample], bundle_size: int = None) -> Operation[dict[str, str]]:
+        """Upload multiple samples along with their observations to blaze. Donors of all the samples are resolved
+        with bulk searches before anything is uploaded. Samples are packed into transaction bundles of
+        at most bundle_size samples (observations of a sample are always part of the same bundle as the sample),
+        and the bundles are sent concurrently.
+        :param samples: the samples to upload
+        :param bundle_size: maximum number of samples in a single bundle. Defaults to upload_bundle_size of the client
+        :return: dictionary mapping identifier of the sample to the fhir id of the uploaded sample
+        :raises NonExistentResourceException: if donor of any of the samples is not present in the blaze store
+        :raises HTTPError: if the request to blaze fails
+        """
+        samples = list(samples)
+        if self._conditional_upload:
+            upload_items = [(sample.identifier, sample.build_bundle_entry_dicts_for_upload(conditional=True))
+                            for sample in samples]
+            return (yield from self.__upload_in_bundles("Specimen", upload_items, bundle_size, "transaction"))
+        donor_fhir_ids = yield from self.__get_donor_fhir_ids_for_upload(
+            [sample.donor_identifier for sample in samples if sample.subject_fhir_id is None], "samples")
+        upload_items = [(sample.identifier, sample.build_bundle_entry_dicts_for_upload(
+            sample.subject_fhir_id or donor_fhir_ids[sample.donor_identifier])) for sample in samples]
+        return (yield from self.__upload_in_bundles("Specimen", upload_items, bundle_size, "transaction"))
+
+    @operation
+    def update_sample(self, sample: Sample) -> Operation[str]:
+        """
+        Update sample along with observation and diagnosis report that are already preent in the blaze store.
+        :param sample: sample to be updated
+        Uses PUT method
+        :return: fhir id of updated sample (fhir id will be changed after update of sample),
+        """
+        existing_sample_fhir_id = yield from self.get_fhir_id("Specimen", sample.identifier)
+        if existing_sample_fhir_id is None:
+            raise NonExistentResourceException(f"Cannot update sample. Sample with identifier {sample.identifier}"
+                                               f" is not present in the blaze store.")
+        existing_sample = yield from self.build_sample_from_json(existing_sample_fhir_id)
+        if existing_sample == sample:
+            return existing_sample.sample_fhir_id
+        sample._sample_fhir_id = existing_sample.sample_fhir_id
+        sample._subject_fhir_id = existing_sample.subject_fhir_id
+        sample_fhir = self.__with_fhir_id(sample.to_fhir_dict(), sample.sample_fhir_id)
+        yield from self._update_fhir_resource("Specimen", sample.sample_fhir_id, sample_fhir)
+        if not sample.compare_observations(existing_sample):
+            for observation in existing_sample.observations:
+                yield from self._delete_observation(observation.observation_fhir_id)
+            for observation in sample.observations:
+                yield from self._upload_observation(observation)
+        return sample.sample_fhir_id
+
+    @operation
+    def _upload_sample(self, sample: Sample) -> Operation[str]:
+        """Upload a sample to blaze.
+            :param sample: the sample to upload
+            :raises HTTPError: if the request to blaze fails
+            :return: the fhir id of the uploaded sample
+            :raises HTTPError: if the request to blaze fails
+            """
+        donor_fhir_id = sample.subject_fhir_id or (yield from self.get_fhir_id("Patient", sample.donor_identifier))
+        if donor_fhir_id is None:
+            raise NonExistentResourceException(
+                f"Cannot upload sample. Donor with (organizational) "
+                f"identifier: {sample.donor_identifier} is not present in the blaze store.")
+        response_json = yield from self.__post(f"{self._blaze_url}/Specimen", sample.to_fhir_dict(donor_fhir_id))
+        return response_json["id"]
+
+    @operation
+    def _upload_observation(self, observation: _Observation) -> Operation[str]:
+        """Upload an observation to blaze.
+            :param observation: the observation to upload
+            :raises HTTPError: if the request to blaze fails
+            :return: the fhir id of the uploaded observation
+            """
+        if self._conditional_upload:
+            observation_entry = observation.build_bundle_entry_dict_for_upload(conditional=True)
+            return (yield from self.__upload_transaction_entry(observation_entry, "Observation"))
+        patient_fhir_id, sample_fhir_id = observation.patient_fhir_id, observation.sample_fhir_id
+        if patient_fhir_id is None and sample_fhir_id is None:
+            patient_fhir_id, sample_fhir_id = yield from self.__get_fhir_ids_by_batch(
+                [("Patient", observation.patient_identifier), ("Specimen", observation.sample_identifier)])
+        else:
+            patient_fhir_id = patient_fhir_id or (yield from self.get_fhir_id("Patient",
+                                                                              observation.patient_identifier))
+            sample_fhir_id = sample_fhir_id or (yield from self.get_fhir_id("Specimen", observation.sample_identifier))
+        if patient_fhir_id is None:
+            raise NonExistentResourceException(f"Cannot upload observation. Donor with (organizational) identifier: "
+                                               f"{observation.patient_identifier} is not present in the blaze store.")
+        if sample_fhir_id is None:
+            raise NonExistentResourceException(f"Cannot upload observation. Sample with (organizational) identifier: "
+                                               f"{observation.sample_identifier} is not present in the blaze store.")
+        response_json = yield from self.__post(f"{self._blaze_url}/Observation",
+                                               observation.to_fhir_dict(patient_fhir_id, sample_fhir_id))
+        return response_json["id"]
+
+    @operation
+    def upload_condition(self, condition: Condition) -> Operation[str]:
+        """Upload a condition to blaze.
+            :param condition: the condition to upload
+            :raises HTTPError: if the request to blaze fails
+            :raises NonExistentResourceException: if the resource cannot be found
+            :return: the fhir id of the uploaded condition
+            """
+        if self._conditional_upload:
+            condition_entry = condition.build_bundle_entry_dict_for_upload(conditional=True)
+            return (yield from self.__upload_transaction_entry(condition_entry, "Condition"))
+        donor_fhir_id = condition.patient_fhir_id or (yield from self.get_fhir_id("Patient",
+                                                                                  condition.patient_identifier))
+        if donor_fhir_id is None:
+            raise NonExistentResourceException(
+                f"Cannot upload Condition. Donor with (organizational) identifier: "
+                f"{condition.patient_identifier} is not present in the blaze store.")
+        response_json = yield from self.__post(f"{self._blaze_url}/Condition", condition.to_fhir_dict(donor_fhir_id))
+        return response_json["id"]
+
+    @operation
+    def upload_conditions(self, conditions: Iterable[Condition], bundle_size: int = None,
+                          bundle_type: str = "transaction") -> Operation[list[str | None]]:
+        """Upload multiple conditions to blaze. Donors of all the conditions are resolved with bulk searches
+        before anything is uploaded. Conditions are packed into bundles of at most bundle_size conditions,
+        and the bundles are sent concurrently.
+        :param conditions: the conditions to upload
+        :param bundle_size: maximum number of conditions in a single bundle.
+        Defaults to upload_bundle_size of the client
+        :param bundle_type: "transaction" - all conditions of a bundle are created or none of them,
+        "batch" - every condition is created independently,
+        conditions which could not be created have None in the result
+        :return: list of the fhir ids of the uploaded conditions, in the order of the conditions. A list is returned
+        instead of a mapping, because a donor can have many conditions and the condition identifier is optional
+        :raises NonExistentResourceException: if donor of any of the conditions is not present in the blaze store
+        :raises HTTPError: if the request to blaze fails
+        """
+        conditions = list(conditions)
+        if self._conditional_upload:
+            if bundle_type != "transaction":
+                raise ValueError("Conditional references can only be resolved in transaction bundles.")
+            upload_items = [(index, [condition.build_bundle_entry_dict_for_upload(conditional=True)])
+                            for index, condition in enumerate(conditions)]
+        else:
+            donor_fhir_ids = yield from self.__get_donor_fhir_ids_for_upload(
+                [condition.patient_identifier for condition in conditions if condition.patient_fhir_id is None],
+                "Conditions")
+            upload_items = [(index, [condition.build_bundle_entry_dict_for_upload(
+                condition.patient_fhir_id or donor_fhir_ids[condition.patient_identifier])])
+                            for index, condition in enumerate(conditions)]
+        # the conditions are identified by their position, see the return value
+        fhir_ids = yield from self.__upload_in_bundles("Condition", upload_items, bundle_size, bundle_type)
+        return [fhir_ids.get(index) for index in range(len(conditions))]
+
+    def __get_donor_fhir_ids_for_upload(self, donor_identifiers: list[str],
+                                        resource_name: str) -> Operation[dict[str, str]]:
+        """Resolve fhir ids of donors referenced by uploaded resources.
+        :param donor_identifiers: (organizational) identifiers of the donors
+        :param resource_name: name of the uploaded resources, used in the error message
+        :return: dictionary mapping identifier of the donor to its fhir id
+        :raises NonExistentResourceException: if any of the donors is not present in the blaze store"""
+        donor_fhir_ids = yield from self.get_fhir_ids("Patient", donor_identifiers)
+        missing_donor_identifiers = [donor_identifier for donor_identifier in dict.fromkeys(donor_identifiers)
+                                     if donor_identifier not in donor_fhir_ids]
+        if missing_donor_identifiers:
+            raise NonExistentResourceException(
+                f"Cannot upload {resource_name}. Donors with (organizational) identifiers: "
+                f"{', '.join(missing_donor_identifiers)} are not present in the blaze store.")
+        return donor_fhir_ids
+
+    def __upload_in_bundles(self, resource_type: str, upload_items: list[tuple[Hashable, list[dict]]],
+                            bundle_size: int | None, bundle_type: str) -> Operation[dict[Hashable, str]]:
+        """Pack entries into bundles and upload them concurrently.
+        :param resource_type: type of the resource whose fhir ids are returned
+        :param upload_items: list of (key, entries) tuples, the key is usually the identifier of the resource.
+        The first entry creates the resource whose fhir id is returned for the key, all the entries of one item
+        are placed in the same bundle.
+        :param bundle_size: maximum number of items in a single bundle
+        :param bundle_type: "transaction" or "batch"
+        :return: dictionary mapping key to the fhir id of the created resource
+        """
+        if bundle_type not in ("transaction", "batch"):
+            raise ValueError("Bundle type must be either 'transaction' or 'batch'.")
+
+        def upload_bundle(items_chunk: list[tuple[Hashable, list[dict]]]) -> Operation[dict[Hashable, str]]:
+            entries = [entry for _, item_entries in items_chunk for entry in item_entries]
+            response_json = yield from self.__post(self._blaze_url, self.__create_bundle(entries, bundle_type))
+            response_entries = response_json.get("entry", [])
+            fhir_ids = {}
+            entry_index = 0
+            for key, item_entries in items_chunk:
+                entry_response = response_entries[entry_index].get("response", {})
+                entry_index += len(item_entries)
+                if not entry_response.get("status", "").startswith("2"):
+                    continue
+                fhir_id = self.__get_id_from_location(entry_response.get("location", ""), resource_type)
+                if fhir_id is not None:
+                    fhir_ids[key] = fhir_id
+            return fhir_ids
+
+        uploaded_fhir_ids = {}
+        for chunk_fhir_ids in (yield Concurrently([
+                upload_bundle(items_chunk)
+                for items_chunk in chunk_list(upload_items, bundle_size or self._upload_bundle_size)])):
+            uploaded_fhir_ids.update(chunk_fhir_ids)
+        return uploaded_fhir_ids
+
+    def __upload_transaction_entry(self, entry: dict, resource_type: str) -> Operation[str]:
+        """Upload a single entry in a transaction bundle, so that the conditional references of the entry
+        are resolved by blaze.
+        :return: the fhir id of the uploaded resource"""
+        response_json = yield from self.__post(self._blaze_url, self.__create_bundle([entry]))
+        return self.__get_id_from_bundle_response(response_json, resource_type)
+
+    @operation
+    def upload_biobank(self, biobank: Biobank) -> Operation[str]:
+        """Upload a biobank to blaze.
+        :param biobank: the biobank to upload
+        :raises HTTPError: if the request to blaze fails
+        :return: the fhir id of the uploaded biobank"""
+
+        juristic_person = yield from self._get_juristic_person_organization_by_name(biobank.juristic_person.name)
+        if juristic_person is None:
+            response_json = yield from self.__post(self._blaze_url, biobank.build_bundle_dict_for_upload())
+            return self.__get_id_from_bundle_response(response_json, "Organization")
+        response_json = yield from self.__post(f"{self._blaze_url}/Organization",
+                                               biobank.to_fhir_dict(get_nested_value(juristic_person, ["id"])))
+        return response_json["id"]
+
+    @operation
+    def update_biobank(self, biobank: Biobank) -> Operation[str]:
+        """
+        Update biobank resource already present in the blaze store
+        :param biobank: biobank to be updated
+        :return: fhir id of the biobank
+        """
+        biobank_fhir_id = yield from self.get_fhir_id("Organization", biobank.identifier)
+        if biobank_fhir_id is None:
+            raise NonExistentResourceException(f"Cannot update biobank. Biobank with identifier {biobank.identifier} "
+                                               f"is not present in the blaze store.")
+        existing_biobank = yield from self.build_biobank_from_json(biobank_fhir_id)
+        if existing_biobank == biobank:
+            return biobank_fhir_id
+        biobank._biobank_fhir_id = existing_biobank.biobank_fhir_id
+        biobank_fhir = self.__with_fhir_id(biobank.to_fhir_dict(existing_biobank.juristic_person.fhir_id),
+                                           biobank.biobank_fhir_id)
+        yield from self._update_fhir_resource("Organization", biobank_fhir_id, biobank_fhir)
+        return biobank_fhir_id
+
+    @operation
+    def upload_collection(self, collection: Collection) -> Operation[str]:
+        """
+        Upload collection to blaze (as collection is made of Collection and Collection Organization,
+        two resources are uploaded via bundle.)
+        :param collection:
+        :return: id of the collection
+        """
+        managing_biobank_fhir_id = yield from self.get_fhir_id("Organization", collection.managing_biobank_id)
+        if managing_biobank_fhir_id is None:
+            raise NonExistentResourceException(
+                f"Cannot upload Network Organization. Biobank with (organizational) identifier: "
+                f"{collection.managing_biobank_id} is not present in the blaze store.")
+        sample_fhir_ids = collection.sample_fhir_ids
+        if sample_fhir_ids is None:
+            sample_fhir_ids = yield from self.__get_member_fhir_ids("Specimen", collection.sample_ids or [],
+                                                                    "Cannot upload Collection. Sample")
+        collection_bundle_json = collection.build_bundle_dict_for_upload(managing_biobank_fhir_id, sample_fhir_ids)
+        response_json = yield from self.__post(self._blaze_url, collection_bundle_json)
+        return self.__get_id_from_bundle_response(response_json, "Group")
+
+    @operation
+    def update_collection(self, collection: Collection) -> Operation[str]:
+        """
+        update collection resource that is already present in the blaze store.
+        :param collection: collection to be updated
+        :return: fhir id of the collection
+        """
+        collection_fhir_id = yield from self.get_fhir_id("Group", collection.identifier)
+        if collection_fhir_id is None:
+            raise NonExistentResourceException(f"cannot update collection. Collection with identifier "
+                                               f"{collection.identifier} is not present in the blaze store")
+        existing_collection = yield from self.build_collection_from_json(collection_fhir_id)
+        if collection == existing_collection:
+            return collection_fhir_id
+        existing_collection.name = collection.name
+        existing_collection.managing_collection_org_id = collection.managing_collection_org_id
+        existing_collection.inclusion_criteria = collection.inclusion_criteria
+
+        collection_organization = collection.collection_organization
+        collection_organization._collection_org_fhir_id = existing_collection.collection_organization. \
+            collection_org_fhir_id
+        collection_organization._managing_biobank_fhir_id = existing_collection.collection_organization. \
+            managing_biobank_fhir_id
+        collection_organization_fhir = self.__with_fhir_id(collection_organization.to_fhir_dict(),
+                                                           collection_organization.collection_org_fhir_id)
+        collection_to_update = self.__with_fhir_id(existing_collection.to_fhir_dict(),
+                                                   existing_collection.collection_fhir_id)
+        yield Concurrently([
+            self._update_fhir_resource("Organization", collection_organization.collection_org_fhir_id,
+                                       collection_organization_fhir),
+            self._update_fhir_resource("Group", collection_fhir_id, collection_to_update)])
+        return collection_fhir_id
+
+    @operation
+    def _upload_juristic_person(self, juristic_person: _JuristicPerson) -> Operation[str]:
+        """
+        Upload a juristic person (organization resource) to blaze.
+        :param juristic_person: juristic_person resource to upload
+         :raises: HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if the resource cannot be found
+        :return: the fhir id of uploaded juristic person
+        """
+        response_json = yield from self.__post(f"{self._blaze_url}/Organization", juristic_person.to_fhir_dict())
+        return response_json["id"]
+
+    @operation
+    def upload_network(self, network: Network) -> Operation[str]:
+        """
+        Upload network to blaze (as network is made of Network and Network Organization,
+        two resources are uploaded via bundle.)
+        :param network: Network Object
+        :return: network fhir id
+        """
+        biobank_members_fhir_ids = network.members_biobanks_fhir_ids
+        collection_members_fhir_ids = network.members_collections_fhir_ids
+
+        if biobank_members_fhir_ids is None:
+            biobank_members_fhir_ids = yield from self.__get_member_fhir_ids(
+                "Organization", network.members_biobanks_ids or [], "Cannot upload Network. Biobank")
+        if collection_members_fhir_ids is None:
+            collection_members_fhir_ids = yield from self.__get_member_fhir_ids(
+                "Group", network.members_collections_ids or [], "Cannot upload Network. Collection")
+
+        juristic_person_fhir_id = None
+        juristic_person = yield from self._get_juristic_person_organization_by_name(
+            network.network_organization.juristic_person.name)
+        if juristic_person is not None:
+            juristic_person_fhir_id = juristic_person.get("id", None)
+        network_bundle_json = network.build_bundle_dict_for_upload(juristic_person_fhir_id, collection_members_fhir_ids,
+                                                                   biobank_members_fhir_ids)
+        response_json = yield from self.__post(self._blaze_url, network_bundle_json)
+        return self.__get_id_from_bundle_response(response_json, "Group")
+
+    def __get_member_fhir_ids(self, resource_type: str, identifiers: list[str],
+                              error_message_prefix: str) -> Operation[list[str]]:
+        """Resolve the identifiers of members of a group into FHIR ids, keeping their order.
+        :param resource_type: type of the member resources
+        :param identifiers: (organizational) identifiers of the members
+        :param error_message_prefix: beginning of the message of exception raised for a missing member
+        :return: list of FHIR ids of the members
+        :raises NonExistentResourceException: if any of the members is not present in blaze"""
+        fhir_ids = yield from self.get_fhir_ids(resource_type, identifiers)
+        for identifier in identifiers:
+            if identifier not in fhir_ids:
+                raise NonExistentResourceException(
+                    f"{error_message_prefix} with (organizational) identifier: "
+                    f"{identifier} is not present in the blaze store.")
+        return [fhir_ids[identifier] for identifier in identifiers]
+
+    @operation
+    def update_network(self, network: Network) -> Operation[str]:
+        """
+        Update network resource that is already present in the blaze store
+        :param network: network to be updated
+        :return: fhir id of the network
+        """
+        network_fhir_id = yield from self.get_fhir_id("Group", network.identifier)
+        if network_fhir_id is None:
+            raise NonExistentResourceException(f"cannot update network. Network with identifier {network.identifier} "
+                                               f"is not present in the blaze store")
+        existing_network = yield from self.build_network_from_json(network_fhir_id)
+        if existing_network == network:
+            return network_fhir_id
+        existing_network.name = network.name
+        existing_network.managing_network_org_id = network.managing_network_org_id
+        existing_network.members_biobanks_ids = network.members_biobanks_ids
+        existing_network.members_collections_ids = network.members_collections_ids
+
+        network_organization = network.network_organization
+        network_organization._network_org_fhir_id = existing_network.network_organization.network_org_fhir_id
+        network_organization_fhir = self.__with_fhir_id(
+            network_organization.to_fhir_dict(existing_network.network_organization.juristic_person.fhir_id),
+            network_organization.network_org_fhir_id)
+        network_to_update = self.__with_fhir_id(existing_network.to_fhir_dict(), existing_network.network_fhir_id)
+        yield Concurrently([
+            self._update_fhir_resource("Organization", network_organization.network_org_fhir_id,
+                                       network_organization_fhir),
+            self._update_fhir_resource("Group", network_fhir_id, network_to_update)])
+        return network_fhir_id
+
+    @operation
+    def update_donor_if_match(self, donor: SampleDonor, conflict_retries: int = 0) -> Operation[str]:
+        """Update donor built by build_donor_from_json, without reading it from blaze first.
+        The donor is written by a single PUT conditioned on its version (If-Match: meta.versionId),
+        which fails if the donor was changed since it was read. The version of the donor object
+        is updated afterwards, so that the object can be updated again.
+        :param donor: donor with fhir id and version, carrying the updated values
+        :param conflict_retries: how many times the update is repeated against the current version of the resource
+        if blaze responds with 412 Precondition Failed
+        :return: fhir id of the updated donor
+        :raises ValueError: if the donor does not have fhir id and version
+        :raises HTTPError: if the request to blaze fails, or the version conflict persists after all retries
+        """
+        self.__check_versioned_resource("donor", donor.donor_fhir_id, donor.version_id)
+        donor_fhir = self.__with_fhir_id(donor.to_fhir_dict(), donor.donor_fhir_id)
+        response_entries = yield from self.__update_if_match(
+            [("Patient", donor.donor_fhir_id, donor_fhir, donor.version_id)], [], conflict_retries)
+        donor._version_id = self.__get_version_from_response_entry(response_entries[0])
+        return donor.donor_fhir_id
+
+    @operation
+    def update_sample_if_match(self, sample: Sample, conflict_retries: int = 0) -> Operation[str]:
+        """Update sample built by build_sample_from_json, without reading it from blaze first.
+        The specimen is written by a PUT conditioned on its version (If-Match: meta.versionId). Observations
+        without fhir id are created, and observations from sample.observation_fhir_ids which are no longer part
+        of the sample are deleted, all within the same transaction. The version of the sample object
+        is updated afterwards, so that the object can be updated again.
+        :param sample: sample with fhir id and version, carrying the updated values
+        :param conflict_retries: how many times the update is repeated against the current version of the resource
+        if blaze responds with 412 Precondition Failed
+        :return: fhir id of the updated sample
+        :raises ValueError: if the sample does not have fhir id and version
+        :raises HTTPError: if the request to blaze fails, or the version conflict persists after all retries
+        """
+        self.__check_versioned_resource("sample", sample.sample_fhir_id, sample.version_id)
+        sample_fhir = self.__with_fhir_id(sample.to_fhir_dict(), sample.sample_fhir_id)
+        kept_observation_fhir_ids = [observation.observation_fhir_id for observation in sample.observations
+                                     if observation.observation_fhir_id is not None]
+        new_observations = [observation for observation in sample.observations
+                            if observation.observation_fhir_id is None]
+        entries = [self.__create_delete_bundle_entry("Observation", observation_fhir_id)
+                   for observation_fhir_id in sample.observation_fhir_ids or []
+                   if observation_fhir_id not in kept_observation_fhir_ids]
+        observations_start = len(entries) + 1
+        entries.extend(observation.build_bundle_entry_dict_for_upload(sample.subject_fhir_id, sample.sample_fhir_id)
+                       for observation in new_observations)
+        response_entries = yield from self.__update_if_match(
+            [("Specimen", sample.sample_fhir_id, sample_fhir, sample.version_id)], entries, conflict_retries)
+        sample._version_id = self.__get_version_from_response_entry(response_entries[0])
+        for observation, response_entry in zip(new_observations, response_entries[observations_start:]):
+            observation._observation_fhir_id = self.__get_id_from_location(
+                get_nested_value(response_entry, ["response", "location"]), "Observation")
+            observation._patient_fhir_id = sample.subject_fhir_id
+            observation._sample_fhir_id = sample.sample_fhir_id
+        sample._observation_fhir_ids = [observation.observation_fhir_id for observation in sample.observations]
+        return sample.sample_fhir_id
+
+    @operation
+    def update_biobank_if_match(self, biobank: Biobank, conflict_retries: int = 0) -> Operation[str]:
+        """Update biobank built by build_biobank_from_json, without reading it from blaze first.
+        The biobank is written by a single PUT conditioned on its version (If-Match: meta.versionId).
+        The version of the biobank object is updated afterwards, so that the object can be updated again.
+        :param biobank: biobank with fhir id and version, carrying the updated values
+        :param conflict_retries: how many times the update is repeated against the current version of the resource
+        if blaze responds with 412 Precondition Failed
+        :return: fhir id of the updated biobank
+        :raises ValueError: if the biobank does not have fhir id and version
+        :raises HTTPError: if the request to blaze fails, or the version conflict persists after all retries
+        """
+        self.__check_versioned_resource("biobank", biobank.biobank_fhir_id, biobank.version_id)
+        biobank_fhir = self.__with_fhir_id(biobank.to_fhir_dict(), biobank.biobank_fhir_id)
+        response_entries = yield from self.__update_if_match(
+            [("Organization", biobank.biobank_fhir_id, biobank_fhir, biobank.version_id)], [],
+            conflict_retries)
+        biobank._version_id = self.__get_version_from_response_entry(response_entries[0])
+        return biobank.biobank_fhir_id
+
+    @operation
+    def update_collection_if_match(self, collection: Collection, conflict_retries: int = 0) -> Operation[str]:
+        """Update collection built by build_collection_from_json, without reading it from blaze first.
+        Collection and its collection organization are written in a single transaction, each PUT is conditioned
+        on the version of the resource (If-Match: meta.versionId). Versions of the collection objects
+        are updated afterwards, so that the objects can be updated again.
+        :param collection: collection with fhir ids and versions, carrying the updated values
+        :param conflict_retries: how many times the update is repeated against the current versions of the resources
+        if blaze responds with 412 Precondition Failed
+        :return: fhir id of the updated collection
+        :raises ValueError: if the collection or its organization does not have fhir id and version
+        :raises HTTPError: if the request to blaze fails, or the version conflict persists after all retries
+        """
+        collection_organization = collection.collection_organization
+        self.__check_versioned_resource("collection", collection.collection_fhir_id, collection.version_id)
+        self.__check_versioned_resource("collection organization", collection_organization.collection_org_fhir_id,
+                                        collection_organization.version_id)
+        collection_fhir = self.__with_fhir_id(collection.to_fhir_dict(), collection.collection_fhir_id)
+        collection_organization_fhir = self.__with_fhir_id(collection_organization.to_fhir_dict(),
+                                                           collection_organization.collection_org_fhir_id)
+        response_entries = yield from self.__update_if_match(
+            [("Group", collection.collection_fhir_id, collection_fhir, collection.version_id),
+             ("Organization", collection_organization.collection_org_fhir_id, collection_organization_fhir,
+              collection_organization.version_id)], [], conflict_retries)
+        collection._version_id = self.__get_version_from_response_entry(response_entries[0])
+        collection_organization._version_id = self.__get_version_from_response_entry(response_entries[1])
+        return collection.collection_fhir_id
+
+    @operation
+    def update_network_if_match(self, network: Network, conflict_retries: int = 0) -> Operation[str]:
+        """Update network built by build_network_from_json, without reading it from blaze first.
+        Network and its network organization are written in a single transaction, each PUT is conditioned
+        on the version of the resource (If-Match: meta.versionId). Versions of the network objects
+        are updated afterwards, so that the objects can be updated again.
+        :param network: network with fhir ids and versions, carrying the updated values
+        :param conflict_retries: how many times the update is repeated against the current versions of the resources
+        if blaze responds with 412 Precondition Failed
+        :return: fhir id of the updated network
+        :raises ValueError: if the network or its organization does not have fhir id and version
+        :raises HTTPError: if the request to blaze fails, or the version conflict persists after all retries
+        """
+        network_organization = network.network_organization
+        self.__check_versioned_resource("network", network.network_fhir_id, network.version_id)
+        self.__check_versioned_resource("network organization", network_organization.network_org_fhir_id,
+                                        network_organization.version_id)
+        network_fhir = self.__with_fhir_id(network.to_fhir_dict(), network.network_fhir_id)
+        network_organization_fhir = self.__with_fhir_id(network_organization.to_fhir_dict(),
+                                                        network_organization.network_org_fhir_id)
+        response_entries = yield from self.__update_if_match(
+            [("Group", network.network_fhir_id, network_fhir, network.version_id),
+             ("Organization", network_organization.network_org_fhir_id, network_organization_fhir,
+              network_organization.version_id)], [], conflict_retries)
+        network._version_id = self.__get_version_from_response_entry(response_entries[0])
+        network_organization._version_id = self.__get_version_from_response_entry(response_entries[1])
+        return network.network_fhir_id
+
+    @staticmethod
+    def __check_versioned_resource(resource_name: str, resource_fhir_id: str | None, version_id: str | None):
+        if resource_fhir_id is None or version_id is None:
+            raise ValueError(f"Cannot update {resource_name} conditionally. FHIR id and version of the {resource_name} "
+                             f"are only known for objects built from json of the resource stored in blaze.")
+
+    def __update_if_match(self, updates: list[tuple[str, str, dict, str]], other_entries: list[BundleEntry | dict],
+                          conflict_retries: int) -> Operation[list[dict]]:
+        """Send PUTs conditioned on the versions of the resources (If-Match), together with other entries,
+        as a single transaction. Only version conflicts (412 Precondition Failed) are retried: the current versions
+        of the updated resources are read and the transaction is sent again.
+        :param updates: list of (resource type, fhir id, json of the updated resource, expected version) tuples
+        :param other_entries: other entries of the transaction, placed after the PUT entries
+        :param conflict_retries: how many times the transaction is repeated on version conflict
+        :return: entries of the transaction response, in the order of the updates followed by other entries
+        :raises HTTPError: if the request to blaze fails, or the version conflict persists after all retries
+        """
+        version_ids = [version_id for _, _, _, version_id in updates]
+        attempt = 0
+        while True:
+            entries = [self.__create_put_bundle_entry(resource_type, resource_fhir_id, resource, version_id)
+                       for (resource_type, resource_fhir_id, resource, _), version_id in zip(updates, version_ids)]
+            entries.extend(other_entries)
+            bundle_json = self.__create_bundle(entries)
+            response = yield HttpRequest("POST", self._blaze_url, json=bundle_json)
+            if response.status == 412 and attempt < conflict_retries:
+                attempt += 1
+                version_ids = yield Concurrently([self.__get_current_version_id(resource_type, resource_fhir_id)
+                                                  for resource_type, resource_fhir_id, _, _ in updates])
+                continue
+            self.__raise_for_status_extract_diagnostics_message(response)
+            self.__record_bundle_writes(bundle_json, response.json)
+            return response.json.get("entry", [])
+
+    def __get_current_version_id(self, resource_type: str, resource_fhir_id: str) -> Operation[str]:
+        resource = yield from self.get_fhir_resource_as_json(resource_type, resource_fhir_id)
+        if resource is None:
+            raise NonExistentResourceException(f"Cannot update {resource_type} with FHIR ID {resource_fhir_id} "
+                                               f"because this resource is not present in the blaze store")
+        return get_nested_value(resource, ["meta", "versionId"])
+
+    @staticmethod
+    def __get_version_from_response_entry(response_entry: dict) -> str | None:
+        """Get the new version of a resource from its entry in a transaction response (etag W/"2")"""
+        etag = get_nested_value(response_entry, ["response", "etag"])
+        if etag is None:
+            return None
+        return etag.removeprefix("W/").strip('"')
+
+    @operation
+    def build_donor_from_json(self, donor_fhir_id: str) -> Operation[SampleDonor]:
+        """Build Donor Object from json representation
+        :param donor_fhir_id: FHIR ID of the Patient resource
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if the resource cannot be found
+        :return SampleDonor Object"""
+        donor_json = yield from self.get_fhir_resource_as_json("Patient", donor_fhir_id)
+        if donor_json is None:
+            raise NonExistentResourceException(f"Patient with fhir id {donor_fhir_id} is not present in blaze store")
+        donor = SampleDonor.from_json(donor_json, trusted=self._trusted_hydration)
+        return donor
+
+    @operation
+    def build_sample_from_json(self, sample_fhir_id: str) -> Operation[Sample]:
+        """Build Sample Object from json representation
+        :param sample_fhir_id: FHIR ID of the Specimen resource
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if the resource cannot be found
+        :return Sample Object"""
+        samples, _ = yield from self.__build_samples_for_chunk([sample_fhir_id])
+        if sample_fhir_id not in samples:
+            raise NonExistentResourceException(f"Sample with FHIR ID {sample_fhir_id} is not present in blaze store")
+        return samples[sample_fhir_id]
+
+    @operation
+    def build_samples_from_json(self, sample_fhir_ids: Iterable[str]) -> Operation[list[Sample]]:
+        """Build Sample Objects from json representation. Samples are read in chunks, each chunk by a single search
+        which includes the donors and the observations of the samples. Chunks are read concurrently.
+        :param sample_fhir_ids: FHIR IDs of the Specimen resources
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if any of the resources cannot be found
+        :return list of Sample Objects, in the same order as sample_fhir_ids"""
+        sample_fhir_ids = list(sample_fhir_ids)
+        samples = {}
+        for chunk_samples, _ in (yield Concurrently([
+                self.__build_samples_for_chunk(fhir_ids_chunk)
+                for fhir_ids_chunk in chunk_list(list(dict.fromkeys(sample_fhir_ids)), self._search_chunk_size)])):
+            samples.update(chunk_samples)
+        self.__raise_for_missing_resources("Samples", sample_fhir_ids, samples)
+        return [samples[sample_fhir_id] for sample_fhir_id in sample_fhir_ids]
+
+    def __build_samples_for_chunk(self, sample_fhir_ids: list[str]) \
+            -> Operation[tuple[dict[str, Sample], dict[str, dict]]]:
+        """Build samples with single search, including their donors (_include=Specimen:subject)
+        and observations (_revinclude=Observation:specimen).
+        :param sample_fhir_ids: FHIR IDs of the Specimen resources
+        :return: tuple of dictionary mapping FHIR ID to the Sample Object (samples that are not present in blaze
+        are not present in the dictionary), and dictionary mapping FHIR ID of donor to the json of the donor"""
+        sample_jsons = {}
+        donor_jsons = {}
+        observation_jsons = {}
+        entries = yield SearchAll("Specimen", {
+            "_id": ",".join(sample_fhir_ids),
+            "_include": "Specimen:subject",
+            "_revinclude": "Observation:specimen"
+        }, page_size=len(sample_fhir_ids))
+        for entry in entries:
+            resource = entry.get("resource", {})
+            resource_type = resource.get("resourceType")
+            if resource_type == "Specimen":
+                sample_jsons[resource["id"]] = resource
+            elif resource_type == "Patient":
+                donor_jsons[resource["id"]] = resource
+            elif resource_type == "Observation":
+                sample_fhir_id = parse_reference_id(get_nested_value(resource, ["specimen", "reference"]))
+                observation_jsons.setdefault(sample_fhir_id, []).append(resource)
+        samples = {}
+        for sample_fhir_id, sample_json in sample_jsons.items():
+            donor_fhir_id = parse_reference_id(get_nested_value(sample_json, ["subject", "reference"]))
+            donor_identifier = get_nested_value(donor_jsons.get(donor_fhir_id), ["identifier", 0, "value"])
+            samples[sample_fhir_id] = Sample.from_json(sample_json, observation_jsons.get(sample_fhir_id, []),
+                                                       donor_identifier, trusted=self._trusted_hydration)
+        return samples, donor_jsons
+
+    @operation
+    def _build_observation_from_json(self, observation_fhir_id: str) -> Operation[_Observation]:
+        """Build Observation Object from json representation
+        :param observation_fhir_id: FHIR ID of the Observation resource
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if the resource cannot be found
+        :return Observation Object"""
+        observation_json = yield from self.get_fhir_resource_as_json("Observation", observation_fhir_id)
+        if observation_json is None:
+            raise NonExistentResourceException(
+                f"Observation with FHIR ID {observation_fhir_id} is not present in blaze store")
+        patient_fhir_id = parse_reference_id(get_nested_value(observation_json, ["subject", "reference"]))
+        sample_fhir_id = parse_reference_id(get_nested_value(observation_json, ["specimen", "reference"]))
+        patient_identifier, sample_identifier = yield from self.__get_identifiers_by_batch(
+            [("Patient", patient_fhir_id), ("Specimen", sample_fhir_id)])
+        observation = _Observation.from_json(observation_json, patient_identifier, sample_identifier,
+                                             trusted=self._trusted_hydration)
+        return observation
+
+    @operation
+    def build_condition_from_json(self, condition_fhir_id: str) -> Operation[Condition]:
+        """Build Condition object from json representation
+        :param condition_fhir_id: FHIR ID of the Condition resource
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if the resource cannot be found
+        :return Condition Object"""
+        condition_json = yield from self.get_fhir_resource_as_json("Condition", condition_fhir_id)
+        if condition_json is None:
+            raise NonExistentResourceException(
+                f"Condition with FHIR ID {condition_fhir_id} is not present in blaze store")
+        patient_fhir_id = parse_reference_id(get_nested_value(condition_json, ["subject", "reference"]))
+        patient_identifier = yield from self.get_identifier_by_fhir_id("Patient", patient_fhir_id)
+        condition = Condition.from_json(condition_json, patient_identifier, trusted=self._trusted_hydration)
+        return condition
+
+    @operation
+    def build_collection_from_json(self, collection_fhir_id: str) -> Operation[Collection]:
+        """Build a collection object from a json representation.
+        Does not add samples which are alredy deleted from blaze
+        :param collection_fhir_id: FHIR ID of the Collection resource
+        :return: Collection object
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if the resource cannot be found
+        """
+        collections = yield from self.__build_collections([collection_fhir_id])
+        if collection_fhir_id not in collections:
+            raise NonExistentResourceException(
+                f"Collection with FHIR ID {collection_fhir_id} is not present in blaze store")
+        return collections[collection_fhir_id]
+
+    @operation
+    def build_collections_from_json(self, collection_fhir_ids: Iterable[str]) -> Operation[list[Collection]]:
+        """Build collection objects from a json representation. Collections are read together with their
+        collection organizations and managing biobanks by chunked _include searches.
+        :param collection_fhir_ids: FHIR IDs of the Collection resources
+        :return: list of Collection objects, in the same order as collection_fhir_ids
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if any of the resources cannot be found
+        """
+        collection_fhir_ids = list(collection_fhir_ids)
+        collections = yield from self.__build_collections(collection_fhir_ids)
+        self.__raise_for_missing_resources("Collections", collection_fhir_ids, collections)
+        return [collections[collection_fhir_id] for collection_fhir_id in collection_fhir_ids]
+
+    def __build_collections(self, collection_fhir_ids: list[str]) -> Operation[dict[str, Collection]]:
+        """Build collections, reading the Group together with its managing Organization and biobank.
+        :return: dictionary mapping FHIR ID to Collection object. Collections which are not present in blaze
+        are not present in the dictionary"""
+        collection_jsons, included_resources = yield from self.__get_collection_jsons_with_organizations(
+            collection_fhir_ids)
+        collection_identifiers = [get_nested_value(collection_json, ["identifier", 0, "value"])
+                                  for collection_json in collection_jsons.values()]
+        samples_by_collection_identifier = yield from self.__get_samples_by_collection_identifiers(
+            collection_identifiers)
+        collections = {}
+        for collection_fhir_id, collection_json in collection_jsons.items():
+            collection_org_json = included_resources.get(get_nested_value(collection_json,
+                                                                          ["managingEntity", "reference"]))
+            managing_biobank_json = included_resources.get(get_nested_value(collection_org_json,
+                                                                            ["partOf", "reference"]))
+            managing_biobank_identifier = get_nested_value(managing_biobank_json, ["identifier", 0, "value"])
+            collection_samples = samples_by_collection_identifier.get(
+                get_nested_value(collection_json, ["identifier", 0, "value"]), [])
+            collection = Collection.from_json(collection_json, collection_org_json, managing_biobank_identifier,
+                                              [sample_identifier for _, sample_identifier in collection_samples],
+                                              trusted=self._trusted_hydration)
+            collection._sample_fhir_ids = [sample_fhir_id for sample_fhir_id, _ in collection_samples]
+            collections[collection_fhir_id] = collection
+        return collections
+
+    def __get_samples_by_collection_identifiers(self, collection_identifiers: list[str]) \
+            -> Operation[dict[str, list[tuple[str, str]]]]:
+        """Get samples belonging to collections, by chunked OR searches over sample-collection-id.
+        Only the identifier and extensions of the samples are transferred.
+        :param collection_identifiers: (organizational) identifiers of the collections
+        :return: dictionary mapping collection identifier to list of (sample FHIR ID, sample identifier)"""
+        samples = {}
+        for sample_jsons in (yield Concurrently([
+                self.__get_all_resources_by_search("Specimen", {
+                    "sample-collection-id": join_search_values(identifiers_chunk),
+                    "_elements": "identifier,extension"
+                }) for identifiers_chunk in chunk_list(collection_identifiers, self._search_chunk_size)])):
+            for sample_json in sample_jsons:
+                collection_identifier = get_sample_collection_id(sample_json)
+                samples.setdefault(collection_identifier, []).append(
+                    (sample_json["id"], get_nested_value(sample_json, ["identifier", 0, "value"])))
+        return samples
+
+    @operation
+    def _build_collection_organization_from_json(self, collection_organization_fhir_id: str) \
+            -> Operation[_CollectionOrganization]:
+        """Build a CollectionOrganization object from a json representation
+        :param collection_organization_fhir_id: FHIR ID of the collection resource
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if the resource cannot be found
+        :return CollectionOrganization Object"""
+        collection_org_jsons, included_resources = yield from self.__get_resources_with_includes(
+            "Organization", [collection_organization_fhir_id], {"_include": "Organization:partof"})
+        if collection_organization_fhir_id not in collection_org_jsons:
+            raise NonExistentResourceException(
+                f"CollectionOrganization with FHIR ID {collection_organization_fhir_id} is not present in blaze store")
+        collection_org_json = collection_org_jsons[collection_organization_fhir_id]
+        managing_biobank_json = included_resources.get(get_nested_value(collection_org_json, ["partOf", "reference"]))
+        managing_biobank_identifier = get_nested_value(managing_biobank_json, ["identifier", 0, "value"])
+        collection_organization = _CollectionOrganization.from_json(collection_org_json, managing_biobank_identifier,
+                                                                    trusted=self._trusted_hydration)
+        return collection_organization
+
+    @operation
+    def build_network_from_json(self, network_fhir_id: str) -> Operation[Network]:
+        """Build a Network object form a json representation
+        :param network_fhir_id: FHIR ID of the network resource
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if the resource cannot be found
+        :return Network Object"""
+        networks = yield from self.__build_networks([network_fhir_id])
+        if network_fhir_id not in networks:
+            raise NonExistentResourceException(f"Network with FHIR ID {network_fhir_id} is not present in blaze store")
+        return networks[network_fhir_id]
+
+    @operation
+    def build_networks_from_json(self, network_fhir_ids: Iterable[str]) -> Operation[list[Network]]:
+        """Build Network objects from a json representation. Networks are read together with their
+        network organizations and juristic persons by chunked _include searches.
+        :param network_fhir_ids: FHIR IDs of the network resources
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if any of the resources cannot be found
+        :return list of Network objects, in the same order as network_fhir_ids"""
+        network_fhir_ids = list(network_fhir_ids)
+        networks = yield from self.__build_networks(network_fhir_ids)
+        self.__raise_for_missing_resources("Networks", network_fhir_ids, networks)
+        return [networks[network_fhir_id] for network_fhir_id in network_fhir_ids]
+
+    def __build_networks(self, network_fhir_ids: list[str]) -> Operation[dict[str, Network]]:
+        """Build networks, reading the Group, its managing Organization and juristic person in a single search.
+        :return: dictionary mapping FHIR ID to Network object. Networks which are not present in blaze
+        are not present in the dictionary"""
+        network_jsons, included_resources = yield from self.__get_resources_with_includes(
+            "Group", network_fhir_ids, {
+                "_include": "Group:managing-entity",
+                "_include:iterate": "Organization:partof"
+            })
+        members = {network_fhir_id: self.__get_all_members_belonging_to_network(network_json)
+                   for network_fhir_id, network_json in network_jsons.items()}
+        collection_identifiers_by_fhir_id, biobank_identifiers_by_fhir_id = yield Concurrently([
+            self.get_identifiers_by_fhir_ids(
+                "Group", [collection_fhir_id for collection_fhir_ids, _ in members.values()
+                          for collection_fhir_id in collection_fhir_ids]),
+            self.get_identifiers_by_fhir_ids(
+                "Organization", [biobank_fhir_id for _, biobank_fhir_ids in members.values()
+                                 for biobank_fhir_id in biobank_fhir_ids])])
+        networks = {}
+        for network_fhir_id, network_json in network_jsons.items():
+            network_org_json = included_resources.get(get_nested_value(network_json, ["managingEntity", "reference"]))
+            juristic_person_json = included_resources.get(get_nested_value(network_org_json, ["partOf", "reference"]))
+            collection_fhir_ids, biobank_fhir_ids = members[network_fhir_id]
+            collection_identifiers = [collection_identifiers_by_fhir_id.get(collection_fhir_id) for
+                                      collection_fhir_id in collection_fhir_ids]
+            biobank_identifiers = [biobank_identifiers_by_fhir_id.get(biobank_fhir_id) for biobank_fhir_id in
+                                   biobank_fhir_ids]
+            networks[network_fhir_id] = Network.from_json(network_json, network_org_json, juristic_person_json,
+                                                          collection_identifiers, biobank_identifiers,
+                                                          trusted=self._trusted_hydration)
+        return networks
+
+    @operation
+    def _build_network_org_from_json(self, network_org_fhir_id: str) -> Operation[_NetworkOrganization]:
+        """Build a NetworkOrganization object from a json representation
+        :param network_org_fhir_id: FHIR ID of the network organization resource
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if the resource cannot be found
+        :return NetworkOrganisation object"""
+        network_org_jsons, included_resources = yield from self.__get_resources_with_includes(
+            "Organization", [network_org_fhir_id], {"_include": "Organization:partof"})
+        if network_org_fhir_id not in network_org_jsons:
+            raise NonExistentResourceException(
+                f"NetworkOrganization with FHIR ID {network_org_fhir_id} is not present in blaze store")
+        network_org_json = network_org_jsons[network_org_fhir_id]
+        juristic_person_json = included_resources.get(get_nested_value(network_org_json, ["partOf", "reference"]))
+        network_org = _NetworkOrganization.from_json(network_org_json, juristic_person_json,
+                                                     trusted=self._trusted_hydration)
+        return network_org
+
+    @operation
+    def build_biobank_from_json(self, biobank_fhir_id: str) -> Operation[Biobank]:
+        """Build a Biobank object from a json representation
+        :param biobank_fhir_id: FHIR ID of the biobank resource
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if the resource cannot be found
+        :return Biobank object"""
+        biobanks = yield from self.__build_biobanks([biobank_fhir_id])
+        if biobank_fhir_id not in biobanks:
+            raise NonExistentResourceException(f"Biobank with FHIR ID {biobank_fhir_id} is not present in blaze store")
+        return biobanks[biobank_fhir_id]
+
+    @operation
+    def build_biobanks_from_json(self, biobank_fhir_ids: Iterable[str]) -> Operation[list[Biobank]]:
+        """Build Biobank objects from a json representation. Biobanks are read together with their juristic persons
+        by chunked _include searches.
+        :param biobank_fhir_ids: FHIR IDs of the biobank resources
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if any of the resources cannot be found
+        :return list of Biobank objects, in the same order as biobank_fhir_ids"""
+        biobank_fhir_ids = list(biobank_fhir_ids)
+        biobanks = yield from self.__build_biobanks(biobank_fhir_ids)
+        self.__raise_for_missing_resources("Biobanks", biobank_fhir_ids, biobanks)
+        return [biobanks[biobank_fhir_id] for biobank_fhir_id in biobank_fhir_ids]
+
+    def __build_biobanks(self, biobank_fhir_ids: list[str]) -> Operation[dict[str, Biobank]]:
+        biobank_jsons, included_resources = yield from self.__get_resources_with_includes(
+            "Organization", biobank_fhir_ids, {"_include": "Organization:partof"})
+        biobanks = {}
+        for biobank_fhir_id, biobank_json in biobank_jsons.items():
+            juristic_person_json = included_resources.get(get_nested_value(biobank_json, ["partOf", "reference"]))
+            biobanks[biobank_fhir_id] = Biobank.from_json(biobank_json, juristic_person_json,
+                                                          trusted=self._trusted_hydration)
+        return biobanks
+
+    def __get_collection_jsons_with_organizations(self, collection_fhir_ids: list[str]) \
+            -> Operation[tuple[dict[str, dict], dict[str, dict]]]:
+        """Read collections together with their collection organizations and managing biobanks by _include searches.
+        If the resource cache is used, the Groups (which are large for collections with many samples) are read
+        by conditional reads instead, and only the organizations are searched for.
+        :param collection_fhir_ids: FHIR ids of the collections
+        :return: tuple of dictionary mapping FHIR id to the collection, and dictionary mapping
+        reference (ResourceType/id) to the included organization"""
+        if self._resource_cache is None:
+            return (yield from self.__get_resources_with_includes("Group", collection_fhir_ids, {
+                "_include": "Group:managing-entity",
+                "_include:iterate": "Organization:partof"
+            }))
+        collection_fhir_ids = list(dict.fromkeys(collection_fhir_ids))
+        collection_jsons = yield Concurrently([self.get_fhir_resource_as_json("Group", collection_fhir_id)
+                                               for collection_fhir_id in collection_fhir_ids])
+        collection_jsons = {collection_fhir_id: collection_json
+                            for collection_fhir_id, collection_json in zip(collection_fhir_ids, collection_jsons)
+                            if collection_json is not None}
+        organization_fhir_ids = [parse_reference_id(get_nested_value(collection_json, ["managingEntity", "reference"]))
+                                 for collection_json in collection_jsons.values()
+                                 if get_nested_value(collection_json, ["managingEntity", "reference"]) is not None]
+        organization_jsons, included_resources = yield from self.__get_resources_with_includes(
+            "Organization", organization_fhir_ids, {"_include": "Organization:partof"})
+        included_resources.update({f"Organization/{organization_fhir_id}": organization_json
+                                   for organization_fhir_id, organization_json in organization_jsons.items()})
+        return collection_jsons, included_resources
+
+    def __get_resources_with_includes(self, resource_type: str, resource_fhir_ids: list[str],
+                                      include_params: dict) -> Operation[tuple[dict[str, dict], dict[str, dict]]]:
+        """Read resources by their FHIR ids together with the resources they reference.
+        FHIR ids are split into chunks, each chunk is read by a single search and the chunks are read concurrently.
+        :param resource_type: the type of the resources
+        :param resource_fhir_ids: the FHIR ids of the resources
+        :param include_params: _include (and _include:iterate) search parameters
+        :return: tuple of dictionary mapping FHIR id to the matched resource, and dictionary mapping
+        reference (ResourceType/id) to the included resource"""
+        matched_resources = {}
+        included_resources = {}
+        for entries in (yield Concurrently([
+                self.__search_all(resource_type, {"_id": ",".join(fhir_ids_chunk), **include_params},
+                                  page_size=len(fhir_ids_chunk))
+                for fhir_ids_chunk in chunk_list(list(dict.fromkeys(resource_fhir_ids)), self._search_chunk_size)])):
+            for entry in entries:
+                resource = entry.get("resource", {})
+                if get_nested_value(entry, ["search", "mode"]) == "include":
+                    included_resources[f"{resource.get('resourceType')}/{resource.get('id')}"] = resource
+                else:
+                    matched_resources[resource.get("id")] = resource
+        return matched_resources, included_resources
+
+    @staticmethod
+    def __search_all(resource_type: str, params: dict, page_size: int = None) -> Operation[list[dict]]:
+        """Get entries of all the pages of a search, as an operation which can be run concurrently with others."""
+        return (yield SearchAll(resource_type, params, page_size))
+
+    @staticmethod
+    def __raise_for_missing_resources(resource_name: str, requested_fhir_ids: list[str], found_resources: dict):
+        missing_fhir_ids = [fhir_id for fhir_id in requested_fhir_ids if fhir_id not in found_resources]
+        if missing_fhir_ids:
+            raise NonExistentResourceException(f"{resource_name} with FHIR IDs {missing_fhir_ids} "
+                                               f"are not present in blaze store")
+
+    @operation
+    def add_already_present_samples_to_existing_collection(self, sample_fhir_ids: list[str],
+                                                           collection_fhir_id: str) -> Operation[bool]:
+        """Add samples already present in blaze to the collection
+        :param sample_fhir_ids: FHIR IDs of samples to add to collection
+        :param collection_fhir_id: FHIR ID of collection
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if the resource cannot be found
+        :return: Bool indicating outcome of this operation"""
+        collection = yield from self.build_collection_from_json(collection_fhir_id)
+        already_present_samples = list(collection.sample_fhir_ids or [])
+        already_present_samples_set = set(already_present_samples)
+        new_sample_fhir_ids = [sample_fhir_id for sample_fhir_id in dict.fromkeys(sample_fhir_ids)
+                               if sample_fhir_id not in already_present_samples_set]
+        characteristics = yield from self.__get_collection_characteristics(collection)
+        for sample, donor in (yield from self.__build_samples_with_donors(new_sample_fhir_ids)):
+            characteristics.add_sample(sample, donor)
+        collection = characteristics.apply_to(collection)
+        collection._sample_fhir_ids = already_present_samples + new_sample_fhir_ids
+        collection_fhir = self.__with_fhir_id(collection.to_fhir_dict(), collection.collection_fhir_id)
+        updated = yield from self._update_fhir_resource("Group", collection_fhir_id, collection_fhir)
+        if updated:
+            self._collection_statistics_store.save(collection_fhir_id, characteristics)
+        return updated
+
+    @operation
+    def update_collection_values(self, collection_fhir_id: str) -> Operation[bool]:
+        """Recalculate characteristics of a collection from all of its samples.
+        :param collection_fhir_id: FHIR ID of collection
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if the resource cannot be found
+        :return: Bool indicating if the collection was updated or not"""
+        collection = yield from self.build_collection_from_json(collection_fhir_id)
+        characteristics = yield from self.__compute_collection_characteristics(collection)
+        collection = characteristics.apply_to(collection)
+        collection_fhir = self.__with_fhir_id(collection.to_fhir_dict(), collection.collection_fhir_id)
+        updated = yield from self._update_fhir_resource("Group", collection.collection_fhir_id, collection_fhir)
+        if updated:
+            self._collection_statistics_store.save(collection_fhir_id, characteristics)
+        return updated
+
+    def __get_collection_characteristics(self, collection: Collection) -> Operation[CollectionCharacteristics]:
+        """Get characteristics of the collection from the statistics store. If there are no stored characteristics,
+        or they were computed from other samples than the collection has (e.g. the collection was modified
+        by another client), they are computed from all the samples of the collection.
+        :param collection: the collection
+        :return: characteristics of the collection
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if any of the samples cannot be found
+        """
+        characteristics = self._collection_statistics_store.get(collection.collection_fhir_id)
+        if characteristics is not None and characteristics.sample_fhir_ids == set(collection.sample_fhir_ids or []):
+            return characteristics
+        return (yield from self.__compute_collection_characteristics(collection))
+
+    def __compute_collection_characteristics(self, collection: Collection) -> Operation[CollectionCharacteristics]:
+        """Compute characteristics of the collection from all of its samples.
+        :param collection: the collection
+        :return: characteristics of the collection
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if any of the samples cannot be found
+        """
+        characteristics = CollectionCharacteristics()
+        for sample, donor in (yield from self.__build_samples_with_donors(collection.sample_fhir_ids or [])):
+            characteristics.add_sample(sample, donor)
+        return characteristics
+
+    def __build_samples_with_donors(self, sample_fhir_ids: list[str]) \
+            -> Operation[list[tuple[Sample, SampleDonor | None]]]:
+        """Build samples together with their donors. Samples are read in chunks together with
+        their donors and observations, every donor is built only once.
+        :param sample_fhir_ids: FHIR IDs of the samples
+        :return: list of tuples (sample, donor of the sample)
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if any of the samples cannot be found
+        """
+        sample_fhir_ids = list(dict.fromkeys(sample_fhir_ids))
+        samples_with_donors = []
+        found_sample_fhir_ids = set()
+        donors = {}
+        for samples, donor_jsons in (yield Concurrently([
+                self.__build_samples_for_chunk(fhir_ids_chunk)
+                for fhir_ids_chunk in chunk_list(sample_fhir_ids, self._search_chunk_size)])):
+            for donor_fhir_id, donor_json in donor_jsons.items():
+                if donor_fhir_id not in donors:
+                    donors[donor_fhir_id] = SampleDonor.from_json(donor_json, trusted=self._trusted_hydration)
+            for sample_fhir_id, sample in samples.items():
+                found_sample_fhir_ids.add(sample_fhir_id)
+                samples_with_donors.append((sample, donors.get(sample.subject_fhir_id)))
+        self.__raise_for_missing_resources("Samples", sample_fhir_ids, found_sample_fhir_ids)
+        return samples_with_donors
+
+    @operation
+    def _get_juristic_person_organization_by_name(self, name: str) -> Operation[dict | None]:
+        """
+        Get juristic_person in json representation with specified name, if such exists
+        :param name: name of the juristic person
+        :raises HTTPError: if the request to blaze fails
+        :return: json representation of juristic person
+        """
+        return (yield from self.__get_first_resource_by_search("Organization", {"name": name}))
+
+    @operation
+    def get_collection_fhir_id_by_sample_fhir_identifier(self, sample_fhir_id: str) -> Operation[str | None]:
+        """Get Collection FHIR id which contains provided sample FHIR ID, if there is one
+        :param sample_fhir_id: FHIR ID of the sample
+        :return: collection FHIR id if there is collection which contains this sample, None otherwise"""
+        return (yield from self.__get_group_fhir_id_by_resource_fhir_identifier(sample_fhir_id))
+
+    @operation
+    def get_network_fhir_id_by_member_fhir_identifier(self, member_fhir_id: str) -> Operation[str | None]:
+        """Get Network FHIR id which contains provided member FHIR ID (either collection resource of biobank resource),
+         if there is one
+        :param member_fhir_id: FHIR ID of the member of network
+        :return: network FHIR id if there is network which contains this member, None otherwise"""
+        return (yield from self.__get_group_fhir_id_by_resource_fhir_identifier(member_fhir_id))
+
+    def __get_group_fhir_id_by_resource_fhir_identifier(self, resource_fhir_id: str) -> Operation[str | None]:
+        """Get Group FHIR id which contains provided FHIR_ID or resource, if there is one
+        :param resource_fhir_id: FHIR ID of the resource
+        :return: Group resource FHIR ID if there is group which
+        contains reference to resource_fhir_id, none otherwise"""
+        group_membership_index = yield from self.__get_group_membership_index()
+        if group_membership_index is not None:
+            return next(iter(group_membership_index.get_group_fhir_ids(resource_fhir_id)), None)
+        resource = yield from self.__get_first_resource_by_search(
+            "Group", self._search_policy.id_resolution_params({"groupMember": resource_fhir_id}))
+        return get_nested_value(resource, ["id"])
+
+    def __get_group_membership_index(self) -> Operation[GroupMembershipIndex | None]:
+        """Get the group membership index of the client, loading it from all the Groups on first use.
+        :return: GroupMembershipIndex, None if the client does not use the index
+        :raises HTTPError: if the request to blaze fails"""
+        group_membership_index = self._group_membership_index
+        if group_membership_index is not None and not group_membership_index.is_loaded:
+            group_membership_index.load((yield from self.__get_all_resources_by_search(
+                "Group", {"_elements": "id,extension"})))
+        return group_membership_index
+
+    def record_bundle_writes(self, bundle_json: dict, response_json: dict):
+        """Record resources written by a bundle which was sent by the caller, e.g. a bundle containing
+        the entries returned by the deletes with part_of_bundle=True.
+        :param bundle_json: json representation of the sent bundle
+        :param response_json: response of blaze to the bundle"""
+        self.__record_bundle_writes(bundle_json, response_json)
+
+    def __record_bundle_writes(self, bundle_json: dict, response_json: dict):
+        """Record resources created, updated or deleted by the bundle into the group membership index
+        and the caches, if they are used. Statistics of deleted collections are dropped from the collection
+        statistics store.
+        :param bundle_json: json representation of the sent bundle
+        :param response_json: response of blaze to the bundle, only its successful entries are recorded"""
+        if self._group_membership_index is not None:
+            self._group_membership_index.apply_bundle(bundle_json, response_json)
+        for method, resource_type, resource_fhir_id, resource_json in iter_bundle_writes(bundle_json, response_json):
+            if method == "DELETE" and resource_type == "Group":
+                self._collection_statistics_store.delete(resource_fhir_id)
+            if self._resource_cache is not None:
+                self._resource_cache.invalidate(resource_type, resource_fhir_id)
+            if self._identifier_cache is None:
+                continue
+            if method == "DELETE":
+                self._identifier_cache.invalidate(resource_type, resource_fhir_id)
+            else:
+                self._identifier_cache.put(resource_type, get_nested_value(resource_json, ["identifier", 0, "value"]),
+                                           resource_fhir_id)
+
+    def __cache_resource(self, resource_json: dict | None):
+        """Store translation of the identifier of a read or written resource into the identifier cache, if used."""
+        if self._identifier_cache is not None and resource_json is not None and "resourceType" in resource_json:
+            self._identifier_cache.put(resource_json["resourceType"],
+                                       get_nested_value(resource_json, ["identifier", 0, "value"]),
+                                       resource_json.get("id"))
+
+    @operation
+    def delete_donor(self, donor_fhir_id: str, part_of_bundle: bool = False) -> Operation[list[BundleEntry] | bool]:
+        """Delete a donor from blaze.
+        BEWARE: Deleting a donor will also delete all related samples and diagnosis reports.
+        :param donor_fhir_id: the fhir id of the donor to delete
+        :param part_of_bundle: bool indicating if this operation is part of larger bundle or not
+        :return: if part_of_bundle = True, this function returns list of BundleEntries to be using in a larger Bundle.
+        otherwise, it will create its own bundle, and return True if deletion was successful, False otherwise
+        :raises HTTPError: if the request to blaze fails
+        """
+        plan = yield from self.__plan_delete(donor_fhir_ids=[donor_fhir_id])
+        return (yield from self.__execute_delete_plan(plan, part_of_bundle))
+
+    @operation
+    def delete_donors(self, donor_fhir_ids: Iterable[str], bundle_size: int = None) -> Operation[bool]:
+        """Delete multiple donors from blaze, together with all their samples, observations and conditions.
+        Every collection containing any of the deleted samples is updated only once, and the deletes are packed
+        into transaction bundles.
+        :param donor_fhir_ids: FHIR IDs of the donors to delete
+        :param bundle_size: maximum number of entries in a single bundle. If None, delete_bundle_size of the client
+        is used. Deletes which do not fit into a single bundle are not atomic
+        :return: True if deletion was successful, False otherwise
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if any of the donors is not present in blaze
+        """
+        plan = yield from self.__plan_delete(donor_fhir_ids=donor_fhir_ids)
+        return (yield from self.__execute_delete_plan(plan, bundle_size=bundle_size))
+
+    @operation
+    def delete_samples(self, sample_fhir_ids: Iterable[str], bundle_size: int = None) -> Operation[bool]:
+        """Delete multiple samples from blaze, together with their observations.
+        Every collection containing any of the deleted samples is updated only once, and the deletes are packed
+        into transaction bundles.
+        :param sample_fhir_ids: FHIR IDs of the samples to delete
+        :param bundle_size: maximum number of entries in a single bundle. If None, delete_bundle_size of the client
+        is used. Deletes which do not fit into a single bundle are not atomic
+        :return: True if deletion was successful, False otherwise
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if any of the samples is not present in blaze
+        """
+        plan = yield from self.__plan_delete(sample_fhir_ids=sample_fhir_ids)
+        return (yield from self.__execute_delete_plan(plan, bundle_size=bundle_size))
+
+    @operation
+    def delete_condition(self, condition_fhir_id: str,
+                         part_of_bundle: bool = False) -> Operation[list[BundleEntry] | bool]:
+        """Delete a condition from blaze.
+        :param condition_fhir_id: the fhir id of the condition to delete
+        :param part_of_bundle: bool indicating if this operation is part of larger bundle or not
+        :return: if part_of_bundle = True, this function returns list of BundleEntries to be using in a larger Bundle.
+        otherwise, it will create its own bundle, and return True if deletion was successful, False otherwise
+        :raises HTTPError: if the request to blaze fails
+        """
+        entries = []
+        if not (yield from self.is_resource_present_in_blaze("Condition", condition_fhir_id)):
+            raise NonExistentResourceException(
+                f"Cannot delete Condition with FHIR id {condition_fhir_id} because "
+                f"condition is not present in the blaze store.")
+        condition_entry = self.__create_delete_bundle_entry("Condition", condition_fhir_id)
+        entries.append(condition_entry)
+        return (yield from self.__post_delete_entries(entries, part_of_bundle))
+
+    @operation
+    def delete_sample(self, sample_fhir_id: str, part_of_bundle: bool = False,
+                      part_of_deleting_patient: bool = False) -> Operation[list[BundleEntry] | bool]:
+        """Delete a sample from blaze. BEWARE: Deleting a sample will also delete all related diagnosis reports and
+        observations.
+        :param sample_fhir_id: the fhir id of the sample to delete
+        :param part_of_bundle: bool indicating if this operation is part of larger bundle or not
+        :param part_of_deleting_patient: bool indicating if deleting sample is part of
+        deleting patient(and his condition), or not.
+        :return: if part_of_bundle = True, this function returns list of BundleEntries to be using in a larger Bundle.
+        otherwise, it will create its own bundle, and return True if deletion was successful, False otherwise
+        :raises HTTPError: if the request to blaze fails
+        """
+        plan = yield from self.__plan_delete(sample_fhir_ids=[sample_fhir_id],
+                                             remove_samples_from_collections=not part_of_deleting_patient)
+        return (yield from self.__execute_delete_plan(plan, part_of_bundle))
+
+    @operation
+    def _delete_observation(self, observation_fhir_id: str,
+                            part_of_bundle: bool = False) -> Operation[list[BundleEntry] | bool]:
+        """Delete an observation from blaze.
+        :param observation_fhir_id: the fhir id of the observation to delete
+        :param part_of_bundle: bool indicating if this operation is part of larger bundle or not
+        :return: if part_of_bundle = True, this function returns list of BundleEntries to be using in a larger Bundle.
+        otherwise, it will create its own bundle, and return True if deletion was successful, False otherwise
+        :raises HTTPError: if the request to blaze fails
+        """
+        entries = []
+        if not (yield from self.is_resource_present_in_blaze("Observation", observation_fhir_id)):
+            raise NonExistentResourceException(
+                f"Cannot delete Observation with FHIR id {observation_fhir_id} "
+                f"because observation is not present in the blaze store.")
+        entry = self.__create_delete_bundle_entry("Observation", observation_fhir_id)
+        entries.append(entry)
+        return (yield from self.__post_delete_entries(entries, part_of_bundle))
+
+    @operation
+    def delete_collection(self, collection_fhir_id: str,
+                          part_of_bundle=False) -> Operation[list[BundleEntry] | bool]:
+        """delete collection from the blaze store
+        :param collection_fhir_id: FHIR ID of collection resource to be deleted
+        :param part_of_bundle: bool indicating if this operation is part of larger bundle or not
+        :return: if part_of_bundle = True, this function returns list of BundleEntries to be using in a larger Bundle.
+        otherwise, it will create its own bundle, and return True if deletion was successful, False otherwise
+        """
+        entries = []
+        collection_json = yield from self.get_fhir_resource_as_json("Group", collection_fhir_id)
+        collection_organization_fhir_id = parse_reference_id(
+            get_nested_value(collection_json, ["managingEntity", "reference"]))
+        collection_entries = yield from self._delete_collection_organization(collection_organization_fhir_id, True)
+        entries.extend(collection_entries)
+        return (yield from self.__post_delete_entries(entries, part_of_bundle))
+
+    @operation
+    def _delete_collection(self, collection_fhir_id: str,
+                           part_of_bundle: bool = False) -> Operation[list[BundleEntry] | bool]:
+        """Delete collection from blaze.
+        :param collection_fhir_id: FHIR ID of the collection to be deleted
+        :param part_of_bundle: bool indicating if this operation is part of larger bundle or not
+        :return: if part_of_bundle = True, this function returns list of BundleEntries to be using in a larger Bundle.
+        otherwise, it will create its own bundle, and return True if deletion was successful, False otherwise """
+        entries = []
+        if not (yield from self.is_resource_present_in_blaze("Group", collection_fhir_id)):
+            raise NonExistentResourceException(
+                f"Cannot delete Collection with FHIR ID {collection_fhir_id} "
+                f"because collection is not present in the blaze store")
+        collection_entry = self.__create_delete_bundle_entry("Group", collection_fhir_id)
+        entries.append(collection_entry)
+        network_group_fhir_id = yield from self.__get_network_fhir_id_by_member(collection_fhir_id)
+        if network_group_fhir_id is not None:
+            yield from self.__delete_member_reference_from_network(network_group_fhir_id, collection_fhir_id)
+        return (yield from self.__post_delete_entries(entries, part_of_bundle))
+
+    def __post_delete_entries(self, entries: list[BundleEntry],
+                              part_of_bundle: bool) -> Operation[list[BundleEntry] | bool]:
+        """Post the delete entries in a single transaction bundle, or return them to be used in a larger bundle.
+        :param entries: delete entries
+        :param part_of_bundle: bool indicating if this operation is part of larger bundle or not. If True,
+        the deletes are recorded only once the caller passes the sent bundle to record_bundle_writes
+        :return: if part_of_bundle = True, the entries. Otherwise True if deletion was successful, False otherwise
+        :raises HTTPError: if the request to blaze fails"""
+        if part_of_bundle:
+            return entries
+        bundle_json = self.__create_bundle(entries)
+        response = yield HttpRequest("POST", self._blaze_url, json=bundle_json)
+        self.__raise_for_status_extract_diagnostics_message(response)
+        self.__record_bundle_writes(bundle_json, response.json)
+        return response.status == 200 or response.status == 204
+
+    def __delete_member_reference_from_network(self, network_fhir_id: str, member_fhir_id: str) -> Operation[bool]:
+        """Delete a collection reference from network
+        :param network_fhir_id: FHIR ID of the network
+        :param collection_fhir_id: FHIR ID of the collection to be deleted
+        :return: True if the reference was deleted sucessfully, false otherwise"""
+        network = yield from self.build_network_from_json(network_fhir_id)
+        if member_fhir_id in network.members_collections_fhir_ids:
+            network.members_collections_fhir_ids.remove(member_fhir_id)
+        if member_fhir_id in network.members_biobanks_fhir_ids:
+            network.members_biobanks_fhir_ids.remove(member_fhir_id)
+        update_network_fhir = self.__with_fhir_id(network.to_fhir_dict(), network.network_fhir_id)
+        return (yield from self._update_fhir_resource("Group", network_fhir_id, update_network_fhir))
+
+    def __delete_samples_from_collection(self, collection_fhir_id: str, sample_fhir_ids: list[str]) \
+            -> Operation[tuple[Collection, CollectionCharacteristics]]:
+        """Remove samples from the collection, and remove their contribution to the characteristics
+        of the collection.
+        :param collection_fhir_id: FHIR ID of the collection
+        :param sample_fhir_ids: FHIR IDs of the samples to be removed
+        :return: tuple of updated collection and its updated characteristics
+        """
+        collection = yield from self.build_collection_from_json(collection_fhir_id)
+        characteristics = yield from self.__get_collection_characteristics(collection)
+        # the samples are not read, their contributions to the characteristics are stored under their FHIR IDs
+        sample_fhir_ids_to_remove = set(sample_fhir_ids)
+        for sample_fhir_id in sample_fhir_ids_to_remove:
+            characteristics.remove_sample(sample_fhir_id)
+        collection._sample_fhir_ids = [sample_fhir_id for sample_fhir_id in collection.sample_fhir_ids
+                                       if sample_fhir_id not in sample_fhir_ids_to_remove]
+        return characteristics.apply_to(collection), characteristics
+
+    @operation
+    def _delete_collection_organization(self, collection_organization_fhir_id: str, part_of_bundle: bool = False) \
+            -> Operation[list[BundleEntry] | bool]:
+        """delete collection organization from blaze store. WARNING: deleting collection organization
+        will result in deleting collection resource as well
+        :param collection_organization_fhir_id: FHIR ID of collection organization resource to be deleted
+        :param part_of_bundle: bool indicating if this operation is part of larger bundle or not
+        :return: if part_of_bundle = True, this function returns list of BundleEntries to be using in a larger Bundle.
+        otherwise, it will create its own bundle, and return True if deletion was successful, False otherwise """
+        plan = yield from self.__plan_delete(organization_fhir_ids=[collection_organization_fhir_id])
+        return (yield from self.__execute_delete_plan(plan, part_of_bundle))
+
+    @operation
+    def delete_network(self, network_fhir_id: str, part_of_bundle: bool = False) \
+            -> Operation[list[BundleEntry] | bool]:
+        """delete network from blaze store.
+        :param network_fhir_id: FHIR ID of network resource to be deleted
+        :param part_of_bundle: bool indicating if this operation is part of larger bundle or not
+        :return: if part_of_bundle = True, this function returns list of BundleEntries to be using in a larger Bundle.
+        otherwise, it will create its own bundle, and return True if deletion was successful, False otherwise """
+        entries = []
+        network_json = yield from self.get_fhir_resource_as_json("Group", network_fhir_id)
+        if network_json is None:
+            raise NonExistentResourceException(f"Cannot delete Network with FHIR ID {network_fhir_id} because "
+                                               f"this resource is not present in the blaze store")
+        network_org_fhir_id = parse_reference_id(get_nested_value(network_json, ["managingEntity", "reference"]))
+        network_entries = yield from self._delete_network_organization(network_org_fhir_id, True)
+        entries.extend(network_entries)
+        return (yield from self.__post_delete_entries(entries, part_of_bundle))
+
+    @operation
+    def _delete_network(self, network_fhir_id: str, part_of_bundle: bool = False) \
+            -> Operation[list[BundleEntry] | bool]:
+        """delete network from blaze store.
+        :param network_fhir_id: FHIR ID of network resource to be deleted
+        :param part_of_bundle: bool indicating if this operation is part of larger bundle or not
+        :return: if part_of_bundle = True, this function returns list of BundleEntries to be using in a larger Bundle.
+        otherwise, it will create its own bundle, and return True if deletion was successful, False otherwise """
+        entries = []
+        if not (yield from self.is_resource_present_in_blaze("Group", network_fhir_id)):
+            raise NonExistentResourceException(f"Cannot delete Network with FHIR ID {network_fhir_id} because "
+                                               f"this resource is not present in the blaze store")
+        network_entry = self.__create_delete_bundle_entry("Group", network_fhir_id)
+        entries.append(network_entry)
+        return (yield from self.__post_delete_entries(entries, part_of_bundle))
+
+    @operation
+    def _delete_network_organization(self, network_organization_fhir_id: str, part_of_bundle: bool = False) \
+            -> Operation[list[BundleEntry] | bool]:
+        """delete network organization from blaze store. BEWARE: deleting network organization will
+        result in deleting network resource as well
+        :param network_organization_fhir_id: FHIR ID of network organization resource to be deleted
+        :param part_of_bundle: bool indicating if this operation is part of larger bundle or not
+        :return: if part_of_bundle = True, this function returns list of BundleEntries to be using in a larger Bundle.
+        otherwise, it will create its own bundle, and return True if deletion was successful, False otherwise """
+        plan = yield from self.__plan_delete(organization_fhir_ids=[network_organization_fhir_id])
+        return (yield from self.__execute_delete_plan(plan, part_of_bundle))
+
+    @operation
+    def delete_biobank(self, biobank_fhir_id: str, part_of_bundle: bool = False) \
+            -> Operation[list[BundleEntry] | bool]:
+        """delete biobank from blaze store. BEWARE: deleting biobank will result in
+        deleting all connected collections and networks asw well
+        :param biobank_fhir_id: FHIR ID of biobank resource to be deleted
+        :param part_of_bundle: bool indicating if this operation is part of larger bundle or not
+        :return: if part_of_bundle = True, this function returns list of BundleEntries to be using in a larger Bundle.
+        otherwise, it will create its own bundle, and return True if deletion was successful, False otherwise """
+        plan = yield from self.__plan_delete(biobank_fhir_ids=[biobank_fhir_id])
+        return (yield from self.__execute_delete_plan(plan, part_of_bundle))
+
+    def __plan_delete(self, donor_fhir_ids: Iterable[str] = (), sample_fhir_ids: Iterable[str] = (),
+                      organization_fhir_ids: Iterable[str] = (), biobank_fhir_ids: Iterable[str] = (),
+                      remove_samples_from_collections: bool = True) -> Operation[DeletePlan]:
+        """Discover the whole cascade of a delete with a few chunked _revinclude searches, instead of searching
+        for the dependent resources of every deleted resource separately.
+        :param donor_fhir_ids: FHIR IDs of donors to delete, together with their samples, observations and conditions
+        :param sample_fhir_ids: FHIR IDs of samples to delete, together with their observations
+        :param organization_fhir_ids: FHIR IDs of collection or network organizations to delete,
+        together with the collections/networks they manage
+        :param biobank_fhir_ids: FHIR IDs of biobanks to delete, together with their collection and network
+        organizations
+        :param remove_samples_from_collections: if False, deleted samples are not removed from their collections
+        :return: DeletePlan
+        :raises HTTPError: if the request to blaze fails
+        :raises NonExistentResourceException: if any of the resources to delete is not present in blaze
+        """
+        plan = DeletePlan()
+        donor_fhir_ids = list(dict.fromkeys(donor_fhir_ids))
+        sample_fhir_ids = list(dict.fromkeys(sample_fhir_ids))
+        organization_fhir_ids = list(dict.fromkeys(organization_fhir_ids))
+        biobank_fhir_ids = list(dict.fromkeys(biobank_fhir_ids))
+        if donor_fhir_ids:
+            donors, included_resources = yield from self.__get_resources_with_includes(
+                "Patient", donor_fhir_ids,
+                {"_revinclude": ["Specimen:patient", "Condition:subject", "Observation:subject"]})
+            self.__raise_for_missing_resources("Donors", donor_fhir_ids, donors)
+            self.__add_deletes_to_plan(plan, "Patient", donor_fhir_ids, included_resources)
+        if sample_fhir_ids:
+            samples, included_resources = yield from self.__get_resources_with_includes(
+                "Specimen", sample_fhir_ids, {"_revinclude": "Observation:specimen"})
+            self.__raise_for_missing_resources("Samples", sample_fhir_ids, samples)
+            self.__add_deletes_to_plan(plan, "Specimen", sample_fhir_ids, included_resources)
+        if remove_samples_from_collections:
+            for collection_fhir_id, member_fhir_ids in (yield from self.__get_groups_by_members(
+                    plan.fhir_ids("Specimen"))).items():
+                plan.remove_collection_members(collection_fhir_id, member_fhir_ids)
+        if biobank_fhir_ids:
+            biobanks, included_resources = yield from self.__get_resources_with_includes(
+                "Organization", biobank_fhir_ids, {"_revinclude": "Organization:partof"})
+            self.__raise_for_missing_resources("Biobanks", biobank_fhir_ids, biobanks)
+            for reference in included_resources:
+                resource_type, resource_fhir_id = reference.split("/")
+                if resource_type == "Organization" and resource_fhir_id not in organization_fhir_ids:
+                    organization_fhir_ids.append(resource_fhir_id)
+        if organization_fhir_ids:
+            organizations, included_resources = yield from self.__get_resources_with_includes(
+                "Organization", organization_fhir_ids, {"_revinclude": "Group:managing-entity"})
+            self.__raise_for_missing_resources("Organizations", organization_fhir_ids, organizations)
+            self.__add_deletes_to_plan(plan, "Organization", organization_fhir_ids, included_resources)
+        # biobanks are referenced by their collection and network organizations, so they are deleted after them
+        for biobank_fhir_id in biobank_fhir_ids:
+            plan.add_delete("Organization", biobank_fhir_id)
+        for network_fhir_id, member_fhir_ids in (yield from self.__get_groups_by_members(
+                plan.fhir_ids("Group") + biobank_fhir_ids)).items():
+            plan.remove_network_members(network_fhir_id, member_fhir_ids)
+        return plan
+
+    @staticmethod
+    def __add_deletes_to_plan(plan: DeletePlan, resource_type: str, resource_fhir_ids: list[str],
+                              included_resources: dict[str, dict]):
+        for resource_fhir_id in resource_fhir_ids:
+            plan.add_delete(resource_type, resource_fhir_id)
+        for reference in included_resources:
+            included_resource_type, included_resource_fhir_id = reference.split("/")
+            plan.add_delete(included_resource_type, included_resource_fhir_id)
+
+    def __get_groups_by_members(self, member_fhir_ids: list[str]) -> Operation[dict[str, list[str]]]:
+        """Get Groups (collections or networks) which contain any of the members, by chunked searches.
+        :param member_fhir_ids: FHIR IDs of the members
+        :return: dictionary mapping FHIR ID of the Group to the FHIR IDs of the members it contains
+        :raises HTTPError: if the request to blaze fails"""
+        group_membership_index = yield from self.__get_group_membership_index()
+        if group_membership_index is not None:
+            return group_membership_index.get_groups_by_members(member_fhir_ids)
+        member_fhir_ids_set = set(member_fhir_ids)
+        groups = {}
+        for group_jsons in (yield Concurrently([
+                self.__get_all_resources_by_search("Group", {"groupMember": ",".join(fhir_ids_chunk)})
+                for fhir_ids_chunk in chunk_list(member_fhir_ids, self._search_chunk_size)])):
+            for group_json in group_jsons:
+                groups[group_json["id"]] = [member_fhir_id for member_fhir_id in
+                                            get_group_member_fhir_ids(group_json)
+                                            if member_fhir_id in member_fhir_ids_set]
+        return groups
+
+    def __execute_delete_plan(self, plan: DeletePlan, part_of_bundle: bool = False,
+                              bundle_size: int = None) -> Operation[list[BundleEntry] | bool]:
+        """Remove the deleted members from the collections and networks, and delete all the resources of the plan.
+        The updates of the Groups are followed by the deletes, packed into transaction bundles of at most
+        bundle_size entries.
+        :param plan: DeletePlan
+        :param part_of_bundle: bool indicating if this operation is part of larger bundle or not. If True,
+        the Groups are updated right away and the delete entries are returned. The deletes are not recorded
+        into the caches, the group membership index and the collection statistics store until the caller passes
+        the sent bundle and its response to record_bundle_writes
+        :param bundle_size: maximum number of entries in a single bundle. If None, delete_bundle_size of the client
+        is used
+        :return: if part_of_bundle = True, this function returns list of BundleEntries to be using in a larger Bundle.
+        otherwise, it will create its own bundles, and return True if deletion was successful, False otherwise
+        :raises HTTPError: if the request to blaze fails
+        """
+        removed_network_members = plan.removed_network_members
+        updated_collections, networks = yield Concurrently([
+            self.__delete_samples_from_collections(plan.removed_collection_members),
+            self.build_networks_from_json(removed_network_members.keys())])
+        for network in networks:
+            removed_members = set(removed_network_members[network.network_fhir_id])
+            network._members_collections_fhir_ids = [member_fhir_id for member_fhir_id in
+                                                     network.members_collections_fhir_ids or []
+                                                     if member_fhir_id not in removed_members]
+            network._members_biobanks_fhir_ids = [member_fhir_id for member_fhir_id in
+                                                  network.members_biobanks_fhir_ids or []
+                                                  if member_fhir_id not in removed_members]
+        update_entries = [self.__create_bundle_entry_for_updating_collection(collection)
+                          for collection, _ in updated_collections]
+        update_entries.extend(self.__create_bundle_entry_for_updating_network(network) for network in networks)
+        delete_entries = [self.__create_delete_bundle_entry(resource_type, resource_fhir_id)
+                          for resource_type, resource_fhir_id in plan.deletes]
+        if part_of_bundle:
+            if update_entries and not (yield from self.__post_transaction_bundles(update_entries, bundle_size)):
+                return []
+            self.__save_collection_statistics(updated_collections)
+            return delete_entries
+        deleted = yield from self.__post_transaction_bundles(update_entries + delete_entries, bundle_size)
+        if deleted:
+            self.__save_collection_statistics(updated_collections)
+        return deleted
+
+    def __delete_samples_from_collections(self, removed_collection_members: dict[str, list[str]]) \
+            -> Operation[list[tuple[Collection, CollectionCharacteristics]]]:
+        """Remove samples from every collection of removed_collection_members, the collections are read concurrently.
+        :return: list of tuples of updated collection and its updated characteristics"""
+        return (yield Concurrently([self.__delete_samples_from_collection(collection_fhir_id, sample_fhir_ids)
+                                    for collection_fhir_id, sample_fhir_ids in removed_collection_members.items()]))
+
+    def __post_transaction_bundles(self, entries: list[BundleEntry | dict], bundle_size: int = None) -> Operation[bool]:
+        """Post entries in transaction bundles of at most bundle_size entries, one bundle after another.
+        :param entries: entries to post
+        :param bundle_size: maximum number of entries in a single bundle. If None, delete_bundle_size of the client
+        is used
+        :return: True if all the bundles were successful, False otherwise (the remaining bundles are not sent)
+        :raises HTTPError: if the request to blaze fails"""
+        for entries_chunk in chunk_list(entries, bundle_size or self._delete_bundle_size):
+            bundle_json = self.__create_bundle(entries_chunk)
+            response = yield HttpRequest("POST", self._blaze_url, json=bundle_json)
+            self.__raise_for_status_extract_diagnostics_message(response)
+            if not 200 <= response.status < 300:
+                return False
+            self.__record_bundle_writes(bundle_json, response.json)
+        return True
+
+    def __save_collection_statistics(self, updated_collections: list[tuple[Collection, CollectionCharacteristics]]):
+        for collection, characteristics in updated_collections:
+            self._collection_statistics_store.save(collection.collection_fhir_id, characteristics)
+
+    @operation
+    def delete_all_resources(self, biobank_id: str, fast_purge: bool = False,
+                             progress_callback: Callable[[PurgeProgress], None] = None) -> Operation[bool]:
+        """Just as name says.DELETES EVERYTHING!!!
+        :param biobank_id: identifier of the biobank to delete, together with all the donors
+        :param fast_purge: if True, all the MIABIS on FHIR resources are purged by purge_all_resources instead,
+        regardless of the biobank they belong to
+        :param progress_callback: called with the progress after every bundle of the fast purge
+        :return: True if deletion was successful, False otherwise
+        :raises HTTPError: if the request to blaze fails
+        """
+        if fast_purge:
+            return (yield from self.purge_all_resources(progress_callback=progress_callback))
+        biobank_fhir_id = yield from self.get_fhir_id("Organization", biobank_id)
+        deleted_biobank = yield from self.delete_biobank(biobank_fhir_id)
+        if not deleted_biobank:
+            return False
+        # the donors are read and deleted page by page, every page starts after the last donor of the previous one,
+        # so that the pages are not shifted by the deletes
+        last_donor_fhir_id = None
+        while True:
+            donor_fhir_ids, has_next_page = yield from self.__get_fhir_id_page(
+                "Patient", create_keyset_search_params({}, last_donor_fhir_id), self._delete_bundle_size)
+            if donor_fhir_ids and not (yield from self.delete_donors(donor_fhir_ids)):
+                return False
+            if not donor_fhir_ids or not has_next_page:
+                return True
+            last_donor_fhir_id = donor_fhir_ids[-1]
+
+    @operation
+    def purge_all_resources(self, bundle_size: int = None,
+                            progress_callback: Callable[[PurgeProgress], None] = None) -> Operation[bool]:
+        """Delete all the MIABIS on FHIR resources (identified by their profiles) from blaze, as fast as possible.
+        FHIR IDs of all the resources are read first, page by page sorted by the FHIR IDs.
+        Then the resources are deleted profile by profile in the PURGE_ORDER, referencing resources before
+        the resources they reference, by batch bundles which are sent concurrently.
+        Unlike delete_donor or delete_biobank, no cascade is searched for and no collection or network is updated.
+        :param bundle_size: maximum number of deletes in a single batch bundle. If None, delete_bundle_size
+        of the client is used
+        :param progress_callback: called with the progress of the purged profile after every bundle
+        :return: True if all the resources were deleted, False otherwise
+        :raises HTTPError: if the request to blaze fails
+        """
+        bundle_size = bundle_size or self._delete_bundle_size
+        snapshot = []
+        for resource_type, profile in PURGE_ORDER:
+            snapshot.append((resource_type, profile,
+                             (yield from self.__get_purge_snapshot(resource_type, profile, bundle_size))))
+        purged = True
+        for resource_type, profile, resource_fhir_ids in snapshot:
+            progress = yield from self.__purge_resources(resource_type, profile, resource_fhir_ids, bundle_size,
+                                                         progress_callback)
+            purged = purged and progress.failed == 0
+        return purged
+
+    def __purge_resources(self, resource_type: str, profile: str, resource_fhir_ids: list[str], bundle_size: int,
+                          progress_callback: Callable[[PurgeProgress], None] | None) -> Operation[PurgeProgress]:
+        """Delete the resources by batch bundles of at most bundle_size entries, sent concurrently.
+        :return: final progress of the purge
+        :raises HTTPError: if the request to blaze fails"""
+        progress = PurgeProgress(resource_type, profile, len(resource_fhir_ids))
+        # the bundles of the BlazeClient are finished by its worker threads
+        progress_lock = threading.Lock()
+
+        def delete_chunk(fhir_ids_chunk: list[str]) -> Operation[None]:
+            deleted = yield from self.__post_purge_batch(resource_type, fhir_ids_chunk)
+            with progress_lock:
+                progress.record(deleted, len(fhir_ids_chunk) - deleted)
+                if progress_callback is not None:
+                    progress_callback(progress)
+
+        yield Concurrently([delete_chunk(fhir_ids_chunk)
+                            for fhir_ids_chunk in chunk_list(resource_fhir_ids, bundle_size)])
+        return progress
+
+    def __get_purge_snapshot(self, resource_type: str, profile: str, page_size: int) -> Operation[list[str]]:
+        """FHIR IDs of all the resources with the profile. Every page starts after the last FHIR ID of the previous
+        page (keyset pagination), so resources deleted meanwhile do not make the following resources skipped.
+        :raises HTTPError: if the request to blaze fails"""
+        fhir_ids = []
+        while True:
+            page, has_next_page = yield from self.__get_fhir_id_page(
+                resource_type, create_purge_search_params(profile, fhir_ids[-1] if fhir_ids else None), page_size)
+            fhir_ids.extend(page)
+            if not page or not has_next_page:
+                return fhir_ids
+
+    def __get_fhir_id_page(self, resource_type: str, params: dict,
+                           page_size: int) -> Operation[tuple[list[str], bool]]:
+        """FHIR IDs of the resources on the first page of the search.
+        :return: the FHIR IDs, and whether the search has a next page
+        :raises HTTPError: if the request to blaze fails"""
+        search_bundle = yield from self.get_first_search_page(resource_type, params, page_size)
+        fhir_ids = [get_nested_value(entry, ["resource", "id"]) for entry in search_bundle.get("entry", [])
+                    if get_nested_value(entry, ["resource", "id"]) is not None]
+        return fhir_ids, self.get_next_link(search_bundle) is not None
+
+    def __post_purge_batch(self, resource_type: str, resource_fhir_ids: list[str]) -> Operation[int]:
+        """Delete resources by a single batch bundle, every entry is processed independently.
+        :return: number of successfully deleted resources
+        :raises HTTPError: if the request to blaze fails"""
+        entries = [self.__create_delete_bundle_entry(resource_type, resource_fhir_id)
+                   for resource_fhir_id in resource_fhir_ids]
+        bundle_json = self.__create_bundle(entries, "batch")
+        response = yield HttpRequest("POST", self._blaze_url, json=bundle_json)
+        self.__raise_for_status_extract_diagnostics_message(response)
+        self.__record_bundle_writes(bundle_json, response.json)
+        return sum(1 for response_entry in response.json.get("entry", [])
+                   if is_successful_entry_response(response_entry))
+
+    @staticmethod
+    def __get_all_members_belonging_to_network(network_json: dict) -> tuple[list[str], list[str]]:
+        """Get all members which belong to the network
+        :param network_json: json representation of network
+        :return tuple containing list of collection FHIR IDs,
+        and list of organization FHIR ids belonging to this network"""
+        collection_fhir_ids = []
+        biobank_fhir_ids = []
+        for extension in network_json.get("extension", []):
+            if extension["url"] == "http://hl7.org/fhir/5.0/StructureDefinition/extension-Group.member.entity":
+                resource_type, reference = get_nested_value(extension, ["valueReference", "reference"]).split("/")
+                if resource_type == "Group":
+                    collection_fhir_ids.append(reference)
+                else:
+                    biobank_fhir_ids.append(reference)
+        return collection_fhir_ids, biobank_fhir_ids
+
+    def __get_network_fhir_id_by_member(self, group_member_fhir_id: str) -> Operation[str | None]:
+        """
+        Returns FHIR id of network, that a member is part of, if there is any, None otherwise
+        :param group_member_fhir_id: fhir id of member to search by
+        :return: FHIR id of Network | None
+        """
+        return (yield from self.__get_group_fhir_id_by_resource_fhir_identifier(group_member_fhir_id))
+
+    def __raise_for_status_extract_diagnostics_message(self, response: BlazeResponse):
+        """Raise the exception of the client for a failed request, extending the message
+        by the diagnostics of the OperationOutcome sent by blaze."""
+        if response.status < 400:
+            return
+        message = f"HTTP {response.status}"
+        if isinstance(response.json, dict):
+            for issue in response.json.get("issue", []):
+                message += f" - Diagnostics: {issue.get('diagnostics', 'No diagnostics available')}"
+        raise self._create_request_error(response, response.status, message)
+
+    @staticmethod
+    def __create_bundle(entries: list[BundleEntry | dict], bundle_type: str = "transaction") -> dict:
+        """Create json representation of a bundle used for uploading/updating/deleting multiple FHIR resources.
+        :param entries: entries of the bundle, either as json or as BundleEntry objects
+        (e.g. returned by the delete methods with part_of_bundle=True)
+        :param bundle_type: "transaction" or "batch"
+        :return: json representation of the bundle"""
+        return create_bundle_dict([entry if isinstance(entry, dict) else entry.as_json() for entry in entries],
+                                  bundle_type)
+
+    @staticmethod
+    def __create_get_bundle_entry(request_url: str) -> dict:
+        return {"request": {"method": "GET", "url": request_url}}
+
+    @staticmethod
+    def __create_delete_bundle_entry(resource_type: str, resource_fhir_id: str) -> BundleEntry:
+        entry = BundleEntry()
+        entry.request = BundleEntryRequest()
+        entry.request.method = "DELETE"
+        entry.request.url = f"{resource_type.capitalize()}/{resource_fhir_id}"
+        return entry
+
+    @staticmethod
+    def __create_put_bundle_entry(resource_type: str, resource_fhir_id: str, resource_json: dict,
+                                  version_id: str = None) -> dict:
+        entry = {"resource": resource_json, "request": {"method": "PUT", "url": f"{resource_type}/{resource_fhir_id}"}}
+        if version_id is not None:
+            entry["request"]["ifMatch"] = f'W/"{version_id}"'
+        return entry
+
+    @staticmethod
+    def __with_fhir_id(resource_json: dict, resource_fhir_id: str) -> dict:
+        """Add FHIR ID to the json representation of a resource, which is necessary for updating it."""
+        resource_json["id"] = resource_fhir_id
+        return resource_json
+
+    def __create_bundle_entry_for_updating_collection(self, collection: Collection) -> dict:
+        collection_fhir = self.__with_fhir_id(collection.to_fhir_dict(), collection.collection_fhir_id)
+        return self.__create_put_bundle_entry("Group", collection.collection_fhir_id, collection_fhir)
+
+    def __create_bundle_entry_for_updating_network(self, network: Network) -> dict:
+        network_fhir = self.__with_fhir_id(network.to_fhir_dict(), network.network_fhir_id)
+        return self.__create_put_bundle_entry("Group", network.network_fhir_id, network_fhir)
+
+    def __get_id_from_bundle_response(self, response: dict, resource_type: str) -> str:
+        for entry in response.get("entry", []):
+            fhir_id = self.__get_id_from_location(get_nested_value(entry, ["response", "location"]), resource_type)
+            if fhir_id is not None:
+                return fhir_id
+
+    @staticmethod
+    def __get_id_from_location(location: str, resource_type: str) -> str | None:
+        """Get fhir id of a resource from the location of a bundle entry response (e.g. Patient/1/_history/1)"""
+        split_url = location.split("/")
+        if resource_type in split_url:
+            resource_type_index = split_url.index(resource_type)
+            if resource_type_index + 1 < len(split_url):
+                return split_url[resource_type_index + 1]
+        return None
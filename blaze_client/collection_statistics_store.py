@@ -0,0 +1,76 @@
+import json
+import os
+import threading
+
+from miabis_model.collection_characteristics import CollectionCharacteristics
+
+
+class CollectionStatisticsStore:
+    """Store of incrementally maintained characteristics of collections, keyed by FHIR ID of the collection.
+    If directory is provided, the characteristics of every collection are persisted into a separate json file
+    in the directory, so that they survive between runs of the client, and saving characteristics of one collection
+    does not rewrite the characteristics of the others. Otherwise, they are kept only in memory."""
+
+    def __init__(self, directory: str = None):
+        """
+        :param directory: path of the directory the characteristics are persisted to. It is created if it does
+        not exist
+        """
+        self._directory = directory
+        self._lock = threading.Lock()
+        self._characteristics: dict[str, dict | None] = {}
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, collection_fhir_id: str) -> CollectionCharacteristics | None:
+        """Get characteristics of the collection.
+        :param collection_fhir_id: FHIR ID of the collection
+        :return: stored characteristics, None if there are no characteristics stored for the collection"""
+        with self._lock:
+            if collection_fhir_id not in self._characteristics:
+                self._characteristics[collection_fhir_id] = self.__load(collection_fhir_id)
+            characteristics_json = self._characteristics[collection_fhir_id]
+        if characteristics_json is None:
+            return None
+        return CollectionCharacteristics.from_json(characteristics_json)
+
+    def save(self, collection_fhir_id: str, characteristics: CollectionCharacteristics):
+        """Store characteristics of the collection.
+        :param collection_fhir_id: FHIR ID of the collection
+        :param characteristics: characteristics to store"""
+        with self._lock:
+            self._characteristics[collection_fhir_id] = characteristics.to_json()
+            self.__persist(collection_fhir_id)
+
+    def delete(self, collection_fhir_id: str):
+        """Remove characteristics of the collection, if there are any.
+        :param collection_fhir_id: FHIR ID of the collection"""
+        with self._lock:
+            self._characteristics[collection_fhir_id] = None
+            if self._directory is not None:
+                try:
+                    os.remove(self.__get_path(collection_fhir_id))
+                except FileNotFoundError:
+                    pass
+
+    def __load(self, collection_fhir_id: str) -> dict | None:
+        if self._directory is None:
+            return None
+        try:
+            with open(self.__get_path(collection_fhir_id), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def __persist(self, collection_fhir_id: str):
+        if self._directory is None:
+            return
+        path = self.__get_path(collection_fhir_id)
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(self._characteristics[collection_fhir_id], file)
+        os.replace(temporary_path, path)
+
+    def __get_path(self, collection_fhir_id: str) -> str:
+        # FHIR IDs consist only of letters, digits, "-" and ".", so they are valid file names
+        return os.path.join(self._directory, f"{collection_fhir_id}.json")
@@ -0,0 +1,64 @@
+class DeletePlan:
+    """Cascade of a delete operation, discovered up front: the resources to be deleted, and the members which have
+    to be removed from the collections and networks (Groups) that are not deleted themselves.
+    Resources are deduplicated, so a resource reachable from several deleted roots is deleted only once."""
+
+    # referencing resources are deleted before the resources they reference, so that the plan can be split
+    # into several transaction bundles without violating referential integrity. Resources of the same type
+    # are deleted in the order they were added
+    DELETE_ORDER = ("Observation", "Condition", "Specimen", "Group", "Patient", "Organization")
+
+    def __init__(self):
+        self._deletes: dict[str, dict[str, None]] = {resource_type: {} for resource_type in self.DELETE_ORDER}
+        self._removed_collection_members: dict[str, dict[str, None]] = {}
+        self._removed_network_members: dict[str, dict[str, None]] = {}
+
+    def add_delete(self, resource_type: str, resource_fhir_id: str):
+        """Add resource to be deleted.
+        :param resource_type: type of the resource
+        :param resource_fhir_id: FHIR ID of the resource"""
+        if resource_type not in self._deletes:
+            raise ValueError(f"Resources of type {resource_type} cannot be deleted by a delete plan.")
+        self._deletes[resource_type][resource_fhir_id] = None
+
+    def is_deleted(self, resource_type: str, resource_fhir_id: str) -> bool:
+        return resource_fhir_id in self._deletes.get(resource_type, {})
+
+    def fhir_ids(self, resource_type: str) -> list[str]:
+        """FHIR IDs of the resources of the type which are going to be deleted"""
+        return list(self._deletes.get(resource_type, {}))
+
+    def remove_collection_members(self, collection_fhir_id: str, sample_fhir_ids: list[str]):
+        """Remove deleted samples from the collection.
+        :param collection_fhir_id: FHIR ID of the collection
+        :param sample_fhir_ids: FHIR IDs of the deleted samples"""
+        self._removed_collection_members.setdefault(collection_fhir_id, {}).update(dict.fromkeys(sample_fhir_ids))
+
+    def remove_network_members(self, network_fhir_id: str, member_fhir_ids: list[str]):
+        """Remove deleted collections or biobanks from the network.
+        :param network_fhir_id: FHIR ID of the network
+        :param member_fhir_ids: FHIR IDs of the deleted members"""
+        self._removed_network_members.setdefault(network_fhir_id, {}).update(dict.fromkeys(member_fhir_ids))
+
+    @property
+    def removed_collection_members(self) -> dict[str, list[str]]:
+        """Samples to be removed from each collection which is not deleted"""
+        return {collection_fhir_id: list(sample_fhir_ids)
+                for collection_fhir_id, sample_fhir_ids in self._removed_collection_members.items()
+                if not self.is_deleted("Group", collection_fhir_id)}
+
+    @property
+    def removed_network_members(self) -> dict[str, list[str]]:
+        """Members to be removed from each network which is not deleted"""
+        return {network_fhir_id: list(member_fhir_ids)
+                for network_fhir_id, member_fhir_ids in self._removed_network_members.items()
+                if not self.is_deleted("Group", network_fhir_id)}
+
+    @property
+    def deletes(self) -> list[tuple[str, str]]:
+        """All the resources to be deleted as (resource type, FHIR ID), in the order they should be deleted"""
+        return [(resource_type, resource_fhir_id) for resource_type in self.DELETE_ORDER
+                for resource_fhir_id in self._deletes[resource_type]]
+
+    def __len__(self):
+        return sum(len(fhir_ids) for fhir_ids in self._deletes.values())
@@ -0,0 +1,110 @@
+import threading
+from typing import Iterable
+
+from miabis_model.util.parsing_util import get_nested_value, parse_reference_id
+from blaze_client.bundle_util import iter_bundle_writes
+
+GROUP_MEMBER_EXTENSION_URL = "http://hl7.org/fhir/5.0/StructureDefinition/extension-Group.member.entity"
+
+
+def get_group_member_fhir_ids(group_json: dict) -> list[str]:
+    """Get FHIR IDs of all members of the Group (collection or network)
+    :param group_json: json representation of the Group
+    :return: FHIR IDs of the members, in the order of the member extensions"""
+    return [parse_reference_id(get_nested_value(extension, ["valueReference", "reference"]))
+            for extension in group_json.get("extension", [])
+            if extension.get("url") == GROUP_MEMBER_EXTENSION_URL]
+
+
+class GroupMembershipIndex:
+    """Client-side reverse index of Group membership, mapping FHIR ID of a member (sample, collection or biobank)
+    to the FHIR IDs of the Groups (collections or networks) containing it. The index is loaded from the member
+    extensions of all the Groups once, and then kept up to date by the client on every Group it writes,
+    so that membership lookups do not need a groupMember search.
+    The index is only correct as long as the Groups are not modified by anyone else than the clients using it;
+    call clear() to load it again."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._members: dict[str, list[str]] = {}
+        self._groups_by_member: dict[str, dict[str, None]] = {}
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, group_jsons: Iterable[dict]):
+        """Replace content of the index by the members of the Groups.
+        :param group_jsons: json representations of all the Groups (at least with id and extension elements)"""
+        members = {group_json["id"]: get_group_member_fhir_ids(group_json) for group_json in group_jsons}
+        with self._lock:
+            self._members = {}
+            self._groups_by_member = {}
+            for group_fhir_id, member_fhir_ids in members.items():
+                self.__set_members(group_fhir_id, member_fhir_ids)
+            self._loaded = True
+
+    def clear(self):
+        """Drop content of the index, so that it is loaded again on the next lookup."""
+        with self._lock:
+            self._members = {}
+            self._groups_by_member = {}
+            self._loaded = False
+
+    def set_members(self, group_fhir_id: str, member_fhir_ids: Iterable[str]):
+        """Record the current members of a created or updated Group.
+        :param group_fhir_id: FHIR ID of the Group
+        :param member_fhir_ids: FHIR IDs of all the members of the Group"""
+        with self._lock:
+            self.__remove_group(group_fhir_id)
+            self.__set_members(group_fhir_id, member_fhir_ids)
+
+    def remove_group(self, group_fhir_id: str):
+        """Forget a deleted Group.
+        :param group_fhir_id: FHIR ID of the Group"""
+        with self._lock:
+            self.__remove_group(group_fhir_id)
+
+    def get_group_fhir_ids(self, member_fhir_id: str) -> list[str]:
+        """Get FHIR IDs of the Groups containing the member.
+        :param member_fhir_id: FHIR ID of the member
+        :return: FHIR IDs of the Groups, empty list if the resource is not a member of any Group"""
+        with self._lock:
+            return list(self._groups_by_member.get(member_fhir_id, {}))
+
+    def get_groups_by_members(self, member_fhir_ids: Iterable[str]) -> dict[str, list[str]]:
+        """Get Groups which contain any of the members.
+        :param member_fhir_ids: FHIR IDs of the members
+        :return: dictionary mapping FHIR ID of the Group to the FHIR IDs of the members it contains"""
+        groups = {}
+        with self._lock:
+            for member_fhir_id in dict.fromkeys(member_fhir_ids):
+                for group_fhir_id in self._groups_by_member.get(member_fhir_id, {}):
+                    groups.setdefault(group_fhir_id, []).append(member_fhir_id)
+        return groups
+
+    def apply_bundle(self, bundle_json: dict, response_json: dict = None):
+        """Record Group writes of a transaction or batch bundle. Only the entries which succeeded are recorded.
+        :param bundle_json: json representation of the sent bundle
+        :param response_json: response of blaze to the bundle. If None, all the entries are considered successful"""
+        for method, resource_type, group_fhir_id, group_json in iter_bundle_writes(bundle_json, response_json):
+            if resource_type != "Group":
+                continue
+            if method == "DELETE":
+                self.remove_group(group_fhir_id)
+            else:
+                self.set_members(group_fhir_id, get_group_member_fhir_ids(group_json or {}))
+
+    def __set_members(self, group_fhir_id: str, member_fhir_ids: Iterable[str]):
+        self._members[group_fhir_id] = list(dict.fromkeys(member_fhir_ids))
+        for member_fhir_id in self._members[group_fhir_id]:
+            self._groups_by_member.setdefault(member_fhir_id, {})[group_fhir_id] = None
+
+    def __remove_group(self, group_fhir_id: str):
+        for member_fhir_id in self._members.pop(group_fhir_id, []):
+            groups = self._groups_by_member.get(member_fhir_id)
+            if groups is not None:
+                groups.pop(group_fhir_id, None)
+                if not groups:
+                    del self._groups_by_member[member_fhir_id]
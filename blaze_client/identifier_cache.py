@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+
+class IdentifierCache:
+    """Bidirectional cache of translations between (organizational) identifiers and FHIR IDs of resources.
+    The number of cached translations is bounded, least recently used translations are evicted first,
+    and every translation expires ttl_seconds after it was stored.
+    Any object with the same public methods can be provided to the client instead, e.g. a cache shared
+    between processes."""
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float | None = 300,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param max_size: maximum number of cached translations
+        :param ttl_seconds: how long a translation is kept, None for no expiration
+        :param clock: source of the current time in seconds, used for the expiration
+        """
+        if max_size < 1:
+            raise ValueError("Maximum size of the cache must be a positive integer.")
+        self._max_size = max_size
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (resource type, identifier) -> (FHIR ID, expiration time), ordered from the least recently used
+        self._fhir_ids: OrderedDict[tuple[str, str], tuple[str, float | None]] = OrderedDict()
+        self._identifiers: dict[tuple[str, str], str] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        """Number of translations dropped because the cache was full"""
+        return self._evictions
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self._hits + self._misses
+        return self._hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self._fhir_ids)
+
+    def get_fhir_id(self, resource_type: str, identifier: str) -> str | None:
+        """Get cached FHIR ID of the resource.
+        :param resource_type: type of the resource
+        :param identifier: (organizational) identifier of the resource
+        :return: FHIR ID, None if the translation is not cached"""
+        with self._lock:
+            key = (resource_type.capitalize(), identifier)
+            entry = self.__get_valid_entry(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._fhir_ids.move_to_end(key)
+            return entry[0]
+
+    def get_identifier(self, resource_type: str, resource_fhir_id: str) -> str | None:
+        """Get cached identifier of the resource.
+        :param resource_type: type of the resource
+        :param resource_fhir_id: FHIR ID of the resource
+        :return: (organizational) identifier, None if the translation is not cached"""
+        with self._lock:
+            resource_type = resource_type.capitalize()
+            identifier = self._identifiers.get((resource_type, resource_fhir_id))
+            if identifier is None or self.__get_valid_entry((resource_type, identifier)) is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._fhir_ids.move_to_end((resource_type, identifier))
+            return identifier
+
+    def put(self, resource_type: str, identifier: str, resource_fhir_id: str):
+        """Store translation of the identifier of a resource to its FHIR ID, replacing previous translations
+        of both the identifier and the FHIR ID.
+        :param resource_type: type of the resource
+        :param identifier: (organizational) identifier of the resource
+        :param resource_fhir_id: FHIR ID of the resource"""
+        if identifier is None or resource_fhir_id is None:
+            return
+        with self._lock:
+            resource_type = resource_type.capitalize()
+            self.__remove_identifier(resource_type, identifier)
+            self.__remove_fhir_id(resource_type, resource_fhir_id)
+            expires_at = self._clock() + self._ttl_seconds if self._ttl_seconds is not None else None
+            self._fhir_ids[(resource_type, identifier)] = (resource_fhir_id, expires_at)
+            self._identifiers[(resource_type, resource_fhir_id)] = identifier
+            while len(self._fhir_ids) > self._max_size:
+                (evicted_type, _), (evicted_fhir_id, _) = self._fhir_ids.popitem(last=False)
+                self._identifiers.pop((evicted_type, evicted_fhir_id), None)
+                self._evictions += 1
+
+    def invalidate(self, resource_type: str, resource_fhir_id: str):
+        """Drop translations of a deleted resource.
+        :param resource_type: type of the resource
+        :param resource_fhir_id: FHIR ID of the resource"""
+        with self._lock:
+            self.__remove_fhir_id(resource_type.capitalize(), resource_fhir_id)
+
+    def clear(self):
+        """Drop all the translations. Statistics are kept."""
+        with self._lock:
+            self._fhir_ids.clear()
+            self._identifiers.clear()
+
+    def __get_valid_entry(self, key: tuple[str, str]) -> tuple[str, float | None] | None:
+        entry = self._fhir_ids.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= self._clock():
+            self.__remove_identifier(*key)
+            return None
+        return entry
+
+    def __remove_identifier(self, resource_type: str, identifier: str):
+        entry = self._fhir_ids.pop((resource_type, identifier), None)
+        if entry is not None:
+            self._identifiers.pop((resource_type, entry[0]), None)
+
+    def __remove_fhir_id(self, resource_type: str, resource_fhir_id: str):
+        identifier = self._identifiers.pop((resource_type, resource_fhir_id), None)
+        if identifier is not None:
+            self._fhir_ids.pop((resource_type, identifier), None)
@@ -0,0 +1,100 @@
+import time
+
+from miabis_model.util.config import FHIRConfig
+
+# MIABIS on FHIR resources as (resource type, profile), in the order they are purged. Every resource is purged only
+# after all the resources which may reference it, so the resources of a single profile can be deleted
+# by independent batch bundles sent concurrently, without violating referential integrity
+PURGE_ORDER = (
+    ("Group", "network"),
+    ("Group", "collection"),
+    ("Observation", "observation"),
+    ("Condition", "condition"),
+    ("Specimen", "sample"),
+    ("Patient", "donor"),
+    ("Organization", "network_organization"),
+    ("Organization", "collection_organization"),
+    ("Organization", "biobank"),
+    ("Organization", "juristic_person"),
+)
+
+
+def create_keyset_search_params(params: dict, after_fhir_id: str = None) -> dict:
+    """Search parameters for a single page of FHIR IDs of the matched resources. The resources are sorted
+    by their FHIR IDs, and every page starts after the last FHIR ID of the previous page (keyset pagination),
+    so resources deleted between the pages do not shift the following pages.
+    :param params: search parameters
+    :param after_fhir_id: last FHIR ID of the previous page, None for the first page
+    :return: search parameters"""
+    params = {**params, "_elements": "id", "_sort": "_id"}
+    if after_fhir_id is not None:
+        params["_id"] = f"gt{after_fhir_id}"
+    return params
+
+
+def create_purge_search_params(profile: str, after_fhir_id: str = None) -> dict:
+    """Search parameters for a single page of the snapshot of FHIR IDs of all the resources with the MIABIS profile.
+    :param profile: name of the profile (as in PURGE_ORDER)
+    :param after_fhir_id: last FHIR ID of the previous page, None for the first page
+    :return: search parameters"""
+    return create_keyset_search_params({"_profile": FHIRConfig.get_meta_profile_url(profile)}, after_fhir_id)
+
+
+class PurgeProgress:
+    """Progress of purging the resources of a single MIABIS profile, reported after every bundle."""
+
+    def __init__(self, resource_type: str, profile: str, total: int):
+        """
+        :param resource_type: type of the purged resources
+        :param profile: name of the MIABIS profile of the purged resources
+        :param total: number of resources in the snapshot
+        """
+        self._resource_type = resource_type
+        self._profile = profile
+        self._total = total
+        self._deleted = 0
+        self._failed = 0
+        self._started = time.monotonic()
+
+    @property
+    def resource_type(self) -> str:
+        return self._resource_type
+
+    @property
+    def profile(self) -> str:
+        return self._profile
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    @property
+    def deleted(self) -> int:
+        return self._deleted
+
+    @property
+    def failed(self) -> int:
+        return self._failed
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.monotonic() - self._started
+
+    @property
+    def throughput(self) -> float:
+        """Number of processed (deleted or failed) resources per second"""
+        elapsed_seconds = self.elapsed_seconds
+        if elapsed_seconds <= 0:
+            return 0.0
+        return (self._deleted + self._failed) / elapsed_seconds
+
+    def record(self, deleted: int, failed: int):
+        """Record the outcome of a single bundle.
+        :param deleted: number of successfully deleted resources
+        :param failed: number of resources which could not be deleted"""
+        self._deleted += deleted
+        self._failed += failed
+
+    def __str__(self):
+        return (f"{self._resource_type} ({self._profile}): {self._deleted}/{self._total} deleted, "
+                f"{self._failed} failed, {self.throughput:.1f} resources/s")
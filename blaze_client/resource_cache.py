@@ -0,0 +1,91 @@
+import json
+import threading
+from collections import OrderedDict
+
+from miabis_model.util.parsing_util import get_nested_value
+
+
+class ResourceCache:
+    """Cache of bodies of read resources, keyed by resource type and FHIR ID, together with their versions.
+    The client re-reads a cached resource by a conditional read (If-None-Match), so a resource which
+    did not change since it was cached is answered by 304 Not Modified without a body, and served from the cache.
+    The number of cached resources is bounded, least recently used resources are evicted first.
+    Bodies are stored serialized, so the callers are free to modify the returned resources."""
+
+    def __init__(self, max_size: int = 1000):
+        """
+        :param max_size: maximum number of cached resources
+        """
+        if max_size < 1:
+            raise ValueError("Maximum size of the cache must be a positive integer.")
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        # (resource type, FHIR ID) -> (version ID, serialized resource), ordered from the least recently used
+        self._resources: OrderedDict[tuple[str, str], tuple[str, str]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def hits(self) -> int:
+        """Number of reads served from the cache, because the resource was not modified"""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Number of reads which transferred the body of the resource"""
+        return self._misses
+
+    def __len__(self):
+        return len(self._resources)
+
+    def get_version_id(self, resource_type: str, resource_fhir_id: str) -> str | None:
+        """Get version of the cached resource.
+        :param resource_type: type of the resource
+        :param resource_fhir_id: FHIR ID of the resource
+        :return: version ID (meta.versionId), None if the resource is not cached"""
+        with self._lock:
+            entry = self._resources.get((resource_type.capitalize(), resource_fhir_id))
+            return entry[0] if entry is not None else None
+
+    def get(self, resource_type: str, resource_fhir_id: str) -> dict | None:
+        """Get the cached resource, after blaze confirmed it was not modified.
+        :param resource_type: type of the resource
+        :param resource_fhir_id: FHIR ID of the resource
+        :return: json representation of the resource, None if the resource is not cached"""
+        with self._lock:
+            key = (resource_type.capitalize(), resource_fhir_id)
+            entry = self._resources.get(key)
+            if entry is None:
+                return None
+            self._hits += 1
+            self._resources.move_to_end(key)
+        return json.loads(entry[1])
+
+    def put(self, resource_json: dict):
+        """Store a read resource. Resources without a version (meta.versionId) are not stored.
+        :param resource_json: json representation of the resource"""
+        version_id = get_nested_value(resource_json, ["meta", "versionId"])
+        resource_type = resource_json.get("resourceType")
+        resource_fhir_id = resource_json.get("id")
+        if version_id is None or resource_type is None or resource_fhir_id is None:
+            return
+        serialized_resource = json.dumps(resource_json)
+        with self._lock:
+            key = (resource_type, resource_fhir_id)
+            self._misses += 1
+            self._resources[key] = (version_id, serialized_resource)
+            self._resources.move_to_end(key)
+            while len(self._resources) > self._max_size:
+                self._resources.popitem(last=False)
+
+    def invalidate(self, resource_type: str, resource_fhir_id: str):
+        """Drop a modified or deleted resource.
+        :param resource_type: type of the resource
+        :param resource_fhir_id: FHIR ID of the resource"""
+        with self._lock:
+            self._resources.pop((resource_type.capitalize(), resource_fhir_id), None)
+
+    def clear(self):
+        """Drop all the resources. Statistics are kept."""
+        with self._lock:
+            self._resources.clear()
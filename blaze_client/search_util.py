@@ -0,0 +1,79 @@
+from typing import Iterable, Generator
+
+from miabis_model.util.util import escape_search_value
+
+
+def chunk_list(values: Iterable, chunk_size: int) -> Generator[list, None, None]:
+    """Split values into consecutive lists of at most chunk_size elements."""
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be a positive integer.")
+    chunk = []
+    for value in values:
+        chunk.append(value)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def join_search_values(values: Iterable[str]) -> str:
+    """Join values into a comma separated list, which FHIR servers interpret as logical OR."""
+    return ",".join(escape_search_value(value) for value in values)
+
+
+class SearchPolicy:
+    """Decides the result parameters of the searches sent by the client, so that blaze neither computes
+    nor transfers more than the caller needs. Existence checks ask for a single match (or only for the number
+    of matches), resolutions of FHIR ids and identifiers transfer only these elements, and list searches
+    are paged by the page size of the policy. The total number of matches is not requested, unless
+    the search asks only for it."""
+
+    def __init__(self, page_size: int = None, existence_by_count: bool = False, skip_total: bool = True):
+        """
+        :param page_size: number of entries per page (_count) of the list searches which do not set their own.
+        If None, the default of the server is used
+        :param existence_by_count: if True, existence checks ask for the number of matches (_summary=count),
+        otherwise for the first match only (_count=1)
+        :param skip_total: if True, searches ask blaze not to compute the total number of matches (_total=none)
+        """
+        if page_size is not None and page_size < 1:
+            raise ValueError("Page size must be a positive integer.")
+        self._page_size = page_size
+        self._existence_by_count = existence_by_count
+        self._skip_total = skip_total
+
+    @property
+    def existence_by_count(self) -> bool:
+        return self._existence_by_count
+
+    def existence_params(self, params: dict) -> dict:
+        """Parameters of a search which only decides whether any resource matches.
+        :param params: search parameters
+        :return: search parameters with the result parameters of the policy"""
+        if self._existence_by_count:
+            return {**params, "_summary": "count"}
+        return {**params, **self.__get_total_params(), "_count": 1, "_elements": "id"}
+
+    def id_resolution_params(self, params: dict) -> dict:
+        """Parameters of a search which only needs FHIR ids and identifiers of the matched resources.
+        Elements requested by params themselves are kept.
+        :param params: search parameters
+        :return: search parameters with the result parameters of the policy"""
+        return {"_elements": "id,identifier", **self.__get_total_params(), **params}
+
+    def list_params(self, params: dict, page_size: int = None) -> dict:
+        """Parameters of a search which lists the matched resources page by page.
+        :param params: search parameters
+        :param page_size: page size requested by the caller, overrides both _count of params and the page size
+        of the policy
+        :return: search parameters with the result parameters of the policy"""
+        params = {**self.__get_total_params(), **params} if "_summary" not in params else dict(params)
+        if page_size is not None:
+            params["_count"] = page_size
+        elif "_count" not in params and self._page_size is not None:
+            params["_count"] = self._page_size
+        return params
+
+    def __get_total_params(self) -> dict:
+        return {"_total": "none"} if self._skip_total else {}
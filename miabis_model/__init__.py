@@ -1,11 +1,55 @@
-from .biobank import Biobank
-from .collection import Collection
-from .collection_organization import _CollectionOrganization
-from .condition import Condition
-from .gender import Gender
-from .incorrect_json_format import IncorrectJsonFormatException
-from .network import Network, _NetworkOrganization
-from .observation import _Observation
-from .sample import Sample
-from .sample_donor import SampleDonor
-from .storage_temperature import StorageTemperature
+"""MIABIS on FHIR model. The classes are imported lazily, on first access, so importing the package does not load
+fhirclient or the ICD-10 data until they are needed."""
+import importlib
+from typing import TYPE_CHECKING
+
+# imported eagerly, the submodule of the same name would shadow the icd10_service instance once imported. It is
+# cheap, the ICD-10 data are loaded on first validation
+from .icd10_service import ICD10Service, icd10_service
+
+if TYPE_CHECKING:
+    from .biobank import Biobank
+    from .collection import Collection
+    from .collection_organization import _CollectionOrganization
+    from .condition import Condition
+    from .gender import Gender
+    from .incorrect_json_format import IncorrectJsonFormatException
+    from .network import Network, _NetworkOrganization
+    from .observation import _Observation
+    from .sample import Sample
+    from .sample_donor import SampleDonor
+    from .storage_temperature import StorageTemperature
+    from .collection_characteristics import CollectionCharacteristics
+
+# name of the attribute -> module it is defined in
+_LAZY_ATTRIBUTES = {
+    "Biobank": ".biobank",
+    "Collection": ".collection",
+    "_CollectionOrganization": ".collection_organization",
+    "Condition": ".condition",
+    "Gender": ".gender",
+    "IncorrectJsonFormatException": ".incorrect_json_format",
+    "Network": ".network",
+    "_NetworkOrganization": ".network",
+    "_Observation": ".observation",
+    "Sample": ".sample",
+    "SampleDonor": ".sample_donor",
+    "StorageTemperature": ".storage_temperature",
+    "CollectionCharacteristics": ".collection_characteristics",
+}
+
+__all__ = ["ICD10Service", "icd10_service"] + [name for name in _LAZY_ATTRIBUTES if not name.startswith("_")]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # later accesses do not go through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
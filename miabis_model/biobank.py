@@ -11,10 +11,27 @@ from miabis_model.juristic_person import _JuristicPerson
 from miabis_model.util.config import FHIRConfig
 from miabis_model.util.constants import BIOBANK_BIOPROCESSING_AND_ANALYTICAL_CAPABILITIES, \
     BIOBANK_INFRASTRUCTURAL_CAPABILITIES, \
-    BIOBANK_ORGANISATIONAL_CAPABILITIES, DEFINITION_BASE_URL
-from miabis_model.util.parsing_util import get_nested_value, parse_contact
+    BIOBANK_ORGANISATIONAL_CAPABILITIES
+from miabis_model.util.parsing_util import parse_contact, get_fhir_id, get_identifier_value, get_version_id, \
+    get_name, get_alias, get_country, get_codeable_concept_code, get_string_value, ExtensionParser, set_value, \
+    append_value, create_unchecked
 from miabis_model.util.util import create_fhir_identifier, create_contact, create_country_of_residence, \
-    create_codeable_concept_extension, create_string_extension, create_post_bundle_entry, create_bundle
+    create_codeable_concept_extension, create_string_extension, create_post_bundle_entry, create_bundle, \
+    create_resource_dict, create_fhir_identifier_dict, create_reference_dict, create_contact_dict, \
+    create_country_of_residence_dict, create_codeable_concept_extension_dict, create_string_extension_dict, \
+    create_post_bundle_entry_dict, create_bundle_dict
+
+_EXTENSION_PARSER = ExtensionParser({
+    FHIRConfig.get_extension_url("biobank", "infrastructural_capabilities"):
+        append_value("infrastructural_capabilities", get_codeable_concept_code),
+    FHIRConfig.get_extension_url("biobank", "organisational_capabilities"):
+        append_value("organisational_capabilities", get_codeable_concept_code),
+    FHIRConfig.get_extension_url("biobank", "bioprocessing_and_analysis_capabilities"):
+        append_value("bioprocessing_and_analysis_capabilities", get_codeable_concept_code),
+    FHIRConfig.get_extension_url("biobank", "quality_management_standard"):
+        append_value("quality_management_standards", get_string_value),
+    FHIRConfig.get_extension_url("biobank", "description"): set_value("description", get_string_value),
+})
 
 
 class Biobank:
@@ -59,6 +76,7 @@ class Biobank:
         self.url = url
         self.bioprocessing_and_analysis_capabilities = bioprocessing_and_analysis_capabilities
         self._biobank_fhir_id = None
+        self._version_id = None
 
     @property
     def identifier(self) -> str:
@@ -195,37 +213,57 @@ class Biobank:
     def biobank_fhir_id(self) -> str:
         return self._biobank_fhir_id
 
+    @property
+    def version_id(self) -> str:
+        """Version (meta.versionId) of the biobank resource this object was built from,
+        used for conditional updates (If-Match)."""
+        return self._version_id
+
     @classmethod
-    def from_json(cls, biobank_json: dict, juristic_person_json: dict) -> Self:
+    def from_json(cls, biobank_json: dict, juristic_person_json: dict, trusted: bool = False) -> Self:
         """
         Parse a json into a MoFBiobank object.
         :param juristic_person_json: json representation of juristic person responsible for this biobank.
         :param biobank_json: json representation of the biobank.
+        :param trusted: if True, the values are not validated, for json which was validated when it was written
         :return: MoFBiobank object.
         """
         try:
-            biobank_fhir_id = get_nested_value(biobank_json, ["id"])
-            identifier = get_nested_value(biobank_json, ["identifier", 0, "value"])
-            name = get_nested_value(biobank_json, ["name"])
-            alias = get_nested_value(biobank_json, ["alias", 0])
-            country = get_nested_value(biobank_json, ["address", 0, "country"])
+            biobank_fhir_id = get_fhir_id(biobank_json)
+            identifier = get_identifier_value(biobank_json)
+            name = get_name(biobank_json)
+            alias = get_alias(biobank_json)
+            country = get_country(biobank_json)
             contact = parse_contact(biobank_json.get("contact", [{}])[0])
-            extensions = get_nested_value(biobank_json, ["extension"])
+            extensions = biobank_json.get("extension")
             parsed_extension = cls.__parse_extensions(extensions)
             infrastructural_capabilities = parsed_extension["infrastructural_capabilities"]
             organisational_capabilities = parsed_extension["organisational_capabilities"]
             bioprocessing = parsed_extension["bioprocessing_and_analysis_capabilities"]
             quality_standards = parsed_extension["quality_management_standards"]
             description = parsed_extension["description"]
-            juristic_person_fhir_id = get_nested_value(juristic_person_json, ["id"])
-            juristic_person_name = get_nested_value(juristic_person_json, ["name"])
-            instance = cls(identifier, name, country, contact["name"], contact["surname"], contact["email"],
-                           juristic_person_name, description, alias,
-                           infrastructural_capabilities=infrastructural_capabilities,
-                           organisational_capabilities=organisational_capabilities,
-                           bioprocessing_and_analysis_capabilities=bioprocessing,
-                           quality__management_standards=quality_standards)
+            juristic_person_fhir_id = get_fhir_id(juristic_person_json)
+            juristic_person_name = get_name(juristic_person_json)
+            if trusted:
+                instance = create_unchecked(cls, _identifier=identifier, _name=name, _alias=alias, _country=country,
+                                            _contact_name=contact["name"], _contact_surname=contact["surname"],
+                                            _contact_email=contact["email"],
+                                            juristic_person=create_unchecked(_JuristicPerson,
+                                                                             _name=juristic_person_name),
+                                            _quality__management_standards=quality_standards,
+                                            _infrastructural_capabilities=infrastructural_capabilities,
+                                            _organisational_capabilities=organisational_capabilities,
+                                            _description=description, _url=None,
+                                            _bioprocessing_and_analysis_capabilities=bioprocessing)
+            else:
+                instance = cls(identifier, name, country, contact["name"], contact["surname"], contact["email"],
+                               juristic_person_name, description, alias,
+                               infrastructural_capabilities=infrastructural_capabilities,
+                               organisational_capabilities=organisational_capabilities,
+                               bioprocessing_and_analysis_capabilities=bioprocessing,
+                               quality__management_standards=quality_standards)
             instance._biobank_fhir_id = biobank_fhir_id
+            instance._version_id = get_version_id(biobank_json)
             instance.juristic_person._fhir_id = juristic_person_fhir_id
             return instance
         except KeyError:
@@ -243,36 +281,7 @@ class Biobank:
         parsed_extension = {"infrastructural_capabilities": [], "organisational_capabilities": [],
                             "bioprocessing_and_analysis_capabilities": [], "quality_management_standards": [],
                             "juristic_person": None, "description": None}
-        infrastruct_url = FHIRConfig.get_extension_url("biobank", "infrastructural_capabilities")
-        org_capability_url = FHIRConfig.get_extension_url("biobank", "organisational_capabilities")
-        bioprocess__url = FHIRConfig.get_extension_url("biobank", "bioprocessing_and_analysis_capabilities")
-        quality_url = FHIRConfig.get_extension_url("biobank", "quality_management_standard")
-        description_url = FHIRConfig.get_extension_url("biobank", "description")
-        for extension in extensions:
-            ext_type = extension["url"].replace(f"{DEFINITION_BASE_URL}/", "", 1)
-            extension_url = extension["url"]
-            if extension_url == infrastruct_url:
-                value = get_nested_value(extension, ["valueCodeableConcept", "coding", 0, "code"])
-                if value is not None:
-                    parsed_extension["infrastructural_capabilities"].append(value)
-            elif extension_url == org_capability_url:
-                value = get_nested_value(extension, ["valueCodeableConcept", "coding", 0, "code"])
-                if value is not None:
-                    parsed_extension["organisational_capabilities"].append(value)
-            elif extension_url == bioprocess__url:
-                value = get_nested_value(extension, ["valueCodeableConcept", "coding", 0, "code"])
-                if value is not None:
-                    parsed_extension["bioprocessing_and_analysis_capabilities"].append(value)
-            elif extension_url == quality_url:
-                value = get_nested_value(extension, ["valueString"])
-                if value is not None:
-                    parsed_extension["quality_management_standards"].append(value)
-            elif extension_url == description_url:
-                value = get_nested_value(extension, ["valueString"])
-                if value is not None:
-                    parsed_extension["description"] = value
-            else:
-                continue
+        _EXTENSION_PARSER.parse(extensions, parsed_extension)
         for key, value in parsed_extension.items():
             if isinstance(value, list) and value == []:
                 parsed_extension[key] = None
@@ -332,6 +341,48 @@ class Biobank:
             fhir_organization.extension = extensions
         return fhir_organization
 
+    def to_fhir_dict(self, juristic_person_fhir_id: str = None) -> dict:
+        """Return json representation of the biobank in FHIR, equal to to_fhir().as_json(),
+        but built directly, without the fhirclient objects."""
+        juristic_person_fhir_id = juristic_person_fhir_id or self.juristic_person.fhir_id
+        if juristic_person_fhir_id is None:
+            raise ValueError("Managing biobank FHIR id must be provided either as an argument or as a property.")
+
+        organization = create_resource_dict("Organization", FHIRConfig.get_meta_profile_url("biobank"))
+        organization["identifier"] = [create_fhir_identifier_dict(self.identifier)]
+        organization["identifier"][0]["system"] = "http://www.bbmri-eric.eu/"
+        organization["name"] = self.name
+        organization["partOf"] = create_reference_dict(f"Organization/{juristic_person_fhir_id}")
+        if self.alias is not None:
+            organization["alias"] = [self.alias]
+        organization["contact"] = [create_contact_dict(self.contact_name, self.contact_surname, self.contact_email)]
+        organization["address"] = [create_country_of_residence_dict(self.country)]
+        extensions = []
+        for capability in self.infrastructural_capabilities or []:
+            extensions.append(create_codeable_concept_extension_dict(
+                FHIRConfig.get_extension_url("biobank", "infrastructural_capabilities"),
+                FHIRConfig.get_code_system_url("biobank", "infrastructural_capabilities"),
+                capability))
+        for capability in self.organisational_capabilities or []:
+            extensions.append(create_codeable_concept_extension_dict(
+                FHIRConfig.get_extension_url("biobank", "organisational_capabilities"),
+                FHIRConfig.get_code_system_url("biobank", "ogranisational_capabilities"),
+                capability))
+        for capability in self.bioprocessing_and_analysis_capabilities or []:
+            extensions.append(create_codeable_concept_extension_dict(
+                FHIRConfig.get_extension_url("biobank", "bioprocessing_and_analysis_capabilities"),
+                FHIRConfig.get_code_system_url("biobank", "bioprocessing_and_analysis_capabilities"),
+                capability))
+        for standard in self.quality__management_standards or []:
+            extensions.append(create_string_extension_dict(
+                FHIRConfig.get_extension_url("biobank", "quality_management_standard"), standard))
+        if self.description is not None:
+            extensions.append(create_string_extension_dict(
+                FHIRConfig.get_extension_url("biobank", "description"), self.description))
+        if extensions:
+            organization["extension"] = extensions
+        return organization
+
     def build_bundle_for_upload(self) -> Bundle:
 
         juristic_person_temporary_id = str(uuid.uuid4())
@@ -345,6 +396,16 @@ class Biobank:
         bundle = create_bundle([biobank_entry, juristic_person_entry])
         return bundle
 
+    def build_bundle_dict_for_upload(self) -> dict:
+        """Json counterpart of build_bundle_for_upload, built by to_fhir_dict."""
+        juristic_person_temporary_id = str(uuid.uuid4())
+        biobank_fhir = self.to_fhir_dict(juristic_person_temporary_id)
+        biobank_fhir["partOf"]["reference"] = juristic_person_temporary_id
+        return create_bundle_dict([
+            create_post_bundle_entry_dict("Organization", biobank_fhir, str(uuid.uuid4())),
+            create_post_bundle_entry_dict("Organization", self.juristic_person.to_fhir_dict(),
+                                          juristic_person_temporary_id)])
+
     def add_fhir_id_to_biobank(self, biobank: Organization) -> Organization:
         """Add FHIR id to the FHIR representation of the Biobank. FHIR ID is necessary for updating the
                 resource on the server.This method should only be called if the Biobank object was created by the
@@ -2,7 +2,6 @@
 import uuid
 from typing import Self
 
-import simple_icd_10 as icd10
 from fhirclient.models.bundle import Bundle
 from fhirclient.models.extension import Extension
 from fhirclient.models.fhirreference import FHIRReference
@@ -13,14 +12,52 @@ from fhirclient.models.range import Range
 
 from miabis_model.collection_organization import _CollectionOrganization
 from miabis_model.gender import Gender
+from miabis_model.icd10_service import icd10_service
 from miabis_model.incorrect_json_format import IncorrectJsonFormatException
 from miabis_model.storage_temperature import StorageTemperature
 from miabis_model.util.config import FHIRConfig
 from miabis_model.util.constants import COLLECTION_INCLUSION_CRITERIA, COLLECTION_MATERIAL_TYPE_CODES
-from miabis_model.util.parsing_util import get_nested_value, parse_reference_id
+from miabis_model.util.parsing_util import parse_reference_id, compile_path, get_fhir_id, get_identifier_value, \
+    get_version_id, get_name, get_managing_entity_reference, get_value_reference, get_codeable_concept_code, \
+    ExtensionParser, append_value, create_unchecked
 from miabis_model.util.util import create_fhir_identifier, create_integer_extension, \
     create_codeable_concept_extension, \
-    create_codeable_concept, create_post_bundle_entry, create_bundle
+    create_codeable_concept, create_post_bundle_entry, create_bundle, create_resource_dict, \
+    create_fhir_identifier_dict, create_reference_dict, create_codeable_concept_dict, \
+    create_codeable_concept_extension_dict, create_integer_extension_dict, create_post_bundle_entry_dict, \
+    create_bundle_dict
+
+_get_age_range_low = compile_path(["valueRange", "low", "value"])
+_get_age_range_high = compile_path(["valueRange", "high", "value"])
+
+
+def _parse_age_range(parsed_characteristics: dict, characteristic: dict):
+    age_range_low = _get_age_range_low(characteristic)
+    age_range_high = _get_age_range_high(characteristic)
+    if age_range_high is not None and age_range_low is not None:
+        parsed_characteristics["age_range_low"] = age_range_low
+        parsed_characteristics["age_range_high"] = age_range_high
+
+
+def _parse_number_of_subjects(parsed_extensions: dict, extension: dict):
+    parsed_extensions["number_of_subjects"] = extension["valueInteger"]
+
+
+_CHARACTERISTIC_HANDLERS = {
+    "Age": _parse_age_range,
+    "Sex": append_value("sex", get_codeable_concept_code, convert=Gender.from_string),
+    "StorageTemperature": append_value("storage_temperature", get_codeable_concept_code, convert=StorageTemperature),
+    "MaterialType": append_value("material_type", get_codeable_concept_code),
+    "Diagnosis": append_value("diagnosis", get_codeable_concept_code),
+}
+
+_EXTENSION_PARSER = ExtensionParser({
+    FHIRConfig.get_extension_url("collection", "number_of_subjects"): _parse_number_of_subjects,
+    FHIRConfig.get_extension_url("collection", "inclusion_criteria"):
+        append_value("inclusion_criteria", get_codeable_concept_code, skip_none=False),
+    FHIRConfig.MEMBER_V5_EXTENSION:
+        append_value("sample_fhir_ids", get_value_reference, skip_none=False, convert=parse_reference_id),
+})
 
 
 class Collection:
@@ -102,6 +139,7 @@ class Collection:
                                                        publications=publications)
 
         self._collection_fhir_id = None
+        self._version_id = None
         self._managing_collection_org_fhir_id = None
         self._sample_fhir_ids = None
 
@@ -254,9 +292,8 @@ class Collection:
         if diagnoses is not None:
             if not isinstance(diagnoses, list):
                 raise TypeError("Diagnoses must be a list.")
-            for diagnosis in diagnoses:
-                if not icd10.is_valid_item(diagnosis):
-                    raise ValueError("The provided string is not a valid ICD-10 code.")
+            if not all(icd10_service.validate_many(diagnoses)):
+                raise ValueError("The provided string is not a valid ICD-10 code.")
         self._diagnoses = diagnoses
 
     @property
@@ -301,6 +338,12 @@ class Collection:
     def collection_fhir_id(self) -> str:
         return self._collection_fhir_id
 
+    @property
+    def version_id(self) -> str:
+        """Version (meta.versionId) of the collection resource this object was built from,
+        used for conditional updates (If-Match)."""
+        return self._version_id
+
     @property
     def managing_collection_org_fhir_id(self) -> str:
         return self._managing_collection_org_fhir_id
@@ -315,42 +358,57 @@ class Collection:
 
     @classmethod
     def from_json(cls, collection_json: dict, collection_org_json: dict, managing_biobank_id: str,
-                  sample_ids: list[str]) -> Self:
+                  sample_ids: list[str], trusted: bool = False) -> Self:
         """
         Parse a JSON object into a MoFCollection object.
         :param collection_json: json object representing the collection.
         :param managing_biobank_id: id of biobank usually given by the institution (not a FHIR id!)
         :param sample_ids: list of sample ids belonging to the collection, given by the institution (not FHIR ids!)
+        :param trusted: if True, the values are not validated, for json which was validated when it was written
         :return: MoFCollection object
         """
         try:
-            collection_fhir_id = get_nested_value(collection_json, ["id"])
-            identifier = get_nested_value(collection_json, ["identifier", 0, "value"])
-            name = get_nested_value(collection_json, ["name"])
-            characteristics = cls._get_characteristics(collection_json["characteristic"])
+            collection_fhir_id = get_fhir_id(collection_json)
+            identifier = get_identifier_value(collection_json)
+            name = get_name(collection_json)
+            characteristics = cls._get_characteristics(collection_json.get("characteristic", []))
             managing_collection_fhir_id = parse_reference_id(
-                get_nested_value(collection_json, ["managingEntity", "reference"]))
+                get_managing_entity_reference(collection_json))
             extensions = cls._get_extensions(collection_json.get("extension", []))
-            coll_org_instance = _CollectionOrganization.from_json(collection_org_json, managing_biobank_id)
-            instance = cls(identifier=identifier, name=name, managing_biobank_id=managing_biobank_id,
-                           contact_name=coll_org_instance.contact_name,
-                           contact_surname=coll_org_instance.contact_surname,
-                           contact_email=coll_org_instance.contact_email, country=coll_org_instance.country,
-                           genders=characteristics["sex"], material_types=characteristics["material_type"],
-                           age_range_low=characteristics["age_range_low"],
-                           age_range_high=characteristics["age_range_high"],
-                           storage_temperatures=characteristics["storage_temperature"],
-                           diagnoses=characteristics["diagnosis"],
-                           number_of_subjects=extensions["number_of_subjects"],
-                           inclusion_criteria=extensions["inclusion_criteria"], sample_ids=sample_ids,
-                           alias=coll_org_instance.alias, url=coll_org_instance.url,
-                           description=coll_org_instance.description, dataset_type=coll_org_instance.dataset_type,
-                           sample_source=coll_org_instance.sample_source,
-                           sample_collection_setting=coll_org_instance.sample_collection_setting,
-                           collection_design=coll_org_instance.collection_design,
-                           use_and_access_conditions=coll_org_instance.use_and_access_conditions,
-                           publications=coll_org_instance.publications)
+            coll_org_instance = _CollectionOrganization.from_json(collection_org_json, managing_biobank_id, trusted)
+            if trusted:
+                instance = create_unchecked(cls, _identifier=identifier, _name=name,
+                                            _managing_collection_org_id=identifier,
+                                            _age_range_low=characteristics["age_range_low"],
+                                            _age_range_high=characteristics["age_range_high"],
+                                            _genders=characteristics["sex"],
+                                            _storage_temperatures=characteristics["storage_temperature"],
+                                            _diagnoses=characteristics["diagnosis"] or [],
+                                            _material_types=characteristics["material_type"],
+                                            _number_of_subjects=extensions["number_of_subjects"],
+                                            _sample_ids=sample_ids,
+                                            _inclusion_criteria=extensions["inclusion_criteria"])
+            else:
+                instance = cls(identifier=identifier, name=name, managing_biobank_id=managing_biobank_id,
+                               contact_name=coll_org_instance.contact_name,
+                               contact_surname=coll_org_instance.contact_surname,
+                               contact_email=coll_org_instance.contact_email, country=coll_org_instance.country,
+                               genders=characteristics["sex"], material_types=characteristics["material_type"],
+                               age_range_low=characteristics["age_range_low"],
+                               age_range_high=characteristics["age_range_high"],
+                               storage_temperatures=characteristics["storage_temperature"],
+                               diagnoses=characteristics["diagnosis"],
+                               number_of_subjects=extensions["number_of_subjects"],
+                               inclusion_criteria=extensions["inclusion_criteria"], sample_ids=sample_ids,
+                               alias=coll_org_instance.alias, url=coll_org_instance.url,
+                               description=coll_org_instance.description, dataset_type=coll_org_instance.dataset_type,
+                               sample_source=coll_org_instance.sample_source,
+                               sample_collection_setting=coll_org_instance.sample_collection_setting,
+                               collection_design=coll_org_instance.collection_design,
+                               use_and_access_conditions=coll_org_instance.use_and_access_conditions,
+                               publications=coll_org_instance.publications)
             instance._collection_fhir_id = collection_fhir_id
+            instance._version_id = get_version_id(collection_json)
             instance._managing_collection_org_fhir_id = managing_collection_fhir_id
             instance._sample_fhir_ids = extensions["sample_fhir_ids"]
             instance._collection_org = coll_org_instance
@@ -368,7 +426,7 @@ class Collection:
         sample_fhir_ids = []
         for extension in extensions:
             if extension["url"] == "http://hl7.org/fhir/5.0/StructureDefinition/extension-Group.member.entity":
-                reference = get_nested_value(extension, ["valueReference", "reference"])
+                reference = get_value_reference(extension)
                 sample_fhir_ids.append(parse_reference_id(reference))
         return sample_fhir_ids
 
@@ -381,31 +439,9 @@ class Collection:
         parsed_characteristics = {"age_range_low": None, "age_range_high": None, "sex": [], "storage_temperature": [],
                                   "material_type": [], "diagnosis": []}
         for characteristic in characteristics:
-            match characteristic["code"]["coding"][0]["code"]:
-                case "Age":
-                    age_range_low = get_nested_value(characteristic, ["valueRange", "low", "value"])
-                    age_range_high = get_nested_value(characteristic, ["valueRange", "high", "value"])
-                    if age_range_high is not None and age_range_low is not None:
-                        parsed_characteristics["age_range_low"] = age_range_low
-                        parsed_characteristics["age_range_high"] = age_range_high
-                case "Sex":
-                    value = get_nested_value(characteristic, ["valueCodeableConcept", "coding", 0, "code"])
-                    if value is not None:
-                        parsed_characteristics["sex"].append(Gender.from_string(value))
-                case "StorageTemperature":
-                    value = get_nested_value(characteristic, ["valueCodeableConcept", "coding", 0, "code"])
-                    if value is not None:
-                        parsed_characteristics["storage_temperature"].append(StorageTemperature(value))
-                case "MaterialType":
-                    value = get_nested_value(characteristic, ["valueCodeableConcept", "coding", 0, "code"])
-                    if value is not None:
-                        parsed_characteristics["material_type"].append(value)
-                case "Diagnosis":
-                    value = get_nested_value(characteristic, ["valueCodeableConcept", "coding", 0, "code"])
-                    if value is not None:
-                        parsed_characteristics["diagnosis"].append(value)
-                case _:
-                    pass
+            handler = _CHARACTERISTIC_HANDLERS.get(characteristic["code"]["coding"][0]["code"])
+            if handler is not None:
+                handler(parsed_characteristics, characteristic)
 
         parsed_characteristics["diagnosis"] = None if not parsed_characteristics["diagnosis"] else \
             parsed_characteristics["diagnosis"]
@@ -417,23 +453,10 @@ class Collection:
         :param extension: json object containing the extensions.
         :return: dictionary with the extensions.
         """
-        parsed_extensions = {"number_of_subjects": None, "inclusion_criteria": None, "sample_fhir_ids": []}
-        number_of_subjects_url = FHIRConfig.get_extension_url("collection", "number_of_subjects")
-        inclusion_criteria_url = FHIRConfig.get_extension_url("collection", "inclusion_criteria")
-        for ext in extension:
-            extension_url = ext["url"]
-            if extension_url == number_of_subjects_url:
-                parsed_extensions["number_of_subjects"] = ext["valueInteger"]
-            elif extension_url == inclusion_criteria_url:
-                if parsed_extensions["inclusion_criteria"] is None:
-                    parsed_extensions["inclusion_criteria"] = []
-                parsed_extensions["inclusion_criteria"].append(
-                    get_nested_value(ext, ["valueCodeableConcept", "coding", 0, "code"]))
-            elif extension_url == FHIRConfig.MEMBER_V5_EXTENSION:
-                reference_id = parse_reference_id(get_nested_value(ext, ["valueReference", "reference"]))
-                parsed_extensions["sample_fhir_ids"].append(reference_id)
-            else:
-                continue
+        parsed_extensions = {"number_of_subjects": None, "inclusion_criteria": [], "sample_fhir_ids": []}
+        _EXTENSION_PARSER.parse(extension, parsed_extensions)
+        if not parsed_extensions["inclusion_criteria"]:
+            parsed_extensions["inclusion_criteria"] = None
         return parsed_extensions
 
     def to_fhir(self, managing_collection_org_fhir_id: str = None, sample_fhir_ids: list[str] = None) -> Group:
@@ -498,6 +521,61 @@ class Collection:
             fhir_group.extension = extensions
         return fhir_group
 
+    def to_fhir_dict(self, managing_collection_org_fhir_id: str = None, sample_fhir_ids: list[str] = None) -> dict:
+        """Return json representation of the collection in FHIR, equal to to_fhir().as_json(),
+        but built directly, without the fhirclient objects.
+        :param managing_collection_org_fhir_id: FHIR Identifier of the managing organization
+        :param sample_fhir_ids: List of FHIR identifiers of the samples in the collection"""
+        managing_collection_org_fhir_id = managing_collection_org_fhir_id or self.managing_collection_org_fhir_id
+        if managing_collection_org_fhir_id is None:
+            raise ValueError(
+                "Managing collection organization FHIR id must be provided either as an argument or as a property.")
+        sample_fhir_ids = sample_fhir_ids or self.sample_fhir_ids or []
+        group = create_resource_dict("Group", FHIRConfig.get_meta_profile_url("collection"))
+        group["identifier"] = [create_fhir_identifier_dict(self.identifier)]
+        group["active"] = True
+        group["actual"] = True
+        group["type"] = "person"
+        group["name"] = self.name
+        group["managingEntity"] = create_reference_dict(f"Organization/{managing_collection_org_fhir_id}")
+        characteristic_system = FHIRConfig.get_code_system_url("collection", "characteristic")
+        characteristics = []
+        if self.age_range_low is not None and self.age_range_high is not None:
+            characteristics.append({"code": create_codeable_concept_dict(characteristic_system, "Age"),
+                                    "exclude": False,
+                                    "valueRange": {"low": {"value": self.age_range_low},
+                                                   "high": {"value": self.age_range_high}}})
+        characteristic_values = [("Sex", FHIRConfig.get_code_system_url("collection", "gender"),
+                                  [gender.name.lower() for gender in self.genders]),
+                                 ("StorageTemperature",
+                                  FHIRConfig.get_code_system_url("collection", "storage_temperature"),
+                                  [storage_temperature.value for storage_temperature in self.storage_temperatures]),
+                                 ("MaterialType", FHIRConfig.get_code_system_url("collection", "material_type"),
+                                  self.material_types),
+                                 ("Diagnosis", FHIRConfig.DIAGNOSIS_CODE_SYSTEM, self.diagnoses or [])]
+        for characteristic_code, codeable_concept_url, values in characteristic_values:
+            for value in values:
+                characteristics.append(
+                    {"code": create_codeable_concept_dict(characteristic_system, characteristic_code),
+                     "exclude": False,
+                     "valueCodeableConcept": create_codeable_concept_dict(codeable_concept_url, value)})
+        if characteristics:
+            group["characteristic"] = characteristics
+        extensions = []
+        if self.number_of_subjects is not None:
+            extensions.append(create_integer_extension_dict(
+                FHIRConfig.get_extension_url("collection", "number_of_subjects"), self.number_of_subjects))
+        for criteria in self.inclusion_criteria or []:
+            extensions.append(create_codeable_concept_extension_dict(
+                FHIRConfig.get_extension_url("collection", "inclusion_criteria"),
+                FHIRConfig.get_code_system_url("collection", "inclusion_criteria"), criteria))
+        for sample_fhir_id in sample_fhir_ids:
+            extensions.append({"url": FHIRConfig.MEMBER_V5_EXTENSION,
+                               "valueReference": create_reference_dict(f"Specimen/{sample_fhir_id}")})
+        if extensions:
+            group["extension"] = extensions
+        return group
+
     def add_fhir_id_to_collection(self, collection: Group) -> Group:
         """Add FHIR id to the FHIR representation of the Collection. FHIR ID is necessary for updating the
                 resource on the server.This method should only be called if the Collection object was created by the
@@ -518,6 +596,16 @@ class Collection:
         bundle = create_bundle([collection_entry, collection_org_entry])
         return bundle
 
+    def build_bundle_dict_for_upload(self, biobank_fhir_id: str, sample_fhir_ids: list[str] = None) -> dict:
+        """Json counterpart of build_bundle_for_upload, built by to_fhir_dict."""
+        temporary_collection_org_id = str(uuid.uuid4())
+        collection_fhir = self.to_fhir_dict(temporary_collection_org_id, sample_fhir_ids)
+        collection_fhir["managingEntity"]["reference"] = temporary_collection_org_id
+        return create_bundle_dict([
+            create_post_bundle_entry_dict("Group", collection_fhir, str(uuid.uuid4())),
+            create_post_bundle_entry_dict("Organization", self._collection_org.to_fhir_dict(biobank_fhir_id),
+                                          temporary_collection_org_id)])
+
     @staticmethod
     def __create_member_extension(sample_fhir_id: str):
         extension = Extension()
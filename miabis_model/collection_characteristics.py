@@ -0,0 +1,158 @@
+from collections import Counter
+
+from miabis_model.collection import Collection
+from miabis_model.gender import Gender
+from miabis_model.sample import Sample
+from miabis_model.sample_donor import SampleDonor
+from miabis_model.storage_temperature import StorageTemperature
+from miabis_model.util.parsing_util import get_material_type_from_detailed_material_type
+
+
+class CollectionCharacteristics:
+    """Incrementally maintained characteristics of a collection (genders, storage temperatures, material types,
+    diagnoses, age range and number of distinct donors). Every value is reference counted by the number of samples
+    contributing to it, so that samples can be added and removed in time proportional to the number of changed
+    samples, regardless of the size of the collection. The contribution of every sample is kept under its FHIR ID,
+    so removing a sample subtracts exactly the values it added, even if the sample or its donor was modified since.
+    The state can be persisted with to_json and restored with from_json."""
+
+    def __init__(self):
+        self._genders: Counter[Gender] = Counter()
+        self._storage_temperatures: Counter[StorageTemperature] = Counter()
+        self._material_types: Counter[str] = Counter()
+        self._diagnoses: Counter[str] = Counter()
+        self._donor_fhir_ids: Counter[str] = Counter()
+        self._ages: Counter[int] = Counter()
+        # FHIR ID of the sample -> json representation of the values the sample contributed
+        self._contributions: dict[str, dict] = {}
+
+    @property
+    def genders(self) -> list[Gender]:
+        return list(self._genders)
+
+    @property
+    def storage_temperatures(self) -> list[StorageTemperature]:
+        return list(self._storage_temperatures)
+
+    @property
+    def material_types(self) -> list[str]:
+        return list(self._material_types)
+
+    @property
+    def diagnoses(self) -> list[str]:
+        return list(self._diagnoses)
+
+    @property
+    def number_of_subjects(self) -> int:
+        return len(self._donor_fhir_ids)
+
+    @property
+    def number_of_samples(self) -> int:
+        """Number of samples the characteristics were computed from"""
+        return len(self._contributions)
+
+    @property
+    def sample_fhir_ids(self) -> set[str]:
+        """FHIR IDs of the samples the characteristics were computed from"""
+        return set(self._contributions)
+
+    @property
+    def age_range_low(self) -> int | None:
+        return min(self._ages) if self._ages else None
+
+    @property
+    def age_range_high(self) -> int | None:
+        return max(self._ages) if self._ages else None
+
+    def add_sample(self, sample: Sample, donor: SampleDonor | None):
+        """Add characteristics of a single sample. If the sample was already added, its previous contribution
+        is replaced.
+        :param sample: sample of the collection, read from blaze
+        :param donor: donor of the sample, None if the donor is not known
+        :raises ValueError: if the sample has no FHIR ID"""
+        if sample.sample_fhir_id is None:
+            raise ValueError("Only samples with FHIR ID can be added to the collection characteristics.")
+        self.remove_sample(sample.sample_fhir_id)
+        contribution = self.__create_contribution(sample, donor)
+        self._contributions[sample.sample_fhir_id] = contribution
+        self.__update(contribution, 1)
+
+    def remove_sample(self, sample_fhir_id: str):
+        """Remove characteristics of a single sample, previously added by add_sample. Samples which were not added
+        are ignored.
+        :param sample_fhir_id: FHIR ID of the sample removed from the collection"""
+        contribution = self._contributions.pop(sample_fhir_id, None)
+        if contribution is not None:
+            self.__update(contribution, -1)
+
+    @staticmethod
+    def __create_contribution(sample: Sample, donor: SampleDonor | None) -> dict:
+        """Values of the characteristics the sample contributes, in the json representation."""
+        birth_date = donor.date_of_birth if donor is not None else None
+        diagnoses = []
+        ages = []
+        for diagnosis, observed_datetime in sample.diagnoses_icd10_code_with_observed_datetime:
+            diagnoses.append(diagnosis)
+            if birth_date is not None and observed_datetime is not None:
+                ages.append(observed_datetime.year - birth_date.year)
+        return {
+            "donor": sample.subject_fhir_id,
+            "gender": donor.gender.name if donor is not None and donor.gender is not None else None,
+            "storageTemperature": sample.storage_temperature.name if sample.storage_temperature is not None
+            else None,
+            "materialType": get_material_type_from_detailed_material_type(sample.material_type),
+            "diagnoses": diagnoses,
+            "ages": ages
+        }
+
+    def __update(self, contribution: dict, count: int):
+        self.__count(self._donor_fhir_ids, contribution["donor"], count)
+        if contribution["gender"] is not None:
+            self.__count(self._genders, Gender[contribution["gender"]], count)
+        if contribution["storageTemperature"] is not None:
+            self.__count(self._storage_temperatures, StorageTemperature[contribution["storageTemperature"]], count)
+        self.__count(self._material_types, contribution["materialType"], count)
+        for diagnosis in contribution["diagnoses"]:
+            self.__count(self._diagnoses, diagnosis, count)
+        for age in contribution["ages"]:
+            self.__count(self._ages, age, count)
+
+    @staticmethod
+    def __count(counter: Counter, value, count: int):
+        """Change reference count of the value, values which are no longer referenced are dropped."""
+        if value is None:
+            return
+        counter[value] += count
+        if counter[value] <= 0:
+            del counter[value]
+
+    def apply_to(self, collection: Collection) -> Collection:
+        """Set the accumulated characteristics to the collection.
+        :param collection: collection to update
+        :return: updated collection"""
+        collection.genders = self.genders
+        collection.storage_temperatures = self.storage_temperatures
+        collection.material_types = self.material_types
+        collection.diagnoses = self.diagnoses
+        collection.number_of_subjects = self.number_of_subjects
+        collection.age_range_low = self.age_range_low
+        collection.age_range_high = self.age_range_high
+        return collection
+
+    def to_json(self) -> dict:
+        """Serialize the state of the characteristics, i.e. the contributions of the samples.
+        :return: json representation of the characteristics"""
+        return {"samples": {sample_fhir_id: dict(contribution)
+                            for sample_fhir_id, contribution in self._contributions.items()}}
+
+    @classmethod
+    def from_json(cls, characteristics_json: dict):
+        """Restore characteristics serialized by to_json. Characteristics serialized without the contributions
+        of the samples (by older versions) are restored empty, so that they are computed again.
+        :param characteristics_json: json representation of the characteristics
+        :return: CollectionCharacteristics"""
+        instance = cls()
+        for sample_fhir_id, contribution in characteristics_json.get("samples", {}).items():
+            instance._contributions[sample_fhir_id] = contribution
+            instance.__update(contribution, 1)
+        return instance
@@ -10,9 +10,29 @@ from miabis_model.incorrect_json_format import IncorrectJsonFormatException
 from miabis_model.util.config import FHIRConfig
 from miabis_model.util.constants import COLLECTION_DESIGN, COLLECTION_SAMPLE_COLLECTION_SETTING, \
     COLLECTION_SAMPLE_SOURCE, COLLECTION_DATASET_TYPE, COLLECTION_USE_AND_ACCESS_CONDITIONS
-from miabis_model.util.parsing_util import get_nested_value, parse_contact, parse_reference_id
+from miabis_model.util.parsing_util import parse_contact, parse_reference_id, get_fhir_id, get_identifier_value, \
+    get_version_id, get_name, get_alias, get_country, get_url, get_part_of_reference, get_codeable_concept_code, \
+    get_string_value, ExtensionParser, set_value, append_value, create_unchecked
 from miabis_model.util.util import create_country_of_residence, create_contact, create_codeable_concept_extension, \
-    create_string_extension, create_fhir_identifier
+    create_string_extension, create_fhir_identifier, create_resource_dict, create_fhir_identifier_dict, \
+    create_url_contact_point_dict, create_contact_dict, create_country_of_residence_dict, create_reference_dict, \
+    create_codeable_concept_extension_dict, create_string_extension_dict
+
+_EXTENSION_PARSER = ExtensionParser({
+    FHIRConfig.get_extension_url("collection_organization", "dataset_type"):
+        set_value("dataset_type", get_codeable_concept_code),
+    FHIRConfig.get_extension_url("collection_organization", "sample_source"):
+        set_value("sample_source", get_codeable_concept_code),
+    FHIRConfig.get_extension_url("collection_organization", "sample_collection_setting"):
+        set_value("sample_collection_setting", get_codeable_concept_code),
+    FHIRConfig.get_extension_url("collection_organization", "collection_design"):
+        append_value("collection_design", get_codeable_concept_code),
+    FHIRConfig.get_extension_url("collection_organization", "use_and_access"):
+        append_value("use_and_access_conditions", get_codeable_concept_code),
+    FHIRConfig.get_extension_url("collection_organization", "publications"):
+        append_value("publications", get_string_value),
+    FHIRConfig.get_extension_url("collection_organization", "description"): set_value("description", get_string_value),
+})
 
 
 class _CollectionOrganization:
@@ -66,6 +86,7 @@ class _CollectionOrganization:
         self.use_and_access_conditions = use_and_access_conditions
         self.publications = publications
         self._collection_org_fhir_id = None
+        self._version_id = None
         self._managing_biobank_fhir_id = None
 
     @property
@@ -245,34 +266,55 @@ class _CollectionOrganization:
     def collection_org_fhir_id(self) -> str:
         return self._collection_org_fhir_id
 
+    @property
+    def version_id(self) -> str:
+        """Version (meta.versionId) of the collection organization resource this object was built from,
+        used for conditional updates (If-Match)."""
+        return self._version_id
+
     @property
     def managing_biobank_fhir_id(self) -> str:
         return self._managing_biobank_fhir_id
 
     @classmethod
-    def from_json(cls, collection_json: dict, managing_biobank_id) -> Self:
+    def from_json(cls, collection_json: dict, managing_biobank_id, trusted: bool = False) -> Self:
         """
         Parse a JSON object into a MoFCollection object.
         :param collection_json: json object representing the collection.
         :param managing_biobank_id: id of managing biobank usually given by the institution (not a FHIR id!)
+        :param trusted: if True, the values are not validated, for json which was validated when it was written
         :return: MoFCollection object
         """
         try:
-            collection_org_fhir_id = get_nested_value(collection_json, ["id"])
-            identifier = get_nested_value(collection_json, ["identifier", 0, "value"])
-            name = get_nested_value(collection_json, ["name"])
-            alias = get_nested_value(collection_json, ["alias", 0])
-            managing_biobank_fhir_id = parse_reference_id(get_nested_value(collection_json, ["partOf", "reference"]))
-            url = get_nested_value(collection_json, ["telecom", 0, "value"])
+            collection_org_fhir_id = get_fhir_id(collection_json)
+            identifier = get_identifier_value(collection_json)
+            name = get_name(collection_json)
+            alias = get_alias(collection_json)
+            managing_biobank_fhir_id = parse_reference_id(get_part_of_reference(collection_json))
+            url = get_url(collection_json)
             contact = parse_contact(collection_json.get("contact", [{}])[0])
-            country = get_nested_value(collection_json, ["address", 0, "country"])
+            country = get_country(collection_json)
             parsed_extensions = cls._parse_extensions(collection_json.get("extension", []))
-            instance = cls(identifier, name, managing_biobank_id, contact["name"], contact["surname"], contact["email"],
-                           country, alias, url, parsed_extensions["description"], parsed_extensions["dataset_type"],
-                           parsed_extensions["sample_source"], parsed_extensions["sample_collection_setting"],
-                           parsed_extensions["collection_design"], parsed_extensions["use_and_access_conditions"],
-                           parsed_extensions["publications"])
+            if trusted:
+                instance = create_unchecked(cls, _identifier=identifier, _name=name,
+                                            _description=parsed_extensions["description"],
+                                            _managing_biobank_id=managing_biobank_id,
+                                            _contact_name=contact["name"], _contact_surname=contact["surname"],
+                                            _contact_email=contact["email"], _country=country, _alias=alias, _url=url,
+                                            _dataset_type=parsed_extensions["dataset_type"],
+                                            _sample_source=parsed_extensions["sample_source"],
+                                            _sample_collection_setting=parsed_extensions["sample_collection_setting"],
+                                            _collection_design=parsed_extensions["collection_design"],
+                                            _use_and_access_conditions=parsed_extensions["use_and_access_conditions"],
+                                            _publications=parsed_extensions["publications"])
+            else:
+                instance = cls(identifier, name, managing_biobank_id, contact["name"], contact["surname"],
+                               contact["email"], country, alias, url, parsed_extensions["description"],
+                               parsed_extensions["dataset_type"], parsed_extensions["sample_source"],
+                               parsed_extensions["sample_collection_setting"], parsed_extensions["collection_design"],
+                               parsed_extensions["use_and_access_conditions"], parsed_extensions["publications"])
             instance._collection_org_fhir_id = collection_org_fhir_id
+            instance._version_id = get_version_id(collection_json)
             instance._managing_biobank_fhir_id = managing_biobank_fhir_id
             return instance
         except KeyError:
@@ -283,46 +325,7 @@ class _CollectionOrganization:
         parsed_extensions = {"dataset_type": None, "sample_source": None, "sample_collection_setting": None,
                              "collection_design": [], "use_and_access_conditions": [], "publications": [],
                              "description": None}
-        dataset_url = FHIRConfig.get_extension_url("collection_organization", "dataset_type")
-        sample_source_url = FHIRConfig.get_extension_url("collection_organization", "sample_source")
-        collection_seting_url = FHIRConfig.get_extension_url("collection_organization", "sample_collection_setting")
-        collection_design_url = FHIRConfig.get_extension_url("collection_organization", "collection_design")
-        use_and_access_url = FHIRConfig.get_extension_url("collection_organization", "use_and_access")
-        publications_url = FHIRConfig.get_extension_url("collection_organization", "publications")
-        description_url = FHIRConfig.get_extension_url("collection_organization", "description")
-
-        for extension in extensions:
-            extension_url = extension["url"]
-            if extension_url == dataset_url:
-                value = get_nested_value(extension, ["valueCodeableConcept", "coding", 0, "code"])
-                if value is not None:
-                    parsed_extensions["dataset_type"] = value
-            elif extension_url == sample_source_url:
-                value = get_nested_value(extension, ["valueCodeableConcept", "coding", 0, "code"])
-                if value is not None:
-                    parsed_extensions["sample_source"] = value
-            elif extension_url == collection_seting_url:
-                value = get_nested_value(extension, ["valueCodeableConcept", "coding", 0, "code"])
-                if value is not None:
-                    parsed_extensions["sample_collection_setting"] = value
-            elif extension_url == collection_design_url:
-                value = get_nested_value(extension, ["valueCodeableConcept", "coding", 0, "code"])
-                if value is not None:
-                    parsed_extensions["collection_design"].append(value)
-            elif extension_url == use_and_access_url:
-                value = get_nested_value(extension, ["valueCodeableConcept", "coding", 0, "code"])
-                if value is not None:
-                    parsed_extensions["use_and_access_conditions"].append(value)
-            elif extension_url == publications_url:
-                value = get_nested_value(extension, ["valueString"])
-                if value is not None:
-                    parsed_extensions["publications"].append(value)
-            elif extension_url == description_url:
-                value = get_nested_value(extension, ["valueString"])
-                if value is not None:
-                    parsed_extensions["description"] = value
-            else:
-                continue
+        _EXTENSION_PARSER.parse(extensions, parsed_extensions)
         for key, value in parsed_extensions.items():
             if not value:
                 parsed_extensions[key] = None
@@ -386,6 +389,52 @@ class _CollectionOrganization:
             fhir_org.extension = extensions
         return fhir_org
 
+    def to_fhir_dict(self, managing_organization_fhir_id: str = None) -> dict:
+        """Return json representation of the collection organization in FHIR, equal to to_fhir().as_json(),
+        but built directly, without the fhirclient objects.
+        :param managing_organization_fhir_id: FHIR Identifier of the managing organization"""
+        managing_organization_fhir_id = managing_organization_fhir_id or self.managing_biobank_fhir_id
+        if managing_organization_fhir_id is None:
+            raise ValueError("Managing organization FHIR id must be provided either as an argument or as a property.")
+        organization = create_resource_dict("Organization",
+                                            FHIRConfig.get_meta_profile_url("collection_organization"))
+        organization["identifier"] = [create_fhir_identifier_dict(self.identifier)]
+        organization["active"] = True
+        organization["name"] = self.name
+        if self.alias is not None:
+            organization["alias"] = [self.alias]
+        if self.url is not None:
+            organization["telecom"] = [create_url_contact_point_dict(self.url)]
+        if self.contact_name or self.contact_surname or self.contact_email:
+            organization["contact"] = [create_contact_dict(self.contact_name, self._contact_surname,
+                                                           self._contact_email)]
+            organization["address"] = [create_country_of_residence_dict(self.country)]
+        organization["partOf"] = create_reference_dict(f"Organization/{managing_organization_fhir_id}")
+        extensions = []
+        for url_name, value in (("dataset_type", self.dataset_type), ("sample_source", self.sample_source),
+                                ("sample_collection_setting", self.sample_collection_setting)):
+            if value is not None:
+                extensions.append(create_codeable_concept_extension_dict(
+                    FHIRConfig.get_extension_url("collection_organization", url_name),
+                    FHIRConfig.get_code_system_url("collection_organization", url_name), value))
+        for design in self.collection_design or []:
+            extensions.append(create_codeable_concept_extension_dict(
+                FHIRConfig.get_extension_url("collection_organization", "collection_design"),
+                FHIRConfig.get_code_system_url("collection_organization", "collection_design"), design))
+        for condition in self.use_and_access_conditions or []:
+            extensions.append(create_codeable_concept_extension_dict(
+                FHIRConfig.get_extension_url("collection_organization", "use_and_access"),
+                FHIRConfig.get_code_system_url("collection_organization", "use_and_access"), condition))
+        for publication in self.publications or []:
+            extensions.append(create_string_extension_dict(
+                FHIRConfig.get_extension_url("collection_organization", "publications"), publication))
+        if self.description is not None:
+            extensions.append(create_string_extension_dict(
+                FHIRConfig.get_extension_url("collection_organization", "description"), self.description))
+        if extensions:
+            organization["extension"] = extensions
+        return organization
+
     def add_fhir_id_to_collection_organization(self, collection_org: Organization) -> Organization:
         """Add FHIR id to the FHIR representation of the CollectionOrganization. FHIR ID is necessary for updating the
                 resource on the server.This method should only be called if the CollectionOrganization object
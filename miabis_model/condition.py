@@ -1,16 +1,25 @@
+import uuid
 from typing import Self
 
 import fhirclient.models.condition as fhir_condition
-import simple_icd_10 as icd10
+from fhirclient.models.bundle import BundleEntry
 from fhirclient.models.codeableconcept import CodeableConcept
 from fhirclient.models.coding import Coding
 from fhirclient.models.fhirreference import FHIRReference
 from fhirclient.models.meta import Meta
 
+from miabis_model.icd10_service import icd10_service
 from miabis_model.incorrect_json_format import IncorrectJsonFormatException
 from miabis_model.util.config import FHIRConfig
-from miabis_model.util.parsing_util import get_nested_value, parse_reference_id
-from miabis_model.util.util import create_fhir_identifier
+from miabis_model.util.parsing_util import parse_reference_id, compile_path, get_fhir_id, get_identifier_value, \
+    get_subject_reference, create_unchecked
+from miabis_model.util.util import create_fhir_identifier, create_post_bundle_entry, \
+    create_identifier_search_query, create_conditional_reference, create_resource_dict, \
+    create_fhir_identifier_dict, create_reference_dict, create_codeable_concept_dict, create_post_bundle_entry_dict
+
+_get_assessments = compile_path(["stage", 0, "assessment"])
+_get_code = compile_path(["code", "coding", 0, "code"])
+_get_reference = compile_path(["reference"])
 
 
 class Condition:
@@ -35,7 +44,7 @@ class Condition:
 
     @icd_10_code.setter
     def icd_10_code(self, icd_10_code):
-        if icd_10_code is not None and not icd10.is_valid_item(icd_10_code):
+        if icd_10_code is not None and not icd10_service.is_valid(icd_10_code):
             raise ValueError(f"The provided string {icd_10_code} is not a valid ICD-10 code.")
         self._icd_10_code = icd_10_code
 
@@ -68,17 +77,21 @@ class Condition:
         return self._patient_fhir_id
 
     @classmethod
-    def from_json(cls, condition_json: dict, patient_identifier: str) -> Self:
+    def from_json(cls, condition_json: dict, patient_identifier: str, trusted: bool = False) -> Self:
         try:
-            condition_id = get_nested_value(condition_json, ["id"])
-            patient_fhir_identifier = parse_reference_id(get_nested_value(condition_json, ["subject", "reference"]))
-            diagnosis_reports = get_nested_value(condition_json, ["stage", 0, "assessment"])
+            condition_id = get_fhir_id(condition_json)
+            patient_fhir_identifier = parse_reference_id(get_subject_reference(condition_json))
+            diagnosis_reports = _get_assessments(condition_json)
             if diagnosis_reports is None:
                 diagnosis_reports = []
             diagnosis_report_fhir_ids = cls.parse_diagnosis_reports(diagnosis_reports)
-            icd_10_code = get_nested_value(condition_json, ["code", "coding", 0, "code"])
-            condition_identifier = get_nested_value(condition_json, ["identifier", 0, "value"])
-            instance = cls(patient_identifier, icd_10_code, condition_identifier)
+            icd_10_code = _get_code(condition_json)
+            condition_identifier = get_identifier_value(condition_json)
+            if trusted:
+                instance = create_unchecked(cls, _icd_10_code=icd_10_code, _patient_identifier=patient_identifier,
+                                            _condition_identifier=condition_identifier)
+            else:
+                instance = cls(patient_identifier, icd_10_code, condition_identifier)
             instance._condition_fhir_id = condition_id
             instance._patient_fhir_id = patient_fhir_identifier
             instance._diagnosis_report_fhir_ids = diagnosis_report_fhir_ids
@@ -93,30 +106,81 @@ class Condition:
         """
         diagnosis_ids = []
         for assessment in assessments:
-            diagnosis_report_fhir_id = parse_reference_id(get_nested_value(assessment, ["reference"]))
+            diagnosis_report_fhir_id = parse_reference_id(_get_reference(assessment))
             diagnosis_ids.append(diagnosis_report_fhir_id)
         return diagnosis_ids
 
-    def to_fhir(self, patient_fhir_id: str = None):
+    def to_fhir(self, patient_fhir_id: str = None, patient_reference: str = None):
         """Return condition's representation as a FHIR resource.
         @patient_id: FHIR Resource ID of the patient.
+        @patient_reference: reference to the patient (e.g. a conditional reference), used instead of patient_id.
         @diagnosis_report_id: FHIR Resource ID of the diagnosis report."""
-        patient_fhir_id = patient_fhir_id or self.patient_fhir_id
-        if patient_fhir_id is None:
-            raise ValueError("Patient FHIR ID must be provided either as an argument or as an property.")
+        patient_reference = self.__resolve_patient_reference(patient_fhir_id, patient_reference)
         condition = fhir_condition.Condition()
         condition.meta = Meta()
         condition.meta.profile = [FHIRConfig.get_meta_profile_url("condition")]
         if self.condition_identifier is not None:
-            condition.identifier = create_fhir_identifier(self.condition_identifier)
+            condition.identifier = [create_fhir_identifier(self.condition_identifier)]
         if self.icd_10_code is not None:
             condition.code = self.__create_icd_10_code()
         condition.subject = FHIRReference()
-        condition.subject.reference = f"Patient/{patient_fhir_id}"
+        condition.subject.reference = patient_reference
         condition.stage = [fhir_condition.ConditionStage()]
         condition.stage[0].assessment = []
         return condition
 
+    def to_fhir_dict(self, patient_fhir_id: str = None, patient_reference: str = None) -> dict:
+        """Return json representation of the condition in FHIR, equal to to_fhir().as_json(),
+        but built directly, without the fhirclient objects.
+        :param patient_fhir_id: FHIR Resource ID of the patient.
+        :param patient_reference: reference to the patient, used instead of patient_fhir_id."""
+        patient_reference = self.__resolve_patient_reference(patient_fhir_id, patient_reference)
+        condition = create_resource_dict("Condition", FHIRConfig.get_meta_profile_url("condition"))
+        if self.condition_identifier is not None:
+            condition["identifier"] = [create_fhir_identifier_dict(self.condition_identifier)]
+        if self.icd_10_code is not None:
+            condition["code"] = create_codeable_concept_dict(FHIRConfig.DIAGNOSIS_CODE_SYSTEM,
+                                                             self.__diagnosis_with_period())
+        condition["subject"] = create_reference_dict(patient_reference)
+        condition["stage"] = [{}]
+        return condition
+
+    def build_bundle_entry_for_upload(self, patient_fhir_id: str = None, conditional: bool = False) -> BundleEntry:
+        """Build bundle entry for uploading this condition.
+        :param patient_fhir_id: FHIR ID of the patient. Not needed if conditional is True.
+        :param conditional: if True, the patient is referenced by a conditional reference (Patient?identifier=...),
+        and if the condition has an identifier, it is created only if no condition with the same identifier exists.
+        Such entry needs to be sent in a transaction bundle.
+        :return: POST bundle entry"""
+        if not conditional:
+            return create_post_bundle_entry("Condition", self.to_fhir(patient_fhir_id), str(uuid.uuid4()))
+        condition = self.to_fhir(patient_reference=create_conditional_reference("Patient", self.patient_identifier))
+        if_none_exist = create_identifier_search_query(self.condition_identifier) \
+            if self.condition_identifier is not None else None
+        return create_post_bundle_entry("Condition", condition, str(uuid.uuid4()), if_none_exist)
+
+    def build_bundle_entry_dict_for_upload(self, patient_fhir_id: str = None, conditional: bool = False) -> dict:
+        """Json counterpart of build_bundle_entry_for_upload, built by to_fhir_dict.
+        :param patient_fhir_id: FHIR ID of the patient. Not needed if conditional is True.
+        :param conditional: if True, the patient is referenced by a conditional reference,
+        as in build_bundle_entry_for_upload
+        :return: json representation of the POST bundle entry"""
+        if not conditional:
+            return create_post_bundle_entry_dict("Condition", self.to_fhir_dict(patient_fhir_id), str(uuid.uuid4()))
+        condition = self.to_fhir_dict(
+            patient_reference=create_conditional_reference("Patient", self.patient_identifier))
+        if_none_exist = create_identifier_search_query(self.condition_identifier) \
+            if self.condition_identifier is not None else None
+        return create_post_bundle_entry_dict("Condition", condition, str(uuid.uuid4()), if_none_exist)
+
+    def __resolve_patient_reference(self, patient_fhir_id: str | None, patient_reference: str | None) -> str:
+        if patient_reference is not None:
+            return patient_reference
+        patient_fhir_id = patient_fhir_id or self.patient_fhir_id
+        if patient_fhir_id is None:
+            raise ValueError("Patient FHIR ID must be provided either as an argument or as an property.")
+        return f"Patient/{patient_fhir_id}"
+
     @staticmethod
     def __create_diagnostic_report_reference(diagnosis_report_id: str) -> FHIRReference:
         """Creates a reference to the diagnostic report.
@@ -136,10 +200,7 @@ class Condition:
 
     def __diagnosis_with_period(self, ) -> str:
         """Returns icd-10 code with a period, e.g., C188 to C18.8"""
-        code = self.icd_10_code
-        if len(code) == 4 and "." not in code:
-            return code[:3] + '.' + code[3:]
-        return code
+        return icd10_service.normalize(self.icd_10_code)
 
     def add_fhir_id_to_condition(self, condition: fhir_condition.Condition) -> fhir_condition.Condition:
         """Add FHIR id to the FHIR representation of the Condition. FHIR ID is necessary for updating the
@@ -0,0 +1,81 @@
+"""Module for validating and normalizing ICD-10 codes"""
+import threading
+from typing import Iterable
+
+
+class ICD10Service:
+    """Validation and normalization of ICD-10 codes. Codes are accepted in the same forms as by simple_icd_10,
+    i.e. chapters, blocks and categories, and subcategories both with and without the dot (C18.8 and C188).
+    All the accepted forms are indexed once, on first use, so validating or normalizing a code is a single
+    dictionary lookup. Ancestors of the codes are memoized. simple_icd_10 loads all the ICD-10 data when imported,
+    so it is only imported on first use as well."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # every accepted form of a code -> the code in the dotted form used by simple_icd_10 (C188 -> C18.8)
+        self._index: dict[str, str] | None = None
+        self._ancestors: dict[str, tuple[str, ...]] = {}
+
+    def is_valid(self, code: str) -> bool:
+        """Check whether the code is a valid ICD-10 code.
+        :param code: ICD-10 code, with or without the dot
+        :return: True if the code is valid
+        """
+        return code in (self._index or self.__build_index())
+
+    def validate_many(self, codes: Iterable[str]) -> list[bool]:
+        """Check whether the codes are valid ICD-10 codes.
+        :param codes: ICD-10 codes, with or without the dot
+        :return: list of results, in the order of the codes
+        """
+        index = self._index or self.__build_index()
+        return [code in index for code in codes]
+
+    def normalize(self, code: str) -> str:
+        """Return the code in the dotted form, e.g. C18.8 for C188.
+        :param code: ICD-10 code, with or without the dot
+        :return: the code with the dot. Codes which are not valid are returned unchanged, use is_valid
+        to validate them
+        """
+        return (self._index or self.__build_index()).get(code, code)
+
+    def normalize_many(self, codes: Iterable[str]) -> list[str]:
+        """Return the codes in the dotted form, e.g. C18.8 for C188.
+        :param codes: ICD-10 codes, with or without the dot
+        :return: list of the codes with the dot, in the order of the codes. Codes which are not valid
+        are returned unchanged
+        """
+        index = self._index or self.__build_index()
+        return [index.get(code, code) for code in codes]
+
+    def get_ancestors(self, code: str) -> list[str]:
+        """Get ancestors of the code, from its parent up to its chapter, e.g. C18, C15-C26, C00-C75, C00-C97, II
+        for C18.8.
+        :param code: ICD-10 code, with or without the dot
+        :return: list of the ancestors in the dotted form
+        :raises ValueError: if the code is not valid
+        """
+        normalized_code = (self._index or self.__build_index()).get(code)
+        if normalized_code is None:
+            raise ValueError(f"The provided string {code} is not a valid ICD-10 code.")
+        ancestors = self._ancestors.get(normalized_code)
+        if ancestors is None:
+            import simple_icd_10 as icd10
+            ancestors = tuple(icd10.get_ancestors(normalized_code))
+            self._ancestors[normalized_code] = ancestors
+        return list(ancestors)
+
+    def __build_index(self) -> dict[str, str]:
+        with self._lock:
+            if self._index is None:
+                import simple_icd_10 as icd10
+                dotted_codes = icd10.get_all_codes(with_dots=True)
+                undotted_codes = icd10.get_all_codes(with_dots=False)
+                index = dict(zip(undotted_codes, dotted_codes))
+                # a dotted code is always normalized to itself
+                index.update(zip(dotted_codes, dotted_codes))
+                self._index = index
+            return self._index
+
+
+icd10_service = ICD10Service()
@@ -2,6 +2,7 @@ from fhirclient.models.meta import Meta
 from fhirclient.models.organization import Organization
 
 from miabis_model.util.config import FHIRConfig
+from miabis_model.util.util import create_resource_dict
 
 
 class _JuristicPerson:
@@ -34,3 +35,10 @@ class _JuristicPerson:
         organization.meta.profile = [FHIRConfig.get_meta_profile_url("juristic_person")]
         organization.name = self._name
         return organization
+
+    def to_fhir_dict(self) -> dict:
+        """Return json representation of the juristic person in FHIR, equal to to_fhir().as_json(),
+        but built directly, without the fhirclient objects."""
+        organization = create_resource_dict("Organization", FHIRConfig.get_meta_profile_url("juristic_person"))
+        organization["name"] = self._name
+        return organization
@@ -11,8 +11,22 @@ from miabis_model.incorrect_json_format import IncorrectJsonFormatException
 from miabis_model.juristic_person import _JuristicPerson
 from miabis_model.network_organization import _NetworkOrganization
 from miabis_model.util.config import FHIRConfig
-from miabis_model.util.parsing_util import get_nested_value, parse_reference_id
-from miabis_model.util.util import create_fhir_identifier, create_post_bundle_entry, create_bundle
+from miabis_model.util.parsing_util import parse_reference_id, get_fhir_id, get_identifier_value, get_version_id, \
+    get_managing_entity_reference, get_value_reference, ExtensionParser, create_unchecked
+from miabis_model.util.util import create_fhir_identifier, create_post_bundle_entry, create_bundle, \
+    create_resource_dict, create_fhir_identifier_dict, create_reference_dict, create_post_bundle_entry_dict, \
+    create_bundle_dict
+
+
+def _parse_member(parsed_extensions: dict, extension: dict):
+    ref_type, reference = get_value_reference(extension).split("/")
+    if ref_type == "Group":
+        parsed_extensions["member_collection_fhir_ids"].append(reference)
+    else:
+        parsed_extensions["member_biobank_fhir_ids"].append(reference)
+
+
+_EXTENSION_PARSER = ExtensionParser({FHIRConfig.MEMBER_V5_EXTENSION: _parse_member})
 
 
 class Network:
@@ -46,6 +60,7 @@ class Network:
                                                  common_collaboration_topics=common_collaboration_topics,
                                                  juristic_person=juristic_person, description=description, url=url)
         self._network_fhir_id = None
+        self._version_id = None
         self._members_biobanks_fhir_ids = None
         self._members_collections_fhir_ids = None
         self._managing_network_org_fhir_id = None
@@ -152,6 +167,12 @@ class Network:
     def network_fhir_id(self) -> str:
         return self._network_fhir_id
 
+    @property
+    def version_id(self) -> str:
+        """Version (meta.versionId) of the network resource this object was built from,
+        used for conditional updates (If-Match)."""
+        return self._version_id
+
     @property
     def members_collections_fhir_ids(self) -> list[str]:
         return self._members_collections_fhir_ids
@@ -171,25 +192,31 @@ class Network:
     @classmethod
     def from_json(cls, network_json: dict, network_org_json: dict, juristic_person_json: dict,
                   member_collection_ids: list[str] = None,
-                  member_biobank_ids: list[str] = None) -> Self:
+                  member_biobank_ids: list[str] = None, trusted: bool = False) -> Self:
         try:
-            identifier = get_nested_value(network_json, ["identifier", 0, "value"])
+            identifier = get_identifier_value(network_json)
             name = network_json["name"]
-            network_fhir_id = get_nested_value(network_json, ["id"])
+            network_fhir_id = get_fhir_id(network_json)
             managing_biobank_fhir_id = parse_reference_id(
-                get_nested_value(network_json, ["managingEntity", "reference"]))
+                get_managing_entity_reference(network_json))
             extensions = cls._parse_extensions(network_json.get("extension", []))
-            network_org_instance = _NetworkOrganization.from_json(network_org_json, juristic_person_json)
-            instance = cls(identifier=identifier, name=name,
-                           contact_name=network_org_instance.contact_name,
-                           contact_surname=network_org_instance.contact_surname,
-                           contact_email=network_org_instance.contact_email, country=network_org_instance.country,
-                           juristic_person=network_org_instance.juristic_person.name,
-                           members_collections_ids=member_collection_ids,
-                           members_biobanks_ids=member_biobank_ids,
-                           common_collaboration_topics=network_org_instance.common_collaboration_topics,
-                           description=network_org_instance.description)
+            network_org_instance = _NetworkOrganization.from_json(network_org_json, juristic_person_json, trusted)
+            if trusted:
+                instance = create_unchecked(cls, _identifier=identifier, _name=name, _managing_biobank_id=identifier,
+                                            _alias=None, _members_collections_ids=member_collection_ids,
+                                            _members_biobanks_ids=member_biobank_ids)
+            else:
+                instance = cls(identifier=identifier, name=name,
+                               contact_name=network_org_instance.contact_name,
+                               contact_surname=network_org_instance.contact_surname,
+                               contact_email=network_org_instance.contact_email, country=network_org_instance.country,
+                               juristic_person=network_org_instance.juristic_person.name,
+                               members_collections_ids=member_collection_ids,
+                               members_biobanks_ids=member_biobank_ids,
+                               common_collaboration_topics=network_org_instance.common_collaboration_topics,
+                               description=network_org_instance.description)
             instance._network_fhir_id = network_fhir_id
+            instance._version_id = get_version_id(network_json)
             instance._managing_network_org_fhir_id = managing_biobank_fhir_id
             instance._network_org = network_org_instance
             instance._members_collections_fhir_ids = extensions["member_collection_fhir_ids"]
@@ -201,14 +228,7 @@ class Network:
     @staticmethod
     def _parse_extensions(extensions: list[dict]) -> dict:
         parsed_extensions = {"member_collection_fhir_ids": [], "member_biobank_fhir_ids": []}
-        for extension in extensions:
-            if extension["url"] == FHIRConfig.MEMBER_V5_EXTENSION:
-                ref_type, reference = get_nested_value(extension, ["valueReference", "reference"]).split("/")
-                if ref_type == "Group":
-                    parsed_extensions["member_collection_fhir_ids"].append(reference)
-                else:
-                    parsed_extensions["member_biobank_fhir_ids"].append(reference)
-        return parsed_extensions
+        return _EXTENSION_PARSER.parse(extensions, parsed_extensions)
 
     def to_fhir(self, network_organization_fhir_id: str = None, member_collection_fhir_ids: list[str] = None,
                 member_biobank_fhir_ids: list[str] = None) -> Group:
@@ -234,6 +254,31 @@ class Network:
             network.extension.append(self.__create_member_extension("Organization", member_biobank_fhir_id))
         return network
 
+    def to_fhir_dict(self, network_organization_fhir_id: str = None, member_collection_fhir_ids: list[str] = None,
+                     member_biobank_fhir_ids: list[str] = None) -> dict:
+        """Return json representation of the network in FHIR, equal to to_fhir().as_json(),
+        but built directly, without the fhirclient objects."""
+        network_organization_fhir_id = network_organization_fhir_id or self.managing_network_org_fhir_id
+        if network_organization_fhir_id is None:
+            raise ValueError("Managing biobank FHIR id must be provided either as an argument or as a property.")
+        member_collection_fhir_ids = member_collection_fhir_ids or self.members_collections_fhir_ids or []
+        member_biobank_fhir_ids = member_biobank_fhir_ids or self.members_biobanks_fhir_ids or []
+        network = create_resource_dict("Group", FHIRConfig.get_meta_profile_url("network"))
+        network["identifier"] = [create_fhir_identifier_dict(self.identifier)]
+        network["name"] = self._name
+        network["active"] = True
+        network["actual"] = True
+        network["type"] = "person"
+        network["managingEntity"] = create_reference_dict(f"Organization/{network_organization_fhir_id}")
+        extensions = [{"url": FHIRConfig.MEMBER_V5_EXTENSION,
+                       "valueReference": create_reference_dict(f"{member_type}/{member_fhir_id}")}
+                      for member_type, member_fhir_ids in (("Group", member_collection_fhir_ids),
+                                                           ("Organization", member_biobank_fhir_ids))
+                      for member_fhir_id in member_fhir_ids]
+        if extensions:
+            network["extension"] = extensions
+        return network
+
     def build_bundle_for_upload(self, juristic_person_fhir_id: str = None, member_collection_fhir_ids: list[str] = None,
                                 member_biobank_fhir_ids: list[str] = None) -> Bundle:
 
@@ -266,6 +311,27 @@ class Network:
         bundle = create_bundle(entries)
         return bundle
 
+    def build_bundle_dict_for_upload(self, juristic_person_fhir_id: str = None,
+                                     member_collection_fhir_ids: list[str] = None,
+                                     member_biobank_fhir_ids: list[str] = None) -> dict:
+        """Json counterpart of build_bundle_for_upload, built by to_fhir_dict."""
+        network_org_temporary_id = str(uuid.uuid4())
+        entries = []
+        if juristic_person_fhir_id:
+            network_org_fhir = self._network_org.to_fhir_dict(juristic_person_fhir_id)
+        else:
+            juristic_person_temporary_id = str(uuid.uuid4())
+            juristic_person_fhir = self._network_org.juristic_person.to_fhir_dict()
+            entries.append(create_post_bundle_entry_dict("Organization", juristic_person_fhir,
+                                                         juristic_person_temporary_id))
+            network_org_fhir = self._network_org.to_fhir_dict(juristic_person_temporary_id)
+            network_org_fhir["partOf"]["reference"] = juristic_person_temporary_id
+        network_fhir = self.to_fhir_dict(network_org_temporary_id, member_collection_fhir_ids, member_biobank_fhir_ids)
+        network_fhir["managingEntity"]["reference"] = network_org_temporary_id
+        entries.append(create_post_bundle_entry_dict("Group", network_fhir, str(uuid.uuid4())))
+        entries.append(create_post_bundle_entry_dict("Organization", network_org_fhir, network_org_temporary_id))
+        return create_bundle_dict(entries)
+
     @staticmethod
     def __create_member_extension(member_type: str, member_fhir_id: str):
         extension = Extension()
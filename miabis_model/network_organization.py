@@ -9,9 +9,20 @@ from miabis_model.incorrect_json_format import IncorrectJsonFormatException
 from miabis_model.juristic_person import _JuristicPerson
 from miabis_model.util.config import FHIRConfig
 from miabis_model.util.constants import NETWORK_COMMON_COLLAB_TOPICS
-from miabis_model.util.parsing_util import get_nested_value, parse_contact, parse_reference_id
+from miabis_model.util.parsing_util import parse_contact, parse_reference_id, get_fhir_id, get_identifier_value, \
+    get_version_id, get_name, get_country, get_url, get_part_of_reference, get_codeable_concept_code, \
+    get_string_value, ExtensionParser, set_value, append_value, create_unchecked
 from miabis_model.util.util import create_fhir_identifier, create_contact, create_country_of_residence, \
-    create_codeable_concept_extension, create_string_extension
+    create_codeable_concept_extension, create_string_extension, create_resource_dict, create_fhir_identifier_dict, \
+    create_reference_dict, create_contact_dict, create_country_of_residence_dict, create_url_contact_point_dict, \
+    create_codeable_concept_extension_dict, create_string_extension_dict
+
+_EXTENSION_PARSER = ExtensionParser({
+    FHIRConfig.get_extension_url("network_organization", "common_collaboration_topics"):
+        append_value("common_collaboration_topics", get_codeable_concept_code),
+    FHIRConfig.get_extension_url("network_organization", "description"):
+        set_value("description", get_string_value, skip_none=False),
+})
 
 
 class _NetworkOrganization:
@@ -40,6 +51,7 @@ class _NetworkOrganization:
         self.common_collaboration_topics = common_collaboration_topics
         self.description = description
         self._network_org_fhir_id = None
+        self._version_id = None
 
     @property
     def identifier(self) -> str:
@@ -138,6 +150,12 @@ class _NetworkOrganization:
     def network_org_fhir_id(self) -> str:
         return self._network_org_fhir_id
 
+    @property
+    def version_id(self) -> str:
+        """Version (meta.versionId) of the network organization resource this object was built from,
+        used for conditional updates (If-Match)."""
+        return self._version_id
+
     @property
     def description(self) -> str:
         return self._description
@@ -149,26 +167,37 @@ class _NetworkOrganization:
         self._description = description
 
     @classmethod
-    def from_json(cls, network_json: dict, juristic_person_json: dict) -> Self:
+    def from_json(cls, network_json: dict, juristic_person_json: dict, trusted: bool = False) -> Self:
         try:
-            network_org_fhir_id = get_nested_value(network_json, ["id"])
-            identifier = get_nested_value(network_json, ["identifier", 0, "value"])
-            name = get_nested_value(network_json, ["name"])
-            managing_biobank_fhir_id = parse_reference_id(get_nested_value(network_json, ["partOf", "reference"]))
+            network_org_fhir_id = get_fhir_id(network_json)
+            identifier = get_identifier_value(network_json)
+            name = get_name(network_json)
+            managing_biobank_fhir_id = parse_reference_id(get_part_of_reference(network_json))
             contact = parse_contact(network_json.get("contact", [{}])[0])
-            url = get_nested_value(network_json, ["telecom", 0, "value"])
-            country = get_nested_value(network_json, ["address", 0, "country"])
+            url = get_url(network_json)
+            country = get_country(network_json)
             parsed_extensions = cls._parse_extensions(network_json.get("extension", []))
-            juristic_person_fhir_id = get_nested_value(juristic_person_json, ["id"])
-            juristic_person_name = get_nested_value(juristic_person_json, ["name"])
-            instance = cls(identifier=identifier, name=name,
-                           contact_name=contact["name"],
-                           contact_surname=contact["surname"], contact_email=contact["email"], country=country,
-                           common_collaboration_topics=parsed_extensions["common_collaboration_topics"],
-                           juristic_person=juristic_person_name,
-                           description=parsed_extensions["description"],
-                           url=url)
+            juristic_person_fhir_id = get_fhir_id(juristic_person_json)
+            juristic_person_name = get_name(juristic_person_json)
+            if trusted:
+                instance = create_unchecked(cls, _identifier=identifier, _name=name, _contact_name=contact["name"],
+                                            _contact_surname=contact["surname"], _contact_email=contact["email"],
+                                            _country=country, _url=url,
+                                            juristic_person=create_unchecked(_JuristicPerson,
+                                                                             _name=juristic_person_name),
+                                            _common_collaboration_topics=parsed_extensions[
+                                                "common_collaboration_topics"],
+                                            _description=parsed_extensions["description"])
+            else:
+                instance = cls(identifier=identifier, name=name,
+                               contact_name=contact["name"],
+                               contact_surname=contact["surname"], contact_email=contact["email"], country=country,
+                               common_collaboration_topics=parsed_extensions["common_collaboration_topics"],
+                               juristic_person=juristic_person_name,
+                               description=parsed_extensions["description"],
+                               url=url)
             instance._network_org_fhir_id = network_org_fhir_id
+            instance._version_id = get_version_id(network_json)
             instance._managing_biobank_fhir_id = managing_biobank_fhir_id
             instance.juristic_person._fhir_id = juristic_person_fhir_id
             return instance
@@ -178,20 +207,7 @@ class _NetworkOrganization:
     @staticmethod
     def _parse_extensions(extensions: dict) -> dict:
         parsed_extension = {"common_collaboration_topics": [], "juristic_person": None, "description": None}
-        common_coll_topic_extension: str = FHIRConfig.get_extension_url("network_organization",
-                                                                        "common_collaboration_topics")
-        description_extension: str = FHIRConfig.get_extension_url("network_organization", "description")
-        for extension in extensions:
-            extension_url = extension["url"]
-            if extension_url == common_coll_topic_extension:
-                value = get_nested_value(extension, ["valueCodeableConcept", "coding", 0, "code"])
-                if value is not None:
-                    parsed_extension["common_collaboration_topics"].append(value)
-            elif extension_url == description_extension:
-                value = get_nested_value(extension, ["valueString"])
-                parsed_extension["description"] = value
-            else:
-                continue
+        _EXTENSION_PARSER.parse(extensions, parsed_extension)
         if not parsed_extension["common_collaboration_topics"]:
             parsed_extension["common_collaboration_topics"] = None
         return parsed_extension
@@ -226,6 +242,33 @@ class _NetworkOrganization:
         network.extension = extensions
         return network
 
+    def to_fhir_dict(self, juristic_person_fhir_id: str = None) -> dict:
+        """Return json representation of the network organization in FHIR, equal to to_fhir().as_json(),
+        but built directly, without the fhirclient objects."""
+        juristic_person_fhir_id = juristic_person_fhir_id or self.juristic_person.fhir_id
+        if juristic_person_fhir_id is None:
+            raise ValueError("Juristic Person FHIR ID must be provided either as an argument or as an property.")
+        network = create_resource_dict("Organization", FHIRConfig.get_meta_profile_url("network_organization"))
+        network["identifier"] = [create_fhir_identifier_dict(self.identifier)]
+        network["name"] = self._name
+        network["active"] = True
+        network["partOf"] = create_reference_dict(f"Organization/{juristic_person_fhir_id}")
+        network["contact"] = [create_contact_dict(self._contact_name, self._contact_surname, self._contact_email)]
+        network["address"] = [create_country_of_residence_dict(self._country)]
+        if self.url is not None:
+            network["telecom"] = [create_url_contact_point_dict(self.url)]
+        extensions = []
+        for topic in self._common_collaboration_topics or []:
+            extensions.append(create_codeable_concept_extension_dict(
+                FHIRConfig.get_extension_url("network_organization", "common_collaboration_topics"),
+                FHIRConfig.get_code_system_url("network_organization", "common_collaboration_topics"), topic))
+        if self._description is not None:
+            extensions.append(create_string_extension_dict(
+                FHIRConfig.get_extension_url("network_organization", "description"), self._description))
+        if extensions:
+            network["extension"] = extensions
+        return network
+
     @staticmethod
     def create_url(url: str) -> ContactPoint:
         contact_point = ContactPoint()
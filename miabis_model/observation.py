@@ -1,9 +1,9 @@
+import uuid
 from datetime import datetime
 from typing import Self
 
 import fhirclient.models.observation as fhir_observation
-import simple_icd_10 as icd10
-from dateutil import parser as date_parser
+from fhirclient.models.bundle import BundleEntry
 from dateutil.parser import ParserError
 from fhirclient.models.codeableconcept import CodeableConcept
 from fhirclient.models.coding import Coding
@@ -11,10 +11,17 @@ from fhirclient.models.fhirdatetime import FHIRDateTime
 from fhirclient.models.fhirreference import FHIRReference
 from fhirclient.models.meta import Meta
 
+from miabis_model.icd10_service import icd10_service
 from miabis_model.incorrect_json_format import IncorrectJsonFormatException
 from miabis_model.util.config import FHIRConfig
-from miabis_model.util.parsing_util import get_nested_value, parse_reference_id
-from miabis_model.util.util import create_fhir_identifier
+from miabis_model.util.parsing_util import parse_reference_id, compile_path, get_fhir_id, get_identifier_value, \
+    get_codeable_concept_code, get_subject_reference, create_unchecked, parse_datetime_from_string
+from miabis_model.util.util import create_fhir_identifier, create_post_bundle_entry, \
+    create_identifier_search_query, create_conditional_reference, create_resource_dict, \
+    create_fhir_identifier_dict, create_reference_dict, create_codeable_concept_dict, create_post_bundle_entry_dict
+
+_get_specimen_reference = compile_path(["specimen", "reference"])
+_get_effective_datetime = compile_path(["effectiveDateTime"])
 
 
 class _Observation:
@@ -43,7 +50,7 @@ class _Observation:
 
     @icd10_code.setter
     def icd10_code(self, icd10_code: str):
-        if not icd10.is_valid_item(icd10_code):
+        if not icd10_service.is_valid(icd10_code):
             raise ValueError("The provided string is not a valid ICD-10 code.")
         self._icd10_code = icd10_code
 
@@ -100,15 +107,22 @@ class _Observation:
         return self._sample_fhir_id
 
     @classmethod
-    def from_json(cls, observation_json: dict, patient_identifier: str, sample_identifier: str) -> Self:
+    def from_json(cls, observation_json: dict, patient_identifier: str, sample_identifier: str,
+                  trusted: bool = False) -> Self:
         try:
-            observation_fhir_id = get_nested_value(observation_json, ["id"])
-            icd10_code = get_nested_value(observation_json, ["valueCodeableConcept", "coding", 0, "code"])
-            identifier = get_nested_value(observation_json, ["identifier", 0, "value"])
+            observation_fhir_id = get_fhir_id(observation_json)
+            icd10_code = get_codeable_concept_code(observation_json)
+            identifier = get_identifier_value(observation_json)
             observation_datetime = cls.__parse_datetime(observation_json)
-            patient_fhir_id = parse_reference_id(get_nested_value(observation_json, ["subject", "reference"]))
-            sample_fhir_id = parse_reference_id(get_nested_value(observation_json, ["specimen", "reference"]))
-            instance = cls(icd10_code, sample_identifier, patient_identifier, observation_datetime, identifier)
+            patient_fhir_id = parse_reference_id(get_subject_reference(observation_json))
+            sample_fhir_id = parse_reference_id(_get_specimen_reference(observation_json))
+            if trusted:
+                instance = create_unchecked(cls, _icd10_code=icd10_code, _sample_identifier=sample_identifier,
+                                            _patient_identifier=patient_identifier,
+                                            _diagnosis_observed_datetime=observation_datetime,
+                                            _observation_identifier=identifier)
+            else:
+                instance = cls(icd10_code, sample_identifier, patient_identifier, observation_datetime, identifier)
             instance._patient_fhir_id = patient_fhir_id
             instance._observation_fhir_id = observation_fhir_id
             instance._sample_fhir_id = sample_fhir_id
@@ -120,35 +134,34 @@ class _Observation:
 
     @staticmethod
     def __parse_datetime(observation_json: dict) -> datetime:
-        observation_datetime = get_nested_value(observation_json, ["effectiveDateTime"])
+        observation_datetime = _get_effective_datetime(observation_json)
         if observation_datetime is not None:
-            observation_datetime = date_parser.parse(observation_datetime)
+            observation_datetime = parse_datetime_from_string(observation_datetime)
         return observation_datetime
 
-    def to_fhir(self, patient_fhir_id: str = None, sample_fhir_id: str = None) -> fhir_observation.Observation:
+    def to_fhir(self, patient_fhir_id: str = None, sample_fhir_id: str = None, patient_reference: str = None,
+                sample_reference: str = None) -> fhir_observation.Observation:
         """Converts the observation to a FHIR object.
         patient_fhir_id and sample_fhir_id is not needed if this Observation object was created by from_json method
         (the fhir ids were already taken from the json representation)
         :param patient_fhir_id: FHIR ID of a patient this observation is linked to.
         :param sample_fhir_id: FHIR ID of a sample this observation is linked to.
+        :param patient_reference: reference to the patient (e.g. a conditional reference), used instead
+        of patient_fhir_id
+        :param sample_reference: reference to the sample (e.g. a temporary id of the sample in the bundle),
+        used instead of sample_fhir_id
         :return: Observation
         """
-        patient_fhir_id = patient_fhir_id or self.patient_fhir_id
-        if patient_fhir_id is None:
-            raise ValueError("Patient FHIR ID must be provided either as an argument or as a property")
-
-        sample_fhir_id = sample_fhir_id or self.sample_fhir_id
-        if sample_fhir_id is None:
-            raise ValueError("Sample FHIR ID must be provided either as an argument or as a property")
-
+        patient_reference = self.__resolve_patient_reference(patient_fhir_id, patient_reference)
+        sample_reference = self.__resolve_sample_reference(sample_fhir_id, sample_reference)
         observation = fhir_observation.Observation()
         observation.meta = Meta()
         observation.meta.profile = [FHIRConfig.get_meta_profile_url("observation")]
         if self.observation_identifier is not None:
             observation.identifier = [create_fhir_identifier(self.observation_identifier)]
-        observation.subject = self.__create_patient_reference(patient_fhir_id)
+        observation.subject = self.__create_reference(patient_reference)
         observation.status = "final"
-        observation.specimen = self.__create_specimen_reference(sample_fhir_id)
+        observation.specimen = self.__create_reference(sample_reference)
         if self.diagnosis_observed_datetime is not None:
             observation.effectiveDateTime = FHIRDateTime()
             observation.effectiveDateTime.date = self.diagnosis_observed_datetime.date()
@@ -156,17 +169,92 @@ class _Observation:
         observation.valueCodeableConcept = self.__create_icd_10_code()
         return observation
 
-    @staticmethod
-    def __create_patient_reference(patient_fhir_id: str) -> FHIRReference:
-        patient_reference = FHIRReference()
-        patient_reference.reference = f"Patient/{patient_fhir_id}"
-        return patient_reference
+    def to_fhir_dict(self, patient_fhir_id: str = None, sample_fhir_id: str = None, patient_reference: str = None,
+                     sample_reference: str = None) -> dict:
+        """Return json representation of the observation in FHIR, equal to to_fhir().as_json(),
+        but built directly, without the fhirclient objects.
+        :param patient_fhir_id: FHIR ID of a patient this observation is linked to.
+        :param sample_fhir_id: FHIR ID of a sample this observation is linked to.
+        :param patient_reference: reference to the patient, used instead of patient_fhir_id
+        :param sample_reference: reference to the sample, used instead of sample_fhir_id
+        :return: json representation of the Observation
+        """
+        patient_reference = self.__resolve_patient_reference(patient_fhir_id, patient_reference)
+        sample_reference = self.__resolve_sample_reference(sample_fhir_id, sample_reference)
+        observation = create_resource_dict("Observation", FHIRConfig.get_meta_profile_url("observation"))
+        if self.observation_identifier is not None:
+            observation["identifier"] = [create_fhir_identifier_dict(self.observation_identifier)]
+        observation["subject"] = create_reference_dict(patient_reference)
+        observation["status"] = "final"
+        observation["specimen"] = create_reference_dict(sample_reference)
+        if self.diagnosis_observed_datetime is not None:
+            observation["effectiveDateTime"] = self.diagnosis_observed_datetime.date().isoformat()
+        observation["code"] = create_codeable_concept_dict("http://loinc.org", "52797-8")
+        observation["valueCodeableConcept"] = create_codeable_concept_dict(FHIRConfig.DIAGNOSIS_CODE_SYSTEM,
+                                                                           self.__diagnosis_with_period())
+        return observation
+
+    def build_bundle_entry_for_upload(self, patient_fhir_id: str = None, sample_fhir_id: str = None,
+                                      conditional: bool = False) -> BundleEntry:
+        """Build bundle entry for uploading this observation.
+        :param patient_fhir_id: FHIR ID of a patient this observation is linked to. Not needed if conditional is True.
+        :param sample_fhir_id: FHIR ID of a sample this observation is linked to. Not needed if conditional is True.
+        :param conditional: if True, patient and sample are referenced by conditional references
+        (Patient?identifier=..., Specimen?identifier=...), and if the observation has an identifier,
+        it is created only if no observation with the same identifier exists.
+        Such entry needs to be sent in a transaction bundle.
+        :return: POST bundle entry"""
+        if not conditional:
+            return create_post_bundle_entry("Observation", self.to_fhir(patient_fhir_id, sample_fhir_id),
+                                            str(uuid.uuid4()))
+        observation = self.to_fhir(patient_reference=create_conditional_reference("Patient", self.patient_identifier),
+                                   sample_reference=create_conditional_reference("Specimen", self.sample_identifier))
+        return create_post_bundle_entry("Observation", observation, str(uuid.uuid4()),
+                                        self.__if_none_exist_query())
+
+    def build_bundle_entry_dict_for_upload(self, patient_fhir_id: str = None, sample_fhir_id: str = None,
+                                           conditional: bool = False) -> dict:
+        """Json counterpart of build_bundle_entry_for_upload, built by to_fhir_dict.
+        :param patient_fhir_id: FHIR ID of a patient this observation is linked to. Not needed if conditional is True.
+        :param sample_fhir_id: FHIR ID of a sample this observation is linked to. Not needed if conditional is True.
+        :param conditional: if True, patient and sample are referenced by conditional references,
+        as in build_bundle_entry_for_upload
+        :return: json representation of the POST bundle entry"""
+        if not conditional:
+            return create_post_bundle_entry_dict("Observation", self.to_fhir_dict(patient_fhir_id, sample_fhir_id),
+                                                 str(uuid.uuid4()))
+        observation = self.to_fhir_dict(
+            patient_reference=create_conditional_reference("Patient", self.patient_identifier),
+            sample_reference=create_conditional_reference("Specimen", self.sample_identifier))
+        return create_post_bundle_entry_dict("Observation", observation, str(uuid.uuid4()),
+                                             self.__if_none_exist_query())
+
+    def __if_none_exist_query(self) -> str | None:
+        if self.observation_identifier is None:
+            return None
+        return create_identifier_search_query(self.observation_identifier)
+
+    def __resolve_patient_reference(self, patient_fhir_id: str | None, patient_reference: str | None) -> str:
+        if patient_reference is not None:
+            return patient_reference
+        patient_fhir_id = patient_fhir_id or self.patient_fhir_id
+        if patient_fhir_id is None:
+            raise ValueError("Patient FHIR ID must be provided either as an argument or as a property")
+        return f"Patient/{patient_fhir_id}"
+
+    def __resolve_sample_reference(self, sample_fhir_id: str | None, sample_reference: str | None) -> str:
+        if sample_reference is not None:
+            return sample_reference
+        sample_fhir_id = sample_fhir_id or self.sample_fhir_id
+        if sample_fhir_id is None:
+            raise ValueError("Sample FHIR ID must be provided either as an argument or as a property")
+        return f"Specimen/{sample_fhir_id}"
 
     @staticmethod
-    def __create_specimen_reference(sample_fhir_id: str) -> FHIRReference:
-        specimen_reference = FHIRReference()
-        specimen_reference.reference = f"Specimen/{sample_fhir_id}"
-        return specimen_reference
+    def __create_reference(reference: str) -> FHIRReference:
+        fhir_reference = FHIRReference()
+        fhir_reference.reference = reference
+        return fhir_reference
 
     def _add_fhir_id_to_observation(self, observation: fhir_observation.Observation):
         observation.id = self._observation_fhir_id
@@ -188,10 +276,7 @@ class _Observation:
 
     def __diagnosis_with_period(self, ) -> str:
         """Returns icd-10 code with a period, e.g., C188 to C18.8"""
-        code = self.icd10_code
-        if len(code) == 4 and "." not in code:
-            return code[:3] + '.' + code[3:]
-        return code
+        return icd10_service.normalize(self.icd10_code)
 
     def add_fhir_id_to_observation(self, observation: fhir_observation.Observation) -> fhir_observation.Observation:
         """Add FHIR id to the FHIR representation of the Observation. FHIR ID is necessary for updating the
@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Self
 
 from fhirclient.models.annotation import Annotation
-from fhirclient.models.bundle import Bundle
+from fhirclient.models.bundle import Bundle, BundleEntry
 from fhirclient.models.codeableconcept import CodeableConcept
 from fhirclient.models.coding import Coding
 from fhirclient.models.extension import Extension
@@ -17,9 +17,34 @@ from miabis_model.incorrect_json_format import IncorrectJsonFormatException
 from miabis_model.storage_temperature import StorageTemperature
 from miabis_model.util.config import FHIRConfig
 from miabis_model.util.constants import DETAILED_MATERIAL_TYPE_CODES
-from miabis_model.util.parsing_util import get_nested_value, parse_reference_id
+from miabis_model.util.parsing_util import parse_reference_id, compile_path, get_fhir_id, get_identifier_value, \
+    get_version_id, get_subject_reference, create_unchecked, ExtensionParser, set_value, get_value_identifier_value
 from miabis_model.util.util import create_fhir_identifier, create_codeable_concept, \
-    create_codeable_concept_extension, create_post_bundle_entry, create_bundle
+    create_codeable_concept_extension, create_post_bundle_entry, create_bundle, create_identifier_search_query, \
+    create_conditional_reference, create_resource_dict, create_fhir_identifier_dict, create_reference_dict, \
+    create_codeable_concept_dict, create_codeable_concept_extension_dict, create_coding_dict, \
+    create_post_bundle_entry_dict
+
+
+_get_material_type = compile_path(["type", "coding", 0, "code"])
+_get_body_site = compile_path(["collection", "bodySite", "coding", 0, "code"])
+_get_body_site_system = compile_path(["collection", "bodySite", "coding", 0, "system"])
+_get_use_restrictions = compile_path(["note", 0, "text"])
+_get_collected_datetime = compile_path(["collection", "collectedDateTime"])
+_get_storage_temperature = compile_path(["processing", 0, "extension", 0, "valueCodeableConcept", "coding", 0,
+                                         "code"])
+
+_EXTENSION_PARSER = ExtensionParser({
+    FHIRConfig.get_extension_url("sample", "sample_collection_id"):
+        set_value("sample_collection_id", get_value_identifier_value),
+})
+
+
+def get_sample_collection_id(sample_json: dict) -> str | None:
+    """Get identifier of the collection the sample belongs to, from the extension selected by its URL.
+    :param sample_json: json representation of the sample
+    :return: identifier of the collection, None if the sample does not belong to any collection"""
+    return _EXTENSION_PARSER.parse(sample_json.get("extension"), {"sample_collection_id": None})["sample_collection_id"]
 
 
 class Sample:
@@ -59,6 +84,7 @@ class Sample:
             self._observations.append(observation)
         self._subject_fhir_id = None
         self._sample_fhir_id = None
+        self._version_id = None
         self._observation_fhir_ids = None
 
     @property
@@ -178,6 +204,12 @@ class Sample:
         """FHIR ID of the sample."""
         return self._sample_fhir_id
 
+    @property
+    def version_id(self) -> str:
+        """Version (meta.versionId) of the sample resource this object was built from,
+        used for conditional updates (If-Match)."""
+        return self._version_id
+
     @property
     def observation_fhir_ids(self):
         return self._observation_fhir_ids
@@ -188,34 +220,45 @@ class Sample:
 
     @classmethod
     def from_json(cls, sample_json: dict, observation_jsons: list[dict],
-                  donor_identifier: str) -> Self:
+                  donor_identifier: str, trusted: bool = False) -> Self:
         """
         Build MoFSample from FHIR json representation
         :param sample_json: json the sample should be build from
         :param donor_identifier: organizational identifier of the donor (not the FHIR id!)
+        :param trusted: if True, the values are not validated, for json which was validated when it was written
         :return:
         """
         try:
-            sample_fhir_id = get_nested_value(sample_json, ["id"])
-            identifier = get_nested_value(sample_json, ["identifier", 0, "value"])
-            material_type = get_nested_value(sample_json, ["type", "coding", 0, "code"])
+            sample_fhir_id = get_fhir_id(sample_json)
+            identifier = get_identifier_value(sample_json)
+            material_type = _get_material_type(sample_json)
             collected_datetime = cls._parse_collection_datetime(sample_json)
-            body_site = get_nested_value(sample_json, ["collection", "bodySite", "coding", 0, "code"])
-            body_site_system = get_nested_value(sample_json, ["collection", "bodySite", "coding", 0, "system"])
+            body_site = _get_body_site(sample_json)
+            body_site_system = _get_body_site_system(sample_json)
             storage_temperature = cls._parse_storage_temperature(sample_json)
-            use_restrictions = get_nested_value(sample_json, ["note", 0, "text"])
-            sample_collection_id = get_nested_value(sample_json, ["extension", 0, "valueIdentifier", "value"])
+            use_restrictions = _get_use_restrictions(sample_json)
+            sample_collection_id = get_sample_collection_id(sample_json)
             observation_instances = []
             for observation_json in observation_jsons:
-                observation_instances.append(_Observation.from_json(observation_json, donor_identifier, identifier))
-            instance = cls(identifier=identifier, donor_identifier=donor_identifier, material_type=material_type,
-                           collected_datetime=collected_datetime, body_site=body_site,
-                           body_site_system=body_site_system,
-                           storage_temperature=storage_temperature, use_restrictions=use_restrictions,
-                           sample_collection_id=sample_collection_id)
+                observation_instances.append(
+                    _Observation.from_json(observation_json, donor_identifier, identifier, trusted))
+            if trusted:
+                instance = create_unchecked(cls, _identifier=identifier, _donor_identifier=donor_identifier,
+                                            _material_type=material_type, _collected_datetime=collected_datetime,
+                                            _body_site=body_site, _body_site_system=body_site_system,
+                                            _storage_temperature=storage_temperature,
+                                            _use_restrictions=use_restrictions,
+                                            _sample_collection_id=sample_collection_id)
+            else:
+                instance = cls(identifier=identifier, donor_identifier=donor_identifier, material_type=material_type,
+                               collected_datetime=collected_datetime, body_site=body_site,
+                               body_site_system=body_site_system,
+                               storage_temperature=storage_temperature, use_restrictions=use_restrictions,
+                               sample_collection_id=sample_collection_id)
             instance._observations = observation_instances
-            instance._subject_fhir_id = parse_reference_id(get_nested_value(sample_json, ["subject", "reference"]))
+            instance._subject_fhir_id = parse_reference_id(get_subject_reference(sample_json))
             instance._sample_fhir_id = sample_fhir_id
+            instance._version_id = get_version_id(sample_json)
             instance._observation_fhir_ids = [observation.observation_fhir_id for observation in observation_instances]
             return instance
         except KeyError:
@@ -224,7 +267,7 @@ class Sample:
     @staticmethod
     def _parse_collection_datetime(sample_json: dict) -> datetime | None:
         """Parse the collection datetime from the sample JSON."""
-        collection_datetime = get_nested_value(sample_json, ["collection", "collectedDateTime"])
+        collection_datetime = _get_collected_datetime(sample_json)
         if collection_datetime is not None:
             collection_datetime = datetime.strptime(collection_datetime, "%Y-%m-%d")
         return collection_datetime
@@ -232,23 +275,21 @@ class Sample:
     @staticmethod
     def _parse_storage_temperature(sample_json: dict) -> StorageTemperature | None:
         """Parse the storage temperature from the sample JSON."""
-        storage_temperature = get_nested_value(sample_json,
-                                               ["processing", 0, "extension", 0, "valueCodeableConcept",
-                                                "coding", 0, "code"])
+        storage_temperature = _get_storage_temperature(sample_json)
         if storage_temperature is not None:
             storage_temperature = StorageTemperature(storage_temperature)
         return storage_temperature
 
-    def to_fhir(self, subject_fhir_id: str = None, sample_collection_id: str = None) -> Specimen:
+    def to_fhir(self, subject_fhir_id: str = None, sample_collection_id: str = None,
+                subject_reference: str = None) -> Specimen:
         """return sample representation in FHIR format
-        :param subject_fhir_id: FHIR ID of the subject to which the sample belongs"""
+        :param subject_fhir_id: FHIR ID of the subject to which the sample belongs
+        :param subject_reference: reference to the subject (e.g. a conditional reference),
+        used instead of subject_fhir_id"""
 
-        subject_fhir_id = subject_fhir_id or self.subject_fhir_id
+        subject_reference = self.__resolve_subject_reference(subject_fhir_id, subject_reference)
         sample_collection_id = sample_collection_id or self.sample_collection_id
 
-        if subject_fhir_id is None:
-            raise ValueError("Subject FHIR ID must be provided either as an argument or as a property")
-
         if sample_collection_id is None:
             raise ValueError("collection_id must be provided either as an argument or as a property")
 
@@ -257,7 +298,7 @@ class Sample:
         specimen.meta.profile = [FHIRConfig.get_meta_profile_url("sample")]
         specimen.identifier = [create_fhir_identifier(self.identifier)]
         specimen.subject = FHIRReference()
-        specimen.subject.reference = f"Patient/{subject_fhir_id}"
+        specimen.subject.reference = subject_reference
         specimen.type = create_codeable_concept(FHIRConfig.get_value_set_url("sample", "detailed_sample_type"),
                                                 self.material_type)
         if self.sample_collection_id is not None:
@@ -280,6 +321,42 @@ class Sample:
             specimen.note[0].text = self.use_restrictions
         return specimen
 
+    def to_fhir_dict(self, subject_fhir_id: str = None, sample_collection_id: str = None,
+                     subject_reference: str = None) -> dict:
+        """Return json representation of the sample in FHIR, equal to to_fhir().as_json(),
+        but built directly, without the fhirclient objects.
+        :param subject_fhir_id: FHIR ID of the subject to which the sample belongs
+        :param subject_reference: reference to the subject, used instead of subject_fhir_id"""
+        subject_reference = self.__resolve_subject_reference(subject_fhir_id, subject_reference)
+        sample_collection_id = sample_collection_id or self.sample_collection_id
+
+        if sample_collection_id is None:
+            raise ValueError("collection_id must be provided either as an argument or as a property")
+
+        specimen = create_resource_dict("Specimen", FHIRConfig.get_meta_profile_url("sample"))
+        specimen["identifier"] = [create_fhir_identifier_dict(self.identifier)]
+        specimen["subject"] = create_reference_dict(subject_reference)
+        specimen["type"] = create_codeable_concept_dict(
+            FHIRConfig.get_value_set_url("sample", "detailed_sample_type"), self.material_type)
+        if self.sample_collection_id is not None:
+            specimen["extension"] = [{"url": FHIRConfig.get_extension_url("sample", "sample_collection_id"),
+                                      "valueIdentifier": create_fhir_identifier_dict(self.sample_collection_id)}]
+        if self.collected_datetime is not None or self.body_site is not None:
+            collection = {}
+            if self.collected_datetime is not None:
+                collection["collectedDateTime"] = self.collected_datetime.date().isoformat()
+            if self.body_site is not None:
+                collection["bodySite"] = {"coding": [create_coding_dict(self.body_site_system, self.body_site)]}
+            specimen["collection"] = collection
+        if self.storage_temperature is not None:
+            specimen["processing"] = [{"extension": [
+                create_codeable_concept_extension_dict(
+                    FHIRConfig.get_extension_url("sample", "storage_temperature"),
+                    FHIRConfig.get_value_set_url("sample", "storage_temperature"), self.storage_temperature.value)]}]
+        if self.use_restrictions is not None:
+            specimen["note"] = [{"text": self.use_restrictions}]
+        return specimen
+
     def create_sample_collection_extension(self):
         extension = Extension()
         extension.url = FHIRConfig.get_extension_url("sample", "sample_collection_id")
@@ -294,22 +371,69 @@ class Sample:
         sample.id = self.sample_fhir_id
         return sample
 
-    def build_bundle_for_upload(self, subject_fhir_id: str) -> Bundle:
+    def build_bundle_for_upload(self, subject_fhir_id: str = None, conditional: bool = False) -> Bundle:
+        return create_bundle(self.build_bundle_entries_for_upload(subject_fhir_id, conditional))
+
+    def build_bundle_entries_for_upload(self, subject_fhir_id: str = None,
+                                        conditional: bool = False) -> list[BundleEntry]:
+        """Build transaction bundle entries for uploading this sample along with its observations.
+        The specimen entry is always the first one, observations reference it by its temporary id,
+        so all the entries need to be part of the same transaction bundle.
+        :param subject_fhir_id: FHIR ID of the donor to which the sample belongs. Not needed if conditional is True.
+        :param conditional: if True, the donor is referenced by a conditional reference (Patient?identifier=...),
+        and the specimen is created only if no specimen with the same identifier exists (observations only if they
+        have an identifier), so the server resolves the references and retried uploads do not create duplicates.
+        :return: list of POST bundle entries"""
         sample_bundle_temporary_id = str(uuid.uuid4())
         observation_temporary_ids = []
-        sample_fhir = self.to_fhir(subject_fhir_id)
+        subject_reference = create_conditional_reference("Patient", self.donor_identifier) if conditional \
+            else f"Patient/{subject_fhir_id}"
+        sample_fhir = self.to_fhir(subject_reference=subject_reference)
         observations_fhir = []
         for observation in self._observations:
             observation_temporary_ids.append(str(uuid.uuid4()))
-            observation_fhir = observation.to_fhir(subject_fhir_id, sample_bundle_temporary_id)
-            observation_fhir.specimen.reference = sample_bundle_temporary_id
-            observations_fhir.append(observation_fhir)
-        entries = [create_post_bundle_entry("Specimen", sample_fhir, sample_bundle_temporary_id)]
-        entries.extend(
-            [create_post_bundle_entry("Observation", observation_fhir, observation_temporary_ids[i]) for
-             i, observation_fhir in enumerate(observations_fhir)])
-        bundle = create_bundle(entries)
-        return bundle
+            observations_fhir.append(observation.to_fhir(patient_reference=subject_reference,
+                                                         sample_reference=sample_bundle_temporary_id))
+        sample_if_none_exist = create_identifier_search_query(self.identifier) if conditional else None
+        entries = [create_post_bundle_entry("Specimen", sample_fhir, sample_bundle_temporary_id, sample_if_none_exist)]
+        for i, observation_fhir in enumerate(observations_fhir):
+            observation_identifier = self._observations[i].observation_identifier
+            observation_if_none_exist = create_identifier_search_query(observation_identifier) \
+                if conditional and observation_identifier is not None else None
+            entries.append(create_post_bundle_entry("Observation", observation_fhir, observation_temporary_ids[i],
+                                                    observation_if_none_exist))
+        return entries
+
+    def build_bundle_entry_dicts_for_upload(self, subject_fhir_id: str = None,
+                                            conditional: bool = False) -> list[dict]:
+        """Json counterpart of build_bundle_entries_for_upload, built by to_fhir_dict.
+        :param subject_fhir_id: FHIR ID of the donor to which the sample belongs. Not needed if conditional is True.
+        :param conditional: if True, the donor and the sample are referenced by conditional references and the
+        resources are created conditionally, as in build_bundle_entries_for_upload
+        :return: list of json representations of the POST bundle entries"""
+        sample_bundle_temporary_id = str(uuid.uuid4())
+        subject_reference = create_conditional_reference("Patient", self.donor_identifier) if conditional \
+            else f"Patient/{subject_fhir_id}"
+        sample_fhir = self.to_fhir_dict(subject_reference=subject_reference)
+        sample_if_none_exist = create_identifier_search_query(self.identifier) if conditional else None
+        entries = [create_post_bundle_entry_dict("Specimen", sample_fhir, sample_bundle_temporary_id,
+                                                 sample_if_none_exist)]
+        for observation in self._observations:
+            observation_fhir = observation.to_fhir_dict(patient_reference=subject_reference,
+                                                        sample_reference=sample_bundle_temporary_id)
+            observation_if_none_exist = create_identifier_search_query(observation.observation_identifier) \
+                if conditional and observation.observation_identifier is not None else None
+            entries.append(create_post_bundle_entry_dict("Observation", observation_fhir, str(uuid.uuid4()),
+                                                         observation_if_none_exist))
+        return entries
+
+    def __resolve_subject_reference(self, subject_fhir_id: str | None, subject_reference: str | None) -> str:
+        if subject_reference is not None:
+            return subject_reference
+        subject_fhir_id = subject_fhir_id or self.subject_fhir_id
+        if subject_fhir_id is None:
+            raise ValueError("Subject FHIR ID must be provided either as an argument or as a property")
+        return f"Patient/{subject_fhir_id}"
 
     def __create_body_site(self) -> CodeableConcept:
         """Create body site codeable concept."""
@@ -1,6 +1,8 @@
+import uuid
 from datetime import datetime
 from typing import Self
 
+from fhirclient.models.bundle import BundleEntry
 from fhirclient.models.extension import Extension
 from fhirclient.models.fhirdate import FHIRDate
 from fhirclient.models.meta import Meta
@@ -10,8 +12,15 @@ from miabis_model.gender import Gender
 from miabis_model.incorrect_json_format import IncorrectJsonFormatException
 from miabis_model.util.config import FHIRConfig
 from miabis_model.util.constants import DONOR_DATASET_TYPE
-from miabis_model.util.parsing_util import get_nested_value
-from miabis_model.util.util import create_fhir_identifier, create_codeable_concept_extension
+from miabis_model.util.parsing_util import compile_path, get_fhir_id, get_identifier_value, get_version_id, \
+    create_unchecked
+from miabis_model.util.util import create_fhir_identifier, create_codeable_concept_extension, \
+    create_post_bundle_entry, create_identifier_search_query, create_resource_dict, create_fhir_identifier_dict, \
+    create_codeable_concept_extension_dict, create_post_bundle_entry_dict
+
+_get_gender = compile_path(["gender"])
+_get_birth_date = compile_path(["birthDate"])
+_get_dataset_type = compile_path(["extension", 0, "valueCodeableConcept", "coding", 0, "code"])
 
 
 class SampleDonor:
@@ -38,6 +47,7 @@ class SampleDonor:
             raise ValueError(f"bad dataset type: has to be one of the following: {DONOR_DATASET_TYPE}")
         self._dataset_type = dataset_type
         self._donor_fhir_id = None
+        self._version_id = None
 
     @property
     def identifier(self) -> str:
@@ -87,35 +97,47 @@ class SampleDonor:
     def donor_fhir_id(self) -> str:
         return self._donor_fhir_id
 
+    @property
+    def version_id(self) -> str:
+        """Version (meta.versionId) of the donor resource this object was built from,
+        used for conditional updates (If-Match)."""
+        return self._version_id
+
     @classmethod
-    def from_json(cls, donor_json: dict) -> Self:
+    def from_json(cls, donor_json: dict, trusted: bool = False) -> Self:
         """
         Build MoFSampleDonor instance from json representation of this fhir resource
         :param donor_json: json to be build from
+        :param trusted: if True, the values are not validated, for json which was validated when it was written
         :return: MoFSampleDonor instance
         """
         try:
-            donor_id = get_nested_value(donor_json, ["id"])
-            donor_identifier = get_nested_value(donor_json, ["identifier", 0, "value"])
+            donor_id = get_fhir_id(donor_json)
+            donor_identifier = get_identifier_value(donor_json)
             gender = cls._parse_gender(donor_json)
             birth_date = cls._parse_date_birth(donor_json)
-            dataset_type = get_nested_value(donor_json, ["extension", 0, "valueCodeableConcept", "coding", 0, "code"])
-            instance = cls(donor_identifier, gender, birth_date, dataset_type)
+            dataset_type = _get_dataset_type(donor_json)
+            if trusted:
+                instance = create_unchecked(cls, _identifier=donor_identifier, _gender=gender,
+                                            _date_of_birth=birth_date, _dataset_type=dataset_type)
+            else:
+                instance = cls(donor_identifier, gender, birth_date, dataset_type)
             instance._donor_fhir_id = donor_id
+            instance._version_id = get_version_id(donor_json)
             return instance
         except KeyError:
             raise IncorrectJsonFormatException("Error occured when parsing json into the MoFSampleDonor")
 
     @staticmethod
     def _parse_gender(data: dict) -> Gender | None:
-        gender = get_nested_value(data, ["gender"])
+        gender = _get_gender(data)
         if gender is not None:
             gender = Gender.from_string(gender)
         return gender
 
     @staticmethod
     def _parse_date_birth(data: dict) -> datetime | None:
-        date_string = get_nested_value(data, ["birthDate"])
+        date_string = _get_birth_date(data)
         if date_string is not None:
             return datetime.strptime(date_string, "%Y-%m-%d")
         return None
@@ -141,6 +163,36 @@ class SampleDonor:
             fhir_patient.extension = extensions
         return fhir_patient
 
+    def to_fhir_dict(self) -> dict:
+        """Return json representation of the sample donor in FHIR, equal to to_fhir().as_json(),
+        but built directly, without the fhirclient objects."""
+        patient = create_resource_dict("Patient", FHIRConfig.get_meta_profile_url("donor"))
+        patient["identifier"] = [create_fhir_identifier_dict(self.identifier)]
+        if self.gender is not None:
+            patient["gender"] = self._gender.name.lower()
+        if self.date_of_birth is not None:
+            patient["birthDate"] = self.date_of_birth.date().isoformat()
+        if self.dataset_type is not None:
+            patient["extension"] = [
+                create_codeable_concept_extension_dict(FHIRConfig.get_extension_url("donor", "dataset_type"),
+                                                       FHIRConfig.get_value_set_url("donor", "dataset_type"),
+                                                       self.dataset_type)]
+        return patient
+
+    def build_bundle_entry_for_upload(self, conditional: bool = False) -> BundleEntry:
+        """Build bundle entry for uploading this donor.
+        :param conditional: if True, the donor is created only if no donor with the same identifier exists
+        :return: POST bundle entry"""
+        if_none_exist = create_identifier_search_query(self.identifier) if conditional else None
+        return create_post_bundle_entry("Patient", self.to_fhir(), str(uuid.uuid4()), if_none_exist)
+
+    def build_bundle_entry_dict_for_upload(self, conditional: bool = False) -> dict:
+        """Json counterpart of build_bundle_entry_for_upload, built by to_fhir_dict.
+        :param conditional: if True, the donor is created only if no donor with the same identifier exists
+        :return: json representation of the POST bundle entry"""
+        if_none_exist = create_identifier_search_query(self.identifier) if conditional else None
+        return create_post_bundle_entry_dict("Patient", self.to_fhir_dict(), str(uuid.uuid4()), if_none_exist)
+
     def add_fhir_id_to_donor(self, donor: Patient) -> Patient:
         """Add FHIR id to the FHIR representation of the donor. FHIR ID is necessary for updating the
         resource on the server.This method should only be called if the Donor object was created by the
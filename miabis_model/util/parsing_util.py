@@ -1,5 +1,8 @@
+from functools import lru_cache
+from typing import Any, Callable
+
 from dateutil import parser as date_parser
-from datetime import date
+from datetime import date, datetime
 
 from miabis_model.util.constants import DETAILED_MATERIAL_TYPE_TO_COLLECTION_MATERIAL_TYPE_MAP
 
@@ -15,6 +18,149 @@ def get_nested_value(data: dict, keys: list):
     return data
 
 
+def compile_path(keys: list) -> Callable[[dict], Any]:
+    """Compile a path of keys into a function returning the nested value, the same as get_nested_value does.
+    The path is walked by a chain of closures, one specialized for every key, so the function does not loop over
+    the keys and does not check types of the keys on every call. Compiled paths are cached.
+    :param keys: keys of dictionaries (str) and indices of lists (int) leading to the value
+    :return: function taking the json object and returning the nested value, None if it is not present
+    """
+    return _compile_path(tuple(keys))
+
+
+@lru_cache(maxsize=None)
+def _compile_path(keys: tuple) -> Callable[[dict], Any]:
+    if not keys:
+        return _get_itself
+    # the closures are chained from the last key, every one of them passes its value to the closure of the next key
+    get_value = None
+    for key in reversed(keys):
+        get_value = _create_index_step(key, get_value) if isinstance(key, int) else _create_key_step(key, get_value)
+    return get_value
+
+
+def _get_itself(data):
+    return data
+
+
+def _create_key_step(key, get_rest: Callable[[Any], Any] | None) -> Callable[[Any], Any]:
+    if get_rest is None:
+        def get(data):
+            return data.get(key) if data else None
+    else:
+        def get(data):
+            data = data.get(key) if data else None
+            return None if data is None else get_rest(data)
+    return get
+
+
+def _create_index_step(index: int, get_rest: Callable[[Any], Any] | None) -> Callable[[Any], Any]:
+    if get_rest is None:
+        def get(data):
+            if isinstance(data, list):
+                return data[index] if index < len(data) else None
+            return data.get(index) if data else None
+    else:
+        def get(data):
+            if isinstance(data, list):
+                data = data[index] if index < len(data) else None
+            else:
+                data = data.get(index) if data else None
+            return None if data is None else get_rest(data)
+    return get
+
+
+get_fhir_id = compile_path(["id"])
+get_identifier_value = compile_path(["identifier", 0, "value"])
+get_version_id = compile_path(["meta", "versionId"])
+get_name = compile_path(["name"])
+get_alias = compile_path(["alias", 0])
+get_country = compile_path(["address", 0, "country"])
+get_url = compile_path(["telecom", 0, "value"])
+get_subject_reference = compile_path(["subject", "reference"])
+get_part_of_reference = compile_path(["partOf", "reference"])
+get_managing_entity_reference = compile_path(["managingEntity", "reference"])
+get_value_reference = compile_path(["valueReference", "reference"])
+get_codeable_concept_code = compile_path(["valueCodeableConcept", "coding", 0, "code"])
+get_string_value = compile_path(["valueString"])
+get_value_identifier_value = compile_path(["valueIdentifier", "value"])
+
+
+class ExtensionParser:
+    """Parses extensions of a resource by dispatching every extension to the handler registered for its URL,
+    instead of comparing the URL with every known extension. Extensions with unknown URLs are skipped."""
+
+    def __init__(self, handlers: dict[str, Callable[[dict, dict], None]]):
+        """
+        :param handlers: dictionary mapping URL of the extension to a handler, called with the dictionary
+        of parsed values and the extension
+        """
+        self._handlers = handlers
+
+    def parse(self, extensions: list[dict] | None, parsed: dict) -> dict:
+        """Parse the extensions.
+        :param extensions: list of extensions in the json, None if there are none.
+        :param parsed: dictionary with default values, filled by the handlers
+        :return: the dictionary with parsed values
+        :raises KeyError: if any extension has no URL
+        """
+        handlers = self._handlers
+        for extension in extensions or ():
+            handler = handlers.get(extension["url"])
+            if handler is not None:
+                handler(parsed, extension)
+        return parsed
+
+
+def set_value(field: str, get_value: Callable[[dict], Any], skip_none: bool = True) -> Callable[[dict, dict], None]:
+    """Create an extension handler storing a value of the extension as the field.
+    :param field: name of the parsed field
+    :param get_value: compiled path to the value within the extension
+    :param skip_none: if True, missing value does not overwrite the field
+    :return: extension handler
+    """
+
+    def handler(parsed: dict, extension: dict):
+        value = get_value(extension)
+        if value is not None or not skip_none:
+            parsed[field] = value
+
+    return handler
+
+
+def append_value(field: str, get_value: Callable[[dict], Any], skip_none: bool = True,
+                 convert: Callable[[Any], Any] = None) -> Callable[[dict, dict], None]:
+    """Create an extension handler appending a value of the extension to the list stored as the field.
+    :param field: name of the parsed field, its default value must be a list
+    :param get_value: compiled path to the value within the extension
+    :param skip_none: if True, missing value is not appended
+    :param convert: function applied to the value before it is appended
+    :return: extension handler
+    """
+
+    def handler(parsed: dict, extension: dict):
+        value = get_value(extension)
+        if value is None and skip_none:
+            return
+        parsed[field].append(convert(value) if convert is not None else value)
+
+    return handler
+
+
+def create_unchecked(cls: type, **attributes):
+    """Create an instance of the class with its attributes set directly, without calling the constructor,
+    so that none of the validations of the constructor and of the property setters is run.
+    Meant for hydrating resources which were already validated when they were written, so the given
+    attributes must be complete and valid.
+    :param cls: class of the instance
+    :param attributes: (private) attributes of the instance
+    :return: the instance
+    """
+    instance = cls.__new__(cls)
+    instance.__dict__.update(attributes)
+    return instance
+
+
 def parse_reference_id(reference: str) -> str:
     """Helper method to parse reference id."""
     return reference.split("/")[-1]
@@ -34,5 +180,14 @@ def parse_date_from_string(date_str: str) -> date:
     return date_parser.parse(date_str).date()
 
 
+def parse_datetime_from_string(datetime_str: str) -> datetime:
+    """Parse datetime from string. FHIR dateTime values in the ISO 8601 format are parsed by the (much faster)
+    datetime.fromisoformat, any other format by dateutil."""
+    try:
+        return datetime.fromisoformat(datetime_str)
+    except ValueError:
+        return date_parser.parse(datetime_str)
+
+
 def get_material_type_from_detailed_material_type(detailed_material_type: str) -> str:
     return DETAILED_MATERIAL_TYPE_TO_COLLECTION_MATERIAL_TYPE_MAP.get(detailed_material_type, None)
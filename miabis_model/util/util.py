@@ -1,3 +1,5 @@
+from urllib.parse import urlencode
+
 from fhirclient.models.address import Address
 from fhirclient.models.bundle import BundleEntry, BundleEntryRequest, Bundle
 from fhirclient.models.codeableconcept import CodeableConcept
@@ -64,19 +66,148 @@ def create_country_of_residence(country: str) -> Address:
     return address
 
 
-def create_post_bundle_entry(resource_type: str, resource, temporary_id: str) -> BundleEntry:
+def create_post_bundle_entry(resource_type: str, resource, temporary_id: str, if_none_exist: str = None) \
+        -> BundleEntry:
+    """Create bundle entry for creating a resource.
+    :param resource_type: type of the resource
+    :param resource: FHIR resource to create
+    :param temporary_id: temporary id (fullUrl) by which other entries of the same bundle can reference the resource
+    :param if_none_exist: search query, the resource is created only if no resource matches it (conditional create)
+    :return: BundleEntry"""
     entry = BundleEntry()
     entry.request = BundleEntryRequest()
     entry.fullUrl = temporary_id
     entry.resource = resource
     entry.request.method = "POST"
     entry.request.url = f"/{resource_type}"
+    if if_none_exist is not None:
+        entry.request.ifNoneExist = if_none_exist
     return entry
 
 
-def create_bundle(entries: list[BundleEntry]) -> Bundle:
-    """Create a bundle used for deleting multiple FHIR resources in a transaction"""
+def escape_search_value(value: str) -> str:
+    """Escape characters which have a special meaning in FHIR search values (\\ , $ |),
+    so that the value can be joined with others into a single comma separated OR search."""
+    for special_character in ("\\", ",", "$", "|"):
+        value = value.replace(special_character, "\\" + special_character)
+    return value
+
+
+def create_identifier_search_query(identifier: str) -> str:
+    """Create search query matching resources by their identifier, e.g. identifier=donorId.
+    Characters with special meaning in FHIR search values (\\ , $ |) are escaped."""
+    return urlencode({"identifier": escape_search_value(identifier)})
+
+
+def create_conditional_reference(resource_type: str, identifier: str) -> str:
+    """Create conditional reference to a resource by its identifier, e.g. Patient?identifier=donorId.
+    Conditional references are resolved by the server when the bundle containing them is processed as a transaction."""
+    return f"{resource_type}?{create_identifier_search_query(identifier)}"
+
+
+def create_bundle(entries: list[BundleEntry], bundle_type: str = "transaction") -> Bundle:
+    """Create a bundle used for uploading/deleting multiple FHIR resources.
+    :param entries: entries of the bundle
+    :param bundle_type: "transaction" (all entries succeed or fail together) or "batch" (entries are independent)"""
     bundle = Bundle()
-    bundle.type = "transaction"
+    bundle.type = bundle_type
     bundle.entry = entries
     return bundle
+
+
+def create_codeable_concept_extension_dict(extension_url: str, codeable_concept_url, value: str) -> dict:
+    """Json counterpart of create_codeable_concept_extension, equal to its as_json()."""
+    return {"url": extension_url, "valueCodeableConcept": create_codeable_concept_dict(codeable_concept_url, value)}
+
+
+def create_codeable_concept_dict(url: str, code: str) -> dict:
+    """Json counterpart of create_codeable_concept, equal to its as_json()."""
+    return {"coding": [create_coding_dict(url, code)]}
+
+
+def create_coding_dict(system: str | None, code: str | None) -> dict:
+    coding = {}
+    if code is not None:
+        coding["code"] = code
+    if system is not None:
+        coding["system"] = system
+    return coding
+
+
+def create_integer_extension_dict(extension_url: str, value: int) -> dict:
+    """Json counterpart of create_integer_extension, equal to its as_json()."""
+    extension = {"url": extension_url}
+    if value is not None:
+        extension["valueInteger"] = value
+    return extension
+
+
+def create_string_extension_dict(extension_url: str, value: str) -> dict:
+    """Json counterpart of create_string_extension, equal to its as_json()."""
+    extension = {"url": extension_url}
+    if value is not None:
+        extension["valueString"] = value
+    return extension
+
+
+def create_fhir_identifier_dict(identifier: str) -> dict:
+    """Json counterpart of create_fhir_identifier, equal to its as_json()."""
+    return {"value": identifier} if identifier is not None else {}
+
+
+def create_reference_dict(reference: str) -> dict:
+    return {"reference": reference}
+
+
+def create_contact_dict(name: str, surname: str, email: str) -> dict:
+    """Json counterpart of create_contact, equal to its as_json()."""
+    human_name = {}
+    if surname is not None:
+        human_name["family"] = surname
+    if name is not None:
+        human_name["given"] = [name]
+    telecom = {"system": "email"}
+    if email is not None:
+        telecom["value"] = email
+    return {"name": human_name, "telecom": [telecom]}
+
+
+def create_country_of_residence_dict(country: str) -> dict:
+    """Json counterpart of create_country_of_residence, equal to its as_json()."""
+    return {"country": country} if country is not None else {}
+
+
+def create_url_contact_point_dict(url: str) -> dict:
+    return {"system": "url", "value": url}
+
+
+def create_resource_dict(resource_type: str, profile: str) -> dict:
+    """Create json representation of a resource with the MIABIS profile, the base of all the to_fhir_dict methods.
+    :param resource_type: type of the resource
+    :param profile: url of the profile (meta.profile)
+    :return: json representation of the resource"""
+    return {"resourceType": resource_type, "meta": {"profile": [profile]}}
+
+
+def create_post_bundle_entry_dict(resource_type: str, resource: dict, temporary_id: str,
+                                  if_none_exist: str = None) -> dict:
+    """Json counterpart of create_post_bundle_entry, taking the json representation of the resource.
+    :param resource_type: type of the resource
+    :param resource: json representation of the resource to create
+    :param temporary_id: temporary id (fullUrl) by which other entries of the same bundle can reference the resource
+    :param if_none_exist: search query, the resource is created only if no resource matches it (conditional create)
+    :return: json representation of the bundle entry"""
+    request = {"method": "POST", "url": f"/{resource_type}"}
+    if if_none_exist is not None:
+        request["ifNoneExist"] = if_none_exist
+    return {"fullUrl": temporary_id, "resource": resource, "request": request}
+
+
+def create_bundle_dict(entries: list[dict], bundle_type: str = "transaction") -> dict:
+    """Json counterpart of create_bundle, taking json representations of the entries.
+    :param entries: json representations of the entries of the bundle
+    :param bundle_type: "transaction" (all entries succeed or fail together) or "batch" (entries are independent)"""
+    bundle = {"resourceType": "Bundle", "type": bundle_type}
+    if entries:
+        bundle["entry"] = entries
+    return bundle
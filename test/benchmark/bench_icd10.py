@@ -0,0 +1,50 @@
+"""Micro-benchmark of validating and normalizing ICD-10 codes.
+
+Run from the root of the repository:
+
+    python -m test.benchmark.bench_icd10 [number of codes]
+
+Reports the time of validating the diagnoses of observations by simple_icd_10 and by the indexed ICD10Service,
+and the time of normalizing them to the dotted form.
+"""
+import random
+import sys
+import time
+from typing import Callable
+
+import simple_icd_10 as icd10
+
+from miabis_model import ICD10Service
+
+
+def measure(name: str, count: int, function: Callable[[], None]):
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<45} {elapsed:8.3f} s {count / elapsed:12,.0f} codes/s")
+    return elapsed
+
+
+def main(count: int):
+    # diagnoses of observations are mostly categories and subcategories without the dot, e.g. C51 and C188
+    generator = random.Random(0)
+    codes = [code for code in icd10.get_all_codes(with_dots=False) if icd10.is_category_or_subcategory(code)]
+    observation_codes = [generator.choice(codes) for _ in range(count)]
+    service = ICD10Service()
+
+    print(f"Validating {count:,} ICD-10 codes")
+    start = time.perf_counter()
+    service.is_valid("C51")
+    print(f"{'Index built on first use':<45} {time.perf_counter() - start:8.3f} s")
+    simple_icd_10_time = measure("simple_icd_10.is_valid_item", count,
+                                 lambda: [icd10.is_valid_item(code) for code in observation_codes])
+    is_valid_time = measure("ICD10Service.is_valid", count,
+                            lambda: [service.is_valid(code) for code in observation_codes])
+    validate_many_time = measure("ICD10Service.validate_many", count, lambda: service.validate_many(observation_codes))
+    print(f"{'Speedup of is_valid':<45} {simple_icd_10_time / is_valid_time:8.2f} x")
+    print(f"{'Speedup of validate_many':<45} {simple_icd_10_time / validate_many_time:8.2f} x")
+    measure("ICD10Service.normalize_many", count, lambda: service.normalize_many(observation_codes))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
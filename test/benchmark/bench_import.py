@@ -0,0 +1,62 @@
+"""Benchmark of the import time of the packages, measured by python -X importtime.
+
+Run from the root of the repository:
+
+    python -m test.benchmark.bench_import [number of runs]
+
+Every import is measured in a fresh interpreter, the median of the runs is reported. The imports of the packages
+themselves are checked against IMPORT_BUDGETS, the command fails if any of them is exceeded, so it can be used to
+catch regressions of the lazy imports. The imports of the classes are reported for information.
+"""
+import statistics
+import subprocess
+import sys
+
+# statement -> the budget of its import time in milliseconds, None for no budget
+IMPORT_BUDGETS = {
+    "import miabis_model": 50,
+    "import blaze_client": 50,
+    "import miabis_model, blaze_client": 50,
+    "from miabis_model import Sample": None,
+    "from blaze_client import BlazeClient": None,
+}
+
+
+def measure_import(statement: str) -> float:
+    """Import time of the statement in milliseconds, i.e. the sum of the cumulative times of the top level imports
+    reported by python -X importtime."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                               capture_output=True, text=True, check=True)
+    total = 0
+    after_startup = False
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        # nested imports are indented, their times are included in the cumulative time of the top level import
+        if module.startswith("  "):
+            continue
+        if after_startup:
+            total += int(cumulative)
+        # the modules imported on the start of the interpreter, up to site, are not included
+        after_startup = after_startup or module.strip() == "site"
+    return total / 1000
+
+
+def main(runs: int) -> int:
+    print(f"Median import time of {runs} runs")
+    exceeded = []
+    for statement, budget in IMPORT_BUDGETS.items():
+        times = [measure_import(statement) for _ in range(runs)]
+        median = statistics.median(times)
+        budget_text = f"budget {budget} ms" if budget is not None else ""
+        print(f"{statement:<45} {median:8.1f} ms   {budget_text}".rstrip())
+        if budget is not None and median > budget:
+            exceeded.append(statement)
+    for statement in exceeded:
+        print(f"Import time budget exceeded: {statement}")
+    return 1 if exceeded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5))
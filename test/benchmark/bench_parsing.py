@@ -0,0 +1,131 @@
+"""Micro-benchmark of parsing FHIR json into the MIABIS on FHIR model.
+
+Run from the root of the repository:
+
+    python -m test.benchmark.bench_parsing [number of resources]
+
+Reports the time of reading the nested values of the resources by get_nested_value and by compiled paths,
+and the throughput of from_json of the models, with and without validation (trusted).
+"""
+import sys
+import time
+from datetime import datetime
+from typing import Callable
+
+from miabis_model import Biobank, Collection, Condition, Gender, Sample, SampleDonor, StorageTemperature, \
+    _Observation
+from miabis_model.util.parsing_util import get_nested_value, compile_path
+
+SAMPLE_PATHS = [["id"], ["identifier", 0, "value"], ["type", "coding", 0, "code"],
+                ["collection", "collectedDateTime"], ["collection", "bodySite", "coding", 0, "code"],
+                ["collection", "bodySite", "coding", 0, "system"],
+                ["processing", 0, "extension", 0, "valueCodeableConcept", "coding", 0, "code"], ["note", 0, "text"],
+                ["extension", 0, "valueIdentifier", "value"], ["subject", "reference"], ["meta", "versionId"]]
+
+
+def create_sample_json(i: int) -> dict:
+    sample = Sample(f"sample{i}", f"donor{i}", "Urine", collected_datetime=datetime(year=2022, month=10, day=5),
+                    body_site="arm", body_site_system="http://www.example.com",
+                    storage_temperature=StorageTemperature.TEMPERATURE_LN, use_restrictions="No restrictions",
+                    sample_collection_id="collectionId")
+    sample_json = sample.to_fhir_dict(f"donorFhirId{i}")
+    sample_json["id"] = f"sampleFhirId{i}"
+    sample_json["meta"]["versionId"] = "1"
+    return sample_json
+
+
+def create_observation_json(i: int) -> dict:
+    observation_json = _Observation("C51", f"sample{i}", f"donor{i}", datetime(year=2020, month=10, day=5),
+                                    f"observation{i}").to_fhir_dict(f"donorFhirId{i}", f"sampleFhirId{i}")
+    observation_json["id"] = f"observationFhirId{i}"
+    return observation_json
+
+
+def create_donor_json(i: int) -> dict:
+    donor_json = SampleDonor(f"donor{i}", Gender.FEMALE, datetime(year=1990, month=5, day=3)).to_fhir_dict()
+    donor_json["id"] = f"donorFhirId{i}"
+    return donor_json
+
+
+def create_condition_json(i: int) -> dict:
+    condition_json = Condition(f"donor{i}", "C51", f"condition{i}").to_fhir_dict(f"donorFhirId{i}")
+    condition_json["id"] = f"conditionFhirId{i}"
+    return condition_json
+
+
+def create_biobank_jsons() -> tuple[dict, dict]:
+    biobank = Biobank("biobankId", "biobankName", "CZ", "contactName", "contactSurname", "contactEmail",
+                      "juristicPerson", "description", alias="alias", url="https://biobank.com",
+                      infrastructural_capabilities=["SampleStorage"], organisational_capabilities=["RecontactDonors"],
+                      bioprocessing_and_analysis_capabilities=["Genomics"], quality__management_standards=["ISO9001"])
+    juristic_person_json = biobank.juristic_person.to_fhir_dict()
+    juristic_person_json["id"] = "juristicPersonFhirId"
+    return biobank.to_fhir_dict("juristicPersonFhirId"), juristic_person_json
+
+
+def create_collection_jsons() -> tuple[dict, dict]:
+    collection = Collection("collectionId", "collectionName", "biobankId", "contactName", "contactSurname",
+                            "contactEmail", "CZ", [Gender.MALE, Gender.FEMALE], "description", ["Urine", "Serum"],
+                            age_range_low=10, age_range_high=100,
+                            storage_temperatures=[StorageTemperature.TEMPERATURE_LN], diagnoses=["C51", "C188"],
+                            number_of_subjects=10, inclusion_criteria=["Sex"], alias="alias",
+                            url="https://collection.com", dataset_type="LifeStyle", sample_source="Human",
+                            sample_collection_setting="Environment", collection_design=["CaseControl"],
+                            use_and_access_conditions=["CommercialUse"], publications=["publication"])
+    collection_json = collection.to_fhir_dict("collectionOrgFhirId", [f"sampleFhirId{i}" for i in range(10)])
+    collection_org_json = collection.collection_organization.to_fhir_dict("biobankFhirId")
+    return collection_json, collection_org_json
+
+
+def measure(name: str, count: int, function: Callable[[], None]):
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<45} {elapsed:8.3f} s {count / elapsed:12,.0f} resources/s")
+    return elapsed
+
+
+def main(count: int):
+    sample_jsons = [create_sample_json(i) for i in range(count)]
+    observation_jsons = [create_observation_json(i) for i in range(count)]
+    donor_jsons = [create_donor_json(i) for i in range(count)]
+    condition_jsons = [create_condition_json(i) for i in range(count)]
+    biobank_json, juristic_person_json = create_biobank_jsons()
+    collection_json, collection_org_json = create_collection_jsons()
+    compiled_paths = [compile_path(keys) for keys in SAMPLE_PATHS]
+
+    print(f"Parsing {count:,} resources of every type")
+
+    def read_by_get_nested_value():
+        for sample_json in sample_jsons:
+            for keys in SAMPLE_PATHS:
+                get_nested_value(sample_json, keys)
+
+    def read_by_compiled_paths():
+        for sample_json in sample_jsons:
+            for get_value in compiled_paths:
+                get_value(sample_json)
+
+    nested_value_time = measure("Specimen values by get_nested_value", count, read_by_get_nested_value)
+    compiled_time = measure("Specimen values by compiled paths", count, read_by_compiled_paths)
+    print(f"{'Speedup of the compiled paths':<45} {nested_value_time / compiled_time:8.2f} x")
+
+    for trusted in (False, True):
+        suffix = " (trusted)" if trusted else ""
+        measure("SampleDonor.from_json" + suffix, count,
+                lambda: [SampleDonor.from_json(donor_json, trusted=trusted) for donor_json in donor_jsons])
+        measure("Sample.from_json (with an observation)" + suffix, count,
+                lambda: [Sample.from_json(sample_json, [observation_json], f"donor{i}", trusted=trusted)
+                         for i, (sample_json, observation_json) in enumerate(zip(sample_jsons, observation_jsons))])
+        measure("Condition.from_json" + suffix, count,
+                lambda: [Condition.from_json(condition_json, "donor", trusted=trusted)
+                         for condition_json in condition_jsons])
+        measure("Biobank.from_json" + suffix, count,
+                lambda: [Biobank.from_json(biobank_json, juristic_person_json, trusted=trusted) for _ in range(count)])
+        measure("Collection.from_json" + suffix, count,
+                lambda: [Collection.from_json(collection_json, collection_org_json, "biobankId", [], trusted=trusted)
+                         for _ in range(count)])
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
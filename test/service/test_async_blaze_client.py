@@ -0,0 +1,174 @@
+import datetime
+import unittest
+
+import aiohttp
+
+from blaze_client import NonExistentResourceException
+from blaze_client.async_blaze_client import AsyncBlazeClient
+from miabis_model import Biobank
+from miabis_model import Collection
+from miabis_model import Condition
+from miabis_model import Gender
+from miabis_model import Network
+from miabis_model import Sample
+from miabis_model import SampleDonor
+from miabis_model import StorageTemperature
+
+
+class TestAsyncBlazeService(unittest.IsolatedAsyncioTestCase):
+    example_donor = SampleDonor("donorId", Gender.MALE, datetime.datetime(year=2015, month=10, day=20), "Other")
+    example_samples = [Sample("sampleId", "donorId", "Urine", datetime.datetime(year=2001, month=10, day=20),
+                              storage_temperature=StorageTemperature.TEMPERATURE_LN, diagnoses_with_observed_datetime=[
+            ("C50", datetime.datetime(year=2022, month=10, day=20)),
+            ("C51", datetime.datetime(year=2021, month=10, day=20))], sample_collection_id="collectionId"),
+                       Sample("sampleId2", "donorId", "Nail", datetime.datetime(year=2020, month=11, day=21),
+                              storage_temperature=StorageTemperature.TEMPERATURE_ROOM,
+                              diagnoses_with_observed_datetime=[
+                                  ("C50", datetime.datetime(year=2020, month=10, day=20)),
+                                  ("C45", datetime.datetime(year=2019, month=10, day=20))],
+                              sample_collection_id="collectionId")
+                       ]
+    example_condition = Condition("donorId")
+
+    example_biobank = Biobank("biobankId", "biobankName", "CZ", "ContactName", "ContactSurname",
+                              "email", "juristic_person", "description", infrastructural_capabilities=["SampleStorage"],
+                              organisational_capabilities=["RecontactDonors"],
+                              bioprocessing_and_analysis_capabilities=["Genomics"])
+
+    example_collection = Collection(identifier="collectionId", name="collectionName", managing_biobank_id="biobankId",
+                                    contact_name="contactName", contact_surname="contactSurname",
+                                    contact_email="contactEmail", country="cz", genders=[Gender.MALE],
+                                    material_types=["Urine"], inclusion_criteria=["Sex"],
+                                    alias="collectionAlias", url="urlExample.com", description="description",
+                                    dataset_type="LifeStyle", sample_source="Human",
+                                    sample_collection_setting="Environment", collection_design=["CaseControl"],
+                                    use_and_access_conditions=["CommercialUse"], publications=["publication"])
+
+    example_network = Network(identifier="networkId", name="networkName", contact_email="contactEmail", country="cz",
+                              juristic_person="juristicPerson",
+                              members_collections_ids=["collectionId"],
+                              members_biobanks_ids=["biobankId"], contact_name="contactName",
+                              contact_surname="contactSurname", common_collaboration_topics=["Charter"],
+                              description="description")
+
+    async def asyncSetUp(self):
+        self.blaze_service = AsyncBlazeClient("http://localhost:8080/fhir", "", "", max_concurrency=8)
+
+    async def asyncTearDown(self):
+        try:
+            donor_fhir_id = await self.blaze_service.get_fhir_id("Patient", self.example_donor.identifier)
+            if donor_fhir_id is not None:
+                if not await self.blaze_service.delete_donor(donor_fhir_id):
+                    raise Exception("could not delete patient")
+            biobank_fhir_id = await self.blaze_service.get_fhir_id("Organization", self.example_biobank.identifier)
+            if biobank_fhir_id is not None:
+                if not await self.blaze_service.delete_biobank(biobank_fhir_id):
+                    raise Exception("could not delete biobank")
+        except NonExistentResourceException:
+            pass
+        finally:
+            await self.blaze_service.close()
+
+    async def test_blaze_service_unreachable_raises_connection_error(self):
+        async with AsyncBlazeClient("https://badUrl", "", "", retries=0) as blaze_service:
+            with self.assertRaises(aiohttp.ClientConnectionError):
+                await blaze_service.upload_donor(self.example_donor)
+
+    async def test_upload_donor(self):
+        donor_fhir_id = await self.blaze_service.upload_donor(self.example_donor)
+        self.assertTrue(await self.blaze_service.is_resource_present_in_blaze("Patient", donor_fhir_id))
+
+    async def test_upload_samples_concurrently(self):
+        await self.blaze_service.upload_donor(self.example_donor)
+        sample_fhir_ids = [await self.blaze_service.upload_sample(sample) for sample in self.example_samples]
+        samples = [await self.blaze_service.build_sample_from_json(sample_fhir_id)
+                   for sample_fhir_id in sample_fhir_ids]
+        self.assertEqual(self.example_samples, samples)
+
+    async def test_upload_sample_nonexistent_donor_raises(self):
+        with self.assertRaises(NonExistentResourceException):
+            await self.blaze_service.upload_sample(self.example_samples[0])
+
+    async def test_upload_condition(self):
+        await self.blaze_service.upload_donor(self.example_donor)
+        condition_fhir_id = await self.blaze_service.upload_condition(self.example_condition)
+        condition = await self.blaze_service.build_condition_from_json(condition_fhir_id)
+        self.assertEqual(self.example_condition.patient_identifier, condition.patient_identifier)
+
+    async def test_upload_donors_samples_and_conditions_in_bundles(self):
+        donor_fhir_ids = await self.blaze_service.upload_donors([self.example_donor])
+        sample_fhir_ids = await self.blaze_service.upload_samples(self.example_samples, bundle_size=1)
+        condition_fhir_ids = await self.blaze_service.upload_conditions([self.example_condition])
+        self.assertIn(self.example_donor.identifier, donor_fhir_ids)
+        self.assertCountEqual([sample.identifier for sample in self.example_samples], sample_fhir_ids.keys())
+        self.assertEqual(1, len(condition_fhir_ids))
+        self.assertIsNotNone(condition_fhir_ids[0])
+
+    async def test_upload_conditions_of_the_same_donor(self):
+        await self.blaze_service.upload_donors([self.example_donor])
+        conditions = [Condition(self.example_donor.identifier, "C51", "conditionId1"),
+                      Condition(self.example_donor.identifier, "C188", "conditionId2")]
+        condition_fhir_ids = await self.blaze_service.upload_conditions(conditions, bundle_size=1)
+        self.assertEqual(2, len(set(condition_fhir_ids)))
+        for condition, condition_fhir_id in zip(conditions, condition_fhir_ids):
+            uploaded_condition = await self.blaze_service.build_condition_from_json(condition_fhir_id)
+            self.assertEqual(condition.condition_identifier, uploaded_condition.condition_identifier)
+
+    async def test_update_donor_if_match(self):
+        donor_fhir_id = await self.blaze_service.upload_donor(self.example_donor)
+        donor = await self.blaze_service.build_donor_from_json(donor_fhir_id)
+        donor.gender = Gender.FEMALE
+        self.assertEqual(donor_fhir_id, await self.blaze_service.update_donor_if_match(donor))
+        self.assertEqual(Gender.FEMALE, (await self.blaze_service.build_donor_from_json(donor_fhir_id)).gender)
+
+    async def test_upload_collection_and_update_values(self):
+        await self.blaze_service.upload_biobank(self.example_biobank)
+        await self.blaze_service.upload_donor(self.example_donor)
+        for sample in self.example_samples:
+            await self.blaze_service.upload_sample(sample)
+        collection_fhir_id = await self.blaze_service.upload_collection(self.example_collection)
+        sample_fhir_ids = [await self.blaze_service.get_fhir_id("Specimen", sample.identifier)
+                           for sample in self.example_samples]
+        self.assertTrue(await self.blaze_service.add_already_present_samples_to_existing_collection(
+            sample_fhir_ids, collection_fhir_id))
+        self.assertTrue(await self.blaze_service.update_collection_values(collection_fhir_id))
+        collection = await self.blaze_service.build_collection_from_json(collection_fhir_id)
+        self.assertCountEqual(sample_fhir_ids, collection.sample_fhir_ids)
+        self.assertEqual(1, collection.number_of_subjects)
+
+    async def test_upload_network(self):
+        await self.blaze_service.upload_biobank(self.example_biobank)
+        await self.blaze_service.upload_collection(self.example_collection)
+        network_fhir_id = await self.blaze_service.upload_network(self.example_network)
+        network = await self.blaze_service.build_network_from_json(network_fhir_id)
+        self.assertEqual(self.example_network.members_collections_ids, network.members_collections_ids)
+        self.assertEqual(self.example_network.members_biobanks_ids, network.members_biobanks_ids)
+        self.assertTrue(await self.blaze_service.delete_network(network_fhir_id))
+
+    async def test_batch_get(self):
+        donor_fhir_id = await self.blaze_service.upload_donor(self.example_donor)
+        donor_json, nonexistent_json = await self.blaze_service.batch_get(
+            [f"Patient/{donor_fhir_id}", "Specimen/nonexistentId"])
+        self.assertEqual(self.example_donor.identifier, donor_json["identifier"][0]["value"])
+        self.assertIsNone(nonexistent_json)
+
+    async def test_delete_donor(self):
+        donor_fhir_id = await self.blaze_service.upload_donor(self.example_donor)
+        sample_fhir_id = await self.blaze_service.upload_sample(self.example_samples[0])
+        self.assertTrue(await self.blaze_service.delete_donor(donor_fhir_id))
+        self.assertFalse(await self.blaze_service.is_resource_present_in_blaze("Patient", donor_fhir_id))
+        self.assertFalse(await self.blaze_service.is_resource_present_in_blaze("Specimen", sample_fhir_id))
+
+    async def test_delete_donors(self):
+        donor_fhir_id = await self.blaze_service.upload_donor(self.example_donor)
+        sample_fhir_id = await self.blaze_service.upload_sample(self.example_samples[0])
+        self.assertTrue(await self.blaze_service.delete_donors([donor_fhir_id], bundle_size=1))
+        self.assertFalse(await self.blaze_service.is_resource_present_in_blaze("Patient", donor_fhir_id))
+        self.assertFalse(await self.blaze_service.is_resource_present_in_blaze("Specimen", sample_fhir_id))
+
+    async def test_delete_all_resources_fast_purge(self):
+        await self.blaze_service.upload_biobank(self.example_biobank)
+        donor_fhir_id = await self.blaze_service.upload_donor(self.example_donor)
+        self.assertTrue(await self.blaze_service.delete_all_resources(self.example_biobank.identifier,
+                                                                      fast_purge=True))
+        self.assertFalse(await self.blaze_service.is_resource_present_in_blaze("Patient", donor_fhir_id))
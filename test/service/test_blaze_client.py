@@ -156,6 +156,60 @@ class TestBlazeService(unittest.TestCase):
         non_existent_fhir_id = self.blaze_service.get_fhir_id("Patient", "nonexistentId")
         self.assertIsNone(non_existent_fhir_id)
 
+    def test_get_fhir_ids(self):
+        self.blaze_service.upload_donor(self.example_donor)
+        sample_fhir_ids = [self.blaze_service.upload_sample(sample) for sample in self.example_samples]
+        fhir_ids = self.blaze_service.get_fhir_ids("Specimen", [sample.identifier for sample in self.example_samples]
+                                                   + ["nonexistentId"])
+        self.assertEqual({"sampleId": sample_fhir_ids[0], "sampleId2": sample_fhir_ids[1]}, fhir_ids)
+
+    def test_get_fhir_ids_multiple_chunks(self):
+        blaze_service = BlazeClient("http://localhost:8080/fhir", "", "", search_chunk_size=1)
+        self.blaze_service.upload_donor(self.example_donor)
+        sample_fhir_ids = [self.blaze_service.upload_sample(sample) for sample in self.example_samples]
+        fhir_ids = blaze_service.get_fhir_ids("Specimen", [sample.identifier for sample in self.example_samples])
+        self.assertEqual({"sampleId": sample_fhir_ids[0], "sampleId2": sample_fhir_ids[1]}, fhir_ids)
+
+    def test_get_fhir_resources_as_json(self):
+        self.blaze_service.upload_donor(self.example_donor)
+        sample_fhir_ids = [self.blaze_service.upload_sample(sample) for sample in self.example_samples]
+        resources = self.blaze_service.get_fhir_resources_as_json("Specimen", sample_fhir_ids + ["nonexistentId"])
+        self.assertCountEqual(sample_fhir_ids, resources.keys())
+        self.assertEqual(self.blaze_service.get_fhir_resource_as_json("Specimen", sample_fhir_ids[0])["type"],
+                         resources[sample_fhir_ids[0]]["type"])
+
+    def test_get_fhir_resources_as_json_with_elements(self):
+        donor_fhir_id = self.blaze_service.upload_donor(self.example_donor)
+        resources = self.blaze_service.get_fhir_resources_as_json("Patient", [donor_fhir_id], ["identifier"])
+        self.assertNotIn("gender", resources[donor_fhir_id])
+        self.assertEqual(self.example_donor.identifier,
+                         get_nested_value(resources[donor_fhir_id], ["identifier", 0, "value"]))
+
+    def test_get_identifiers_by_fhir_ids(self):
+        self.blaze_service.upload_donor(self.example_donor)
+        sample_fhir_ids = [self.blaze_service.upload_sample(sample) for sample in self.example_samples]
+        identifiers = self.blaze_service.get_identifiers_by_fhir_ids("Specimen", sample_fhir_ids)
+        self.assertEqual({sample_fhir_ids[0]: "sampleId", sample_fhir_ids[1]: "sampleId2"}, identifiers)
+
+    def test_batch_get(self):
+        donor_fhir_id = self.blaze_service.upload_donor(self.example_donor)
+        sample_fhir_id = self.blaze_service.upload_sample(self.example_samples[0])
+        donor_json, nonexistent_json, sample_search = self.blaze_service.batch_get(
+            [f"Patient/{donor_fhir_id}", "Specimen/nonexistentId", "Specimen?identifier=sampleId"])
+        self.assertEqual(self.example_donor.identifier, donor_json["identifier"][0]["value"])
+        self.assertIsNone(nonexistent_json)
+        self.assertEqual(sample_fhir_id, sample_search["entry"][0]["resource"]["id"])
+
+    def test_iter_search_follows_pages(self):
+        self.blaze_service.upload_donor(self.example_donor)
+        sample_fhir_ids = [self.blaze_service.upload_sample(sample) for sample in self.example_samples]
+        entries = list(self.blaze_service.iter_search("Specimen", {"patient": self.blaze_service.get_fhir_id(
+            "Patient", self.example_donor.identifier)}, page_size=1))
+        self.assertCountEqual(sample_fhir_ids, [get_nested_value(entry, ["resource", "id"]) for entry in entries])
+
+    def test_iter_search_no_results(self):
+        self.assertEqual([], list(self.blaze_service.iter_search("Patient", {"identifier": "nonexistentId"})))
+
     def test_get_identifier_by_fhir_id_existing(self):
         donor_fhir_id = self.blaze_service.upload_donor(self.example_donor)
         donor_identifier = self.blaze_service.get_identifier_by_fhir_id("Patient", donor_fhir_id)
@@ -177,6 +231,35 @@ class TestBlazeService(unittest.TestCase):
         updated_patient = self.blaze_service.build_donor_from_json(updated_fhir_id)
         self.assertEqual(updated_patient.gender, different_patient.gender)
 
+    def test_update_donor_if_match(self):
+        donor_fhir_id = self.blaze_service.upload_donor(self.example_donor)
+        donor = self.blaze_service.build_donor_from_json(donor_fhir_id)
+        original_version_id = donor.version_id
+        donor.gender = Gender.FEMALE
+        self.assertEqual(donor_fhir_id, self.blaze_service.update_donor_if_match(donor))
+        self.assertNotEqual(original_version_id, donor.version_id)
+        self.assertEqual(Gender.FEMALE, self.blaze_service.build_donor_from_json(donor_fhir_id).gender)
+
+    def test_update_donor_if_match_with_stale_version_raises_http_error(self):
+        donor_fhir_id = self.blaze_service.upload_donor(self.example_donor)
+        donor = self.blaze_service.build_donor_from_json(donor_fhir_id)
+        stale_donor = self.blaze_service.build_donor_from_json(donor_fhir_id)
+        donor.gender = Gender.FEMALE
+        self.blaze_service.update_donor_if_match(donor)
+        with self.assertRaises(HTTPError):
+            self.blaze_service.update_donor_if_match(stale_donor)
+        self.assertEqual(donor_fhir_id, self.blaze_service.update_donor_if_match(stale_donor, conflict_retries=1))
+
+    def test_update_sample_if_match(self):
+        self.blaze_service.upload_donor(self.example_donor)
+        sample_fhir_id = self.blaze_service.upload_sample(self.example_samples[0])
+        sample = self.blaze_service.build_sample_from_json(sample_fhir_id)
+        sample.material_type = "Nail"
+        self.blaze_service.update_sample_if_match(sample)
+        updated_sample = self.blaze_service.build_sample_from_json(sample_fhir_id)
+        self.assertEqual("Nail", updated_sample.material_type)
+        self.assertEqual(sample.version_id, updated_sample.version_id)
+
     def test_donor_from_json(self):
         donor_id = self.blaze_service.upload_donor(self.example_donor)
         donor = self.blaze_service.build_donor_from_json(donor_id)
@@ -244,6 +327,20 @@ class TestBlazeService(unittest.TestCase):
         with self.assertRaises(NonExistentResourceException):
             build_sample = self.blaze_service.build_sample_from_json("nonexistentId")
 
+    def test_build_samples_from_json(self):
+        self.blaze_service.upload_donor(self.example_donor)
+        sample_fhir_ids = [self.blaze_service.upload_sample(sample) for sample in self.example_samples]
+        build_samples = self.blaze_service.build_samples_from_json(sample_fhir_ids)
+        self.assertEqual(self.example_samples, build_samples)
+        self.assertEqual(sample_fhir_ids, [sample.sample_fhir_id for sample in build_samples])
+        self.assertEqual(2, len(build_samples[0].observations))
+
+    def test_build_samples_from_json_nonexistent_id_raises_nonexistent_exception(self):
+        self.blaze_service.upload_donor(self.example_donor)
+        sample_fhir_id = self.blaze_service.upload_sample(self.example_samples[0])
+        with self.assertRaises(NonExistentResourceException):
+            self.blaze_service.build_samples_from_json([sample_fhir_id, "nonexistentId"])
+
     def test_update_sample_only_material_type_different(self):
         self.blaze_service.upload_donor(self.example_donor)
         sample_fhir_id = self.blaze_service.upload_sample(self.example_samples[0])
@@ -367,6 +464,58 @@ class TestBlazeService(unittest.TestCase):
         with self.assertRaises(NonExistentResourceException):
             self.blaze_service._delete_observation("nonexistentId")
 
+    def test_upload_donors(self):
+        donor_fhir_ids = self.blaze_service.upload_donors([self.example_donor])
+        self.assertEqual([self.example_donor.identifier], list(donor_fhir_ids.keys()))
+        self.assertTrue(self.blaze_service.is_resource_present_in_blaze("Patient",
+                                                                        donor_fhir_ids[self.example_donor.identifier]))
+
+    def test_upload_samples(self):
+        self.blaze_service.upload_donors([self.example_donor], bundle_type="batch")
+        sample_fhir_ids = self.blaze_service.upload_samples(self.example_samples, bundle_size=1)
+        self.assertCountEqual([sample.identifier for sample in self.example_samples], sample_fhir_ids.keys())
+        samples = self.blaze_service.build_samples_from_json(
+            [sample_fhir_ids[sample.identifier] for sample in self.example_samples])
+        self.assertEqual(self.example_samples, samples)
+
+    def test_upload_samples_with_nonexistent_donor_raises_nonexistent_exception(self):
+        with self.assertRaises(NonExistentResourceException):
+            self.blaze_service.upload_samples(self.example_samples)
+
+    def test_upload_conditions(self):
+        self.blaze_service.upload_donors([self.example_donor])
+        condition_fhir_ids = self.blaze_service.upload_conditions([self.example_condition])
+        condition = self.blaze_service.build_condition_from_json(condition_fhir_ids[0])
+        self.assertEqual(self.example_condition.patient_identifier, condition.patient_identifier)
+
+    def test_upload_conditions_of_the_same_donor(self):
+        self.blaze_service.upload_donors([self.example_donor])
+        conditions = [Condition(self.example_donor.identifier, "C51", "conditionId1"),
+                      Condition(self.example_donor.identifier, "C188", "conditionId2")]
+        condition_fhir_ids = self.blaze_service.upload_conditions(conditions, bundle_size=1)
+        self.assertEqual(2, len(set(condition_fhir_ids)))
+        for condition, condition_fhir_id in zip(conditions, condition_fhir_ids):
+            uploaded_condition = self.blaze_service.build_condition_from_json(condition_fhir_id)
+            self.assertEqual(condition.condition_identifier, uploaded_condition.condition_identifier)
+
+    def test_conditional_upload_resolves_references_and_does_not_duplicate(self):
+        conditional_client = BlazeClient("http://localhost:8080/fhir", "", "", conditional_upload=True)
+        donor_fhir_id = conditional_client.upload_donor(self.example_donor)
+        self.assertEqual(donor_fhir_id, conditional_client.upload_donor(self.example_donor))
+        sample_fhir_id = conditional_client.upload_sample(self.example_samples[0])
+        self.assertEqual(sample_fhir_id, conditional_client.upload_samples([self.example_samples[0]])[
+            self.example_samples[0].identifier])
+        sample = self.blaze_service.build_sample_from_json(sample_fhir_id)
+        self.assertEqual(donor_fhir_id, sample.subject_fhir_id)
+        condition_fhir_id = conditional_client.upload_condition(self.example_condition)
+        self.assertEqual(self.example_condition.patient_identifier,
+                         self.blaze_service.build_condition_from_json(condition_fhir_id).patient_identifier)
+
+    def test_conditional_upload_with_nonexistent_donor_raises_http_error(self):
+        conditional_client = BlazeClient("http://localhost:8080/fhir", "", "", conditional_upload=True)
+        with self.assertRaises(HTTPError):
+            conditional_client.upload_sample(self.example_samples[0])
+
     def test_upload_condition(self):
         self.blaze_service.upload_donor(self.example_donor)
         condition_fhir_id = self.blaze_service.upload_condition(self.example_condition)
@@ -499,6 +648,17 @@ class TestBlazeService(unittest.TestCase):
         with self.assertRaises(NonExistentResourceException):
             self.blaze_service.build_biobank_from_json("nonexistentId")
 
+    def test_build_biobanks_from_json(self):
+        biobank_fhir_id = self.blaze_service.upload_biobank(self.example_biobank)
+        biobanks = self.blaze_service.build_biobanks_from_json([biobank_fhir_id])
+        self.assertEqual([self.example_biobank], biobanks)
+        self.assertEqual(biobank_fhir_id, biobanks[0].biobank_fhir_id)
+
+    def test_build_biobanks_from_json_with_nonexistent_id_raises_nonexistent_exception(self):
+        biobank_fhir_id = self.blaze_service.upload_biobank(self.example_biobank)
+        with self.assertRaises(NonExistentResourceException):
+            self.blaze_service.build_biobanks_from_json([biobank_fhir_id, "nonexistentId"])
+
     def test_upload_collection(self):
         biobank_fhir_id = self.blaze_service.upload_biobank(self.example_biobank)
         collection_fhir_id = self.blaze_service.upload_collection(self.example_collection)
@@ -612,6 +772,28 @@ class TestBlazeService(unittest.TestCase):
         self.assertIsNotNone(network_fhir_id)
         self.assertTrue(self.blaze_service.is_resource_present_in_blaze("Group", network_fhir_id))
 
+    def test_build_collections_from_json(self):
+        self.blaze_service.upload_biobank(self.example_biobank)
+        self.blaze_service.upload_donor(self.example_donor)
+        sample_fhir_ids = [self.blaze_service.upload_sample(sample) for sample in self.example_samples]
+        collection_fhir_id = self.blaze_service.upload_collection(self.example_collection)
+        collections = self.blaze_service.build_collections_from_json([collection_fhir_id])
+        self.assertEqual(1, len(collections))
+        self.assertEqual(self.example_collection.identifier, collections[0].identifier)
+        self.assertEqual(self.example_collection.managing_biobank_id, collections[0].managing_biobank_id)
+        self.assertCountEqual(sample_fhir_ids, collections[0].sample_fhir_ids)
+        self.assertCountEqual([sample.identifier for sample in self.example_samples], collections[0].sample_ids)
+
+    def test_build_networks_from_json(self):
+        biobank_fhir_id = self.blaze_service.upload_biobank(self.example_biobank)
+        collection_fhir_id = self.blaze_service.upload_collection(self.example_collection)
+        network_fhir_id = self.blaze_service.upload_network(self.example_network)
+        networks = self.blaze_service.build_networks_from_json([network_fhir_id])
+        self.assertEqual(self.example_network.identifier, networks[0].identifier)
+        self.assertEqual([biobank_fhir_id], networks[0].members_biobanks_fhir_ids)
+        self.assertEqual([collection_fhir_id], networks[0].members_collections_fhir_ids)
+        self.assertEqual(self.example_network.members_biobanks_ids, networks[0].members_biobanks_ids)
+
     def test_build_network_from_json(self):
         biobank_fhir_id = self.blaze_service.upload_biobank(self.example_biobank)
         collection_fhir_id = self.blaze_service.upload_collection(self.example_collection)
@@ -736,6 +918,32 @@ class TestBlazeService(unittest.TestCase):
         deleted = self.blaze_service.delete_sample(sample_fhir_id1)
         self.assertTrue(deleted)
 
+    def test_delete_samples_removes_them_from_collection(self):
+        self.blaze_service.upload_donor(self.example_donor)
+        sample_fhir_ids = [self.blaze_service.upload_sample(sample) for sample in self.example_samples]
+        self.blaze_service.upload_biobank(self.example_biobank)
+        collection_fhir_id = self.blaze_service.upload_collection(self.example_collection)
+        self.blaze_service.add_already_present_samples_to_existing_collection(sample_fhir_ids, collection_fhir_id)
+        self.assertTrue(self.blaze_service.delete_samples(sample_fhir_ids, bundle_size=1))
+        for sample_fhir_id in sample_fhir_ids:
+            self.assertFalse(self.blaze_service.is_resource_present_in_blaze("Specimen", sample_fhir_id))
+        collection = self.blaze_service.build_collection_from_json(collection_fhir_id)
+        self.assertEqual([], collection.sample_fhir_ids)
+        self.assertEqual(0, collection.number_of_subjects)
+
+    def test_delete_donors(self):
+        donor_fhir_id = self.blaze_service.upload_donor(self.example_donor)
+        sample_fhir_id = self.blaze_service.upload_sample(self.example_samples[0])
+        condition_fhir_id = self.blaze_service.upload_condition(self.example_condition)
+        self.assertTrue(self.blaze_service.delete_donors([donor_fhir_id]))
+        self.assertFalse(self.blaze_service.is_resource_present_in_blaze("Patient", donor_fhir_id))
+        self.assertFalse(self.blaze_service.is_resource_present_in_blaze("Specimen", sample_fhir_id))
+        self.assertFalse(self.blaze_service.is_resource_present_in_blaze("Condition", condition_fhir_id))
+
+    def test_delete_samples_nonexistent_raises_nonexistent_exception(self):
+        with self.assertRaises(NonExistentResourceException):
+            self.blaze_service.delete_samples(["nonexistentSampleId"])
+
     def test_delete_all_resources(self):
         self.blaze_service.upload_biobank(self.example_biobank)
         self.blaze_service.upload_collection(self.example_collection)
@@ -745,3 +953,16 @@ class TestBlazeService(unittest.TestCase):
         self.blaze_service.upload_sample(self.example_samples[1])
         deleted_everything = self.blaze_service.delete_all_resources(self.example_biobank.identifier)
         self.assertTrue(deleted_everything)
+
+    def test_purge_all_resources(self):
+        self.blaze_service.upload_biobank(self.example_biobank)
+        self.blaze_service.upload_collection(self.example_collection)
+        self.blaze_service.upload_network(self.example_network)
+        donor_fhir_id = self.blaze_service.upload_donor(self.example_donor)
+        sample_fhir_id = self.blaze_service.upload_sample(self.example_samples[0])
+        progresses = []
+        self.assertTrue(self.blaze_service.purge_all_resources(bundle_size=1, progress_callback=progresses.append))
+        self.assertFalse(self.blaze_service.is_resource_present_in_blaze("Patient", donor_fhir_id))
+        self.assertFalse(self.blaze_service.is_resource_present_in_blaze("Specimen", sample_fhir_id))
+        self.assertIsNone(self.blaze_service.get_fhir_id("Organization", self.example_biobank.identifier))
+        self.assertTrue(all(progress.failed == 0 for progress in progresses))
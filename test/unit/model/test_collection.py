@@ -354,6 +354,22 @@ class TestCollection(unittest.TestCase):
         self.assertEqual("HealthStatus", collection_fhir.extension[1].valueCodeableConcept.coding[0].code)
         self.assertEqual(collection_fhir.extension[2].valueReference.reference, "Specimen/sampleFhirId1")
 
+    def test_collection_from_json_without_characteristics(self):
+        example_collection = Collection(identifier="collectionId", name="collectionName",
+                                        managing_biobank_id="managingBiobankId",
+                                        contact_name="contactName", contact_surname="contactSurname",
+                                        contact_email="contactEmail", country="CZ", genders=[],
+                                        material_types=[], description="description")
+        collection_org_fhir = example_collection._collection_org.to_fhir("biobankFHIRId")
+        collection_org_fhir.id = "TestOrgFHIRId"
+        example_collection_json = example_collection.to_fhir("TestOrgFHIRId", []).as_json()
+        self.assertNotIn("characteristic", example_collection_json)
+        collection = Collection.from_json(example_collection_json, collection_org_fhir.as_json(),
+                                          "managingBiobankId", [])
+        self.assertEqual([], collection.genders)
+        self.assertEqual([], collection.material_types)
+        self.assertIsNone(collection.age_range_low)
+
     def test_collection_eq(self):
         coll1 = Collection(identifier="collectionId", name="collectionName",
                            managing_biobank_id="managingBiobankId",
@@ -0,0 +1,159 @@
+import datetime
+import json
+import unittest
+
+from miabis_model import Collection
+from miabis_model import CollectionCharacteristics
+from miabis_model import Gender
+from miabis_model import Sample
+from miabis_model import SampleDonor
+from miabis_model import StorageTemperature
+
+
+class TestCollectionCharacteristics(unittest.TestCase):
+    example_donor = SampleDonor("donorId", Gender.MALE, datetime.datetime(year=1990, month=10, day=20))
+
+    @staticmethod
+    def create_sample(identifier: str, material_type: str, subject_fhir_id: str,
+                      diagnoses_with_observed_datetime: list = None,
+                      storage_temperature: StorageTemperature = None) -> Sample:
+        sample = Sample(identifier, "donorId", material_type, storage_temperature=storage_temperature,
+                        diagnoses_with_observed_datetime=diagnoses_with_observed_datetime)
+        sample._subject_fhir_id = subject_fhir_id
+        sample._sample_fhir_id = f"{identifier}FhirId"
+        return sample
+
+    def test_empty_characteristics(self):
+        characteristics = CollectionCharacteristics()
+        self.assertEqual([], characteristics.genders)
+        self.assertEqual([], characteristics.storage_temperatures)
+        self.assertEqual([], characteristics.material_types)
+        self.assertEqual([], characteristics.diagnoses)
+        self.assertEqual(0, characteristics.number_of_subjects)
+        self.assertIsNone(characteristics.age_range_low)
+        self.assertIsNone(characteristics.age_range_high)
+
+    def test_add_samples(self):
+        characteristics = CollectionCharacteristics()
+        characteristics.add_sample(self.create_sample("sampleId", "Urine", "donorFhirId",
+                                                      [("C51", datetime.datetime(year=2020, month=1, day=1))],
+                                                      StorageTemperature.TEMPERATURE_LN), self.example_donor)
+        characteristics.add_sample(self.create_sample("sampleId2", "Nail", "donorFhirId",
+                                                      [("C51", datetime.datetime(year=2010, month=1, day=1)),
+                                                       ("C50", None)],
+                                                      StorageTemperature.TEMPERATURE_LN), self.example_donor)
+        self.assertEqual([Gender.MALE], characteristics.genders)
+        self.assertEqual([StorageTemperature.TEMPERATURE_LN], characteristics.storage_temperatures)
+        self.assertEqual(["Urine", "Other"], characteristics.material_types)
+        self.assertEqual(["C51", "C50"], characteristics.diagnoses)
+        self.assertEqual(1, characteristics.number_of_subjects)
+        self.assertEqual(20, characteristics.age_range_low)
+        self.assertEqual(30, characteristics.age_range_high)
+
+    def test_add_sample_without_donor(self):
+        characteristics = CollectionCharacteristics()
+        characteristics.add_sample(self.create_sample("sampleId", "Urine", "donorFhirId",
+                                                      [("C51", datetime.datetime(year=2020, month=1, day=1))]), None)
+        self.assertEqual([], characteristics.genders)
+        self.assertEqual(["C51"], characteristics.diagnoses)
+        self.assertEqual(1, characteristics.number_of_subjects)
+        self.assertIsNone(characteristics.age_range_low)
+
+    def test_remove_sample(self):
+        characteristics = CollectionCharacteristics()
+        first_sample = self.create_sample("sampleId", "Urine", "donorFhirId",
+                                          [("C51", datetime.datetime(year=2020, month=1, day=1))],
+                                          StorageTemperature.TEMPERATURE_LN)
+        second_sample = self.create_sample("sampleId2", "Nail", "donorFhirId2",
+                                           [("C50", datetime.datetime(year=2010, month=1, day=1))],
+                                           StorageTemperature.TEMPERATURE_ROOM)
+        characteristics.add_sample(first_sample, self.example_donor)
+        characteristics.add_sample(second_sample, self.example_donor)
+        characteristics.remove_sample(first_sample.sample_fhir_id)
+        self.assertEqual([Gender.MALE], characteristics.genders)
+        self.assertEqual([StorageTemperature.TEMPERATURE_ROOM], characteristics.storage_temperatures)
+        self.assertEqual(["Other"], characteristics.material_types)
+        self.assertEqual(["C50"], characteristics.diagnoses)
+        self.assertEqual(1, characteristics.number_of_subjects)
+        self.assertEqual(1, characteristics.number_of_samples)
+        self.assertEqual(20, characteristics.age_range_low)
+        self.assertEqual(20, characteristics.age_range_high)
+        characteristics.remove_sample(second_sample.sample_fhir_id)
+        self.assertEqual([], characteristics.genders)
+        self.assertEqual(0, characteristics.number_of_subjects)
+        self.assertIsNone(characteristics.age_range_low)
+
+    def test_remove_modified_sample(self):
+        characteristics = CollectionCharacteristics()
+        donor = SampleDonor("donorId", Gender.MALE)
+        first_sample = self.create_sample("sampleId", "Urine", "donorFhirId", [("C51", None)])
+        second_sample = self.create_sample("sampleId2", "Urine", "donorFhirId2", [("C50", None)])
+        characteristics.add_sample(first_sample, donor)
+        characteristics.add_sample(second_sample, SampleDonor("donorId2", Gender.FEMALE))
+        # the sample and its donor are modified after they were added
+        first_sample.material_type = "Serum"
+        donor.gender = Gender.FEMALE
+        characteristics.remove_sample(first_sample.sample_fhir_id)
+        self.assertEqual(["Urine"], characteristics.material_types)
+        self.assertEqual([Gender.FEMALE], characteristics.genders)
+        self.assertEqual(["C50"], characteristics.diagnoses)
+        self.assertEqual({"sampleId2FhirId"}, characteristics.sample_fhir_ids)
+
+    def test_add_sample_again_replaces_its_contribution(self):
+        characteristics = CollectionCharacteristics()
+        sample = self.create_sample("sampleId", "Urine", "donorFhirId", [("C51", None)])
+        characteristics.add_sample(sample, self.example_donor)
+        sample.material_type = "Serum"
+        characteristics.add_sample(sample, self.example_donor)
+        self.assertEqual(["Serum"], characteristics.material_types)
+        self.assertEqual(1, characteristics.number_of_samples)
+
+    def test_remove_sample_which_was_not_added(self):
+        characteristics = CollectionCharacteristics()
+        characteristics.add_sample(self.create_sample("sampleId", "Urine", "donorFhirId"), self.example_donor)
+        characteristics.remove_sample("unknownFhirId")
+        self.assertEqual(["Urine"], characteristics.material_types)
+
+    def test_add_sample_without_fhir_id(self):
+        with self.assertRaises(ValueError):
+            CollectionCharacteristics().add_sample(Sample("sampleId", "donorId", "Urine"), None)
+
+    def test_from_json_without_contributions(self):
+        restored = CollectionCharacteristics.from_json({"numberOfSamples": 1, "materialTypes": {"Urine": 1}})
+        self.assertEqual(0, restored.number_of_samples)
+        self.assertEqual([], restored.material_types)
+
+    def test_to_json_from_json(self):
+        characteristics = CollectionCharacteristics()
+        characteristics.add_sample(self.create_sample("sampleId", "Urine", "donorFhirId",
+                                                      [("C51", datetime.datetime(year=2020, month=1, day=1))],
+                                                      StorageTemperature.TEMPERATURE_LN), self.example_donor)
+        characteristics.add_sample(self.create_sample("sampleId2", "Urine", "donorFhirId",
+                                                      [("C51", datetime.datetime(year=2020, month=1, day=1))],
+                                                      StorageTemperature.TEMPERATURE_LN), self.example_donor)
+        restored = CollectionCharacteristics.from_json(json.loads(json.dumps(characteristics.to_json())))
+        self.assertEqual(characteristics.to_json(), restored.to_json())
+        self.assertEqual([Gender.MALE], restored.genders)
+        self.assertEqual([StorageTemperature.TEMPERATURE_LN], restored.storage_temperatures)
+        self.assertEqual(30, restored.age_range_low)
+        self.assertEqual(2, restored.number_of_samples)
+
+    def test_apply_to(self):
+        collection = Collection(identifier="collectionId", name="collectionName", managing_biobank_id="biobankId",
+                                contact_name="contactName", contact_surname="contactSurname",
+                                contact_email="contactEmail", country="CZ", genders=[Gender.FEMALE],
+                                description="description", material_types=["Other"], age_range_low=10,
+                                age_range_high=20, storage_temperatures=[StorageTemperature.TEMPERATURE_ROOM],
+                                diagnoses=["C50"], number_of_subjects=1, sample_ids=["sampleId"])
+        characteristics = CollectionCharacteristics()
+        characteristics.add_sample(self.create_sample("sampleId", "Urine", "donorFhirId",
+                                                      [("C51", datetime.datetime(year=2030, month=1, day=1))],
+                                                      StorageTemperature.TEMPERATURE_LN), self.example_donor)
+        collection = characteristics.apply_to(collection)
+        self.assertEqual([Gender.MALE], collection.genders)
+        self.assertEqual([StorageTemperature.TEMPERATURE_LN], collection.storage_temperatures)
+        self.assertEqual(["Urine"], collection.material_types)
+        self.assertEqual(["C51"], collection.diagnoses)
+        self.assertEqual(1, collection.number_of_subjects)
+        self.assertEqual(40, collection.age_range_low)
+        self.assertEqual(40, collection.age_range_high)
@@ -69,4 +69,15 @@ class TestCondition(unittest.TestCase):
     def test_condition_not_eq(self):
         condition1 = Condition("donorId", "C51")
         condition2 = Condition("donorId", "C52")
-        self.assertNotEqual(condition2,condition1)
\ No newline at end of file
+        self.assertNotEqual(condition2,condition1)
+
+    def test_build_bundle_entry_for_upload(self):
+        entry = Condition("patientId").build_bundle_entry_for_upload("patientFhirId")
+        self.assertEqual("Patient/patientFhirId", entry.resource.subject.reference)
+        self.assertIsNone(entry.request.ifNoneExist)
+
+    def test_build_conditional_bundle_entry_for_upload(self):
+        entry = Condition("patientId", condition_identifier="conditionId").build_bundle_entry_for_upload(
+            conditional=True)
+        self.assertEqual("Patient?identifier=patientId", entry.resource.subject.reference)
+        self.assertEqual("identifier=conditionId", entry.request.ifNoneExist)
@@ -0,0 +1,60 @@
+import unittest
+from datetime import datetime
+
+import simple_icd_10 as icd10
+
+from miabis_model import Condition, ICD10Service, _Observation, icd10_service
+
+
+class TestICD10Service(unittest.TestCase):
+
+    def setUp(self):
+        self.service = ICD10Service()
+
+    def test_same_validity_as_simple_icd_10(self):
+        codes = icd10.get_all_codes(with_dots=True) + icd10.get_all_codes(with_dots=False)
+        codes += [code.lower() for code in codes[:1000]] + [code + "0" for code in codes[:1000]]
+        codes += ["", ".", "C", "C1", "C18.", "C18..8", "C1.88", "c188", "X999", "C18.8 ", "invalid"]
+        self.assertEqual([icd10.is_valid_item(code) for code in codes], self.service.validate_many(codes))
+        for code in codes[::97]:
+            with self.subTest(code=code):
+                self.assertEqual(icd10.is_valid_item(code), self.service.is_valid(code))
+
+    def test_normalize(self):
+        self.assertEqual("C18.8", self.service.normalize("C188"))
+        self.assertEqual("C18.8", self.service.normalize("C18.8"))
+        self.assertEqual("B18.00", self.service.normalize("B1800"))
+        self.assertEqual("C51", self.service.normalize("C51"))
+        self.assertEqual("C15-C26", self.service.normalize("C15-C26"))
+        self.assertEqual("II", self.service.normalize("II"))
+        self.assertEqual("X999", self.service.normalize("X999"))
+
+    def test_normalize_many(self):
+        self.assertEqual(["C51", "C18.8", "B18.00", "X999"],
+                         self.service.normalize_many(["C51", "C188", "B1800", "X999"]))
+        self.assertEqual([], self.service.normalize_many([]))
+
+    def test_get_ancestors(self):
+        self.assertEqual(["C18", "C15-C26", "C00-C75", "C00-C97", "II"], self.service.get_ancestors("C188"))
+        self.assertEqual(self.service.get_ancestors("C18.8"), self.service.get_ancestors("C188"))
+        self.assertEqual([], self.service.get_ancestors("II"))
+
+    def test_get_ancestors_returns_copy(self):
+        self.service.get_ancestors("C188").clear()
+        self.assertEqual(["C18", "C15-C26", "C00-C75", "C00-C97", "II"], self.service.get_ancestors("C188"))
+
+    def test_get_ancestors_of_invalid_code(self):
+        with self.assertRaises(ValueError):
+            self.service.get_ancestors("X999")
+
+    def test_models_store_normalized_codes(self):
+        observation = _Observation("B1800", "sampleId", "donorId", datetime(year=2020, month=10, day=5))
+        observation_json = observation.to_fhir_dict("donorFhirId", "sampleFhirId")
+        self.assertEqual("B18.00", observation_json["valueCodeableConcept"]["coding"][0]["code"])
+        condition = Condition("donorId", "C188")
+        self.assertEqual("C18.8", condition.to_fhir_dict("donorFhirId")["code"]["coding"][0]["code"])
+        self.assertIs(icd10_service.is_valid("C188"), True)
+
+
+if __name__ == "__main__":
+    unittest.main()
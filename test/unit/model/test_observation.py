@@ -75,3 +75,19 @@ class TestObservation(unittest.TestCase):
                             datetime.datetime(year=2021, month=10, day=10))
 
         self.assertNotEqual(obs1, obs2)
+
+    def test_build_conditional_bundle_entry_for_upload(self):
+        entry = _Observation("C51", "sampleId", "patientId").build_bundle_entry_for_upload(conditional=True)
+        self.assertEqual("Patient?identifier=patientId", entry.resource.subject.reference)
+        self.assertEqual("Specimen?identifier=sampleId", entry.resource.specimen.reference)
+        self.assertIsNone(entry.request.ifNoneExist)
+
+    def test_to_fhir_with_references(self):
+        observation = _Observation("C51", "sampleId", "patientId")
+        observation_fhir = observation.to_fhir(patient_reference="Patient?identifier=patientId",
+                                               sample_reference="urn:uuid:sample")
+        self.assertEqual("Patient?identifier=patientId", observation_fhir.subject.reference)
+        self.assertEqual("urn:uuid:sample", observation_fhir.specimen.reference)
+        self.assertEqual(observation_fhir.as_json(),
+                         observation.to_fhir_dict(patient_reference="Patient?identifier=patientId",
+                                                  sample_reference="urn:uuid:sample"))
@@ -4,6 +4,7 @@ from datetime import datetime
 from miabis_model import Sample
 from miabis_model import StorageTemperature
 from miabis_model import _Observation
+from miabis_model.sample import get_sample_collection_id
 
 
 class TestSample(unittest.TestCase):
@@ -175,3 +176,42 @@ class TestSample(unittest.TestCase):
                          diagnoses_with_observed_datetime=[("C51", datetime(year=2020, month=10, day=5)),
                                                            ])
         self.assertNotEqual(sample1, sample2)
+
+    def test_build_bundle_entries_for_upload(self):
+        sample = Sample(identifier="sampleId", donor_identifier="donorId", material_type="BuffyCoat",
+                        sample_collection_id="collectionId",
+                        diagnoses_with_observed_datetime=[("C51", datetime(year=2020, month=10, day=5)),
+                                                          ("C52", datetime(year=2029, month=10, day=5))])
+        entries = sample.build_bundle_entries_for_upload("donorFhirId")
+        self.assertEqual(3, len(entries))
+        self.assertEqual("/Specimen", entries[0].request.url)
+        self.assertEqual("Patient/donorFhirId", entries[0].resource.subject.reference)
+        for observation_entry in entries[1:]:
+            self.assertEqual("/Observation", observation_entry.request.url)
+            self.assertEqual(entries[0].fullUrl, observation_entry.resource.specimen.reference)
+
+    def test_build_conditional_bundle_entries_for_upload(self):
+        sample = Sample(identifier="sampleId", donor_identifier="donorId", material_type="BuffyCoat",
+                        sample_collection_id="collectionId",
+                        diagnoses_with_observed_datetime=[("C51", datetime(year=2020, month=10, day=5))])
+        entries = sample.build_bundle_entries_for_upload(conditional=True)
+        self.assertEqual("identifier=sampleId", entries[0].request.ifNoneExist)
+        self.assertEqual("Patient?identifier=donorId", entries[0].resource.subject.reference)
+        self.assertEqual("Patient?identifier=donorId", entries[1].resource.subject.reference)
+        self.assertEqual(entries[0].fullUrl, entries[1].resource.specimen.reference)
+
+    def test_to_fhir_with_subject_reference(self):
+        sample = Sample(identifier="sampleId", donor_identifier="donorId", material_type="BuffyCoat",
+                        sample_collection_id="collectionId")
+        sample_fhir = sample.to_fhir(subject_reference="Patient?identifier=donorId")
+        self.assertEqual("Patient?identifier=donorId", sample_fhir.subject.reference)
+        self.assertEqual(sample_fhir.as_json(), sample.to_fhir_dict(subject_reference="Patient?identifier=donorId"))
+
+    def test_sample_collection_id_is_selected_by_extension_url(self):
+        sample_json = Sample(identifier="sampleId", donor_identifier="donorId", material_type="BuffyCoat",
+                             sample_collection_id="collectionId").to_fhir_dict("donorFhirId")
+        sample_json["extension"].insert(0, {"url": "http://example.org/other", "valueIdentifier": {"value": "other"}})
+        self.assertEqual("collectionId", get_sample_collection_id(sample_json))
+        self.assertEqual("collectionId", Sample.from_json(sample_json, [], "donorId").sample_collection_id)
+        del sample_json["extension"]
+        self.assertIsNone(get_sample_collection_id(sample_json))
@@ -98,6 +98,14 @@ class TestSampleDonor(unittest.TestCase):
         donor = SampleDonor.from_json(example_fhir.as_json())
         self.assertEqual(example_donor, donor)
         self.assertEqual("TestFHIRId", donor.donor_fhir_id)
+        self.assertIsNone(donor.version_id)
+
+    def test_sample_donor_from_json_with_version(self):
+        example_fhir = SampleDonor("patientId").to_fhir()
+        example_fhir.id = "TestFHIRId"
+        example_fhir.meta.versionId = "3"
+        donor = SampleDonor.from_json(example_fhir.as_json())
+        self.assertEqual("3", donor.version_id)
 
     def test_sample_eq(self):
         donor1 = SampleDonor("patientId", Gender.FEMALE, datetime(year=2022, month=10, day=20), "Lifestyle")
@@ -108,3 +116,8 @@ class TestSampleDonor(unittest.TestCase):
         donor1 = SampleDonor("patientId", Gender.FEMALE, datetime(year=2022, month=10, day=20), "Lifestyle")
         donor2 = SampleDonor("patientId", Gender.MALE, datetime(year=2022, month=10, day=20), "Lifestyle")
         self.assertNotEqual(donor1, donor2)
+
+    def test_build_conditional_bundle_entry_for_upload(self):
+        entry = SampleDonor("donor,Id").build_bundle_entry_for_upload(conditional=True)
+        self.assertEqual("/Patient", entry.request.url)
+        self.assertEqual("identifier=donor%5C%2CId", entry.request.ifNoneExist)
@@ -0,0 +1,192 @@
+import unittest
+from datetime import datetime
+
+from miabis_model import Biobank, Collection, Condition, Gender, Network, Sample, SampleDonor, StorageTemperature, \
+    _Observation
+from miabis_model.juristic_person import _JuristicPerson
+
+
+class TestToFhirDict(unittest.TestCase):
+    """to_fhir_dict() must produce exactly the same json as to_fhir().as_json()."""
+
+    def assert_same_json(self, to_fhir, to_fhir_dict, *args):
+        self.assertEqual(to_fhir(*args).as_json(), to_fhir_dict(*args))
+
+    def test_donor(self):
+        donors = [SampleDonor("donorId"),
+                  SampleDonor("donorId", Gender.FEMALE),
+                  SampleDonor("donorId", Gender.MALE, datetime(year=1990, month=5, day=3, hour=10), "Lifestyle"),
+                  SampleDonor("donorId", birth_date=datetime(year=2001, month=12, day=31))]
+        for donor in donors:
+            with self.subTest(donor=donor.__dict__):
+                self.assert_same_json(donor.to_fhir, donor.to_fhir_dict)
+
+    def test_sample(self):
+        samples = [Sample("sampleId", "donorId", "BuffyCoat", sample_collection_id="collectionId"),
+                   Sample("sampleId", "donorId", "Urine", collected_datetime=datetime(year=2022, month=10, day=5),
+                          body_site="arm", body_site_system="http://www.example.com",
+                          storage_temperature=StorageTemperature.TEMPERATURE_LN, use_restrictions="restricted",
+                          sample_collection_id="collectionId"),
+                   Sample("sampleId", "donorId", "Serum", body_site="arm", sample_collection_id="collectionId")]
+        for sample in samples:
+            with self.subTest(sample=sample.__dict__):
+                self.assert_same_json(sample.to_fhir, sample.to_fhir_dict, "donorFhirId")
+        sample = Sample("sampleId", "donorId", "BuffyCoat")
+        self.assert_same_json(sample.to_fhir, sample.to_fhir_dict, "donorFhirId", "collectionId")
+
+    def test_sample_missing_fhir_ids(self):
+        sample = Sample("sampleId", "donorId", "BuffyCoat")
+        with self.assertRaises(ValueError):
+            sample.to_fhir_dict(sample_collection_id="collectionId")
+        with self.assertRaises(ValueError):
+            sample.to_fhir_dict("donorFhirId")
+
+    def test_sample_bundle_entries(self):
+        sample = Sample("sampleId", "donorId", "BuffyCoat", sample_collection_id="collectionId",
+                        diagnoses_with_observed_datetime=[("C51", datetime(year=2020, month=10, day=5)),
+                                                          ("C188", None)])
+        for conditional in (False, True):
+            with self.subTest(conditional=conditional):
+                entries = sample.build_bundle_entries_for_upload("donorFhirId", conditional)
+                entry_dicts = sample.build_bundle_entry_dicts_for_upload("donorFhirId", conditional)
+                self.assertEqual(len(entries), len(entry_dicts))
+                for entry, entry_dict in zip(entries, entry_dicts):
+                    entry_json = entry.as_json()
+                    # temporary ids are random, the references between the entries must be kept
+                    entry_json["fullUrl"] = entry_dict["fullUrl"]
+                    if entry_json["resource"]["resourceType"] == "Observation":
+                        entry_json["resource"]["specimen"]["reference"] = entry_dicts[0]["fullUrl"]
+                    self.assertEqual(entry_json, entry_dict)
+
+    def test_observation(self):
+        observations = [_Observation("C51", "sampleId", "patientId"),
+                        _Observation("C188", "sampleId", "patientId", datetime(year=2020, month=10, day=5),
+                                     "observationId")]
+        for observation in observations:
+            with self.subTest(observation=observation.__dict__):
+                self.assert_same_json(observation.to_fhir, observation.to_fhir_dict, "patientFhirId", "sampleFhirId")
+
+    def test_observation_bundle_entry(self):
+        observation = _Observation("C51", "sampleId", "patientId", observation_identifier="observationId")
+        for conditional in (False, True):
+            with self.subTest(conditional=conditional):
+                entry_json = observation.build_bundle_entry_for_upload("patientFhirId", "sampleFhirId",
+                                                                       conditional).as_json()
+                entry_dict = observation.build_bundle_entry_dict_for_upload("patientFhirId", "sampleFhirId",
+                                                                            conditional)
+                entry_json["fullUrl"] = entry_dict["fullUrl"]
+                self.assertEqual(entry_json, entry_dict)
+
+    def test_condition(self):
+        conditions = [Condition("patientId"),
+                      Condition("patientId", "C51"),
+                      Condition("patientId", "C188", "conditionId")]
+        for condition in conditions:
+            with self.subTest(condition=condition.__dict__):
+                self.assert_same_json(condition.to_fhir, condition.to_fhir_dict, "patientFhirId")
+
+    def test_condition_bundle_entry(self):
+        condition = Condition("patientId", "C51", "conditionId")
+        for conditional in (False, True):
+            with self.subTest(conditional=conditional):
+                entry_json = condition.build_bundle_entry_for_upload("patientFhirId", conditional).as_json()
+                entry_dict = condition.build_bundle_entry_dict_for_upload("patientFhirId", conditional)
+                entry_json["fullUrl"] = entry_dict["fullUrl"]
+                self.assertEqual(entry_json, entry_dict)
+
+    def test_donor_bundle_entry(self):
+        donor = SampleDonor("donorId", Gender.MALE)
+        for conditional in (False, True):
+            with self.subTest(conditional=conditional):
+                entry_json = donor.build_bundle_entry_for_upload(conditional).as_json()
+                entry_dict = donor.build_bundle_entry_dict_for_upload(conditional)
+                entry_json["fullUrl"] = entry_dict["fullUrl"]
+                self.assertEqual(entry_json, entry_dict)
+
+    def test_juristic_person(self):
+        juristic_person = _JuristicPerson("juristicPerson")
+        self.assert_same_json(juristic_person.to_fhir, juristic_person.to_fhir_dict)
+
+    def test_biobank(self):
+        biobanks = [Biobank("biobankId", "biobankName", "CZ", "contactName", "contactSurname",
+                            "contactEmail", "juristicPerson", None),
+                    Biobank("biobankId", "biobankName", "CZ", "contactName", "contactSurname", "contactEmail",
+                            "juristicPerson", "description", alias="alias", url="https://biobank.com",
+                            infrastructural_capabilities=["SampleStorage"],
+                            organisational_capabilities=["RecontactDonors"],
+                            bioprocessing_and_analysis_capabilities=["Genomics"],
+                            quality__management_standards=["ISO9001"])]
+        for biobank in biobanks:
+            with self.subTest(biobank=biobank.__dict__):
+                self.assert_same_json(biobank.to_fhir, biobank.to_fhir_dict, "juristicPersonFhirId")
+
+    def test_collection_and_organization(self):
+        collections = [Collection("collectionId", "collectionName", "biobankId", "contactName", "contactSurname",
+                                  "contactEmail", "CZ", [], None, []),
+                       Collection("collectionId", "collectionName", "biobankId", "contactName", "contactSurname",
+                                  "contactEmail", "CZ", [Gender.MALE, Gender.FEMALE], "description", ["Urine"],
+                                  age_range_low=10, age_range_high=100,
+                                  storage_temperatures=[StorageTemperature.TEMPERATURE_LN], diagnoses=["C51"],
+                                  number_of_subjects=10, inclusion_criteria=["Sex"], alias="alias",
+                                  url="https://collection.com", dataset_type="LifeStyle", sample_source="Human",
+                                  sample_collection_setting="Environment", collection_design=["CaseControl"],
+                                  use_and_access_conditions=["CommercialUse"], publications=["publication"])]
+        for collection in collections:
+            with self.subTest(collection=collection.__dict__):
+                self.assert_same_json(collection.to_fhir, collection.to_fhir_dict, "collectionOrgFhirId")
+                self.assert_same_json(collection.to_fhir, collection.to_fhir_dict, "collectionOrgFhirId",
+                                      ["sampleFhirId1", "sampleFhirId2"])
+                collection_org = collection.collection_organization
+                self.assert_same_json(collection_org.to_fhir, collection_org.to_fhir_dict, "biobankFhirId")
+
+    def test_network_and_organization(self):
+        networks = [Network("networkId", "networkName", "contactEmail", "CZ", "juristicPerson"),
+                    Network("networkId", "networkName", "contactEmail", "CZ", "juristicPerson",
+                            url="https://network.com", contact_name="contactName", contact_surname="contactSurname",
+                            common_collaboration_topics=["Charter"], description="description")]
+        for network in networks:
+            with self.subTest(network=network.__dict__):
+                self.assert_same_json(network.to_fhir, network.to_fhir_dict, "networkOrgFhirId")
+                self.assert_same_json(network.to_fhir, network.to_fhir_dict, "networkOrgFhirId",
+                                      ["collectionFhirId"], ["biobankFhirId1", "biobankFhirId2"])
+                network_org = network.network_organization
+                self.assert_same_json(network_org.to_fhir, network_org.to_fhir_dict, "juristicPersonFhirId")
+
+    def assert_same_bundle(self, bundle, bundle_dict):
+        """Compare bundles, ignoring the random temporary ids (fullUrl) as long as references between
+        the entries are kept."""
+        bundle_json = bundle.as_json()
+        self.assertEqual(len(bundle_json["entry"]), len(bundle_dict["entry"]))
+        temporary_ids = {entry["fullUrl"]: entry_dict["fullUrl"]
+                         for entry, entry_dict in zip(bundle_json["entry"], bundle_dict["entry"])}
+        for entry in bundle_json["entry"]:
+            entry["fullUrl"] = temporary_ids[entry["fullUrl"]]
+            for element in ("partOf", "managingEntity"):
+                reference = entry["resource"].get(element, {})
+                if reference.get("reference") in temporary_ids:
+                    reference["reference"] = temporary_ids[reference["reference"]]
+        self.assertEqual(bundle_json, bundle_dict)
+
+    def test_biobank_bundle(self):
+        biobank = Biobank("biobankId", "biobankName", "CZ", "contactName", "contactSurname", "contactEmail",
+                          "juristicPerson", "description")
+        self.assert_same_bundle(biobank.build_bundle_for_upload(), biobank.build_bundle_dict_for_upload())
+
+    def test_collection_bundle(self):
+        collection = Collection("collectionId", "collectionName", "biobankId", "contactName", "contactSurname",
+                                "contactEmail", "CZ", [Gender.MALE], "description", ["Urine"])
+        self.assert_same_bundle(collection.build_bundle_for_upload("biobankFhirId", ["sampleFhirId"]),
+                                collection.build_bundle_dict_for_upload("biobankFhirId", ["sampleFhirId"]))
+
+    def test_network_bundle(self):
+        network = Network("networkId", "networkName", "contactEmail", "CZ", "juristicPerson")
+        for juristic_person_fhir_id in (None, "juristicPersonFhirId"):
+            with self.subTest(juristic_person_fhir_id=juristic_person_fhir_id):
+                self.assert_same_bundle(
+                    network.build_bundle_for_upload(juristic_person_fhir_id, ["collectionFhirId"], ["biobankFhirId"]),
+                    network.build_bundle_dict_for_upload(juristic_person_fhir_id, ["collectionFhirId"],
+                                                         ["biobankFhirId"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
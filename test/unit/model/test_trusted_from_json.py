@@ -0,0 +1,110 @@
+import unittest
+from datetime import datetime
+
+from miabis_model import Biobank, Collection, Condition, Gender, Network, Sample, SampleDonor, StorageTemperature, \
+    _Observation
+
+
+def attributes(instance) -> dict:
+    """All the attributes of the instance, including attributes of the nested model instances."""
+
+    def value(attribute):
+        if isinstance(attribute, list):
+            return [value(item) for item in attribute]
+        if hasattr(attribute, "__dict__") and type(attribute).__module__.startswith("miabis_model"):
+            return attributes(attribute)
+        return attribute
+
+    return {name: value(attribute) for name, attribute in vars(instance).items()}
+
+
+def with_id(resource_json: dict, fhir_id: str) -> dict:
+    resource_json["id"] = fhir_id
+    resource_json["meta"]["versionId"] = "1"
+    return resource_json
+
+
+class TestTrustedFromJson(unittest.TestCase):
+    """from_json(trusted=True) must build the same instances as the validating from_json."""
+
+    def assert_same_instances(self, from_json, *args):
+        self.assertEqual(attributes(from_json(*args)), attributes(from_json(*args, trusted=True)))
+
+    def test_donor(self):
+        for donor in [SampleDonor("donorId"),
+                      SampleDonor("donorId", Gender.MALE, datetime(year=1990, month=5, day=3), "Lifestyle")]:
+            with self.subTest(donor=donor.__dict__):
+                self.assert_same_instances(SampleDonor.from_json, with_id(donor.to_fhir_dict(), "donorFhirId"))
+
+    def test_sample(self):
+        sample = Sample("sampleId", "donorId", "Urine", collected_datetime=datetime(year=2022, month=10, day=5),
+                        body_site="arm", body_site_system="http://www.example.com",
+                        storage_temperature=StorageTemperature.TEMPERATURE_LN, use_restrictions="restricted",
+                        sample_collection_id="collectionId")
+        observation = _Observation("C51", "sampleId", "donorId", datetime(year=2020, month=10, day=5), "obsId")
+        sample_json = with_id(sample.to_fhir_dict("donorFhirId"), "sampleFhirId")
+        observation_json = with_id(observation.to_fhir_dict("donorFhirId", "sampleFhirId"), "observationFhirId")
+        self.assert_same_instances(Sample.from_json, sample_json, [observation_json], "donorId")
+        self.assert_same_instances(Sample.from_json, sample_json, [], "donorId")
+
+    def test_condition(self):
+        condition_json = with_id(Condition("donorId", "C51", "conditionId").to_fhir_dict("donorFhirId"),
+                                 "conditionFhirId")
+        self.assert_same_instances(Condition.from_json, condition_json, "donorId")
+
+    def test_biobank(self):
+        biobank = Biobank("biobankId", "biobankName", "CZ", "contactName", "contactSurname", "contactEmail",
+                          "juristicPerson", "description", alias="alias",
+                          infrastructural_capabilities=["SampleStorage"],
+                          organisational_capabilities=["RecontactDonors"],
+                          bioprocessing_and_analysis_capabilities=["Genomics"],
+                          quality__management_standards=["ISO9001"])
+        juristic_person_json = with_id(biobank.juristic_person.to_fhir_dict(), "juristicPersonFhirId")
+        self.assert_same_instances(Biobank.from_json, with_id(biobank.to_fhir_dict("juristicPersonFhirId"),
+                                                              "biobankFhirId"), juristic_person_json)
+
+    def test_collection(self):
+        collections = [Collection("collectionId", "collectionName", "biobankId", "contactName", "contactSurname",
+                                  "contactEmail", "CZ", [], None, []),
+                       Collection("collectionId", "collectionName", "biobankId", "contactName", "contactSurname",
+                                  "contactEmail", "CZ", [Gender.MALE, Gender.FEMALE], "description", ["Urine"],
+                                  age_range_low=10, age_range_high=100,
+                                  storage_temperatures=[StorageTemperature.TEMPERATURE_LN], diagnoses=["C51"],
+                                  number_of_subjects=10, inclusion_criteria=["Sex"], alias="alias",
+                                  url="https://collection.com", dataset_type="LifeStyle", sample_source="Human",
+                                  sample_collection_setting="Environment", collection_design=["CaseControl"],
+                                  use_and_access_conditions=["CommercialUse"], publications=["publication"])]
+        for collection in collections:
+            with self.subTest(collection=collection.__dict__):
+                collection_json = with_id(collection.to_fhir_dict("collectionOrgFhirId", ["sampleFhirId"]),
+                                          "collectionFhirId")
+                collection_org_json = with_id(collection.collection_organization.to_fhir_dict("biobankFhirId"),
+                                              "collectionOrgFhirId")
+                self.assert_same_instances(Collection.from_json, collection_json, collection_org_json, "biobankId",
+                                           ["sampleId"])
+
+    def test_network(self):
+        network = Network("networkId", "networkName", "contactEmail", "CZ", "juristicPerson",
+                          url="https://network.com", contact_name="contactName", contact_surname="contactSurname",
+                          common_collaboration_topics=["Charter"], description="description")
+        network_json = with_id(network.to_fhir_dict("networkOrgFhirId", ["collectionFhirId"], ["biobankFhirId"]),
+                               "networkFhirId")
+        network_org_json = with_id(network.network_organization.to_fhir_dict("juristicPersonFhirId"),
+                                   "networkOrgFhirId")
+        juristic_person_json = with_id(network.network_organization.juristic_person.to_fhir_dict(),
+                                       "juristicPersonFhirId")
+        self.assert_same_instances(Network.from_json, network_json, network_org_json, juristic_person_json,
+                                   ["collectionId"], ["biobankId"])
+
+    def test_trusted_json_is_not_validated(self):
+        sample_json = with_id(Sample("sampleId", "donorId", "Urine").to_fhir_dict("donorFhirId", "collectionId"),
+                              "sampleFhirId")
+        sample_json["type"]["coding"][0]["code"] = "UnknownMaterial"
+        with self.assertRaises(ValueError):
+            Sample.from_json(sample_json, [], "donorId")
+        sample = Sample.from_json(sample_json, [], "donorId", trusted=True)
+        self.assertEqual("UnknownMaterial", sample.material_type)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import asyncio
+import unittest
+
+try:
+    import aiohttp
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    from blaze_client import AsyncBlazeClient
+except ImportError:
+    # aiohttp is an optional dependency, installed with the "async" extra
+    aiohttp = None
+
+
+async def unauthorized(request):
+    return web.Response(status=401, text="Unauthorized", content_type="text/plain")
+
+
+async def unavailable(request):
+    return web.Response(status=503, text="<html>Service Unavailable</html>", content_type="text/html")
+
+
+async def patient(request):
+    return web.json_response({"resourceType": "Patient", "id": request.match_info["fhir_id"]})
+
+
+@unittest.skipIf(aiohttp is None, "aiohttp is not installed")
+class TestAsyncRequest(unittest.IsolatedAsyncioTestCase):
+    """Requests of the AsyncBlazeClient against a local server which does not behave like blaze."""
+
+    async def asyncSetUp(self):
+        app = web.Application()
+        app.router.add_get("/fhir/Patient/unauthorized", unauthorized)
+        app.router.add_get("/fhir/Patient/unavailable", unavailable)
+        app.router.add_get("/fhir/Patient/{fhir_id}", patient)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.url = str(self.server.make_url("/fhir"))
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_error_without_json_body(self):
+        async with AsyncBlazeClient(self.url, "", "", retries=1, backoff_factor=0.01) as client:
+            for fhir_id, status in [("unauthorized", 401), ("unavailable", 503)]:
+                with self.subTest(status=status):
+                    with self.assertRaises(aiohttp.ClientResponseError) as context:
+                        await client.get_fhir_resource_as_json("Patient", fhir_id)
+                    self.assertEqual(status, context.exception.status)
+
+    async def test_backoff_does_not_hold_concurrency_slot(self):
+        async with AsyncBlazeClient(self.url, "", "", max_concurrency=1, retries=1, backoff_factor=0.5) as client:
+            retried = asyncio.create_task(client.get_fhir_resource_as_json("Patient", "unavailable"))
+            await asyncio.sleep(0.1)
+            # the retried request sleeps in its backoff, the only slot is free for another request
+            patient_json = await asyncio.wait_for(client.get_fhir_resource_as_json("Patient", "patientId"), 0.3)
+            self.assertEqual("patientId", patient_json["id"])
+            self.assertFalse(retried.done())
+            with self.assertRaises(aiohttp.ClientResponseError):
+                await retried
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from blaze_client.batch_loader import AsyncBatchLoader, BatchLoader
+
+
+class TestBatchLoader(unittest.TestCase):
+
+    def test_concurrent_loads_are_batched(self):
+        batches = []
+        loader = BatchLoader(lambda keys: batches.append(sorted(keys)) or {key: key.upper() for key in keys},
+                             window_seconds=0.05)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            values = list(executor.map(loader.load, ["a", "b", "c", "d"]))
+        self.assertEqual(["A", "B", "C", "D"], values)
+        self.assertEqual([["a", "b", "c", "d"]], batches)
+        self.assertEqual(1, loader.batches)
+
+    def test_identical_loads_are_coalesced(self):
+        loaded_keys = []
+        loader = BatchLoader(lambda keys: loaded_keys.extend(keys) or {key: key for key in keys}, window_seconds=0.05)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            values = list(executor.map(loader.load, ["a"] * 4))
+        self.assertEqual(["a"] * 4, values)
+        self.assertEqual(["a"], loaded_keys)
+        self.assertEqual(3, loader.coalesced)
+
+    def test_in_flight_load_is_coalesced(self):
+        loading = threading.Event()
+        release = threading.Event()
+
+        def load_batch(keys):
+            loading.set()
+            release.wait(5)
+            return {key: key for key in keys}
+
+        loader = BatchLoader(load_batch, window_seconds=0)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(loader.load, "a")
+            loading.wait(5)
+            second = executor.submit(loader.load, "a")
+            while loader.coalesced == 0:
+                pass
+            release.set()
+            self.assertEqual("a", first.result())
+            self.assertEqual("a", second.result())
+        self.assertEqual(1, loader.batches)
+
+    def test_missing_value_is_none(self):
+        loader = BatchLoader(lambda keys: {}, window_seconds=0)
+        self.assertIsNone(loader.load("a"))
+
+    def test_exception_is_raised_to_all_callers(self):
+        def load_batch(keys):
+            raise ValueError("failed")
+
+        loader = BatchLoader(load_batch, window_seconds=0.05)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(loader.load, key) for key in ["a", "b"]]
+            for future in futures:
+                with self.assertRaises(ValueError):
+                    future.result()
+        self.assertEqual(1, loader.batches)
+        self.assertEqual("a", BatchLoader(lambda keys: {key: key for key in keys}, window_seconds=0).load("a"))
+
+
+class TestAsyncBatchLoader(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_loads_are_batched_and_coalesced(self):
+        batches = []
+
+        async def load_batch(keys):
+            batches.append(sorted(keys))
+            return {key: key.upper() for key in keys}
+
+        loader = AsyncBatchLoader(load_batch, window_seconds=0)
+        values = await asyncio.gather(*(loader.load(key) for key in ["a", "b", "a", "c"]))
+        self.assertEqual(["A", "B", "A", "C"], values)
+        self.assertEqual([["a", "b", "c"]], batches)
+        self.assertEqual(1, loader.coalesced)
+        self.assertEqual("A", await loader.load("a"))
+        self.assertEqual(2, loader.batches)
+
+    async def test_missing_value_is_none(self):
+        async def load_batch(keys):
+            return {}
+
+        self.assertIsNone(await AsyncBatchLoader(load_batch).load("a"))
+
+    async def test_exception_is_raised_to_all_callers(self):
+        async def load_batch(keys):
+            raise ValueError("failed")
+
+        loader = AsyncBatchLoader(load_batch)
+        results = await asyncio.gather(loader.load("a"), loader.load("b"), return_exceptions=True)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        release = asyncio.Event()
+
+        async def load_batch(keys):
+            await release.wait()
+            return {key: key for key in keys}
+
+        loader = AsyncBatchLoader(load_batch, window_seconds=0)
+        first = asyncio.create_task(loader.load("a"))
+        second = asyncio.create_task(loader.load("a"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        release.set()
+        self.assertEqual("a", await second)
@@ -0,0 +1,63 @@
+import unittest
+
+from blaze_client.bundle_util import get_entry_diagnostics, get_entry_status_code, \
+    is_successful_entry_response, iter_bundle_writes, parse_resource_url
+
+
+class TestBundleUtil(unittest.TestCase):
+
+    def test_is_successful_entry_response(self):
+        self.assertTrue(is_successful_entry_response({"response": {"status": "204 No Content"}}))
+        self.assertTrue(is_successful_entry_response({"response": {"status": "200"}}))
+        self.assertFalse(is_successful_entry_response({"response": {"status": "409 Conflict"}}))
+        self.assertFalse(is_successful_entry_response({}))
+
+    def test_get_entry_status_code(self):
+        self.assertEqual(404, get_entry_status_code({"response": {"status": "404 Not Found"}}))
+        self.assertEqual(200, get_entry_status_code({"response": {"status": "200"}}))
+        self.assertIsNone(get_entry_status_code({}))
+
+    def test_get_entry_diagnostics(self):
+        response_entry = {"response": {"status": "400", "outcome": {
+            "resourceType": "OperationOutcome", "issue": [{"severity": "error", "diagnostics": "invalid"}]}}}
+        self.assertEqual("invalid", get_entry_diagnostics(response_entry))
+        self.assertIsNone(get_entry_diagnostics({"response": {"status": "200"}}))
+
+    def test_parse_resource_url(self):
+        self.assertEqual(("Patient", "1"), parse_resource_url("Patient/1"))
+        self.assertEqual(("Patient", None), parse_resource_url("Patient"))
+        self.assertEqual(("Patient", None), parse_resource_url("Patient?identifier=donorId"))
+        self.assertEqual(("Patient", "1"), parse_resource_url("http://localhost:8080/fhir/Patient/1/_history/2"))
+        self.assertIsNone(parse_resource_url(""))
+
+    def test_iter_bundle_writes(self):
+        patient = {"resourceType": "Patient", "identifier": [{"value": "donorId"}]}
+        group = {"resourceType": "Group", "id": "group"}
+        bundle_json = {"entry": [
+            {"resource": patient, "request": {"method": "POST", "url": "Patient"}},
+            {"resource": group, "request": {"method": "PUT", "url": "Group/group"}},
+            {"request": {"method": "DELETE", "url": "Specimen/sample"}},
+            {"request": {"method": "DELETE", "url": "Specimen/sample2"}},
+            {"request": {"method": "GET", "url": "Specimen/sample3"}},
+        ]}
+        response_json = {"entry": [
+            {"response": {"status": "201", "location": "http://localhost:8080/fhir/Patient/patient/_history/1"}},
+            {"response": {"status": "200"}},
+            {"response": {"status": "204"}},
+            {"response": {"status": "409"}},
+            {"response": {"status": "200"}},
+        ]}
+        self.assertEqual([("POST", "Patient", "patient", patient),
+                          ("PUT", "Group", "group", group),
+                          ("DELETE", "Specimen", "sample", None)],
+                         list(iter_bundle_writes(bundle_json, response_json)))
+
+    def test_iter_bundle_writes_without_response(self):
+        group = {"resourceType": "Group", "id": "group"}
+        bundle_json = {"entry": [
+            {"resource": {"resourceType": "Patient"}, "request": {"method": "POST", "url": "Patient"}},
+            {"resource": group, "request": {"method": "PUT", "url": "Group/group"}},
+            {"request": {"method": "DELETE", "url": "Specimen/sample"}},
+        ]}
+        self.assertEqual([("PUT", "Group", "group", group), ("DELETE", "Specimen", "sample", None)],
+                         list(iter_bundle_writes(bundle_json)))
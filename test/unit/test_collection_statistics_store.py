@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+from blaze_client.collection_statistics_store import CollectionStatisticsStore
+from miabis_model import CollectionCharacteristics
+from miabis_model import Sample
+
+
+class TestCollectionStatisticsStore(unittest.TestCase):
+
+    @staticmethod
+    def create_characteristics() -> CollectionCharacteristics:
+        sample = Sample("sampleId", "donorId", "Urine")
+        sample._subject_fhir_id = "donorFhirId"
+        sample._sample_fhir_id = "sampleFhirId"
+        characteristics = CollectionCharacteristics()
+        characteristics.add_sample(sample, None)
+        return characteristics
+
+    def test_in_memory_store(self):
+        store = CollectionStatisticsStore()
+        self.assertIsNone(store.get("collectionFhirId"))
+        store.save("collectionFhirId", self.create_characteristics())
+        self.assertEqual(self.create_characteristics().to_json(), store.get("collectionFhirId").to_json())
+        store.delete("collectionFhirId")
+        self.assertIsNone(store.get("collectionFhirId"))
+
+    def test_store_persists_between_instances(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "statistics")
+            CollectionStatisticsStore(path).save("collectionFhirId", self.create_characteristics())
+            restored = CollectionStatisticsStore(path).get("collectionFhirId")
+            self.assertEqual(self.create_characteristics().to_json(), restored.to_json())
+            store = CollectionStatisticsStore(path)
+            store.delete("collectionFhirId")
+            self.assertIsNone(CollectionStatisticsStore(path).get("collectionFhirId"))
+
+    def test_collections_are_persisted_separately(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = CollectionStatisticsStore(directory)
+            store.save("collectionFhirId", self.create_characteristics())
+            store.save("otherCollectionFhirId", self.create_characteristics())
+            self.assertEqual(["collectionFhirId.json", "otherCollectionFhirId.json"], sorted(os.listdir(directory)))
+            store.delete("collectionFhirId")
+            self.assertEqual(["otherCollectionFhirId.json"], os.listdir(directory))
+            restored = CollectionStatisticsStore(directory).get("otherCollectionFhirId")
+            self.assertEqual(self.create_characteristics().to_json(), restored.to_json())
@@ -0,0 +1,34 @@
+import unittest
+
+from blaze_client.delete_plan import DeletePlan
+
+
+class TestDeletePlan(unittest.TestCase):
+
+    def test_deletes_are_deduplicated_and_ordered(self):
+        plan = DeletePlan()
+        plan.add_delete("Patient", "donor")
+        plan.add_delete("Specimen", "sample")
+        plan.add_delete("Observation", "observation")
+        plan.add_delete("Specimen", "sample")
+        plan.add_delete("Organization", "collectionOrganization")
+        plan.add_delete("Organization", "biobank")
+        self.assertEqual([("Observation", "observation"), ("Specimen", "sample"), ("Patient", "donor"),
+                          ("Organization", "collectionOrganization"), ("Organization", "biobank")], plan.deletes)
+        self.assertEqual(5, len(plan))
+        self.assertTrue(plan.is_deleted("Specimen", "sample"))
+        self.assertFalse(plan.is_deleted("Specimen", "donor"))
+
+    def test_unsupported_resource_type_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            DeletePlan().add_delete("DiagnosticReport", "report")
+
+    def test_removed_members_of_deleted_groups_are_skipped(self):
+        plan = DeletePlan()
+        plan.remove_collection_members("collection", ["sample", "sample2"])
+        plan.remove_collection_members("collection", ["sample"])
+        plan.remove_collection_members("deletedCollection", ["sample"])
+        plan.remove_network_members("network", ["deletedCollection"])
+        plan.add_delete("Group", "deletedCollection")
+        self.assertEqual({"collection": ["sample", "sample2"]}, plan.removed_collection_members)
+        self.assertEqual({"network": ["deletedCollection"]}, plan.removed_network_members)
@@ -0,0 +1,77 @@
+import unittest
+
+from blaze_client.group_membership_index import GroupMembershipIndex, get_group_member_fhir_ids
+
+MEMBER_EXTENSION_URL = "http://hl7.org/fhir/5.0/StructureDefinition/extension-Group.member.entity"
+
+
+def create_group_json(group_fhir_id: str, member_references: list[str]) -> dict:
+    return {"resourceType": "Group", "id": group_fhir_id,
+            "extension": [{"url": MEMBER_EXTENSION_URL, "valueReference": {"reference": reference}}
+                          for reference in member_references]}
+
+
+class TestGroupMembershipIndex(unittest.TestCase):
+
+    def test_get_group_member_fhir_ids(self):
+        group_json = create_group_json("collection", ["Specimen/sample", "Specimen/sample2"])
+        group_json["extension"].append({"url": "otherExtension", "valueString": "value"})
+        self.assertEqual(["sample", "sample2"], get_group_member_fhir_ids(group_json))
+
+    def test_load_and_lookup(self):
+        index = GroupMembershipIndex()
+        self.assertFalse(index.is_loaded)
+        index.load([create_group_json("collection", ["Specimen/sample", "Specimen/sample2"]),
+                    create_group_json("network", ["Group/collection", "Organization/biobank"])])
+        self.assertTrue(index.is_loaded)
+        self.assertEqual(["collection"], index.get_group_fhir_ids("sample"))
+        self.assertEqual(["network"], index.get_group_fhir_ids("biobank"))
+        self.assertEqual([], index.get_group_fhir_ids("nonexistent"))
+        self.assertEqual({"collection": ["sample2"], "network": ["collection"]},
+                         index.get_groups_by_members(["sample2", "collection", "nonexistent"]))
+
+    def test_set_members_replaces_previous_members(self):
+        index = GroupMembershipIndex()
+        index.set_members("collection", ["sample", "sample2"])
+        index.set_members("collection", ["sample2", "sample3"])
+        self.assertEqual([], index.get_group_fhir_ids("sample"))
+        self.assertEqual(["collection"], index.get_group_fhir_ids("sample3"))
+        index.remove_group("collection")
+        self.assertEqual({}, index.get_groups_by_members(["sample2", "sample3"]))
+
+    def test_clear(self):
+        index = GroupMembershipIndex()
+        index.load([create_group_json("collection", ["Specimen/sample"])])
+        index.clear()
+        self.assertFalse(index.is_loaded)
+        self.assertEqual([], index.get_group_fhir_ids("sample"))
+
+    def test_apply_bundle(self):
+        index = GroupMembershipIndex()
+        index.load([create_group_json("collection", ["Specimen/sample"]),
+                    create_group_json("network", ["Group/collection"])])
+        bundle_json = {"entry": [
+            {"request": {"method": "POST", "url": "Group"},
+             "resource": create_group_json(None, ["Specimen/sample2"])},
+            {"request": {"method": "PUT", "url": "Group/network"},
+             "resource": create_group_json("network", ["Organization/biobank"])},
+            {"request": {"method": "DELETE", "url": "Group/collection"}},
+            {"request": {"method": "DELETE", "url": "Specimen/sample"}}]}
+        response_json = {"entry": [{"response": {"status": "201", "location": "Group/newCollection/_history/1"}},
+                                   {"response": {"status": "200"}},
+                                   {"response": {"status": "204"}},
+                                   {"response": {"status": "204"}}]}
+        index.apply_bundle(bundle_json, response_json)
+        self.assertEqual(["newCollection"], index.get_group_fhir_ids("sample2"))
+        self.assertEqual(["network"], index.get_group_fhir_ids("biobank"))
+        self.assertEqual([], index.get_group_fhir_ids("collection"))
+        self.assertEqual([], index.get_group_fhir_ids("sample"))
+
+    def test_apply_bundle_skips_failed_entries(self):
+        index = GroupMembershipIndex()
+        index.load([create_group_json("collection", ["Specimen/sample"])])
+        index.apply_bundle({"entry": [{"request": {"method": "DELETE", "url": "Group/collection"}}]},
+                           {"entry": [{"response": {"status": "409 Conflict"}}]})
+        self.assertEqual(["collection"], index.get_group_fhir_ids("sample"))
+        index.apply_bundle({"entry": [{"request": {"method": "DELETE", "url": "Group/collection"}}]})
+        self.assertEqual([], index.get_group_fhir_ids("sample"))
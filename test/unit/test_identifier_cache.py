@@ -0,0 +1,98 @@
+import unittest
+
+from blaze_client.identifier_cache import IdentifierCache
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestIdentifierCache(unittest.TestCase):
+
+    def test_put_and_get_both_directions(self):
+        cache = IdentifierCache()
+        cache.put("patient", "donorId", "fhirId")
+        self.assertEqual("fhirId", cache.get_fhir_id("Patient", "donorId"))
+        self.assertEqual("donorId", cache.get_identifier("Patient", "fhirId"))
+        self.assertIsNone(cache.get_fhir_id("Specimen", "donorId"))
+        self.assertEqual(1, len(cache))
+
+    def test_put_ignores_missing_values(self):
+        cache = IdentifierCache()
+        cache.put("Patient", None, "fhirId")
+        cache.put("Patient", "donorId", None)
+        self.assertEqual(0, len(cache))
+
+    def test_put_replaces_previous_translations(self):
+        cache = IdentifierCache()
+        cache.put("Patient", "donorId", "fhirId")
+        cache.put("Patient", "donorId", "newFhirId")
+        self.assertEqual("newFhirId", cache.get_fhir_id("Patient", "donorId"))
+        self.assertIsNone(cache.get_identifier("Patient", "fhirId"))
+        cache.put("Patient", "newDonorId", "newFhirId")
+        self.assertIsNone(cache.get_fhir_id("Patient", "donorId"))
+        self.assertEqual("newDonorId", cache.get_identifier("Patient", "newFhirId"))
+        self.assertEqual(1, len(cache))
+
+    def test_least_recently_used_is_evicted(self):
+        cache = IdentifierCache(max_size=2)
+        cache.put("Patient", "donor1", "fhir1")
+        cache.put("Patient", "donor2", "fhir2")
+        cache.get_fhir_id("Patient", "donor1")
+        cache.put("Patient", "donor3", "fhir3")
+        self.assertEqual(2, len(cache))
+        self.assertEqual(1, cache.evictions)
+        self.assertIsNone(cache.get_fhir_id("Patient", "donor2"))
+        self.assertIsNone(cache.get_identifier("Patient", "fhir2"))
+        self.assertEqual("fhir1", cache.get_fhir_id("Patient", "donor1"))
+        self.assertEqual("fhir3", cache.get_fhir_id("Patient", "donor3"))
+
+    def test_translations_expire(self):
+        clock = FakeClock()
+        cache = IdentifierCache(ttl_seconds=10, clock=clock)
+        cache.put("Patient", "donorId", "fhirId")
+        clock.now = 9.9
+        self.assertEqual("fhirId", cache.get_fhir_id("Patient", "donorId"))
+        clock.now = 10
+        self.assertIsNone(cache.get_identifier("Patient", "fhirId"))
+        self.assertIsNone(cache.get_fhir_id("Patient", "donorId"))
+        self.assertEqual(0, len(cache))
+
+    def test_no_expiration(self):
+        clock = FakeClock()
+        cache = IdentifierCache(ttl_seconds=None, clock=clock)
+        cache.put("Patient", "donorId", "fhirId")
+        clock.now = 10 ** 9
+        self.assertEqual("fhirId", cache.get_fhir_id("Patient", "donorId"))
+
+    def test_invalidate(self):
+        cache = IdentifierCache()
+        cache.put("Patient", "donorId", "fhirId")
+        cache.put("Specimen", "sampleId", "fhirId")
+        cache.invalidate("Patient", "fhirId")
+        self.assertIsNone(cache.get_fhir_id("Patient", "donorId"))
+        self.assertEqual("sampleId", cache.get_identifier("Specimen", "fhirId"))
+
+    def test_statistics(self):
+        cache = IdentifierCache()
+        self.assertEqual(0.0, cache.hit_ratio)
+        cache.put("Patient", "donorId", "fhirId")
+        cache.get_fhir_id("Patient", "donorId")
+        cache.get_identifier("Patient", "fhirId")
+        cache.get_fhir_id("Patient", "otherDonorId")
+        cache.get_identifier("Patient", "otherFhirId")
+        self.assertEqual(2, cache.hits)
+        self.assertEqual(2, cache.misses)
+        self.assertEqual(0.5, cache.hit_ratio)
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        self.assertEqual(2, cache.hits)
+
+    def test_invalid_max_size(self):
+        with self.assertRaises(ValueError):
+            IdentifierCache(max_size=0)
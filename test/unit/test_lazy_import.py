@@ -0,0 +1,43 @@
+import subprocess
+import sys
+import unittest
+
+
+def imported_modules(statement: str, modules: list[str]) -> list[str]:
+    """Run the statement in a fresh interpreter and return which of the modules it imported."""
+    check = f"{statement}\nimport sys\nprint(','.join(m for m in {modules!r} if m in sys.modules))"
+    completed = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, check=True)
+    return [module for module in completed.stdout.strip().split(",") if module]
+
+
+class TestLazyImport(unittest.TestCase):
+    HEAVY_MODULES = ["simple_icd_10", "fhirclient", "requests", "aiohttp", "miabis_model.sample"]
+
+    def test_package_imports_are_lazy(self):
+        self.assertEqual([], imported_modules("import miabis_model, blaze_client", self.HEAVY_MODULES))
+
+    def test_icd10_data_are_loaded_on_first_validation(self):
+        self.assertEqual(["fhirclient"],
+                         imported_modules("from miabis_model import Sample, icd10_service",
+                                          ["simple_icd_10", "fhirclient"]))
+        self.assertEqual(["simple_icd_10"],
+                         imported_modules("from miabis_model import icd10_service\nicd10_service.is_valid('C51')",
+                                          ["simple_icd_10"]))
+
+    def test_lazy_attributes(self):
+        import miabis_model
+        import blaze_client
+        from miabis_model.sample import Sample
+        from blaze_client.search_util import SearchPolicy
+        self.assertIs(Sample, miabis_model.Sample)
+        self.assertIs(SearchPolicy, blaze_client.SearchPolicy)
+        self.assertIsInstance(miabis_model.icd10_service, miabis_model.ICD10Service)
+        self.assertIn("Sample", dir(miabis_model))
+        with self.assertRaises(AttributeError):
+            miabis_model.Unknown
+        with self.assertRaises(ImportError):
+            from blaze_client import Unknown  # noqa: F401
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from miabis_model.util.parsing_util import get_nested_value, compile_path, ExtensionParser, set_value, \
+    append_value, get_codeable_concept_code, get_string_value
+
+RESOURCE_JSON = {"id": "fhirId",
+                 "identifier": [{"value": "identifier"}],
+                 "alias": [],
+                 "name": "",
+                 "note": [{"text": None}],
+                 "extension": [{"url": "first", "valueCodeableConcept": {"coding": [{"code": "code"}]}},
+                               {"url": "second", "valueString": "text"}],
+                 "meta": {"versionId": "2"}}
+
+PATHS = [["id"], ["identifier", 0, "value"], ["identifier", 1, "value"], ["identifier", -1, "value"],
+         ["alias", 0], ["name"], ["name", "given"], ["note", 0, "text"], ["missing"], ["missing", 0, "value"],
+         ["extension", 0, "valueCodeableConcept", "coding", 0, "code"], ["extension", 1, "valueString"],
+         ["meta", "versionId"], ["meta", 0], []]
+
+
+class TestCompilePath(unittest.TestCase):
+
+    def test_same_values_as_get_nested_value(self):
+        for keys in PATHS:
+            with self.subTest(keys=keys):
+                self.assertEqual(get_nested_value(RESOURCE_JSON, keys), compile_path(keys)(RESOURCE_JSON))
+
+    def test_compiled_paths_are_cached(self):
+        self.assertIs(compile_path(["identifier", 0, "value"]), compile_path(("identifier", 0, "value")))
+
+    def test_keys_are_not_evaluated(self):
+        key = "x\"]) or __import__('os').getcwd() or (["
+        self.assertIsNone(compile_path([key])(RESOURCE_JSON))
+        self.assertEqual("value", compile_path([key])({key: "value"}))
+
+
+class TestExtensionParser(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = ExtensionParser({"first": append_value("codes", get_codeable_concept_code),
+                                       "second": set_value("text", get_string_value),
+                                       "third": set_value("text", get_string_value, skip_none=False)})
+
+    def test_dispatch_by_url(self):
+        parsed = self.parser.parse(RESOURCE_JSON["extension"] * 2, {"codes": [], "text": None})
+        self.assertEqual({"codes": ["code", "code"], "text": "text"}, parsed)
+
+    def test_unknown_urls_and_missing_extensions(self):
+        self.assertEqual({"codes": []}, self.parser.parse([{"url": "unknown"}], {"codes": []}))
+        self.assertEqual({"codes": []}, self.parser.parse(None, {"codes": []}))
+
+    def test_missing_values(self):
+        parsed = self.parser.parse([{"url": "first"}, {"url": "second"}], {"codes": [], "text": "default"})
+        self.assertEqual({"codes": [], "text": "default"}, parsed)
+        parsed = self.parser.parse([{"url": "third"}], {"text": "default"})
+        self.assertEqual({"text": None}, parsed)
+
+    def test_converted_values(self):
+        parser = ExtensionParser({"first": append_value("codes", get_codeable_concept_code, convert=str.upper)})
+        self.assertEqual({"codes": ["CODE"]}, parser.parse(RESOURCE_JSON["extension"], {"codes": []}))
+
+    def test_extension_without_url(self):
+        with self.assertRaises(KeyError):
+            self.parser.parse([{"valueString": "text"}], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
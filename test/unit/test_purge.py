@@ -0,0 +1,37 @@
+import unittest
+
+from blaze_client.purge import PURGE_ORDER, PurgeProgress, create_purge_search_params
+from miabis_model.util.config import FHIRConfig
+
+
+class TestPurge(unittest.TestCase):
+
+    def test_referencing_resources_are_purged_first(self):
+        order = [profile for _, profile in PURGE_ORDER]
+        self.assertLess(order.index("network"), order.index("collection"))
+        self.assertLess(order.index("collection"), order.index("sample"))
+        self.assertLess(order.index("observation"), order.index("sample"))
+        self.assertLess(order.index("sample"), order.index("donor"))
+        self.assertLess(order.index("condition"), order.index("donor"))
+        self.assertLess(order.index("collection_organization"), order.index("biobank"))
+        self.assertLess(order.index("biobank"), order.index("juristic_person"))
+        self.assertEqual("juristic_person", order[-1])
+
+    def test_create_purge_search_params(self):
+        self.assertEqual({"_profile": FHIRConfig.get_meta_profile_url("sample"), "_elements": "id", "_sort": "_id"},
+                         create_purge_search_params("sample"))
+
+    def test_create_purge_search_params_after_fhir_id(self):
+        self.assertEqual({"_profile": FHIRConfig.get_meta_profile_url("sample"), "_elements": "id", "_sort": "_id",
+                          "_id": "gtfhirId"},
+                         create_purge_search_params("sample", "fhirId"))
+
+    def test_purge_progress(self):
+        progress = PurgeProgress("Specimen", "sample", 10)
+        progress.record(4, 0)
+        progress.record(5, 1)
+        self.assertEqual(9, progress.deleted)
+        self.assertEqual(1, progress.failed)
+        self.assertEqual(10, progress.total)
+        self.assertGreaterEqual(progress.throughput, 0)
+        self.assertTrue(str(progress).startswith("Specimen (sample): 9/10 deleted, 1 failed"))
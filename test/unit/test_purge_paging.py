@@ -0,0 +1,73 @@
+import unittest
+
+try:
+    import aiohttp
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    from blaze_client import AsyncBlazeClient
+except ImportError:
+    # aiohttp is an optional dependency, installed with the "async" extra
+    aiohttp = None
+
+from miabis_model.util.config import FHIRConfig
+
+
+class _PagingServer:
+    """Server paging the searches sorted by FHIR IDs, whose first page of donors is followed by a delete
+    of a donor by someone else."""
+
+    def __init__(self, donor_fhir_ids: list[str]):
+        self.donor_fhir_ids = sorted(donor_fhir_ids)
+        self.donor_searches = 0
+
+    async def search(self, request):
+        if request.match_info["resource_type"] != "Patient" \
+                or request.query.get("_profile") != FHIRConfig.get_meta_profile_url("donor"):
+            return web.json_response({"resourceType": "Bundle", "type": "searchset"})
+        fhir_ids = self.donor_fhir_ids
+        if "_id" in request.query:
+            fhir_ids = [fhir_id for fhir_id in fhir_ids if fhir_id > request.query["_id"].removeprefix("gt")]
+        count = int(request.query["_count"])
+        search_bundle = {"resourceType": "Bundle", "type": "searchset",
+                         "entry": [{"resource": {"resourceType": "Patient", "id": fhir_id}}
+                                   for fhir_id in fhir_ids[:count]]}
+        if len(fhir_ids) > count:
+            search_bundle["link"] = [{"relation": "next", "url": f"{request.url.origin()}/fhir/__page"}]
+        self.donor_searches += 1
+        if self.donor_searches == 1:
+            self.donor_fhir_ids.remove(self.donor_fhir_ids[0])
+        return web.json_response(search_bundle)
+
+    async def batch(self, request):
+        bundle_json = await request.json()
+        for entry in bundle_json["entry"]:
+            fhir_id = entry["request"]["url"].split("/")[-1]
+            if fhir_id in self.donor_fhir_ids:
+                self.donor_fhir_ids.remove(fhir_id)
+        # deletes are idempotent, deleting an already deleted resource succeeds as well
+        return web.json_response({"resourceType": "Bundle", "type": "batch-response",
+                                  "entry": [{"response": {"status": "204 No Content"}} for _ in bundle_json["entry"]]})
+
+
+@unittest.skipIf(aiohttp is None, "aiohttp is not installed")
+class TestPurgePaging(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.blaze = _PagingServer(["p1", "p2", "p3", "p4", "p5"])
+        app = web.Application()
+        app.router.add_get("/fhir/{resource_type}", self.blaze.search)
+        app.router.add_post("/fhir", self.blaze.batch)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.url = str(self.server.make_url("/fhir"))
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_deletes_between_pages_do_not_skip_resources(self):
+        async with AsyncBlazeClient(self.url, "", "") as client:
+            purged = await client.purge_all_resources(bundle_size=2)
+        self.assertTrue(purged)
+        self.assertEqual([], self.blaze.donor_fhir_ids)
+        self.assertEqual(3, self.blaze.donor_searches)
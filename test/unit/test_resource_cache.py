@@ -0,0 +1,67 @@
+import unittest
+
+from blaze_client.resource_cache import ResourceCache
+
+
+def create_resource_json(resource_fhir_id: str, version_id: str | None = "1") -> dict:
+    resource_json = {"resourceType": "Group", "id": resource_fhir_id, "extension": [{"url": "member"}]}
+    if version_id is not None:
+        resource_json["meta"] = {"versionId": version_id}
+    return resource_json
+
+
+class TestResourceCache(unittest.TestCase):
+
+    def test_put_and_get(self):
+        cache = ResourceCache()
+        cache.put(create_resource_json("collection", "3"))
+        self.assertEqual("3", cache.get_version_id("group", "collection"))
+        self.assertEqual(create_resource_json("collection", "3"), cache.get("Group", "collection"))
+        self.assertIsNone(cache.get_version_id("Group", "network"))
+        self.assertIsNone(cache.get("Group", "network"))
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, cache.misses)
+
+    def test_resource_without_version_is_not_cached(self):
+        cache = ResourceCache()
+        cache.put(create_resource_json("collection", None))
+        self.assertEqual(0, len(cache))
+
+    def test_returned_resource_can_be_modified(self):
+        cache = ResourceCache()
+        resource_json = create_resource_json("collection")
+        cache.put(resource_json)
+        resource_json["extension"].clear()
+        cache.get("Group", "collection")["extension"].clear()
+        self.assertEqual([{"url": "member"}], cache.get("Group", "collection")["extension"])
+
+    def test_put_replaces_previous_version(self):
+        cache = ResourceCache()
+        cache.put(create_resource_json("collection", "1"))
+        cache.put(create_resource_json("collection", "2"))
+        self.assertEqual("2", cache.get_version_id("Group", "collection"))
+        self.assertEqual(1, len(cache))
+
+    def test_least_recently_used_is_evicted(self):
+        cache = ResourceCache(max_size=2)
+        cache.put(create_resource_json("collection1"))
+        cache.put(create_resource_json("collection2"))
+        cache.get("Group", "collection1")
+        cache.put(create_resource_json("collection3"))
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get_version_id("Group", "collection2"))
+        self.assertEqual("1", cache.get_version_id("Group", "collection1"))
+
+    def test_invalidate_and_clear(self):
+        cache = ResourceCache()
+        cache.put(create_resource_json("collection1"))
+        cache.put(create_resource_json("collection2"))
+        cache.invalidate("Group", "collection1")
+        self.assertIsNone(cache.get("Group", "collection1"))
+        self.assertEqual(1, len(cache))
+        cache.clear()
+        self.assertEqual(0, len(cache))
+
+    def test_invalid_max_size(self):
+        with self.assertRaises(ValueError):
+            ResourceCache(max_size=0)
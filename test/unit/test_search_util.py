@@ -0,0 +1,57 @@
+import unittest
+
+from blaze_client.search_util import SearchPolicy, chunk_list, join_search_values
+from miabis_model.util.util import escape_search_value, create_identifier_search_query
+
+
+class TestSearchUtil(unittest.TestCase):
+    def test_chunk_list(self):
+        self.assertEqual([[1, 2], [3, 4], [5]], list(chunk_list([1, 2, 3, 4, 5], 2)))
+
+    def test_chunk_list_empty(self):
+        self.assertEqual([], list(chunk_list([], 3)))
+
+    def test_chunk_list_invalid_size(self):
+        with self.assertRaises(ValueError):
+            list(chunk_list([1], 0))
+
+    def test_escape_search_value(self):
+        self.assertEqual("a\\,b\\|c\\$d\\\\e", escape_search_value("a,b|c$d\\e"))
+
+    def test_identifier_search_query_is_escaped(self):
+        self.assertEqual("identifier=a%5C%2Cb", create_identifier_search_query("a,b"))
+
+    def test_join_search_values(self):
+        self.assertEqual("sampleId,sample\\,Id2", join_search_values(["sampleId", "sample,Id2"]))
+
+
+class TestSearchPolicy(unittest.TestCase):
+    def test_existence_params_first_match(self):
+        self.assertEqual({"identifier": "donorId", "_total": "none", "_count": 1, "_elements": "id"},
+                         SearchPolicy().existence_params({"identifier": "donorId"}))
+
+    def test_existence_params_by_count(self):
+        self.assertEqual({"identifier": "donorId", "_summary": "count"},
+                         SearchPolicy(existence_by_count=True).existence_params({"identifier": "donorId"}))
+
+    def test_id_resolution_params(self):
+        policy = SearchPolicy()
+        self.assertEqual({"identifier": "donorId", "_elements": "id,identifier", "_total": "none"},
+                         policy.id_resolution_params({"identifier": "donorId"}))
+        self.assertEqual("id", policy.id_resolution_params({"_elements": "id"})["_elements"])
+
+    def test_list_params_page_size(self):
+        policy = SearchPolicy(page_size=50)
+        self.assertEqual({"subject": "donor", "_total": "none", "_count": 50}, policy.list_params({"subject": "donor"}))
+        self.assertEqual(10, policy.list_params({"subject": "donor", "_count": 10})["_count"])
+        self.assertEqual(1, policy.list_params({"subject": "donor", "_count": 10}, page_size=1)["_count"])
+        self.assertNotIn("_count", SearchPolicy().list_params({"subject": "donor"}))
+
+    def test_list_params_keep_total(self):
+        self.assertEqual({"subject": "donor"}, SearchPolicy(skip_total=False).list_params({"subject": "donor"}))
+        self.assertEqual({"subject": "donor", "_summary": "count"},
+                         SearchPolicy().list_params({"subject": "donor", "_summary": "count"}))
+
+    def test_invalid_page_size(self):
+        with self.assertRaises(ValueError):
+            SearchPolicy(page_size=0)